@@ -15,13 +15,14 @@ Comandos disponibles:
     cleanup         - Limpiar datos antiguos
     stats          - Mostrar estadísticas de la aplicación
     import-players  - Importar jugadores desde CSV
-    export-data    - Exportar datos a CSV
+    import-csv      - Importar CSV de una entidad (--entity jugadores|pesos|multas|puntuaciones|asistencias)
+    export-data    - Exportar todas las tablas a CSV (--format xlsx para Excel, --file directorio)
+    recompute-stats - Recalcular las estadísticas de jugadores desde eventos y convocatorias (--season AAAA-AAAA)
 """
 
 import sys
 import os
-import json
-import csv
+import time
 import argparse
 from datetime import datetime, timedelta
 from getpass import getpass
@@ -30,15 +31,19 @@ from pathlib import Path
 # Añadir el directorio raíz al path para importar módulos
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from database.db_manager import DatabaseManager, init_database, Usuario, Jugador
+from database.db_manager import DatabaseManager, init_database, rebuild_estadisticas_jugadores, es_temporada, Usuario, Jugador
 from auth.login import hash_password
-from utils.helpers import create_backup_data, export_to_excel
+from database.backup import write_backup, restore_backup
+from utils.bulk_import import import_csv, IMPORT_ENTITIES
+from utils.export import write_csv, write_xlsx, EXPORT_ENTITIES
 
 class AdminManager:
     """Gestor de operaciones administrativas"""
     
-    def __init__(self):
-        self.db_manager = DatabaseManager()
+    @property
+    def db_manager(self):
+        """DatabaseManager nuevo para cada comando (su sesión se cierra al salir del with)"""
+        return DatabaseManager()
     
     def init_database(self):
         """Inicializa la base de datos"""
@@ -129,26 +134,23 @@ class AdminManager:
             print(f"❌ Error actualizando contraseña: {e}")
     
     def backup_data(self, output_file=None):
-        """Crea un backup completo de los datos"""
+        """Crea un backup completo de los datos (JSON lines comprimido, en streaming)"""
         if not output_file:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_file = f"backup_ud_atzeneta_{timestamp}.json"
+            output_file = f"backup_ud_atzeneta_{timestamp}.ndjson.gz"
         
         print(f"Creando backup en {output_file}...")
         
         try:
-            backup_data = create_backup_data(self.db_manager)
+            inicio = time.perf_counter()
+            conteos = write_backup(output_file)
+            duracion = time.perf_counter() - inicio
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(backup_data, f, indent=2, ensure_ascii=False)
-            
-            print(f"✅ Backup creado correctamente: {output_file}")
+            print(f"✅ Backup creado correctamente: {output_file} "
+                  f"({os.path.getsize(output_file) / 1024:.0f} KB en {duracion:.1f}s)")
             print(f"📊 Estadísticas del backup:")
-            
-            data = backup_data.get('data', {})
-            for table, records in data.items():
-                if isinstance(records, list):
-                    print(f"  - {table}: {len(records)} registros")
+            for table, registros in conteos.items():
+                print(f"  - {table}: {registros} registros")
                     
         except Exception as e:
             print(f"❌ Error creando backup: {e}")
@@ -166,17 +168,17 @@ class AdminManager:
             return
         
         try:
-            with open(backup_file, 'r', encoding='utf-8') as f:
-                backup_data = json.load(f)
-            
             print("Restaurando datos...")
-            # Aquí se implementaría la lógica de restauración
-            # Por seguridad, se requiere implementación adicional
+            inicio = time.perf_counter()
+            conteos = restore_backup(backup_file)
             
-            print("✅ Datos restaurados correctamente")
+            print(f"✅ Datos restaurados correctamente en {time.perf_counter() - inicio:.1f}s")
+            for table, registros in conteos.items():
+                print(f"  - {table}: {registros} registros")
             
         except Exception as e:
-            print(f"❌ Error restaurando datos: {e}")
+            # La restauración es una sola transacción: los datos actuales no se han tocado
+            print(f"❌ Error restaurando datos (no se ha modificado nada): {e}")
     
     def cleanup_old_data(self, days=90):
         """Limpia datos antiguos"""
@@ -210,10 +212,10 @@ class AdminManager:
                 active_players = db.db.query(Jugador).filter(Jugador.activo == True).count()
                 
                 # Estadísticas del calendario
-                calendar_events = db.get_calendario()
+                calendar_events = db.get_calendario_rows()
                 
                 # Estadísticas de entrenamientos
-                trainings = db.get_entrenamientos()
+                trainings = db.get_entrenamientos_rows()
                 
                 # Estadísticas de multas
                 multas = db.get_multas()
@@ -229,6 +231,14 @@ class AdminManager:
                 print(f"  - Activos: {active_players}")
                 print()
                 
+                temporadas = db.get_resumen_temporadas()
+                if temporadas:
+                    print(f"🥅 Temporadas:")
+                    for temporada, totales in temporadas.items():
+                        print(f"  - {temporada}: {totales['goles']} goles, {totales['asistencias']} asistencias, "
+                              f"{totales['jugadores']} jugadores")
+                    print()
+                
                 print(f"📅 Calendario:")
                 print(f"  - Eventos: {len(calendar_events)}")
                 print()
@@ -252,130 +262,79 @@ class AdminManager:
     
     def import_players_csv(self, csv_file):
         """Importa jugadores desde un archivo CSV"""
+        self.import_data_csv('jugadores', csv_file)
+    
+    def import_data_csv(self, entidad, csv_file):
+        """Importa un CSV de jugadores, pesos, multas, puntuaciones o asistencias"""
         if not os.path.exists(csv_file):
             print(f"❌ Archivo CSV no encontrado: {csv_file}")
             return
         
-        print(f"Importando jugadores desde {csv_file}...")
+        print(f"Importando {entidad} desde {csv_file}...")
         
         try:
-            imported = 0
-            skipped = 0
-            
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                
-                with self.db_manager as db:
-                    for row in reader:
-                        # Verificar si el jugador ya existe
-                        existing = db.db.query(Jugador).filter(
-                            Jugador.dni == row.get('dni')
-                        ).first() if row.get('dni') else None
-                        
-                        if existing:
-                            print(f"⚠️  Jugador {row.get('nombre', 'Sin nombre')} ya existe (DNI: {row.get('dni')})")
-                            skipped += 1
-                            continue
-                        
-                        # Crear nuevo jugador
-                        jugador_data = {
-                            'nombre_futbolistico': row.get('nombre_futbolistico', ''),
-                            'nombre': row.get('nombre', ''),
-                            'apellidos': row.get('apellidos', ''),
-                            'email': row.get('email') or None,
-                            'dni': row.get('dni') or None,
-                            'telefono': row.get('telefono') or None,
-                            'direccion': row.get('direccion') or None,
-                            'dorsal': int(row.get('dorsal')) if row.get('dorsal') else None,
-                            'posicion': row.get('posicion') or None,
-                            'altura': float(row.get('altura')) if row.get('altura') else None
-                        }
-                        
-                        jugador = Jugador(**jugador_data)
-                        db.db.add(jugador)
-                        imported += 1
-                    
-                    db.db.commit()
+            resultado = import_csv(entidad, csv_file)
             
-            print(f"✅ Importación completada:")
-            print(f"  - Importados: {imported}")
-            print(f"  - Omitidos: {skipped}")
+            print(f"✅ Importación completada en {resultado['segundos']:.1f}s:")
+            print(f"  - Importados: {resultado['importados']}")
+            print(f"  - Rechazados: {resultado['rechazados']}")
+            if resultado['rechazos']:
+                print(f"  - Filas rechazadas y motivos en: {resultado['rechazos']}")
             
         except Exception as e:
-            print(f"❌ Error importando jugadores: {e}")
+            # Cada bloque se confirma por separado: lo importado antes del error se conserva
+            print(f"❌ Error importando {entidad}: {e}")
+            print("⚠️  La importación puede haber quedado parcial: revisa los datos antes de reimportar "
+                  "(las filas con DNI ya registrado se rechazan)")
     
-    def export_data_csv(self, output_dir="exports"):
-        """Exporta todos los datos a archivos CSV"""
+    def export_data_csv(self, output_dir="exports", formato="csv"):
+        """Exporta todas las tablas a CSV (un fichero por tabla) o a un Excel con una hoja por tabla"""
         os.makedirs(output_dir, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         print(f"Exportando datos a {output_dir}...")
         
         try:
-            with self.db_manager as db:
-                # Exportar jugadores
-                jugadores = db.get_jugadores(activos_solo=False)
-                jugadores_data = []
-                
-                for j in jugadores:
-                    jugadores_data.append({
-                        'id': j.id,
-                        'nombre_futbolistico': j.nombre_futbolistico,
-                        'nombre': j.nombre,
-                        'apellidos': j.apellidos,
-                        'email': j.email,
-                        'dni': j.dni,
-                        'telefono': j.telefono,
-                        'direccion': j.direccion,
-                        'dorsal': j.dorsal,
-                        'posicion': j.posicion,
-                        'altura': j.altura,
-                        'goles': j.goles,
-                        'asistencias': j.asistencias,
-                        'tarjetas_amarillas': j.tarjetas_amarillas,
-                        'tarjetas_rojas': j.tarjetas_rojas,
-                        'activo': j.activo
-                    })
-                
-                # Escribir CSV de jugadores
-                jugadores_file = os.path.join(output_dir, f"jugadores_{timestamp}.csv")
-                with open(jugadores_file, 'w', newline='', encoding='utf-8') as f:
-                    if jugadores_data:
-                        writer = csv.DictWriter(f, fieldnames=jugadores_data[0].keys())
-                        writer.writeheader()
-                        writer.writerows(jugadores_data)
-                
-                print(f"✅ Jugadores exportados: {jugadores_file}")
-                
-                # Exportar calendario
-                calendario = db.get_calendario()
-                calendario_data = []
-                
-                for c in calendario:
-                    calendario_data.append({
-                        'fecha': c.fecha.strftime("%Y-%m-%d") if c.fecha else '',
-                        'hora': c.hora,
-                        'competicion': c.competicion,
-                        'equipo_local': c.equipo_local,
-                        'equipo_visitante': c.equipo_visitante,
-                        'goles_local': c.goles_equipo_local,
-                        'goles_visitante': c.goles_equipo_visitante,
-                        'arbitro': c.arbitro,
-                        'campo': c.campo
-                    })
-                
-                calendario_file = os.path.join(output_dir, f"calendario_{timestamp}.csv")
-                with open(calendario_file, 'w', newline='', encoding='utf-8') as f:
-                    if calendario_data:
-                        writer = csv.DictWriter(f, fieldnames=calendario_data[0].keys())
-                        writer.writeheader()
-                        writer.writerows(calendario_data)
-                
-                print(f"✅ Calendario exportado: {calendario_file}")
+            inicio = time.perf_counter()
+            if formato == 'xlsx':
+                excel_file = os.path.join(output_dir, f"ud_atzeneta_{timestamp}.xlsx")
+                conteos = write_xlsx(list(EXPORT_ENTITIES), excel_file)
+                for entidad, filas in conteos.items():
+                    print(f"  - {entidad}: {filas} filas")
+                print(f"✅ Datos exportados: {excel_file}")
+            else:
+                for entidad in EXPORT_ENTITIES:
+                    csv_file = os.path.join(output_dir, f"{entidad}_{timestamp}.csv")
+                    filas = write_csv(entidad, csv_file)
+                    print(f"✅ {entidad} exportado ({filas} filas): {csv_file}")
+            
+            print(f"⏱️  Exportación completada en {time.perf_counter() - inicio:.1f}s")
                 
         except Exception as e:
             print(f"❌ Error exportando datos: {e}")
 
+    def recompute_stats(self, temporada=None):
+        """Recalcula las estadísticas de los jugadores (todas las temporadas o una)"""
+        print(f"Recalculando estadísticas de {temporada or 'todas las temporadas'}...")
+        
+        try:
+            inicio = time.perf_counter()
+            with self.db_manager as db:
+                conteos = rebuild_estadisticas_jugadores(db.db, [temporada] if temporada else None)
+            
+            for temporada, jugadores in conteos.items():
+                print(f"  - {temporada}: {jugadores} jugadores")
+            print(f"✅ Estadísticas recalculadas en {time.perf_counter() - inicio:.1f}s")
+            
+        except Exception as e:
+            print(f"❌ Error recalculando estadísticas: {e}")
+
+def temporada_arg(valor):
+    """Tipo de argparse para --season: solo temporadas 'AAAA-AAAA' de años consecutivos"""
+    if not es_temporada(valor):
+        raise argparse.ArgumentTypeError(f"'{valor}' no es una temporada (formato AAAA-AAAA, p. ej. 2024-2025)")
+    return valor
+
 def main():
     """Función principal del script"""
     parser = argparse.ArgumentParser(description='Script de administración para UD Atzeneta')
@@ -386,6 +345,9 @@ def main():
     parser.add_argument('--nombre', help='Nombre completo')
     parser.add_argument('--file', help='Archivo de entrada/salida')
     parser.add_argument('--days', type=int, default=90, help='Días para limpieza')
+    parser.add_argument('--entity', choices=list(IMPORT_ENTITIES), help='Entidad a importar con import-csv')
+    parser.add_argument('--format', choices=['csv', 'xlsx'], default='csv', help='Formato de export-data')
+    parser.add_argument('--season', type=temporada_arg, help='Temporada (AAAA-AAAA) de recompute-stats')
     
     args = parser.parse_args()
     
@@ -421,12 +383,21 @@ def main():
             return
         admin.import_players_csv(args.file)
     
+    elif args.command == 'import-csv':
+        if not args.file or not args.entity:
+            print("❌ Se requiere especificar --entity y --file")
+            return
+        admin.import_data_csv(args.entity, args.file)
+    
     elif args.command == 'export-data':
-        admin.export_data_csv()
+        admin.export_data_csv(args.file or "exports", args.format)
+    
+    elif args.command == 'recompute-stats':
+        admin.recompute_stats(args.season)
     
     else:
         print(f"❌ Comando desconocido: {args.command}")
-        print("Comandos disponibles: init-db, create-user, reset-password, backup-data, restore-data, cleanup, stats, import-players, export-data")
+        print("Comandos disponibles: init-db, create-user, reset-password, backup-data, restore-data, cleanup, stats, import-players, import-csv, export-data, recompute-stats")
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,15 +1,24 @@
+import time
+_inicio_importaciones = time.perf_counter()
+
 import dash
 from dash import dcc, html, Input, Output, State, callback
 import dash_bootstrap_components as dbc
 import os
+from functools import lru_cache
 from config.settings import EXTERNAL_STYLESHEETS, APP_CONFIG, NAVIGATION_PAGES
-from auth.login import create_login_layout, verify_credentials
-from database.db_manager import init_database
-from utils.session_manager import SessionManager
+from auth.login import create_login_layout
+from auth.security import check_login, client_ip, create_session_data, destroy_session_data, session_user
+from database.db_manager import engine, init_database, init_request_sessions
 
 # Importar los componentes necesarios
 from layouts.main_content import create_top_bar, create_main_content
 from layouts.sidebar import create_sidebar, get_sidebar_callbacks
+from utils.startup_profile import STARTUP_TIMINGS, startup_phase
+from utils.metrics import init_metrics
+from utils.export import init_export_downloads
+
+STARTUP_TIMINGS['importaciones de app'] = time.perf_counter() - _inicio_importaciones
 
 # Inicializar la aplicación Dash
 app = dash.Dash(
@@ -23,6 +32,15 @@ app = dash.Dash(
 
 # Configurar el servidor
 server = app.server
+
+# Una sesión de base de datos por petición, cerrada al terminar cada callback
+init_request_sessions(server)
+
+# Métricas de cada callback (duración, sentencias SQL, tamaño) en /_metrics
+callback_metrics = init_metrics(server, engine)
+
+# Descarga de las exportaciones generadas en segundo plano (enlaces firmados)
+init_export_downloads(server)
 app.title = "UD Atzeneta - Gestión del Equipo"
 
 # Configuración de la plantilla HTML personalizada
@@ -282,35 +300,40 @@ app.index_string = '''
 </html>
 '''
 
-# Inicializar base de datos y verificar usuario admin
+# Registro de páginas: los módulos se importan en un hilo de precarga para no
+# retrasar el arranque del worker, o al primer acceso si aún no han llegado
+from pages.registry import page_registry
+page_registry.start_warm_up()
+
+def wait_pages_warm_up():
+    """Dash envía la lista de callbacks al navegador en la primera petición:
+    las páginas (y sus callbacks) tienen que estar importadas antes"""
+    page_registry.wait_warm_up()
+
+# Se ejecuta antes que el _setup_server de Dash, que fija la lista de callbacks
+server.before_request_funcs.setdefault(None, []).insert(0, wait_pages_warm_up)
+
+# Inicializar base de datos (init_database también crea el usuario admin si no existe)
 try:
-    init_database()
+    with startup_phase('init_database'):
+        init_database()
     print("DEBUG: Database initialized successfully")
-    
-    # Verificar que el usuario admin existe
-    from database.db_manager import DatabaseManager
-    with DatabaseManager() as db:
-        admin_user = db.db.query(db.Usuario).filter(db.Usuario.username == 'admin').first()
-        if admin_user:
-            print("DEBUG: Admin user exists in database")
-        else:
-            print("DEBUG: Admin user not found, creating...")
-            from auth.login import hash_password
-            admin_user = db.Usuario(
-                username='admin',
-                password_hash=hash_password('admin123'),
-                nombre='Administrador',
-                activo=True
-            )
-            db.db.add(admin_user)
-            db.db.commit()
-            print("DEBUG: Admin user created successfully")
-            
 except Exception as e:
-    print(f"DEBUG: Database initialization error: {e}")
+    # Sin esquema completo el worker no debe atender peticiones
+    print(f"❌ Database initialization error: {e}")
+    raise
 
-# Gestor de sesiones
-session_manager = SessionManager()
+# Trabajos que quedaron activos de un worker anterior que murió
+try:
+    from utils.jobs import job_runner
+    job_runner.expire_stale_jobs()
+except Exception as e:
+    print(f"DEBUG: Error revisando trabajos interrumpidos: {e}")
+
+# Sincronización automática con la FFCV (solo si hay URLs en FFCV_SYNC_URLS)
+with startup_phase('sincronización FFCV'):
+    from utils.scheduler import sync_scheduler
+    sync_scheduler.start()
 
 # Layout principal de la aplicación
 def serve_layout():
@@ -335,7 +358,8 @@ app.layout = html.Div([
 )
 def update_app_content(session_data):
     """Actualiza el contenido principal según el estado de autenticación"""
-    if session_data and session_data.get('authenticated', False):
+    # Solo se comprueba la firma del token: la navegación nunca pasa por bcrypt
+    if session_user(session_data):
         # Usuario autenticado - mostrar app principal
         return html.Div([
             # Botón para abrir/cerrar el menú
@@ -377,47 +401,6 @@ def update_app_content(session_data):
         except:
             return create_simple_login()
 
-# Importar los módulos de páginas con manejo de errores
-try:
-    from pages import dashboard
-except ImportError:
-    dashboard = None
-
-try:
-    from pages import calendario
-except ImportError:
-    calendario = None
-
-try:
-    from pages import jugadores
-except ImportError:
-    jugadores = None
-
-try:
-    from pages import partidos
-except ImportError:
-    partidos = None
-
-try:
-    from pages import entrenamientos
-except ImportError:
-    entrenamientos = None
-
-try:
-    from pages import objetivos
-except ImportError:
-    objetivos = None
-
-try:
-    from pages import puntuacion
-except ImportError:
-    puntuacion = None
-
-try:
-    from pages import multas
-except ImportError:
-    multas = None
-
 # Los callbacks del sidebar se registran directamente aquí en lugar de usar la función externa
 
 # Callback para resaltar navegación deshabilitado temporalmente para evitar errores
@@ -461,19 +444,31 @@ def show_login_alert(n_clicks, username, password):
                     className="mb-3"
                 )
             
-            # Verificar credenciales hardcodeadas primero
-            if username.strip() == 'admin' and password.strip() == 'admin123':
-                return html.Div()  # No mostrar error si las credenciales son correctas
-            
             try:
-                is_valid = verify_credentials(username, password)
-                if not is_valid:
+                # Comparte la comprobación de handle_login (mismo clic, un solo bcrypt)
+                resultado = check_login(username, password, client_ip())
+                if resultado['motivo'] == 'limite':
                     return dbc.Alert([
-                        html.Strong("Error de autenticación"),
+                        html.Strong("Demasiados intentos"),
                         html.Br(),
-                        "Usuario o contraseña incorrectos",
+                        f"Vuelve a intentarlo en {resultado['reintentar_en']} segundos"
+                    ],
+                    color="warning",
+                    dismissable=True,
+                    className="mb-3"
+                    )
+                if resultado['motivo'] == 'ocupado':
+                    return dbc.Alert(
+                        "El servidor está ocupado, inténtalo de nuevo en unos segundos",
+                        color="warning",
+                        dismissable=True,
+                        className="mb-3"
+                    )
+                if not resultado['ok']:
+                    return dbc.Alert([
+                        html.Strong("Error de autenticación"),
                         html.Br(),
-                        html.Small("Prueba con: admin / admin123")
+                        "Usuario o contraseña incorrectos"
                     ],
                     color="danger",
                     dismissable=True,
@@ -483,9 +478,7 @@ def show_login_alert(n_clicks, username, password):
                 return dbc.Alert([
                     html.Strong("Error del sistema"),
                     html.Br(),
-                    f"Error: {str(e)}",
-                    html.Br(),
-                    html.Small("Usando credenciales por defecto: admin / admin123")
+                    f"Error: {str(e)}"
                 ],
                 color="warning",
                 dismissable=True,
@@ -776,8 +769,7 @@ def create_simple_login():
                                             placeholder="Introduce tu contraseña",
                                             value="",
                                             style={'border': '2px solid #dee2e6'}
-                                        ),
-                                        html.Small("Contraseña por defecto: admin123", className="text-muted")
+                                        )
                                     ], width=12)
                                 ], className="mb-4"),
                                 dbc.Row([
@@ -797,15 +789,7 @@ def create_simple_login():
                                         )
                                     ], width=12)
                                 ])
-                            ]),
-                            html.Hr(className="my-4"),
-                            html.Div([
-                                html.H6("Credenciales de prueba:", className="mb-2"),
-                                html.P([
-                                    html.Strong("Usuario: "), "admin", html.Br(),
-                                    html.Strong("Contraseña: "), "admin123"
-                                ], className="mb-0 text-muted small")
-                            ], className="text-center")
+                            ])
                         ])
                     ], className="shadow-lg")
                 ], width=12, md=6, lg=4)
@@ -822,7 +806,7 @@ def display_page(pathname, session_data):
     """Controla la navegación y autenticación"""
     print(f"DEBUG: Navigating to: {pathname}")
     
-    if not session_data or not session_data.get('authenticated', False):
+    if not session_user(session_data):
         print("DEBUG: User not authenticated, showing login")
         try:
             return create_login_layout()
@@ -834,102 +818,23 @@ def display_page(pathname, session_data):
         pathname = '/dashboard'
         print("DEBUG: Redirecting to dashboard")
     
-    # Títulos de las páginas
-    title_mapping = {
-        '/dashboard': 'Dashboard',
-        '/calendario': 'Calendario',
-        '/jugadores': 'Jugadores',
-        '/partidos': 'Partidos',
-        '/entrenamientos': 'Entrenamientos',
-        '/objetivos': 'Objetivos',
-        '/puntuacion': 'Puntuación',
-        '/multas': 'Multas'
-    }
-    
-    # Obtener el título
-    title = title_mapping.get(pathname, 'Dashboard')
+    page = page_registry.get_page(pathname)
+    title = page['title']
     print(f"DEBUG: Page title: {title}")
     
-    # NUEVO: Cargar páginas con mejor manejo de errores
     try:
-        if pathname == '/calendario':
-            print("DEBUG: Loading calendario page...")
-            try:
-                # Primero verificar si el módulo existe
-                if calendario is None:
-                    raise ImportError("Módulo calendario no disponible")
-                
-                # Verificar si tiene la función create_calendario_layout
-                if hasattr(calendario, 'create_calendario_layout'):
-                    print("DEBUG: Found create_calendario_layout function")
-                    layout = calendario.create_calendario_layout()
-                    
-                    # Registrar callbacks si no están registrados
-                    if hasattr(calendario, 'setup_calendario_callbacks'):
-                        try:
-                            calendario.setup_calendario_callbacks(app)
-                            print("DEBUG: Calendario callbacks registered")
-                        except Exception as e:
-                            print(f"DEBUG: Error registering calendario callbacks: {e}")
-                    
-                elif hasattr(calendario, 'layout'):
-                    print("DEBUG: Using calendario.layout")
-                    layout = calendario.layout
-                else:
-                    print("DEBUG: No layout found in calendario module")
-                    raise AttributeError("No layout function found")
-                    
-            except Exception as e:
-                print(f"DEBUG: Error loading calendario: {e}")
-                layout = create_enhanced_error_layout("Calendario", str(e))
-        
-        elif pathname == '/dashboard':
-            print("DEBUG: Loading dashboard page...")
-            try:
-                if dashboard and hasattr(dashboard, 'create_dashboard_layout'):
-                    layout = dashboard.create_dashboard_layout()
-                elif dashboard and hasattr(dashboard, 'layout'):
-                    layout = dashboard.layout
-                else:
-                    layout = create_simple_layout("Dashboard")
-            except Exception as e:
-                print(f"DEBUG: Error loading dashboard: {e}")
-                layout = create_enhanced_error_layout("Dashboard", str(e))
-        
-        elif pathname == '/jugadores':
-            print("DEBUG: Loading jugadores page...")
-            try:
-                if jugadores and hasattr(jugadores, 'create_jugadores_layout'):
-                    layout = jugadores.create_jugadores_layout()
-                elif jugadores and hasattr(jugadores, 'layout'):
-                    layout = jugadores.layout
-                else:
-                    layout = create_simple_layout("Jugadores")
-            except Exception as e:
-                print(f"DEBUG: Error loading jugadores: {e}")
-                layout = create_enhanced_error_layout("Jugadores", str(e))
-        
-        elif pathname == '/partidos':
-            print("DEBUG: Loading partidos page...")
-            try:
-                if partidos and hasattr(partidos, 'create_partidos_layout'):
-                    layout = partidos.create_partidos_layout()
-                elif partidos and hasattr(partidos, 'layout'):
-                    layout = partidos.layout
-                else:
-                    layout = create_simple_layout("Partidos")
-            except Exception as e:
-                print(f"DEBUG: Error loading partidos: {e}")
-                layout = create_enhanced_error_layout("Partidos", str(e))
-        
-        else:
-            # Para otras páginas, usar layout simple
-            layout = create_simple_layout(title)
-            
+        return build_page_content(page_registry.resolve(pathname))
     except Exception as e:
-        print(f"DEBUG: General error loading page: {e}")
-        layout = create_enhanced_error_layout(title, str(e))
-    
+        print(f"DEBUG: Error loading {title}: {e}")
+        return wrap_page_content(pathname, title, create_enhanced_error_layout(title, str(e)))
+
+@lru_cache(maxsize=None)
+def build_page_content(pathname):
+    """Contenido memoizado de cada página (los errores no se memoizan)"""
+    return wrap_page_content(pathname, page_registry.get_page(pathname)['title'], page_registry.get_layout(pathname))
+
+def wrap_page_content(pathname, title, layout):
+    """Añade la cabecera con el título y el icono de la página"""
     # Retornar el contenido de la página
     return html.Div([
         html.Div(className='container-fluid py-3', children=[
@@ -948,18 +853,7 @@ def display_page(pathname, session_data):
 # Función para obtener el ícono de la página
 def get_page_icon(pathname):
     """Obtiene el ícono correspondiente a cada página"""
-    icons = {
-        '/dashboard': 'fas fa-tachometer-alt',
-        '/calendario': 'fas fa-calendar',
-        '/jugadores': 'fas fa-users',
-        '/partidos': 'fas fa-futbol',
-        '/entrenamientos': 'fas fa-running',
-        '/objetivos': 'fas fa-bullseye',
-        '/puntuacion': 'fas fa-star',
-        '/multas': 'fas fa-euro-sign',
-        '/configuracion': 'fas fa-cog'
-    }
-    return icons.get(pathname, 'fas fa-file-alt')
+    return page_registry.get_page(pathname)['icon']
 
 def create_enhanced_error_layout(page_name, error_msg):
     """Crea un layout de error más informativo"""
@@ -1004,22 +898,12 @@ def debug_page_imports():
     """Función para debuggear las importaciones de páginas"""
     print("=== DEBUG PAGE IMPORTS ===")
     
-    pages_status = {
-        'dashboard': dashboard,
-        'calendario': calendario,
-        'jugadores': jugadores,
-        'partidos': partidos,
-        'entrenamientos': entrenamientos,
-        'objetivos': objetivos,
-        'puntuacion': puntuacion,
-        'multas': multas
-    }
-    
-    for page_name, page_module in pages_status.items():
-        if page_module is None:
-            print(f"❌ {page_name}: No importado")
+    for path, page in page_registry.pages.items():
+        if not page_registry.is_loaded(path):
+            print(f"❌ {page['module']}: No importado")
         else:
-            print(f"✅ {page_name}: Importado")
+            page_module = page_registry.get_module(path)
+            print(f"✅ {page['module']}: Importado en {page_registry.load_times[path]:.2f}s")
             # Verificar funciones disponibles
             functions = [attr for attr in dir(page_module) if not attr.startswith('_')]
             print(f"   Funciones: {functions}")
@@ -1036,32 +920,19 @@ def debug_page_imports():
 )
 def handle_login(n_clicks, username, password):
     """Maneja el proceso de login"""
-    print(f"DEBUG: Login attempt - clicks: {n_clicks}, username: '{username}', password: '{password}'")
+    print(f"DEBUG: Login attempt - clicks: {n_clicks}, username: '{username}'")
     
     if n_clicks and username and password:
-        # Primero probamos con credenciales hardcodeadas para debuggear
-        if username.strip() == 'admin' and password.strip() == 'admin123':
-            print("DEBUG: Hardcoded credentials match - allowing login")
-            return {'authenticated': True, 'user': username}, '/dashboard'
+        # Credenciales de la base de datos (límite de intentos y bcrypt en su pool);
+        # el callback espera aquí el resultado de bcrypt
+        resultado = check_login(username, password, client_ip())
+        print(f"DEBUG: Database credentials valid: {resultado['ok']}")
         
-        try:
-            # Luego probamos con la base de datos
-            is_valid = verify_credentials(username, password)
-            print(f"DEBUG: Database credentials valid: {is_valid}")
-            
-            if is_valid:
-                print(f"DEBUG: Login successful for {username}")
-                return {'authenticated': True, 'user': username}, '/dashboard'
-            else:
-                print(f"DEBUG: Login failed for {username}")
-                return {'authenticated': False, 'user': None}, '/'
-        except Exception as e:
-            print(f"DEBUG: Login error: {e}")
-            # Si hay error con la base de datos, usar credenciales hardcodeadas
-            if username.strip() == 'admin' and password.strip() == 'admin123':
-                print("DEBUG: Fallback to hardcoded credentials")
-                return {'authenticated': True, 'user': username}, '/dashboard'
-            return {'authenticated': False, 'user': None}, '/'
+        if resultado['ok']:
+            print(f"DEBUG: Login successful for {username}")
+            return create_session_data(username), '/dashboard'
+        print(f"DEBUG: Login failed for {username} ({resultado['motivo']})")
+        return {'authenticated': False, 'user': None}, '/'
     
     print("DEBUG: Login attempt failed - missing data or no clicks")
     return {'authenticated': False, 'user': None}, '/'
@@ -1070,17 +941,18 @@ def handle_login(n_clicks, username, password):
 @app.callback(
     Output('url', 'refresh'),
     [Input('logout-button', 'n_clicks')],
+    [State('session-store', 'data')],
     prevent_initial_call=True
 )
-def handle_logout(n_clicks):
+def handle_logout(n_clicks, session_data):
     """Maneja el cierre de sesión"""
     if n_clicks:
-        # Limpiar la sesión
-        session_manager.clear_all_sessions()
+        # Cerrar la sesión en el almacén: el token deja de valer en todos los workers
+        destroy_session_data(session_data)
         return True
     return False
 
-# Los imports de pages ya están arriba y se cargan con manejo de errores
+# Las páginas se cargan a través de pages.registry (ver más arriba)
 # Los callbacks se registran automáticamente al importar los módulos
 
 if __name__ == '__main__':
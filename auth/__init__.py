@@ -7,10 +7,22 @@ from .login import (
     hash_password,
     create_user
 )
+from .security import (
+    check_login,
+    create_session_data,
+    destroy_session_data,
+    session_user,
+    client_ip
+)
 
 __all__ = [
     'create_login_layout',
     'verify_credentials',
     'hash_password',
-    'create_user'
+    'create_user',
+    'check_login',
+    'create_session_data',
+    'destroy_session_data',
+    'session_user',
+    'client_ip'
 ]
\ No newline at end of file
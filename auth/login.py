@@ -1,8 +1,8 @@
 import dash_bootstrap_components as dbc
 from dash import html, dcc
-import bcrypt
 from database.db_manager import DatabaseManager, Usuario
 from config.settings import COLORS
+from .security import check_login, hash_password
 
 def create_login_layout():
     """Crea el layout de la página de login"""
@@ -69,14 +69,7 @@ def create_login_layout():
                                         ]),
                                         
                                         # Mensaje de error
-                                        html.Div(id="login-error", className="text-center"),
-                                        
-                                        # Información de acceso por defecto
-                                        dbc.Alert([
-                                            html.H6("Acceso por defecto:", className="alert-heading"),
-                                            html.P("Usuario: admin", className="mb-1"),
-                                            html.P("Contraseña: admin123", className="mb-0")
-                                        ], color="info", className="mt-3")
+                                        html.Div(id="login-error", className="text-center")
                                     ])
                                 ])
                             ])
@@ -87,30 +80,9 @@ def create_login_layout():
         ], className="login-container")
     ])
 
-def verify_credentials(username, password):
-    """Verifica las credenciales del usuario"""
-    if not username or not password:
-        return False
-    
-    try:
-        with DatabaseManager() as db_manager:
-            usuario = db_manager.db.query(Usuario).filter(
-                Usuario.username == username,
-                Usuario.activo == True
-            ).first()
-            
-            if usuario:
-                # Verificar contraseña
-                if bcrypt.checkpw(password.encode('utf-8'), usuario.password_hash.encode('utf-8')):
-                    return True
-    except Exception as e:
-        print(f"Error verificando credenciales: {e}")
-    
-    return False
-
-def hash_password(password):
-    """Genera hash de contraseña"""
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+def verify_credentials(username, password, ip=None):
+    """Verifica las credenciales del usuario (con límite de intentos, ver auth/security.py)"""
+    return check_login(username, password, ip)['ok']
 
 def create_user(username, password, email=None, nombre=None):
     """Crea un nuevo usuario"""
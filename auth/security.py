@@ -0,0 +1,338 @@
+"""
+Seguridad del login: límites de intentos, bcrypt en un pool y tokens de sesión
+
+Cada intento de login pasa por dos cubos de tokens (uno por IP y otro por
+nombre de usuario desde esa IP) antes de llegar a bcrypt. El cubo de usuario
+va por IP para que nadie pueda dejar bloqueada una cuenta (p. ej. admin)
+gastando sus intentos desde otra máquina.
+
+bcrypt se calcula en un pool pequeño de hilos con una cola acotada, así que
+por muchos intentos que lleguen la CPU dedicada al login no pasa de
+AUTH_CONFIG['bcrypt_workers'] núcleos, y con la cola llena se responde
+"ocupado" sin calcular nada. El pool no añade concurrencia: el callback que
+llama a check_login espera el resultado (hasta verify_timeout segundos) y su
+hilo del worker queda ocupado mientras tanto.
+
+El resultado de un intento se comparte durante unos segundos: los dos
+callbacks que dispara el botón de login (handle_login y show_login_alert)
+esperan la misma comprobación en lugar de calcular bcrypt dos veces.
+
+Tras el login la sesión lleva un token firmado con la clave secreta de la
+aplicación y el id de su sesión en el almacén de sesiones; la navegación
+comprueba la firma y busca la sesión por id (así un logout la invalida en
+todos los workers), nunca bcrypt. La clave sale de SECRET_KEY o, si no está
+definida, de un fichero con una clave aleatoria que comparten los workers.
+"""
+
+import os
+import hmac
+import time
+import secrets
+import tempfile
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Optional
+import bcrypt
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from database.db_manager import DatabaseManager, Usuario
+from config.settings import APP_CONFIG, AUTH_CONFIG
+from utils.session_manager import dash_session_manager
+
+
+class RateLimiter:
+    """Cubos de tokens por clave (IP o usuario) con un número acotado de claves"""
+
+    def __init__(self, capacidad: int, periodo: float, max_claves: int = 10000, reloj=time.monotonic):
+        self.capacidad = capacidad
+        self.ritmo = capacidad / periodo  # tokens por segundo
+        self.max_claves = max_claves
+        self.reloj = reloj
+        self._cubos = OrderedDict()  # clave -> (tokens, instante)
+        self._lock = threading.Lock()
+
+    def consume(self, clave: str) -> float:
+        """
+        Gasta un token de la clave
+
+        Returns:
+            float: 0 si el intento se permite; si no, segundos hasta el siguiente token
+        """
+        with self._lock:
+            ahora = self.reloj()
+            tokens, instante = self._cubos.pop(clave, (self.capacidad, ahora))
+            tokens = min(self.capacidad, tokens + (ahora - instante) * self.ritmo)
+            espera = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                espera = (1 - tokens) / self.ritmo
+            self._cubos[clave] = (tokens, ahora)
+
+            # Se olvidan las claves menos recientes
+            while len(self._cubos) > self.max_claves:
+                self._cubos.popitem(last=False)
+            return espera
+
+    def reset(self, clave: str = None):
+        """Rellena el cubo de una clave (o de todas)"""
+        with self._lock:
+            if clave is None:
+                self._cubos.clear()
+            else:
+                self._cubos.pop(clave, None)
+
+
+ip_limiter = RateLimiter(*AUTH_CONFIG['rate_limit_ip'], max_claves=AUTH_CONFIG['rate_limit_max_keys'])
+user_limiter = RateLimiter(*AUTH_CONFIG['rate_limit_user'], max_claves=AUTH_CONFIG['rate_limit_max_keys'])
+
+_bcrypt_pool = ThreadPoolExecutor(max_workers=AUTH_CONFIG['bcrypt_workers'], thread_name_prefix='bcrypt')
+_pendientes = threading.BoundedSemaphore(AUTH_CONFIG['bcrypt_max_pending'])
+
+# Resultados recientes: huella del intento -> (future, caduca)
+_resultados = OrderedDict()
+_resultados_lock = threading.Lock()
+MAX_CACHED_RESULTS = 1000
+
+_hash_ficticio = None
+
+
+def hash_password(password: str) -> str:
+    """Genera el hash bcrypt de una contraseña con el coste configurado"""
+    salt = bcrypt.gensalt(rounds=AUTH_CONFIG['bcrypt_rounds'])
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """True si el hash se calculó con un coste distinto del configurado"""
+    try:
+        return int(password_hash.split('$')[2]) != AUTH_CONFIG['bcrypt_rounds']
+    except (AttributeError, IndexError, ValueError):
+        return False
+
+
+def _comprobar_ficticio(password: str):
+    """Gasta el mismo tiempo que con un usuario real para no revelar si existe"""
+    global _hash_ficticio
+    if _hash_ficticio is None:
+        _hash_ficticio = hash_password('usuario-inexistente').encode('utf-8')
+    bcrypt.checkpw(password.encode('utf-8'), _hash_ficticio)
+
+
+def _verificar(username: str, password: str) -> bool:
+    """Comprobación real contra la base de datos (se ejecuta en el pool de bcrypt)"""
+    with DatabaseManager() as db_manager:
+        usuario = db_manager.db.query(Usuario).filter(
+            Usuario.username == username,
+            Usuario.activo == True
+        ).first()
+
+        if usuario is None:
+            _comprobar_ficticio(password)
+            return False
+
+        if not bcrypt.checkpw(password.encode('utf-8'), usuario.password_hash.encode('utf-8')):
+            return False
+
+        if needs_rehash(usuario.password_hash):
+            usuario.password_hash = hash_password(password)
+            db_manager.db.commit()
+            print(f"🔐 Hash de {username} actualizado a coste {AUTH_CONFIG['bcrypt_rounds']}")
+        return True
+
+
+def _huella(username: str, password: str) -> str:
+    """Identifica un intento sin guardar la contraseña en memoria"""
+    mensaje = f"{username}\0{password}".encode('utf-8')
+    return hmac.new(secret_key().encode('utf-8'), mensaje, hashlib.sha256).hexdigest()
+
+
+def _clave_usuario(username: str, ip: Optional[str]) -> str:
+    """Cubo del límite por usuario: el usuario desde una IP concreta"""
+    return f"{username.lower()}@{ip}" if ip else username.lower()
+
+
+def _reservar_comprobacion(username: str, password: str, ip: Optional[str]) -> Dict:
+    """Devuelve el future de la comprobación (compartido si ya hay uno reciente) o el motivo del rechazo"""
+    huella = _huella(username, password)
+    ahora = time.monotonic()
+
+    with _resultados_lock:
+        reciente = _resultados.get(huella)
+        if reciente and reciente[1] > ahora:
+            return {'future': reciente[0]}
+
+        # Solo los intentos que llegan a bcrypt gastan tokens
+        espera = user_limiter.consume(_clave_usuario(username, ip))
+        if ip:
+            espera = max(espera, ip_limiter.consume(ip))
+        if espera > 0:
+            return {'motivo': 'limite', 'reintentar_en': int(espera) + 1}
+
+        if not _pendientes.acquire(blocking=False):
+            return {'motivo': 'ocupado'}
+        future = _bcrypt_pool.submit(_verificar, username, password)
+        future.add_done_callback(lambda _: _pendientes.release())
+
+        _resultados[huella] = (future, ahora + AUTH_CONFIG['verify_cache_ttl'])
+        while len(_resultados) > MAX_CACHED_RESULTS:
+            _resultados.popitem(last=False)
+        return {'future': future}
+
+
+def check_login(username: str, password: str, ip: Optional[str] = None) -> Dict:
+    """
+    Comprueba un intento de login con límites de intentos
+
+    Bloquea al llamante hasta que el pool de bcrypt da el resultado.
+
+    Args:
+        username (str): Nombre de usuario
+        password (str): Contraseña
+        ip (str): IP del cliente (sin IP solo se aplica el límite por usuario)
+
+    Returns:
+        dict: ok (bool), motivo ('credenciales', 'limite', 'ocupado' o 'error'
+              si no es correcto) y reintentar_en (segundos) cuando se supera el límite
+    """
+    if not username or not password:
+        return {'ok': False, 'motivo': 'credenciales'}
+
+    reserva = _reservar_comprobacion(username, password, ip)
+    if 'future' not in reserva:
+        print(f"⛔ Login de {username} rechazado ({reserva['motivo']})")
+        return {'ok': False, **reserva}
+
+    try:
+        ok = reserva['future'].result(timeout=AUTH_CONFIG['verify_timeout'])
+    except FutureTimeoutError:
+        return {'ok': False, 'motivo': 'ocupado'}
+    except Exception as e:
+        print(f"Error verificando credenciales: {e}")
+        return {'ok': False, 'motivo': 'error'}
+
+    if ok:
+        user_limiter.reset(_clave_usuario(username, ip))
+        return {'ok': True, 'motivo': None}
+    return {'ok': False, 'motivo': 'credenciales'}
+
+
+def clear_login_state():
+    """Olvida los resultados recientes y los límites (tests y cambios de contraseña)"""
+    with _resultados_lock:
+        _resultados.clear()
+    ip_limiter.reset()
+    user_limiter.reset()
+
+
+def client_ip() -> Optional[str]:
+    """IP del cliente de la petición actual, teniendo en cuenta los proxies de confianza"""
+    from flask import has_request_context, request
+
+    if not has_request_context():
+        return None
+    reenviadas = [ip.strip() for ip in request.headers.get('X-Forwarded-For', '').split(',') if ip.strip()]
+    proxies = AUTH_CONFIG['trusted_proxies']
+    if proxies and len(reenviadas) >= proxies:
+        return reenviadas[-proxies]
+    return request.remote_addr
+
+
+_clave_lock = threading.Lock()
+_clave_generada = None
+
+
+def secret_key() -> str:
+    """
+    Clave con la que se firman los tokens de sesión
+
+    APP_CONFIG['secret_key'] (SECRET_KEY) si está definida. Si no, una clave
+    aleatoria guardada en APP_CONFIG['secret_key_file']: el primer worker que
+    arranca la crea y el resto (y los reinicios) leen la misma.
+    """
+    global _clave_generada
+    if APP_CONFIG.get('secret_key'):
+        return APP_CONFIG['secret_key']
+    if _clave_generada:
+        return _clave_generada
+
+    with _clave_lock:
+        if _clave_generada:
+            return _clave_generada
+        ruta = os.path.abspath(APP_CONFIG.get('secret_key_file') or '.secret_key')
+        if not os.path.exists(ruta):
+            # Se escribe en un temporal y se enlaza: dos workers a la vez no pisan la clave del otro
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(ruta), prefix='.secret_key')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    f.write(secrets.token_urlsafe(48))
+                os.chmod(tmp, 0o600)
+                os.link(tmp, ruta)
+                print(f"🔑 Clave de sesión generada en {ruta} (define SECRET_KEY para fijarla)")
+            except FileExistsError:
+                pass
+            finally:
+                os.unlink(tmp)
+        with open(ruta) as f:
+            _clave_generada = f.read().strip()
+    return _clave_generada
+
+
+def _serializer() -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(secret_key(), salt='ud-atzeneta-sesion')
+
+
+def create_session_token(username: str, session_id: str = None) -> str:
+    """Token firmado con el usuario y su sesión; caduca a los AUTH_CONFIG['token_ttl'] segundos"""
+    return _serializer().dumps({'user': username, 'sid': session_id})
+
+
+def verify_session_token(token: str) -> Optional[Dict]:
+    """Contenido del token (user y sid) si la firma es válida y no ha caducado"""
+    if not token:
+        return None
+    try:
+        contenido = _serializer().loads(token, max_age=AUTH_CONFIG['token_ttl'])
+    except BadSignature:
+        return None
+    return contenido if isinstance(contenido, dict) else None
+
+
+def create_session_data(username: str) -> Dict:
+    """Crea la sesión en el almacén y devuelve el contenido del session-store"""
+    session_data = dash_session_manager.create_dash_session(username, {'ip_address': client_ip()})
+    return {
+        **session_data,
+        'user': username,
+        'token': create_session_token(username, session_data['session_id'])
+    }
+
+
+def session_user(session_data: Optional[Dict]) -> Optional[str]:
+    """
+    Usuario autenticado del session-store
+
+    None si el token falta, está alterado o caducó, si su sesión ya no
+    existe en el almacén (logout, sesión caducada o revocada) o si la sesión
+    guardada es de otro usuario.
+    """
+    if not isinstance(session_data, dict) or not session_data.get('authenticated'):
+        return None
+    contenido = verify_session_token(session_data.get('token'))
+    if not contenido or contenido.get('user') != session_data.get('user'):
+        return None
+    if contenido.get('sid') != session_data.get('session_id'):
+        return None
+    # La sesión guardada tiene que ser del mismo usuario que firmó el token
+    sesion = dash_session_manager.session_manager.peek_session(contenido.get('sid'))
+    if not sesion or sesion.get('username') != contenido['user']:
+        return None
+    return contenido['user']
+
+
+def destroy_session_data(session_data: Optional[Dict]) -> Dict:
+    """Cierra la sesión en el almacén (en todos los workers si es compartido)"""
+    if isinstance(session_data, dict) and session_data.get('session_id'):
+        dash_session_manager.destroy_dash_session(session_data)
+    return {'authenticated': False, 'user': None}
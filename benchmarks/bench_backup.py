@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark del backup y la restauración en streaming
+
+Genera varias temporadas sintéticas en una base de datos SQLite temporal,
+hace el backup con write_backup y lo restaura en otra base de datos vacía
+con restore_backup. Con --memoria se mide además el pico de memoria de
+Python (tracemalloc ralentiza la ejecución, los tiempos no son comparables).
+
+Uso:
+    python benchmarks/bench_backup.py
+    python benchmarks/bench_backup.py --temporadas 100 --memoria
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_manager import Base, create_db_engine
+from database.synthetic_data import generate_synthetic_data
+from database.backup import write_backup, restore_backup
+
+def medir(funcion, memoria):
+    if memoria:
+        tracemalloc.start()
+    t0 = time.perf_counter()
+    resultado = funcion()
+    duracion = time.perf_counter() - t0
+    pico = tracemalloc.get_traced_memory()[1] / 1024 / 1024 if memoria else None
+    if memoria:
+        tracemalloc.stop()
+    return resultado, duracion, pico
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de backup y restauración')
+    parser.add_argument('--temporadas', type=int, default=50, help='Temporadas sintéticas a generar')
+    parser.add_argument('--memoria', action='store_true', help='Medir el pico de memoria con tracemalloc')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        origen = create_db_engine(f"sqlite:///{os.path.join(tmp, 'origen.db')}")
+        destino = create_db_engine(f"sqlite:///{os.path.join(tmp, 'destino.db')}")
+        Base.metadata.create_all(bind=origen)
+        Base.metadata.create_all(bind=destino)
+        generate_synthetic_data(origen, temporadas=args.temporadas)
+        fichero = os.path.join(tmp, 'backup.ndjson.gz')
+
+        conteos, t_backup, m_backup = medir(lambda: write_backup(fichero, origen), args.memoria)
+        tamaño = os.path.getsize(fichero) / 1024 / 1024
+        _, t_restore, m_restore = medir(lambda: restore_backup(fichero, destino), args.memoria)
+        origen.dispose()
+        destino.dispose()
+
+    print(f"\n💾 {sum(conteos.values())} filas en {len(conteos)} tablas ({tamaño:.1f} MB comprimido)")
+    for nombre, duracion, pico in [('Backup', t_backup, m_backup), ('Restauración', t_restore, m_restore)]:
+        memoria = f"   pico de memoria {pico:6.1f} MB" if pico is not None else ''
+        print(f"   {nombre:13} {duracion:6.2f} s{memoria}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark de concurrencia sobre SQLite
+
+Simula varios workers de gunicorn: N procesos escriben (un jugador por
+transacción, como create_jugador) y M procesos leen (las consultas de una
+carga de página) a la vez sobre el mismo fichero. Se compara el engine por
+defecto de SQLAlchemy con el de create_db_engine (WAL, synchronous=NORMAL,
+busy_timeout, mmap y caché de APP_CONFIG).
+
+Uso:
+    python benchmarks/bench_db_concurrency.py
+    python benchmarks/bench_db_concurrency.py --escritores 8 --lectores 8 --operaciones 300
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import multiprocessing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from database.db_manager import Base, Jugador, create_db_engine
+
+def crear_engine(url, ajustado):
+    if ajustado:
+        return create_db_engine(url)
+    # Engine por defecto; el timeout de pysqlite se iguala a busy_timeout para comparar solo los PRAGMAs
+    return create_engine(url, connect_args={'timeout': 5})
+
+def worker(url, ajustado, rol, operaciones, listos, inicio, resultados):
+    Session = sessionmaker(bind=crear_engine(url, ajustado))
+    latencias, errores = [], 0
+    listos.put(rol)
+    inicio.wait()
+    t_inicio = time.perf_counter()
+
+    for i in range(operaciones):
+        t0 = time.perf_counter()
+        session = Session()
+        try:
+            if rol == 'escritor':
+                session.add(Jugador(nombre_futbolistico=f"Bench {os.getpid()}-{i}",
+                                    nombre="Bench", apellidos="Concurrencia"))
+                session.commit()
+            else:
+                # Carga típica de una página: varias consultas en la misma sesión
+                session.query(Jugador).filter(Jugador.activo == True).order_by(Jugador.id.desc()).limit(25).all()
+                session.query(Jugador).count()
+            latencias.append(time.perf_counter() - t0)
+        except OperationalError:
+            session.rollback()
+            errores += 1
+        finally:
+            session.close()
+
+    resultados.put((rol, latencias, errores, time.perf_counter() - t_inicio))
+
+def ejecutar(ajustado, escritores, lectores, operaciones, directorio=None):
+    with tempfile.TemporaryDirectory(dir=directorio) as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'concurrencia.db')}"
+        Base.metadata.create_all(bind=crear_engine(url, ajustado))
+
+        ctx = multiprocessing.get_context('spawn')
+        listos, inicio, resultados = ctx.Queue(), ctx.Event(), ctx.Queue()
+        procesos = [
+            ctx.Process(target=worker, args=(url, ajustado, rol, operaciones, listos, inicio, resultados))
+            for rol in ['escritor'] * escritores + ['lector'] * lectores
+        ]
+        for proceso in procesos:
+            proceso.start()
+
+        # Se empieza cuando todos los procesos han importado la aplicación
+        for _ in procesos:
+            listos.get()
+        t0 = time.perf_counter()
+        inicio.set()
+        datos = [resultados.get() for _ in procesos]
+        total = time.perf_counter() - t0
+        for proceso in procesos:
+            proceso.join()
+
+    resumen = {}
+    for rol in ('escritor', 'lector'):
+        latencias = [l for r, lats, _, _ in datos if r == rol for l in lats]
+        resumen[rol] = {
+            # Suma del ritmo de cada proceso del rol
+            'ops_s': sum(len(lats) / duracion for r, lats, _, duracion in datos if r == rol),
+            'errores': sum(e for r, _, e, _ in datos if r == rol),
+            'p50': statistics.median(latencias) * 1000 if latencias else 0,
+            'p95': statistics.quantiles(latencias, n=20)[18] * 1000 if len(latencias) > 1 else 0,
+        }
+    resumen['total'] = total
+    return resumen
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de concurrencia SQLite')
+    parser.add_argument('--escritores', type=int, default=4)
+    parser.add_argument('--lectores', type=int, default=4)
+    parser.add_argument('--operaciones', type=int, default=200, help='Operaciones por proceso')
+    parser.add_argument('--directorio', help='Directorio de la base de datos temporal (mismo disco que producción)')
+    args = parser.parse_args()
+
+    print(f"\n🏁 {args.escritores} escritores + {args.lectores} lectores, "
+          f"{args.operaciones} operaciones por proceso")
+    for nombre, ajustado in [('por defecto', False), ('create_db_engine', True)]:
+        r = ejecutar(ajustado, args.escritores, args.lectores, args.operaciones, args.directorio)
+        print(f"\n   Engine {nombre}: {r['total']:.2f} s")
+        for rol in ('escritor', 'lector'):
+            d = r[rol]
+            print(f"      {rol + 'es':11} {d['ops_s']:8.0f} ops/s   p50 {d['p50']:6.1f} ms   "
+                  f"p95 {d['p95']:7.1f} ms   bloqueos {d['errores']}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la exportación a CSV y Excel
+
+Genera varias temporadas sintéticas y exporta la asistencia a entrenamientos
+(la tabla más grande) de tres formas: cargando todas las filas y usando
+export_to_excel (pandas), con write_xlsx en streaming y con write_csv. Con
+--memoria se mide además el pico de memoria de Python (tracemalloc ralentiza
+la ejecución, los tiempos no son comparables).
+
+Uso:
+    python benchmarks/bench_export.py
+    python benchmarks/bench_export.py --temporadas 100 --memoria
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_manager import Base, create_db_engine
+from database.synthetic_data import generate_synthetic_data
+from utils.export import export_query, write_csv, write_xlsx
+from utils.helpers import export_to_excel
+from bench_backup import medir
+
+ENTIDAD = 'asistencia_entrenamientos'
+
+def exportar_en_memoria(engine, ruta):
+    """Exportación anterior: todas las filas en memoria y un DataFrame"""
+    with engine.connect() as conn:
+        datos = [dict(fila._mapping) for fila in conn.execute(export_query(ENTIDAD))]
+    with open(ruta, 'wb') as f:
+        f.write(export_to_excel(datos, ruta))
+    return len(datos)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la exportación')
+    parser.add_argument('--temporadas', type=int, default=50, help='Temporadas sintéticas a generar')
+    parser.add_argument('--memoria', action='store_true', help='Medir el pico de memoria con tracemalloc')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'origen.db')}")
+        Base.metadata.create_all(bind=engine)
+        generate_synthetic_data(engine, temporadas=args.temporadas)
+
+        pruebas = [
+            ('en memoria', lambda: exportar_en_memoria(engine, os.path.join(tmp, 'memoria.xlsx'))),
+            ('write_xlsx', lambda: write_xlsx([ENTIDAD], os.path.join(tmp, 'streaming.xlsx'), engine)[ENTIDAD]),
+            ('write_csv', lambda: write_csv(ENTIDAD, os.path.join(tmp, 'streaming.csv'), engine))
+        ]
+        print(f"\n📤 Exportación de {ENTIDAD} ({args.temporadas} temporadas)")
+        for nombre, funcion in pruebas:
+            filas, duracion, pico = medir(funcion, args.memoria)
+            memoria = f"   pico de memoria {pico:7.1f} MB" if pico is not None else ''
+            print(f"   {nombre:11} {filas:8} filas {duracion:6.2f} s{memoria}")
+        engine.dispose()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la importación masiva desde CSV
+
+Genera un CSV de jugadores del tamaño de una federación (con un 2% de filas
+incorrectas) y compara la importación anterior de admin.py (una SELECT por
+DNI y un add por fila) con utils/bulk_import.py. Después importa años de
+asistencias a entrenamientos con la importación masiva.
+
+Uso:
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --jugadores 50000 --asistencias 500000
+"""
+
+import os
+import sys
+import csv
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_manager import Base, Jugador, create_db_engine
+from utils.bulk_import import import_csv
+from utils.helpers import DNI_LETTERS
+
+def escribir_jugadores(ruta, n):
+    random.seed(42)
+    with open(ruta, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['nombre_futbolistico', 'nombre', 'apellidos', 'email', 'dni', 'telefono', 'dorsal', 'altura'])
+        for i in range(n):
+            numero = 10000000 + i
+            dni = f"{numero}{DNI_LETTERS[numero % 23]}"
+            email = f"jugador{i}@club.test"
+            if random.random() < 0.02:
+                email = "sin-arroba"
+            writer.writerow([f"Jugador {i}", "Nombre", "Apellido Apellido", email, dni,
+                             f"6{random.randint(10000000, 99999999)}", random.randint(1, 25),
+                             f"{random.uniform(1.65, 1.95):.2f}"])
+
+def escribir_asistencias(ruta, n, jugadores):
+    random.seed(7)
+    with open(ruta, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['jugador_id', 'numero_entrenamiento', 'fecha_entrenamiento', 'entrena', 'razon_ausencia'])
+        for i in range(n):
+            numero = i // 25 + 1
+            entrena = random.random() < 0.9
+            # Los ids válidos son los de los jugadores importados sin rechazos
+            writer.writerow([random.randint(1, int(jugadores * 0.9)), numero,
+                             f"{2000 + numero // 150}-{numero % 12 + 1:02d}-{numero % 28 + 1:02d}",
+                             'si' if entrena else 'no', '' if entrena else 'Trabajo'])
+
+def importar_fila_a_fila(ruta, Session):
+    """Importación anterior de admin.py: una consulta por fila"""
+    session = Session()
+    with open(ruta, encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row.get('dni') and session.query(Jugador).filter(Jugador.dni == row['dni']).first():
+                continue
+            session.add(Jugador(nombre_futbolistico=row['nombre_futbolistico'], nombre=row['nombre'],
+                                apellidos=row['apellidos'], email=row['email'] or None, dni=row['dni'] or None,
+                                telefono=row['telefono'] or None,
+                                dorsal=int(row['dorsal']) if row['dorsal'] else None,
+                                altura=float(row['altura']) if row['altura'] else None))
+    session.commit()
+    session.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de la importación desde CSV')
+    parser.add_argument('--jugadores', type=int, default=20000, help='Filas del CSV de jugadores')
+    parser.add_argument('--asistencias', type=int, default=200000, help='Filas del CSV de asistencias')
+    args = parser.parse_args()
+
+    from sqlalchemy.orm import sessionmaker
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jugadores_csv = os.path.join(tmp, 'jugadores.csv')
+        asistencias_csv = os.path.join(tmp, 'asistencias.csv')
+        escribir_jugadores(jugadores_csv, args.jugadores)
+        escribir_asistencias(asistencias_csv, args.asistencias, args.jugadores)
+
+        print(f"\n📥 {args.jugadores} jugadores")
+        for nombre in ('fila a fila', 'bulk_import'):
+            engine = create_db_engine(f"sqlite:///{os.path.join(tmp, nombre.replace(' ', '_'))}.db")
+            Base.metadata.create_all(bind=engine)
+            t0 = time.perf_counter()
+            if nombre == 'fila a fila':
+                importar_fila_a_fila(jugadores_csv, sessionmaker(bind=engine))
+                detalle = ''
+            else:
+                r = import_csv('jugadores', jugadores_csv, engine=engine)
+                detalle = f"({r['importados']} importados, {r['rechazados']} rechazados)"
+            print(f"   {nombre:12} {time.perf_counter() - t0:7.2f} s {detalle}")
+
+        r = import_csv('asistencias', asistencias_csv, engine=engine)
+        print(f"\n📥 {args.asistencias} asistencias: {r['segundos']:.2f} s "
+              f"({r['importados']} importadas, {r['rechazados']} rechazadas)")
+        engine.dispose()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark de índices para UD Atzeneta
+
+Genera una base de datos SQLite temporal con varias temporadas sintéticas,
+elimina los índices añadidos por la migración 1 para simular una base de
+datos antigua y compara los planes de consulta y los tiempos antes y después
+de ejecutar run_migrations().
+
+Uso:
+    python benchmarks/bench_indexes.py
+    python benchmarks/bench_indexes.py --temporadas 100 --repeticiones 200
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Consultas de las rutas más frecuentes de la aplicación
+QUERIES = {
+    'Próximos partidos': (
+        "SELECT * FROM calendario WHERE fecha >= :hoy ORDER BY fecha LIMIT 5",
+        lambda ctx: {'hoy': ctx['hoy']}
+    ),
+    'Dedupe del scraper': (
+        "SELECT id FROM calendario WHERE fecha = :fecha AND equipo_local = :equipo_local "
+        "AND equipo_visitante = :equipo_visitante AND competicion = :competicion",
+        lambda ctx: random.choice(ctx['partidos'])
+    ),
+    'Multas pendientes': (
+        "SELECT SUM(debe) FROM multas WHERE completamente_pagada = 0",
+        lambda ctx: {}
+    ),
+    'Historial multas': (
+        "SELECT * FROM multas WHERE completamente_pagada = 0 ORDER BY fecha DESC LIMIT 15",
+        lambda ctx: {}
+    ),
+    'Puntuaciones de un jugador': (
+        "SELECT * FROM puntuaciones WHERE jugador_id = :jugador_id ORDER BY fecha DESC",
+        lambda ctx: {'jugador_id': random.choice(ctx['jugadores'])}
+    ),
+    'Asistencias de un entrenamiento': (
+        "SELECT * FROM asistencia_entrenamientos WHERE entrenamiento_id = :entrenamiento_id",
+        lambda ctx: {'entrenamiento_id': random.choice(ctx['entrenamientos'])}
+    ),
+    'Objetivos del mes': (
+        "SELECT * FROM objetivos_individuales WHERE mes = :mes",
+        lambda ctx: {'mes': random.choice(ctx['meses'])}
+    ),
+}
+
+def seed(engine, temporadas):
+    """Inserta temporadas sintéticas con el generador de la aplicación"""
+    from database.synthetic_data import generate_synthetic_data
+
+    random.seed(42)
+    datos = generate_synthetic_data(engine, temporadas=temporadas)
+    return {
+        'partidos': datos['calendario'],
+        'jugadores': datos['jugadores'],
+        'entrenamientos': datos['entrenamientos'],
+        'meses': datos['meses'],
+        'hoy': datos['hoy'],
+    }
+
+def measure(engine, ctx, repeticiones):
+    """Devuelve {consulta: (plan, mediana_ms)}"""
+    from sqlalchemy import text
+
+    resultados = {}
+    with engine.connect() as conn:
+        for nombre, (sql, params_fn) in QUERIES.items():
+            plan_rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params_fn(ctx)).fetchall()
+            plan = "; ".join(row[-1] for row in plan_rows)
+
+            tiempos = []
+            for _ in range(repeticiones):
+                params = params_fn(ctx)
+                t0 = time.perf_counter()
+                conn.execute(text(sql), params).fetchall()
+                tiempos.append((time.perf_counter() - t0) * 1000)
+            resultados[nombre] = (plan, statistics.median(tiempos))
+    return resultados
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de índices UD Atzeneta')
+    parser.add_argument('--temporadas', type=int, default=50, help='Temporadas sintéticas a generar')
+    parser.add_argument('--repeticiones', type=int, default=100, help='Ejecuciones por consulta')
+    args = parser.parse_args()
+
+    db_file = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+    db_file.close()
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_file.name}'
+
+    from database.db_manager import Base, engine
+    from database.migrations import run_migrations, get_table_args_indexes, MIGRATIONS, QUERY_INDEX_MODELS
+
+    try:
+        # Esquema "antiguo": tablas sin los índices de la migración 1
+        Base.metadata.create_all(bind=engine)
+        for index in get_table_args_indexes(*QUERY_INDEX_MODELS):
+            index.drop(bind=engine, checkfirst=True)
+
+        ctx = seed(engine, args.temporadas)
+
+        antes = measure(engine, ctx, args.repeticiones)
+        t0 = time.perf_counter()
+        run_migrations(engine)
+        duracion_migracion = time.perf_counter() - t0
+        despues = measure(engine, ctx, args.repeticiones)
+
+        print(f"\n⏱️  Migraciones ({len(MIGRATIONS)}) aplicadas en {duracion_migracion:.2f}s\n")
+        for nombre in QUERIES:
+            plan_antes, ms_antes = antes[nombre]
+            plan_despues, ms_despues = despues[nombre]
+            mejora = ms_antes / ms_despues if ms_despues else float('inf')
+            print(f"🔎 {nombre}")
+            print(f"   antes:   {ms_antes:8.3f} ms | {plan_antes}")
+            print(f"   después: {ms_despues:8.3f} ms | {plan_despues}")
+            print(f"   mejora:  x{mejora:.1f}\n")
+    finally:
+        engine.dispose()
+        os.unlink(db_file.name)
+
+if __name__ == '__main__':
+    main()
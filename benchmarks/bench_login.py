@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark del login bajo un ataque de fuerza bruta
+
+Lanza muchos intentos con contraseñas distintas desde varios hilos (como
+los workers de Dash atendiendo clics de login) contra un usuario real, y
+compara la comprobación anterior (bcrypt directamente en cada hilo) con
+check_login (límites de intentos y pool de bcrypt). Se mide el tiempo de
+CPU del proceso y cuántas comprobaciones bcrypt llegan a ejecutarse.
+
+Uso:
+    python benchmarks/bench_login.py
+    python benchmarks/bench_login.py --intentos 400 --hilos 12 --ips 4
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bcrypt
+from database.db_manager import Base, SessionLocal, Usuario, create_db_engine
+from auth import security
+
+def comprobacion_anterior(username, password, _ip):
+    """verify_credentials anterior: consulta y bcrypt en el hilo del callback"""
+    session = SessionLocal()
+    try:
+        usuario = session.query(Usuario).filter(Usuario.username == username).first()
+        return bool(usuario) and bcrypt.checkpw(password.encode('utf-8'), usuario.password_hash.encode('utf-8'))
+    finally:
+        session.close()
+
+def atacar(comprobar, intentos, hilos, ips):
+    cpu0, t0 = time.process_time(), time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        resultados = list(pool.map(lambda i: comprobar('admin', f"intento{i}", f"10.0.0.{i % ips}"), range(intentos)))
+    return resultados, time.process_time() - cpu0, time.perf_counter() - t0
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del login bajo fuerza bruta')
+    parser.add_argument('--intentos', type=int, default=60, help='Intentos de login')
+    parser.add_argument('--hilos', type=int, default=8, help='Hilos lanzando intentos a la vez')
+    parser.add_argument('--ips', type=int, default=1, help='IPs distintas del atacante')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'login.db')}")
+        Base.metadata.create_all(bind=engine)
+        SessionLocal.configure(bind=engine)
+        session = SessionLocal()
+        session.add(Usuario(username='admin', password_hash=security.hash_password('admin123')))
+        session.commit()
+        session.close()
+
+        ejecuciones = []
+        verificar = security._verificar
+        security._verificar = lambda u, p: ejecuciones.append(u) or verificar(u, p)
+
+        print(f"\n🔐 {args.intentos} intentos desde {args.hilos} hilos y {args.ips} IP(s)")
+        for nombre, comprobar in [('anterior', comprobacion_anterior),
+                                  ('check_login', lambda u, p, ip: security.check_login(u, p, ip)['ok'])]:
+            security.clear_login_state()
+            ejecuciones.clear()
+            resultados, cpu, duracion = atacar(comprobar, args.intentos, args.hilos, args.ips)
+            bcrypts = len(ejecuciones) if nombre == 'check_login' else len(resultados)
+            print(f"   {nombre:12} {duracion:6.2f} s   CPU {cpu:6.2f} s   {bcrypts:4} comprobaciones bcrypt")
+        engine.dispose()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark de carga de páginas a distintas escalas (pytest-benchmark)
+
+Genera con database/synthetic_data.py una base de datos SQLite temporal
+por escala (1, 10 y 100 temporadas) y llama directamente al callback de
+carga de cada página, el mismo que Dash ejecuta al abrirla. Cada ronda
+empieza con la caché de lecturas vacía para medir el acceso real a la base
+de datos. Además de la latencia se cuentan las sentencias SQL de una carga:
+deben ser las mismas en todas las escalas, si crecen con los datos hay una
+consulta N+1 y el test falla.
+
+Requiere pytest-benchmark (pip install pytest-benchmark).
+
+Uso:
+    python -m pytest benchmarks/bench_pages.py
+    BENCH_ESCALAS=1,10 python -m pytest benchmarks/bench_pages.py
+    python -m pytest benchmarks/bench_pages.py --benchmark-autosave
+    python -m pytest benchmarks/bench_pages.py --benchmark-compare --benchmark-compare-fail=mean:25%
+"""
+
+import os
+import sys
+import importlib
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from dash._callback import GLOBAL_CALLBACK_MAP
+from sqlalchemy import event
+from database.cache import query_cache
+from database.db_manager import Base, SessionLocal, create_db_engine
+from database.synthetic_data import generate_synthetic_data
+
+ESCALAS = [int(e) for e in os.environ.get('BENCH_ESCALAS', '1,10,100').split(',')]
+RONDAS = int(os.environ.get('BENCH_RONDAS', 5))
+
+# Temporada completa: la fecha de referencia es el final de la temporada en curso
+HOY = date.today()
+FIN_TEMPORADA = date(HOY.year + 1 if HOY.month >= 8 else HOY.year, 6, 1)
+
+# (página, callback de carga, argumentos con los valores iniciales del layout)
+CALLBACKS = [
+    ('dashboard', 'update_dashboard_data', (None,)),
+    ('jugadores', 'load_jugadores_data', (None, 'active')),
+    ('calendario', 'main_callback', (0, None, 0)),
+    ('partidos', 'load_partidos_data', (None,)),
+    ('entrenamientos', 'load_entrenamientos_data', (None, None, None)),
+    ('objetivos', 'load_objetivos_data', (None, 'all', 'all', 'all')),
+    ('puntuacion', 'load_puntuacion_data', (None,)),
+    ('multas', 'load_multas_data', (None,)),
+]
+
+# {callback: {escala: sentencias}}
+SENTENCIAS = {}
+
+
+def buscar_callback(pagina, nombre):
+    """Función original de un callback registrado por la página con @callback"""
+    modulo = importlib.import_module(f"pages.{pagina}")
+    for entrada in GLOBAL_CALLBACK_MAP.values():
+        funcion = getattr(entrada['callback'], '__wrapped__', None)
+        if funcion and funcion.__name__ == nombre and funcion.__module__ == modulo.__name__:
+            return funcion
+    raise LookupError(f"{modulo.__name__} no registra el callback {nombre}")
+
+
+@pytest.fixture(scope='module', params=ESCALAS, ids=lambda escala: f"{escala}x")
+def base_datos(request, tmp_path_factory):
+    """Base de datos sintética de la escala y contador de sentencias"""
+    escala = request.param
+    ruta = tmp_path_factory.mktemp(f"escala{escala}") / 'bench.db'
+    engine = create_db_engine(f"sqlite:///{ruta}")
+    Base.metadata.create_all(bind=engine)
+    generate_synthetic_data(engine, temporadas=escala, hoy=FIN_TEMPORADA)
+
+    contador = {'sentencias': 0}
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _contar(conn, cursor, statement, parameters, context, executemany):
+        contador['sentencias'] += 1
+
+    bind_anterior = SessionLocal.kw['bind']
+    SessionLocal.configure(bind=engine)
+    query_cache.clear()
+    yield {'escala': escala, 'contador': contador}
+
+    SessionLocal.configure(bind=bind_anterior)
+    query_cache.clear()
+    engine.dispose()
+
+
+@pytest.fixture(scope='module', autouse=True)
+def informe_sentencias(request):
+    """Tabla de sentencias SQL por carga al final del benchmark"""
+    yield
+    if not SENTENCIAS:
+        return
+    captura = request.config.pluginmanager.get_plugin('capturemanager')
+    with captura.global_and_fixture_disabled():
+        print(f"\n\n🔢 Sentencias SQL por carga de página")
+        print(f"   {'callback':28}" + ''.join(f"{f'{e}x':>8}" for e in ESCALAS))
+        for nombre, por_escala in SENTENCIAS.items():
+            print(f"   {nombre:28}" + ''.join(f"{por_escala.get(e, '-'):>8}" for e in ESCALAS))
+
+
+@pytest.mark.parametrize('pagina, nombre, args', CALLBACKS, ids=[nombre for _, nombre, _ in CALLBACKS])
+def test_carga_pagina(benchmark, base_datos, pagina, nombre, args):
+    funcion = buscar_callback(pagina, nombre)
+    escala, contador = base_datos['escala'], base_datos['contador']
+
+    # Carga en frío para contar sentencias y comprobar que devuelve datos
+    # (los callbacks capturan sus errores y devuelven listas vacías)
+    query_cache.clear()
+    contador['sentencias'] = 0
+    resultado = funcion(*args)
+    sentencias = contador['sentencias']
+    assert resultado and all(r != [] for r in (resultado if isinstance(resultado, tuple) else [resultado]))
+
+    benchmark.group = nombre
+    benchmark.extra_info.update({'escala': escala, 'sentencias': sentencias})
+    benchmark.pedantic(funcion, args=args, setup=query_cache.clear, rounds=RONDAS, iterations=1)
+
+    por_escala = SENTENCIAS.setdefault(nombre, {})
+    por_escala[escala] = sentencias
+    # Las sentencias no pueden depender del volumen de datos (N+1)
+    assert sentencias == por_escala[min(por_escala)], \
+        f"{nombre}: {sentencias} sentencias a {escala}x frente a {por_escala[min(por_escala)]} a {min(por_escala)}x"
+
+
+if __name__ == '__main__':
+    sys.exit(pytest.main([__file__] + sys.argv[1:]))
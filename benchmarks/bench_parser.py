@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark del parseo de calendarios FFCV
+
+Compara el parseo original (árbol completo con html.parser y los
+_extract_*_ffcv) con el parser de utils/ffcv_parser.py con cada backend
+disponible, sobre las páginas guardadas en fixtures/ffcv, y comprueba que
+todos devuelven los mismos partidos.
+
+Uso:
+    python benchmarks/bench_parser.py
+    python benchmarks/bench_parser.py --repeticiones 100 fixtures/ffcv/calendario_temporada.html
+"""
+
+import os
+import sys
+import glob
+import time
+import argparse
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bs4 import BeautifulSoup
+from utils.scraping import FFCVScraper
+from utils.ffcv_parser import lxml_available
+
+def build_parsers():
+    scraper = FFCVScraper()
+    parsers = {
+        'original (html.parser, árbol completo)':
+            lambda content: scraper.parse_ffcv_calendar(BeautifulSoup(content, 'html.parser')),
+        'rápido (html.parser + SoupStrainer)':
+            lambda content: scraper.parse_ffcv_html(content, backend='html.parser'),
+    }
+    if lxml_available():
+        parsers['rápido (lxml + SoupStrainer)'] = lambda content: scraper.parse_ffcv_html(content, backend='lxml')
+    else:
+        print("⚠️  lxml no está instalado: solo se compara html.parser")
+    return parsers
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del parser FFCV')
+    parser.add_argument('paginas', nargs='*', help='Páginas HTML guardadas (por defecto fixtures/ffcv/*.html)')
+    parser.add_argument('--repeticiones', type=int, default=50, help='Parseos por página y backend')
+    args = parser.parse_args()
+
+    paginas = args.paginas or sorted(glob.glob(os.path.join(ROOT, 'fixtures', 'ffcv', '*.html')))
+    parsers = build_parsers()
+
+    for pagina in paginas:
+        with open(pagina, 'rb') as f:
+            content = f.read()
+
+        print(f"\n📄 {os.path.basename(pagina)} ({len(content) / 1024:.0f} KB)")
+        referencia = None
+        base_ms = None
+
+        for nombre, parse in parsers.items():
+            matches = parse(content)
+            if referencia is None:
+                referencia = matches
+            iguales = "✅" if matches == referencia else "❌ resultados distintos"
+
+            tiempos = []
+            for _ in range(args.repeticiones):
+                t0 = time.perf_counter()
+                parse(content)
+                tiempos.append((time.perf_counter() - t0) * 1000)
+            mediana = statistics.median(tiempos)
+            base_ms = base_ms or mediana
+
+            print(f"   {nombre:42} {mediana:8.2f} ms  x{base_ms / mediana:4.1f}  "
+                  f"{len(matches)} partidos {iguales}")
+
+if __name__ == '__main__':
+    main()
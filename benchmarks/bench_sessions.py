@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark de los almacenes de sesiones
+
+Crea muchas sesiones de pocos usuarios y mide, para cada backend, el coste
+de crear una sesión (que limpia las caducadas), validar una sesión por id,
+listar las sesiones de un usuario y limpiar cuando caduca una parte.
+
+Uso:
+    python benchmarks/bench_sessions.py
+    python benchmarks/bench_sessions.py --sesiones 200000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.session_store import MemorySessionBackend, SQLiteSessionBackend
+
+def medir(funcion, repeticiones):
+    t0 = time.perf_counter()
+    for i in range(repeticiones):
+        funcion(i)
+    return (time.perf_counter() - t0) / repeticiones * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de los almacenes de sesiones')
+    parser.add_argument('--sesiones', type=int, default=50000, help='Sesiones en el almacén')
+    parser.add_argument('--usuarios', type=int, default=500, help='Usuarios distintos')
+    args = parser.parse_args()
+
+    random.seed(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"\n🔑 {args.sesiones} sesiones de {args.usuarios} usuarios (µs por operación)")
+        for nombre, backend in [('memory', MemorySessionBackend()),
+                                ('sqlite', SQLiteSessionBackend(os.path.join(tmp, 'sesiones.db')))]:
+            ahora = 1000.0
+            for i in range(args.sesiones):
+                backend.put(f"s{i}", {'user_id': f"u{i % args.usuarios}"}, ahora + random.uniform(1, 3600))
+
+            crear = medir(lambda i: (backend.cleanup(ahora), backend.put(f"n{i}", {'user_id': 'u0'}, ahora + 3600)), 1000)
+            validar = medir(lambda i: backend.get(f"s{random.randrange(args.sesiones)}", ahora), 5000)
+            usuario = medir(lambda i: backend.user_sessions(f"u{i % args.usuarios}", ahora), 500)
+            t0 = time.perf_counter()
+            borradas = backend.cleanup(ahora + 360)
+            limpiar = (time.perf_counter() - t0) * 1e3
+            print(f"   {nombre:7} crear {crear:7.1f}   validar {validar:6.1f}   por usuario {usuario:7.1f}"
+                  f"   limpiar {borradas} caducadas en {limpiar:.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark del arranque en frío de un worker
+
+Lanza varias veces un intérprete nuevo que importa app (lo mismo que hace
+gunicorn con app:server) y mide cuánto tarda en tener el servidor listo y
+cuánto en tener todas las páginas precargadas. La base de datos es una
+copia temporal ya migrada, así que todas las repeticiones hacen el mismo
+trabajo.
+
+Uso:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeticiones 10
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULOS_PESADOS = ['pandas', 'numpy', 'plotly.express', 'bs4', 'requests']
+
+SCRIPT = f"""
+import io, sys, json, time, contextlib
+inicio = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+    servidor = time.perf_counter() - inicio
+    app.page_registry.wait_warm_up()
+    paginas = time.perf_counter() - inicio
+print(json.dumps({{
+    'servidor': servidor,
+    'paginas': paginas,
+    'cargados': [m for m in {MODULOS_PESADOS!r} if m in sys.modules]
+}}))
+"""
+
+def arrancar(env):
+    salida = subprocess.run([sys.executable, '-c', SCRIPT], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del arranque de la aplicación')
+    parser.add_argument('--repeticiones', type=int, default=5, help='Arranques a medir')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ,
+               'DATABASE_URL': f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+               'FFCV_SYNC_URLS': ''}
+
+        # Primer arranque: crea y migra la base de datos (no se mide)
+        arrancar(env)
+        resultados = [arrancar(env) for _ in range(args.repeticiones)]
+
+    print(f"\n🚀 Arranque en frío ({args.repeticiones} repeticiones)")
+    for clave, nombre in [('servidor', 'import app (servidor listo)'),
+                          ('paginas', 'páginas precargadas')]:
+        tiempos = [r[clave] * 1000 for r in resultados]
+        print(f"   {nombre:30} mediana {statistics.median(tiempos):7.0f} ms   "
+              f"mín {min(tiempos):7.0f} ms")
+
+    cargados = resultados[-1]['cargados']
+    print(f"   Módulos pesados cargados: {', '.join(cargados) if cargados else 'ninguno'}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark de las estadísticas de jugadores
+
+Genera varias temporadas sintéticas y compara tres formas de obtener los
+goleadores y minutos de una temporada: recorrer en Python todos los
+eventos y convocatorias (lo que habría que hacer sin contadores derivados),
+el recálculo agrupado de rebuild_estadisticas_jugadores y la lectura de la
+tabla precalculada que usa el dashboard. También mide el coste que añaden
+los eventos ORM al guardar un evento de partido.
+
+Uso:
+    python benchmarks/bench_stats.py
+    python benchmarks/bench_stats.py --temporadas 50 --lecturas 200
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from collections import Counter
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.orm import sessionmaker
+from database.db_manager import (
+    Base, ConvocatoriaPartido, EventoPartido, Jugador, Partido, create_db_engine,
+    limites_temporada, rebuild_estadisticas_jugadores, temporada_de
+)
+from database.dashboard_stats import DashboardStats
+from database.synthetic_data import generate_synthetic_data
+
+class _Manager:
+    """Lo mínimo de DatabaseManager que necesita DashboardStats"""
+
+    def __init__(self, session):
+        self.db = session
+
+def recorrer_filas(session, temporada):
+    """Cálculo sin agregados: todas las filas de la temporada a Python"""
+    inicio, fin = limites_temporada(temporada)
+    goles, minutos = Counter(), Counter()
+    eventos = session.query(EventoPartido.jugador_id, EventoPartido.tipo_evento).join(Partido).filter(
+        Partido.fecha >= inicio, Partido.fecha < fin
+    )
+    for jugador_id, tipo in eventos:
+        if tipo == 'gol':
+            goles[jugador_id] += 1
+    convocatorias = session.query(ConvocatoriaPartido.jugador_id, ConvocatoriaPartido.minutos_jugados).join(Partido).filter(
+        Partido.fecha >= inicio, Partido.fecha < fin
+    )
+    for jugador_id, minutos_jugados in convocatorias:
+        minutos[jugador_id] += minutos_jugados or 0
+    return goles.most_common(5)
+
+def cronometrar(funcion, repeticiones):
+    t0 = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = funcion()
+    return resultado, (time.perf_counter() - t0) / repeticiones
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de las estadísticas de jugadores')
+    parser.add_argument('--temporadas', type=int, default=20, help='Temporadas sintéticas a generar')
+    parser.add_argument('--lecturas', type=int, default=50, help='Repeticiones de cada lectura')
+    parser.add_argument('--eventos', type=int, default=500, help='Eventos a guardar uno a uno')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'stats.db')}")
+        Base.metadata.create_all(bind=engine)
+        generate_synthetic_data(engine, temporadas=args.temporadas)
+        session = sessionmaker(bind=engine)()
+        temporada = temporada_de(date.today())
+
+        print(f"\n🥅 Estadísticas de {temporada} ({args.temporadas} temporadas generadas)")
+        _, duracion = cronometrar(lambda: recorrer_filas(session, temporada), args.lecturas)
+        print(f"   recorrer filas      {duracion * 1000:8.2f} ms por lectura")
+        _, duracion = cronometrar(lambda: DashboardStats(_Manager(session)).get_top_goleadores(temporada=temporada),
+                                  args.lecturas)
+        print(f"   tabla precalculada  {duracion * 1000:8.2f} ms por lectura")
+
+        t0 = time.perf_counter()
+        conteos = rebuild_estadisticas_jugadores(session)
+        print(f"   recálculo completo  {time.perf_counter() - t0:8.2f} s ({len(conteos)} temporadas)")
+        t0 = time.perf_counter()
+        rebuild_estadisticas_jugadores(session, [temporada])
+        print(f"   recálculo temporada {(time.perf_counter() - t0) * 1000:8.2f} ms")
+
+        partido = session.query(Partido).order_by(Partido.fecha.desc()).first()
+        jugador_id = session.query(Jugador.id).filter(Jugador.activo == True).first()[0]
+        for nombre, modelo in (('sin estadísticas', EventoPartido.__table__), ('con estadísticas', EventoPartido)):
+            t0 = time.perf_counter()
+            for minuto in range(args.eventos):
+                valores = dict(partido_id=partido.id, jugador_id=jugador_id, minuto=minuto % 90, tipo_evento='gol')
+                if modelo is EventoPartido:
+                    session.add(EventoPartido(**valores))
+                else:
+                    session.execute(modelo.insert().values(**valores))
+                session.commit()
+            print(f"   guardar evento ({nombre}) {(time.perf_counter() - t0) / args.eventos * 1000:6.2f} ms")
+
+        session.close()
+        engine.dispose()
+
+if __name__ == '__main__':
+    main()
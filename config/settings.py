@@ -1,3 +1,4 @@
+import os
 import dash_bootstrap_components as dbc
 
 # Configuración de colores del club UD Atzeneta
@@ -244,8 +245,74 @@ APP_CONFIG = {
     'club_name': 'UD Atzeneta',
     'season': '2024-2025',
     'database_url': 'sqlite:///ud_atzeneta.db',
-    'secret_key': 'ud-atzeneta-secret-key-2024',
+    # Sin SECRET_KEY se genera una clave aleatoria y se guarda en secret_key_file (ver auth/security.py)
+    'secret_key': os.environ.get('SECRET_KEY'),
+    'secret_key_file': os.environ.get('SECRET_KEY_FILE', '.secret_key'),
     'session_timeout': 3600,  # 1 hora en segundos
+    'background_workers': 2,  # hilos para trabajos en segundo plano (importaciones)
+    'job_timeout': 1800,      # segundos; un trabajo activo más antiguo se da por interrumpido
+    'export_dir': os.environ.get('EXPORT_DIR'),  # exportaciones terminadas (por defecto en el directorio temporal)
+    'export_ttl': 3600,       # segundos que vale el enlace de descarga y se guarda el fichero
+    
+    # Pool de conexiones (PostgreSQL)
+    'db_pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+    'db_max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+    'db_pool_recycle': 1800,         # segundos; evita conexiones cerradas por el servidor
+    'db_pool_pre_ping': True,
+    
+    # Ajustes de cada conexión SQLite
+    'sqlite_journal_mode': 'WAL',    # lectores y un escritor a la vez entre workers
+    'sqlite_synchronous': 'NORMAL',  # seguro con WAL y mucho más rápido que FULL
+    'sqlite_busy_timeout': 5000,     # milisegundos esperando un bloqueo antes de fallar
+    'sqlite_mmap_size': 64 * 1024 * 1024,
+    'sqlite_cache_size': -16000,     # negativo = KiB (16 MB por conexión)
+}
+
+# Login (auth/security.py)
+AUTH_CONFIG = {
+    'bcrypt_rounds': int(os.environ.get('BCRYPT_ROUNDS', 12)),  # los hashes con otro coste se rehacen al entrar
+    'bcrypt_workers': 2,             # hilos que calculan bcrypt: limitan la CPU del login
+    'bcrypt_max_pending': 8,         # comprobaciones en cola antes de responder "servidor ocupado"
+    'verify_timeout': 10,            # segundos esperando el resultado de bcrypt
+    'verify_cache_ttl': 30,          # segundos que se reutiliza el resultado de un mismo intento
+    'rate_limit_ip': (20, 60),       # intentos por IP (cubo de tokens: capacidad, segundos para rellenarlo)
+    'rate_limit_user': (5, 300),     # intentos por nombre de usuario desde una misma IP
+    'rate_limit_max_keys': 10000,    # IPs/usuarios recordados por cada limitador
+    'token_ttl': APP_CONFIG['session_timeout'],  # validez del token de sesión firmado
+    # Proxies delante de la aplicación; con 0 se ignora X-Forwarded-For (cualquiera podría falsearlo)
+    'trusted_proxies': int(os.environ.get('TRUSTED_PROXIES', 0)),
+}
+
+# Almacén de sesiones (utils/session_store.py)
+SESSION_CONFIG = {
+    # 'memory' (de cada proceso), 'sqlite' o 'redis' (compartidos entre workers);
+    # con varios workers de gunicorn (WEB_CONCURRENCY) se usa SQLite por defecto
+    'backend': os.environ.get('SESSION_BACKEND', 'sqlite' if int(os.environ.get('WEB_CONCURRENCY', 1)) > 1 else 'memory'),
+    'url': os.environ.get('SESSION_URL'),  # fichero SQLite o URL de Redis
+}
+
+# Métricas de los callbacks (utils/metrics.py)
+METRICS_CONFIG = {
+    # Desactivadas salvo que se defina METRICS_TOKEN (o METRICS_ENABLED=1 para usar solo METRICS_FILE)
+    'enabled': os.environ.get('METRICS_ENABLED', '1' if os.environ.get('METRICS_TOKEN') else '0') != '0',
+    'max_records': 1000,                         # registros en memoria por worker
+    'log_file': os.environ.get('METRICS_FILE'),  # JSON lines compartido entre workers (opcional)
+    'token': os.environ.get('METRICS_TOKEN'),    # /_metrics exige ?token= (sin token responde 403)
+    'n_plus_one_threshold': 5,                   # repeticiones de la misma sentencia para marcar N+1
+}
+
+# Caché de lecturas de la base de datos (database/cache.py)
+CACHE_CONFIG = {
+    # 'memory', 'sqlite', 'redis' o 'none'; con varios workers la caché en memoria no se invalida entre ellos
+    'backend': os.environ.get('CACHE_BACKEND', 'sqlite' if int(os.environ.get('WEB_CONCURRENCY', 1)) > 1 else 'memory'),
+    'url': os.environ.get('CACHE_URL'),                     # fichero SQLite o URL de Redis compartidos entre workers
+    'max_entries': 256,
+    'ttl': {                                                # segundos por entidad
+        'jugadores': 300,
+        'calendario': 300,
+        'multas': 60,
+        'entrenamientos': 120,
+    },
 }
 
 # Configuración de scraping
@@ -253,7 +320,21 @@ SCRAPING_CONFIG = {
     'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
     'timeout': 30,
     'retry_attempts': 3,
-    'delay_between_requests': 1
+    'retry_backoff': 1,              # segundos; se duplica en cada reintento
+    'delay_between_requests': 1,     # segundos entre peticiones al mismo host
+    'max_concurrent_requests': 4,
+    'parse_workers': 1,              # procesos (spawn) para parsear páginas; 1 = en el proceso actual
+    'cache_dir': 'cache/ffcv',       # respuestas guardadas para peticiones condicionales
+    'parser': 'auto',                # 'lxml', 'html.parser' o 'auto' (lxml si está instalado)
+    
+    # Sincronización automática (URLs separadas por espacios o saltos de línea)
+    'sync_urls': os.environ.get('FFCV_SYNC_URLS', '').split(),
+    'sync_interval_partido': 180,    # segundos entre sincronizaciones en ventana de partido
+    'sync_interval_normal': 43200,   # segundos entre sincronizaciones fuera de ventana
+    'sync_retry_interval': 300,      # segundos de espera tras una sincronización fallida
+    'sync_ventana_antes': 30,        # minutos antes del inicio del partido
+    'sync_ventana_despues': 150,     # minutos después del inicio (resultado final)
+    'sync_check_interval': 60        # segundos entre comprobaciones de cada worker
 }
 
 # Configuración de las páginas de navegación
@@ -0,0 +1,66 @@
+"""
+Configuración común de los tests
+
+Los tests nunca usan ud_atzeneta.db: DATABASE_URL apunta a un fichero SQLite
+temporal antes de que se importe database.db_manager (TEST_DATABASE_URL
+permite elegir otra base de datos). Antes de cada test se rehacen sus tablas
+y se vacían la caché de lecturas y los límites de login, así el resultado no
+depende de lo que hayan dejado otros tests u otras ejecuciones.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+_TMP_DIR = tempfile.mkdtemp(prefix='ud_atzeneta_tests_')
+os.environ['DATABASE_URL'] = os.environ.get('TEST_DATABASE_URL') or f"sqlite:///{os.path.join(_TMP_DIR, 'tests.db')}"
+os.environ['SECRET_KEY_FILE'] = os.path.join(_TMP_DIR, 'secret_key')
+os.environ['EXPORT_DIR'] = os.path.join(_TMP_DIR, 'exports')
+# Coste mínimo de bcrypt: init_database crea el usuario admin en cada test
+os.environ.setdefault('BCRYPT_ROUNDS', '4')
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_TMP_DIR, ignore_errors=True)
+
+
+@pytest.fixture(autouse=True)
+def clean_database():
+    """Tablas vacías, caché de lecturas vacía y límites de login a cero en cada test"""
+    from database.db_manager import Base, ScopedSession, engine
+    from database.cache import query_cache
+    from auth.security import clear_login_state
+
+    ScopedSession.remove()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    query_cache.clear()
+    clear_login_state()
+    yield
+    ScopedSession.remove()
+
+
+@pytest.fixture
+def count_queries():
+    """Función que ejecuta func contando las sentencias SQL emitidas"""
+    from sqlalchemy import event
+    from database.db_manager import engine
+
+    def contar(func):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            result = func()
+        finally:
+            event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+        return result, len(statements)
+
+    return contar
@@ -5,6 +5,8 @@ from .db_manager import (
     init_database,
     get_db,
     DatabaseManager,
+    ScopedSession,
+    init_request_sessions,
     # Modelos
     Usuario,
     Jugador,
@@ -18,14 +20,22 @@ from .db_manager import (
     AsistenciaEntrenamiento,
     ObjetivoIndividual,
     Puntuacion,
+    RankingPuntuacion,
+    EstadisticaJugador,
     Multa,
-    PagoMulta
+    PagoMulta,
+    Trabajo,
+    TareaProgramada
 )
+from .dashboard_stats import DashboardStats
 
 __all__ = [
     'init_database',
     'get_db',
     'DatabaseManager',
+    'ScopedSession',
+    'init_request_sessions',
+    'DashboardStats',
     'Usuario',
     'Jugador',
     'PesoJugador',
@@ -38,6 +48,10 @@ __all__ = [
     'AsistenciaEntrenamiento',
     'ObjetivoIndividual',
     'Puntuacion',
+    'RankingPuntuacion',
+    'EstadisticaJugador',
     'Multa',
-    'PagoMulta'
+    'PagoMulta',
+    'Trabajo',
+    'TareaProgramada'
 ]
\ No newline at end of file
@@ -0,0 +1,233 @@
+"""
+Backup y restauración en streaming
+
+El backup es un único fichero gzip en formato JSON lines: una cabecera con
+la versión, y para cada tabla una línea con sus columnas seguida de una
+línea por fila (lista de valores en el orden de las columnas). La última
+línea resume las filas escritas por tabla; al restaurar se comprueba para
+detectar ficheros truncados.
+
+Las tablas se leen con yield_per y se restauran en lotes dentro de una sola
+transacción, en orden de claves foráneas, así que la memoria no depende del
+tamaño de la base de datos. ranking_puntuaciones es un agregado y se
+recalcula al restaurar; trabajos y tareas_programadas son estado de los
+workers y no se copian.
+"""
+
+import os
+import gzip
+import json
+from datetime import datetime, date
+from typing import Dict
+from sqlalchemy import Date, DateTime, delete, insert, select, text
+from .db_manager import (
+    SessionLocal,
+    engine as default_engine,
+    rebuild_ranking_puntuaciones,
+    rebuild_estadisticas_jugadores,
+    Usuario,
+    Jugador,
+    PesoJugador,
+    Lesion,
+    Calendario,
+    Partido,
+    EventoPartido,
+    ConvocatoriaPartido,
+    Entrenamiento,
+    AsistenciaEntrenamiento,
+    ObjetivoIndividual,
+    Puntuacion,
+    RankingPuntuacion,
+    EstadisticaJugador,
+    Multa,
+    PagoMulta
+)
+
+BACKUP_VERSION = '2.0'
+
+# Orden de claves foráneas: cada tabla solo referencia a las anteriores
+BACKUP_MODELS = [
+    Usuario,
+    Jugador,
+    PesoJugador,
+    Lesion,
+    Calendario,
+    Partido,
+    EventoPartido,
+    ConvocatoriaPartido,
+    Entrenamiento,
+    AsistenciaEntrenamiento,
+    ObjetivoIndividual,
+    Puntuacion,
+    Multa,
+    PagoMulta
+]
+
+BACKUP_TABLES = {modelo.__tablename__: modelo.__table__ for modelo in BACKUP_MODELS}
+
+
+def _a_json(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+
+def _linea(valor) -> str:
+    return json.dumps(valor, ensure_ascii=False, separators=(',', ':'), default=_a_json) + '\n'
+
+
+def write_backup(output_file: str, engine=None, batch_size: int = 1000) -> Dict[str, int]:
+    """
+    Escribe el backup de todas las tablas en streaming
+
+    El fichero se escribe primero con extensión .tmp y se renombra al
+    terminar, así nunca queda un backup a medias con el nombre final.
+
+    Args:
+        output_file (str): Ruta del fichero .ndjson.gz
+        engine: Engine de origen (por defecto el de la aplicación)
+        batch_size (int): Filas leídas del cursor en cada lote
+
+    Returns:
+        dict: Filas escritas por tabla
+    """
+    engine = engine or default_engine
+    conteos = {}
+    temporal = f"{output_file}.tmp"
+
+    try:
+        with engine.connect() as conn, gzip.open(temporal, 'wt', encoding='utf-8', compresslevel=6) as f:
+            f.write(_linea({'backup': 'ud_atzeneta', 'version': BACKUP_VERSION,
+                            'timestamp': datetime.now().isoformat(), 'tablas': list(BACKUP_TABLES)}))
+
+            for nombre, tabla in BACKUP_TABLES.items():
+                f.write(_linea({'tabla': nombre, 'columnas': [c.name for c in tabla.columns]}))
+                resultado = conn.execution_options(yield_per=batch_size).execute(
+                    select(tabla).order_by(*tabla.primary_key.columns)
+                )
+                conteos[nombre] = 0
+                for lote in resultado.partitions():
+                    f.write(''.join(_linea(list(fila)) for fila in lote))
+                    conteos[nombre] += len(lote)
+
+            f.write(_linea({'fin': conteos}))
+        os.replace(temporal, output_file)
+    finally:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+
+    return conteos
+
+
+def _conversores(tabla, columnas):
+    """Funciones que devuelven a su tipo las fechas guardadas como texto ISO"""
+    conversores = []
+    for nombre in columnas:
+        if nombre not in tabla.c:
+            raise ValueError(f"La columna {tabla.name}.{nombre} del backup no existe en la base de datos")
+        tipo = tabla.c[nombre].type
+        if isinstance(tipo, DateTime):
+            conversores.append(datetime.fromisoformat)
+        elif isinstance(tipo, Date):
+            conversores.append(date.fromisoformat)
+        else:
+            conversores.append(None)
+    return conversores
+
+
+def _reiniciar_secuencias(session):
+    """En PostgreSQL los ids restaurados no avanzan las secuencias"""
+    if session.get_bind().dialect.name != 'postgresql':
+        return
+    for nombre, tabla in BACKUP_TABLES.items():
+        if 'id' in tabla.c:
+            session.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{nombre}', 'id'), COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM {nombre}"
+            ))
+
+
+def restore_backup(backup_file: str, engine=None, batch_size: int = 1000) -> Dict[str, int]:
+    """
+    Reemplaza los datos de la base de datos por los del backup
+
+    Todo se hace en una transacción que se confirma al final, después de
+    recalcular ranking y estadísticas: si el fichero está incompleto, no
+    encaja con el esquema o falla algún recálculo no se modifica nada.
+
+    Args:
+        backup_file (str): Ruta del fichero .ndjson.gz
+        engine: Engine de destino (por defecto el de la aplicación)
+        batch_size (int): Filas por inserción en bloque
+
+    Returns:
+        dict: Filas restauradas por tabla
+
+    Raises:
+        ValueError: Si el fichero no es un backup válido o está truncado
+    """
+    session = SessionLocal(bind=engine or default_engine)
+    conteos = {}
+
+    try:
+        with gzip.open(backup_file, 'rt', encoding='utf-8') as f:
+            cabecera = json.loads(f.readline() or 'null')
+            if not isinstance(cabecera, dict) or cabecera.get('backup') != 'ud_atzeneta':
+                raise ValueError("El fichero no es un backup de UD Atzeneta")
+            if cabecera.get('version') != BACKUP_VERSION:
+                raise ValueError(f"Versión de backup no soportada: {cabecera.get('version')}")
+
+            # Se vacían las tablas en orden inverso de claves foráneas
+            session.execute(delete(RankingPuntuacion.__table__))
+            session.execute(delete(EstadisticaJugador.__table__))
+            for tabla in reversed(list(BACKUP_TABLES.values())):
+                session.execute(delete(tabla))
+
+            tabla, columnas, conversores, lote, resumen = None, None, None, [], None
+
+            def volcar():
+                if lote:
+                    session.execute(insert(tabla), lote)
+                    conteos[tabla.name] += len(lote)
+                    lote.clear()
+
+            for linea in f:
+                registro = json.loads(linea)
+                if isinstance(registro, list):
+                    if tabla is None:
+                        raise ValueError("Fila de datos antes de la cabecera de su tabla")
+                    lote.append({
+                        columna: conversor(valor) if conversor and valor is not None else valor
+                        for columna, conversor, valor in zip(columnas, conversores, registro)
+                    })
+                    if len(lote) >= batch_size:
+                        volcar()
+                elif 'tabla' in registro:
+                    volcar()
+                    if registro['tabla'] not in BACKUP_TABLES:
+                        raise ValueError(f"Tabla desconocida en el backup: {registro['tabla']}")
+                    tabla = BACKUP_TABLES[registro['tabla']]
+                    columnas = registro['columnas']
+                    conversores = _conversores(tabla, columnas)
+                    conteos[tabla.name] = 0
+                elif 'fin' in registro:
+                    volcar()
+                    resumen = registro['fin']
+
+            if resumen is None:
+                raise ValueError("El backup está incompleto (falta el resumen final)")
+            if resumen != conteos:
+                raise ValueError(f"El número de filas no coincide con el resumen del backup: {resumen} != {conteos}")
+
+        _reiniciar_secuencias(session)
+        # Los agregados se recalculan sin confirmar: datos y agregados se
+        # confirman juntos, o no se confirma nada si falla cualquiera de ellos
+        rebuild_ranking_puntuaciones(session, commit=False)
+        rebuild_estadisticas_jugadores(session, commit=False)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+    return conteos
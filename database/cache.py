@@ -0,0 +1,285 @@
+# Caché de lecturas de DatabaseManager para UD Atzeneta
+#
+# Las lecturas más repetidas (jugadores, calendario, multas, entrenamientos)
+# se guardan como diccionarios con los valores de las columnas (y de las
+# relaciones cargadas en la consulta), nunca como objetos ORM: un objeto
+# desacoplado de la sesión lanzaría DetachedInstanceError al acceder a una
+# relación perezosa. Cada lectura devuelve filas CachedRow de solo lectura,
+# tanto si sale de la caché como si no. Cada entidad tiene su TTL y un número
+# de generación; escribir en cualquiera de sus tablas incrementa la
+# generación y deja inaccesibles las entradas anteriores.
+#
+# Con el backend 'memory' la caché es de cada proceso y una escritura en un
+# worker no invalida la de los demás (sirven datos antiguos hasta el TTL).
+# Con 'sqlite' o 'redis' las entradas y las generaciones se comparten entre
+# los workers de gunicorn; CACHE_CONFIG usa 'sqlite' por defecto cuando
+# WEB_CONCURRENCY > 1.
+
+import time
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+from sqlalchemy import inspect
+from config.settings import CACHE_CONFIG
+
+# Tablas de las que depende cada entidad cacheada
+CACHE_ENTITIES = {
+    'jugadores': {'jugadores'},
+    'calendario': {'calendario'},
+    'multas': {'multas', 'pagos_multas', 'jugadores'},
+    'entrenamientos': {'entrenamientos'},
+}
+
+class CachedRow:
+    """Fila de solo lectura con los valores cacheados accesibles como atributos"""
+
+    def __init__(self, valores):
+        for nombre, valor in valores.items():
+            if isinstance(valor, dict):
+                valor = CachedRow(valor)
+            object.__setattr__(self, nombre, valor)
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError("Las filas cacheadas son de solo lectura")
+
+    def __repr__(self):
+        return f"CachedRow({self.__dict__!r})"
+
+def row_to_dict(objeto, relaciones=()):
+    """
+    Columnas de un objeto ORM (y de las relaciones indicadas) como diccionario
+
+    Args:
+        objeto: Instancia ORM
+        relaciones (tuple): Relaciones muchos-a-uno a incluir; deben estar
+            cargadas en la consulta (joinedload) para no lanzar otra
+    """
+    valores = {attr.key: getattr(objeto, attr.key) for attr in inspect(objeto).mapper.column_attrs}
+    for relacion in relaciones:
+        relacionado = getattr(objeto, relacion)
+        valores[relacion] = row_to_dict(relacionado) if relacionado is not None else None
+    return valores
+
+class MemoryCacheBackend:
+    """Diccionario LRU en memoria del proceso"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expira = entry
+            if expira < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_generation(self, entity):
+        with self._lock:
+            return self._generations.get(entity, 0)
+
+    def incr_generation(self, entity):
+        with self._lock:
+            self._generations[entity] = self._generations.get(entity, 0) + 1
+            # Las entradas de generaciones anteriores ya no se pueden leer
+            prefix = f"{entity}:"
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class SQLiteCacheBackend:
+    """Caché compartida entre procesos en un fichero SQLite"""
+
+    def __init__(self, path, max_entries=256):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS cache_entradas ("
+                         "clave TEXT PRIMARY KEY, valor BLOB, expira REAL, accedido REAL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS cache_generaciones ("
+                         "entidad TEXT PRIMARY KEY, generacion INTEGER NOT NULL)")
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._connect()
+        row = conn.execute("SELECT valor, expira FROM cache_entradas WHERE clave = ?", (key,)).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row[0]
+
+    def set(self, key, value, ttl):
+        ahora = time.time()
+        conn = self._connect()
+        conn.execute("INSERT OR REPLACE INTO cache_entradas VALUES (?, ?, ?, ?)", (key, value, ahora + ttl, ahora))
+        # Límite de tamaño: se descartan las entradas caducadas y después las más antiguas
+        conn.execute("DELETE FROM cache_entradas WHERE expira < ?", (ahora,))
+        conn.execute("DELETE FROM cache_entradas WHERE clave NOT IN ("
+                     "SELECT clave FROM cache_entradas ORDER BY accedido DESC LIMIT ?)", (self.max_entries,))
+
+    def get_generation(self, entity):
+        row = self._connect().execute(
+            "SELECT generacion FROM cache_generaciones WHERE entidad = ?", (entity,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def incr_generation(self, entity):
+        conn = self._connect()
+        conn.execute("INSERT INTO cache_generaciones VALUES (?, 1) "
+                     "ON CONFLICT(entidad) DO UPDATE SET generacion = generacion + 1", (entity,))
+        conn.execute("DELETE FROM cache_entradas WHERE clave LIKE ?", (f"{entity}:%",))
+
+    def clear(self):
+        self._connect().execute("DELETE FROM cache_entradas")
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM cache_entradas").fetchone()[0]
+
+class RedisCacheBackend:
+    """Caché compartida en Redis (el límite LRU lo aplica maxmemory-policy de Redis)"""
+
+    def __init__(self, url, prefix='ud_atzeneta:cache:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=int(ttl))
+
+    def get_generation(self, entity):
+        return int(self.client.get(f"{self.prefix}gen:{entity}") or 0)
+
+    def incr_generation(self, entity):
+        self.client.incr(f"{self.prefix}gen:{entity}")
+
+    def clear(self):
+        for key in self.client.scan_iter(f"{self.prefix}*"):
+            if b':gen:' not in key:
+                self.client.delete(key)
+
+    def __len__(self):
+        return sum(1 for key in self.client.scan_iter(f"{self.prefix}*") if b':gen:' not in key)
+
+def create_backend(config):
+    """Crea el backend configurado (memoria si el compartido no está disponible)"""
+    backend = config.get('backend', 'memory')
+    max_entries = config.get('max_entries', 256)
+
+    try:
+        if backend == 'sqlite':
+            return SQLiteCacheBackend(config.get('url') or 'ud_atzeneta_cache.db', max_entries)
+        if backend == 'redis':
+            return RedisCacheBackend(config.get('url') or 'redis://localhost:6379/0')
+    except Exception as e:
+        print(f"Caché '{backend}' no disponible, se usa la caché en memoria: {e}")
+
+    return MemoryCacheBackend(max_entries)
+
+class QueryCache:
+    """Caché de lecturas con TTL por entidad, invalidación por tablas y contadores"""
+
+    def __init__(self, config=None):
+        self.configure(config or CACHE_CONFIG)
+
+    def configure(self, config):
+        """Cambia la configuración (y el backend) de la caché"""
+        self.config = {**CACHE_CONFIG, **config}
+        self.enabled = self.config.get('backend') != 'none'
+        self.backend = create_backend(self.config)
+        self.hits = {entity: 0 for entity in CACHE_ENTITIES}
+        self.misses = {entity: 0 for entity in CACHE_ENTITIES}
+
+    def get_or_load(self, entity, params, loader):
+        """
+        Devuelve la lectura cacheada o la ejecuta y la guarda
+
+        Args:
+            entity (str): Entidad de CACHE_ENTITIES
+            params: Parámetros de la lectura (forman parte de la clave)
+            loader: Función sin argumentos que hace la consulta
+        """
+        if not self.enabled:
+            return loader()
+
+        key = f"{entity}:{self.backend.get_generation(entity)}:{params!r}"
+        value = self.backend.get(key)
+        if value is not None:
+            self.hits[entity] += 1
+            return pickle.loads(value)
+
+        self.misses[entity] += 1
+        result = loader()
+        self.backend.set(key, pickle.dumps(result), self.config['ttl'].get(entity, 60))
+        return result
+
+    def get_or_load_rows(self, entity, params, loader, relaciones=()):
+        """
+        Como get_or_load, pero para consultas que devuelven objetos ORM
+
+        Se cachean los diccionarios de row_to_dict y se devuelven CachedRow,
+        que no dependen de ninguna sesión.
+        """
+        filas = self.get_or_load(
+            entity, params,
+            lambda: [row_to_dict(objeto, relaciones) for objeto in loader()]
+        )
+        return [CachedRow(valores) for valores in filas]
+
+    def invalidate(self, *entities):
+        for entity in entities:
+            self.backend.incr_generation(entity)
+
+    def invalidate_tables(self, tables):
+        """Invalida las entidades que leen de alguna de las tablas escritas"""
+        tables = set(tables)
+        if not tables:
+            return
+        self.invalidate(*[entity for entity, depends in CACHE_ENTITIES.items() if depends & tables])
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        """Aciertos, fallos y tasa de acierto por entidad"""
+        return {
+            entity: {
+                'hits': self.hits[entity],
+                'misses': self.misses[entity],
+                'hit_rate': self.hits[entity] / ((self.hits[entity] + self.misses[entity]) or 1)
+            }
+            for entity in CACHE_ENTITIES
+        }
+
+# Instancia global usada por DatabaseManager
+query_cache = QueryCache()
@@ -0,0 +1,77 @@
+from sqlalchemy import func
+from datetime import date
+from .db_manager import Jugador, Calendario, Entrenamiento, Multa, EstadisticaJugador, temporada_de
+
+class DashboardStats:
+    """Consultas agregadas del dashboard resueltas en la base de datos"""
+
+    def __init__(self, db_manager):
+        self.db = db_manager.db
+
+    def count_jugadores_activos(self):
+        return self.db.query(func.count(Jugador.id)).filter(Jugador.activo == True).scalar() or 0
+
+    def count_entrenamientos_mes(self, hoy=None):
+        """Número de entrenamientos del mes en curso"""
+        hoy = hoy or date.today()
+        inicio = hoy.replace(day=1)
+        if inicio.month == 12:
+            fin = inicio.replace(year=inicio.year + 1, month=1)
+        else:
+            fin = inicio.replace(month=inicio.month + 1)
+
+        return self.db.query(func.count(Entrenamiento.id)).filter(
+            Entrenamiento.fecha >= inicio,
+            Entrenamiento.fecha < fin
+        ).scalar() or 0
+
+    def sum_multas_pendientes(self):
+        """Importe total pendiente de cobro"""
+        total = self.db.query(func.sum(Multa.debe)).filter(
+            Multa.completamente_pagada == False
+        ).scalar()
+        return float(total or 0)
+
+    def get_proximos_partidos(self, limit=5, hoy=None):
+        """Partidos a partir de hoy, del más cercano al más lejano"""
+        hoy = hoy or date.today()
+        return self.db.query(Calendario).filter(
+            Calendario.fecha >= hoy
+        ).order_by(Calendario.fecha.asc(), Calendario.hora.asc()).limit(limit).all()
+
+    def count_partidos_por_competicion(self):
+        """Devuelve {competicion: numero_partidos}"""
+        rows = self.db.query(
+            Calendario.competicion, func.count(Calendario.id)
+        ).group_by(Calendario.competicion).all()
+        return {competicion: total for competicion, total in rows}
+
+    def get_top_goleadores(self, limit=5, temporada=None):
+        """Devuelve [(nombre_futbolistico, goles)] de los máximos goleadores de la temporada (precalculados)"""
+        temporada = temporada or temporada_de(date.today())
+        rows = self.db.query(Jugador.nombre_futbolistico, EstadisticaJugador.goles).join(
+            Jugador, Jugador.id == EstadisticaJugador.jugador_id
+        ).filter(
+            EstadisticaJugador.temporada == temporada,
+            EstadisticaJugador.goles > 0,
+            Jugador.activo == True
+        ).order_by(EstadisticaJugador.goles.desc(), Jugador.nombre_futbolistico).limit(limit).all()
+        return [(nombre, goles) for nombre, goles in rows]
+
+    def get_resumen(self, hoy=None):
+        """Obtiene todas las estadísticas del dashboard en un único diccionario"""
+        hoy = hoy or date.today()
+        proximos_partidos = self.get_proximos_partidos(hoy=hoy)
+        proximo_partido = proximos_partidos[0] if proximos_partidos else None
+
+        return {
+            'jugadores_activos': self.count_jugadores_activos(),
+            'entrenamientos_mes': self.count_entrenamientos_mes(hoy),
+            'multas_pendientes': self.sum_multas_pendientes(),
+            'proximo_partido': proximo_partido,
+            'dias_proximo': (proximo_partido.fecha - hoy).days if proximo_partido else 0,
+            'proximos_partidos': proximos_partidos,
+            'partidos_por_competicion': self.count_partidos_por_competicion(),
+            'temporada': temporada_de(hoy),
+            'top_goleadores': self.get_top_goleadores(temporada=temporada_de(hoy))
+        }
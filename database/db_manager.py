@@ -1,16 +1,95 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Date, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import create_engine, event, func, case, inspect, select, literal, union_all, or_, insert, update, delete, Column, Index, Integer, String, Float, Date, DateTime, Boolean, Text, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
-from datetime import datetime, date
+from sqlalchemy.orm import sessionmaker, scoped_session, relationship, column_property, object_session, joinedload
+from datetime import datetime, date, timedelta
 import os
+from config.settings import APP_CONFIG, AUTH_CONFIG
+from .cache import query_cache
 
 # Configuración de la base de datos
 DATABASE_URL = os.environ.get('DATABASE_URL', 'sqlite:///ud_atzeneta.db')
 if DATABASE_URL.startswith('postgres://'):
     DATABASE_URL = DATABASE_URL.replace('postgres://', 'postgresql://', 1)
 
-engine = create_engine(DATABASE_URL, echo=False)
+def sqlite_pragmas(config=None):
+    """PRAGMAs que se aplican a cada conexión SQLite nueva"""
+    config = config or APP_CONFIG
+    return {
+        'journal_mode': config.get('sqlite_journal_mode', 'WAL'),
+        'synchronous': config.get('sqlite_synchronous', 'NORMAL'),
+        'busy_timeout': config.get('sqlite_busy_timeout', 5000),
+        'mmap_size': config.get('sqlite_mmap_size', 0),
+        'cache_size': config.get('sqlite_cache_size', -2000),
+    }
+
+def create_db_engine(url=None, config=None, **kwargs):
+    """
+    Crea el engine con el pool y los ajustes de APP_CONFIG
+    
+    PostgreSQL: tamaño del pool, desbordamiento, reciclado y pre-ping.
+    SQLite: WAL, synchronous, busy_timeout, mmap y caché en cada conexión,
+    para que varios workers de gunicorn puedan leer mientras otro escribe
+    sin errores "database is locked".
+    
+    Args:
+        url (str, optional): URL de la base de datos (por defecto DATABASE_URL)
+        config (dict, optional): Configuración (por defecto APP_CONFIG)
+        **kwargs: Argumentos adicionales para create_engine
+    """
+    url = url or DATABASE_URL
+    config = config or APP_CONFIG
+    
+    if url.startswith('sqlite'):
+        engine = create_engine(url, echo=False, **kwargs)
+        pragmas = sqlite_pragmas(config)
+        
+        @event.listens_for(engine, 'connect')
+        def _configure_sqlite(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma, value in pragmas.items():
+                cursor.execute(f"PRAGMA {pragma}={value}")
+            cursor.close()
+        
+        return engine
+    
+    return create_engine(
+        url,
+        echo=False,
+        pool_size=config.get('db_pool_size', 5),
+        max_overflow=config.get('db_max_overflow', 10),
+        pool_recycle=config.get('db_pool_recycle', 1800),
+        pool_pre_ping=config.get('db_pool_pre_ping', True),
+        **kwargs
+    )
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def _session_scope():
+    # Una sesión por petición HTTP (cada callback de Dash es una petición)
+    from flask import has_request_context, request
+    if has_request_context():
+        return ('request', id(request._get_current_object()))
+    return None
+
+# Registro de sesiones compartidas dentro de cada petición de Flask
+ScopedSession = scoped_session(SessionLocal, scopefunc=_session_scope)
+
+def in_request_scope():
+    """Indica si hay una petición de Flask activa (y por tanto una sesión compartida)"""
+    return _session_scope() is not None
+
+def init_request_sessions(server):
+    """
+    Cierra la sesión de cada petición al terminarla
+    
+    La conexión vuelve al pool al acabar el callback, aunque haya fallado,
+    en lugar de depender de que cada DatabaseManager se cierre.
+    """
+    @server.teardown_request
+    def _remove_request_session(exc=None):
+        ScopedSession.remove()
+
 Base = declarative_base()
 
 # Modelos de la base de datos
@@ -44,7 +123,8 @@ class Jugador(Base):
     posicion = Column(String(50))
     pierna_dominante = Column(String(20))
     
-    # Estadísticas
+    # Estadísticas: total de todas las temporadas, derivado de eventos y
+    # convocatorias (ver EstadisticaJugador y rebuild_estadisticas_jugadores)
     goles = Column(Integer, default=0)
     asistencias = Column(Integer, default=0)
     tarjetas_amarillas = Column(Integer, default=0)
@@ -107,6 +187,15 @@ class Calendario(Base):
     campo = Column(String(100))
     scrapeado = Column(Boolean, default=False)
     fecha_actualizacion = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('ix_calendario_fecha', 'fecha'),
+        # Clave con la que el scraper identifica un partido ya importado
+        Index('ix_calendario_partido', 'fecha', 'equipo_local', 'equipo_visitante', 'competicion', unique=True),
+    )
+
+# Columnas que identifican un partido del calendario (índice único ix_calendario_partido)
+CALENDARIO_KEY_COLUMNS = ('fecha', 'equipo_local', 'equipo_visitante', 'competicion')
 
 class Partido(Base):
     __tablename__ = 'partidos'
@@ -121,15 +210,21 @@ class Partido(Base):
     # Relaciones
     eventos = relationship("EventoPartido", back_populates="partido")
     convocatorias = relationship("ConvocatoriaPartido", back_populates="partido")
+    
+    __table_args__ = (
+        # Las estadísticas se recalculan por temporada (rango de fechas)
+        Index('ix_partidos_fecha', 'fecha'),
+    )
 
 class EventoPartido(Base):
     __tablename__ = 'eventos_partido'
     
     id = Column(Integer, primary_key=True, index=True)
-    partido_id = Column(Integer, ForeignKey('partidos.id'))
+    # active_history: las estadísticas agregadas necesitan el valor anterior al modificar
+    partido_id = column_property(Column(Integer, ForeignKey('partidos.id')), active_history=True)
     minuto = Column(Integer, nullable=False)
-    jugador_id = Column(Integer, ForeignKey('jugadores.id'))
-    tipo_evento = Column(String(50), nullable=False)  # gol, asistencia, tarjeta_amarilla, tarjeta_roja, etc.
+    jugador_id = column_property(Column(Integer, ForeignKey('jugadores.id')), active_history=True)
+    tipo_evento = column_property(Column(String(50), nullable=False), active_history=True)  # gol, asistencia, tarjeta_amarilla, tarjeta_roja, etc.
     descripcion = Column(Text)
     
     partido = relationship("Partido", back_populates="eventos")
@@ -139,10 +234,10 @@ class ConvocatoriaPartido(Base):
     __tablename__ = 'convocatorias_partido'
     
     id = Column(Integer, primary_key=True, index=True)
-    partido_id = Column(Integer, ForeignKey('partidos.id'))
-    jugador_id = Column(Integer, ForeignKey('jugadores.id'))
-    estado = Column(String(20), nullable=False)  # titular, suplente, no_convocado
-    minutos_jugados = Column(Integer, default=0)
+    partido_id = column_property(Column(Integer, ForeignKey('partidos.id')), active_history=True)
+    jugador_id = column_property(Column(Integer, ForeignKey('jugadores.id')), active_history=True)
+    estado = column_property(Column(String(20), nullable=False), active_history=True)  # titular, suplente, no_convocado
+    minutos_jugados = column_property(Column(Integer, default=0), active_history=True)
     
     partido = relationship("Partido", back_populates="convocatorias")
     jugador = relationship("Jugador")
@@ -158,6 +253,10 @@ class Entrenamiento(Base):
     
     # Relaciones
     asistencias = relationship("AsistenciaEntrenamiento", back_populates="entrenamiento")
+    
+    __table_args__ = (
+        Index('ix_entrenamientos_fecha', 'fecha'),
+    )
 
 class AsistenciaEntrenamiento(Base):
     __tablename__ = 'asistencia_entrenamientos'
@@ -171,6 +270,10 @@ class AsistenciaEntrenamiento(Base):
     
     entrenamiento = relationship("Entrenamiento", back_populates="asistencias")
     jugador = relationship("Jugador", back_populates="entrenamientos")
+    
+    __table_args__ = (
+        Index('ix_asistencia_entrenamientos_entrenamiento', 'entrenamiento_id'),
+    )
 
 class ObjetivoIndividual(Base):
     __tablename__ = 'objetivos_individuales'
@@ -186,18 +289,225 @@ class ObjetivoIndividual(Base):
     mes = Column(String(7))  # YYYY-MM
     
     jugador = relationship("Jugador")
+    
+    __table_args__ = (
+        Index('ix_objetivos_mes', 'mes'),
+    )
 
 class Puntuacion(Base):
     __tablename__ = 'puntuaciones'
     
     id = Column(Integer, primary_key=True, index=True)
-    jugador_id = Column(Integer, ForeignKey('jugadores.id'))
+    # active_history: el ranking agregado necesita el valor anterior al modificar
+    jugador_id = column_property(Column(Integer, ForeignKey('jugadores.id')), active_history=True)
     fecha = Column(Date, nullable=False)
-    puntos = Column(Integer, nullable=False)
+    puntos = column_property(Column(Integer, nullable=False), active_history=True)
     concepto = Column(String(100))
     observaciones = Column(Text)
     
     jugador = relationship("Jugador", back_populates="puntuaciones")
+    
+    __table_args__ = (
+        Index('ix_puntuaciones_jugador_fecha', 'jugador_id', 'fecha'),
+    )
+
+class RankingPuntuacion(Base):
+    """Agregado por jugador de la tabla puntuaciones, mantenido al escribir"""
+    __tablename__ = 'ranking_puntuaciones'
+    
+    jugador_id = Column(Integer, ForeignKey('jugadores.id'), primary_key=True)
+    total_puntos = Column(Integer, nullable=False, default=0)
+    puntos_positivos = Column(Integer, nullable=False, default=0)
+    puntos_negativos = Column(Integer, nullable=False, default=0)
+    total_registros = Column(Integer, nullable=False, default=0)
+    
+    jugador = relationship("Jugador")
+
+def _apply_ranking_delta(connection, jugador_id, puntos, signo):
+    """Suma (signo=1) o resta (signo=-1) una puntuación del ranking de su jugador"""
+    if jugador_id is None or puntos is None:
+        return
+    
+    valores = {
+        'total_puntos': signo * puntos,
+        'puntos_positivos': signo * puntos if puntos > 0 else 0,
+        'puntos_negativos': signo * puntos if puntos <= 0 else 0,
+        'total_registros': signo
+    }
+    tabla = RankingPuntuacion.__table__
+    result = connection.execute(
+        update(tabla).where(tabla.c.jugador_id == jugador_id).values(
+            **{col: tabla.c[col] + delta for col, delta in valores.items()}
+        )
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(tabla).values(jugador_id=jugador_id, **valores))
+
+@event.listens_for(Puntuacion, 'after_insert')
+def _ranking_after_insert(mapper, connection, target):
+    _apply_ranking_delta(connection, target.jugador_id, target.puntos, 1)
+
+@event.listens_for(Puntuacion, 'after_delete')
+def _ranking_after_delete(mapper, connection, target):
+    _apply_ranking_delta(connection, target.jugador_id, target.puntos, -1)
+
+@event.listens_for(Puntuacion, 'after_update')
+def _ranking_after_update(mapper, connection, target):
+    state = inspect(target)
+    jugador_hist = state.attrs.jugador_id.history
+    puntos_hist = state.attrs.puntos.history
+    if not jugador_hist.has_changes() and not puntos_hist.has_changes():
+        return
+    
+    jugador_anterior = jugador_hist.deleted[0] if jugador_hist.deleted else target.jugador_id
+    puntos_anteriores = puntos_hist.deleted[0] if puntos_hist.deleted else target.puntos
+    _apply_ranking_delta(connection, jugador_anterior, puntos_anteriores, -1)
+    _apply_ranking_delta(connection, target.jugador_id, target.puntos, 1)
+
+# Las temporadas van del 1 de agosto al 31 de julio y se nombran 'AAAA-AAAA'
+INICIO_TEMPORADA_MES = 8
+
+def temporada_de(fecha):
+    """Temporada a la que pertenece una fecha"""
+    inicio = fecha.year if fecha.month >= INICIO_TEMPORADA_MES else fecha.year - 1
+    return f"{inicio}-{inicio + 1}"
+
+def es_temporada(texto):
+    """True si el texto es una temporada como las de temporada_de ('AAAA-AAAA' con años consecutivos)"""
+    if not isinstance(texto, str) or len(texto) != 9 or texto[4] != '-':
+        return False
+    inicio, fin = texto[:4], texto[5:]
+    return inicio.isdigit() and fin.isdigit() and int(fin) == int(inicio) + 1
+
+def limites_temporada(temporada):
+    """(primer día, primer día de la siguiente) de una temporada 'AAAA-AAAA'"""
+    if not es_temporada(temporada):
+        raise ValueError(f"Temporada no válida: {temporada!r} (formato AAAA-AAAA, p. ej. 2024-2025)")
+    inicio = int(temporada.split('-')[0])
+    return date(inicio, INICIO_TEMPORADA_MES, 1), date(inicio + 1, INICIO_TEMPORADA_MES, 1)
+
+class EstadisticaJugador(Base):
+    """Estadísticas de un jugador en una temporada, derivadas de eventos y convocatorias"""
+    __tablename__ = 'estadisticas_jugadores'
+
+    jugador_id = Column(Integer, ForeignKey('jugadores.id'), primary_key=True)
+    temporada = Column(String(9), primary_key=True)
+    goles = Column(Integer, nullable=False, default=0)
+    asistencias = Column(Integer, nullable=False, default=0)
+    tarjetas_amarillas = Column(Integer, nullable=False, default=0)
+    tarjetas_rojas = Column(Integer, nullable=False, default=0)
+    minutos_jugados = Column(Integer, nullable=False, default=0)
+    partidos_titular = Column(Integer, nullable=False, default=0)
+    partidos_suplente = Column(Integer, nullable=False, default=0)
+    convocatorias = Column(Integer, nullable=False, default=0)
+
+    jugador = relationship("Jugador")
+
+    __table_args__ = (
+        Index('ix_estadisticas_temporada_goles', 'temporada', 'goles'),
+    )
+
+# Contadores comunes a EstadisticaJugador y Jugador (en Jugador, el total de todas las temporadas)
+ESTADISTICAS_COLUMNAS = (
+    'goles', 'asistencias', 'tarjetas_amarillas', 'tarjetas_rojas',
+    'minutos_jugados', 'partidos_titular', 'partidos_suplente', 'convocatorias'
+)
+
+# tipo_evento -> contador que incrementa
+EVENTOS_ESTADISTICAS = {
+    'gol': 'goles',
+    'asistencia': 'asistencias',
+    'tarjeta_amarilla': 'tarjetas_amarillas',
+    'tarjeta_roja': 'tarjetas_rojas'
+}
+
+def _valores_evento(tipo_evento):
+    columna = EVENTOS_ESTADISTICAS.get(tipo_evento)
+    return {columna: 1} if columna else {}
+
+def _valores_convocatoria(estado, minutos_jugados):
+    valores = {'minutos_jugados': minutos_jugados} if minutos_jugados else {}
+    if estado in ('titular', 'suplente'):
+        valores[f'partidos_{estado}'] = 1
+        valores['convocatorias'] = 1
+    return valores
+
+def _apply_estadisticas_delta(connection, jugador_id, partido_id, valores, signo):
+    """Suma (signo=1) o resta (signo=-1) los contadores de un evento o convocatoria"""
+    if jugador_id is None or partido_id is None or not valores:
+        return
+
+    fecha = connection.execute(select(Partido.__table__.c.fecha).where(Partido.__table__.c.id == partido_id)).scalar()
+    if fecha is None:
+        return
+
+    deltas = {columna: signo * valor for columna, valor in valores.items()}
+    tabla = EstadisticaJugador.__table__
+    temporada = temporada_de(fecha)
+    result = connection.execute(
+        update(tabla).where(tabla.c.jugador_id == jugador_id, tabla.c.temporada == temporada).values(
+            **{col: tabla.c[col] + delta for col, delta in deltas.items()}
+        )
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(tabla).values(
+            jugador_id=jugador_id, temporada=temporada,
+            **{col: deltas.get(col, 0) for col in ESTADISTICAS_COLUMNAS}
+        ))
+    elif signo < 0:
+        # Como en el recálculo, un jugador sin nada en la temporada no tiene fila
+        connection.execute(delete(tabla).where(
+            tabla.c.jugador_id == jugador_id, tabla.c.temporada == temporada,
+            *[tabla.c[col] == 0 for col in ESTADISTICAS_COLUMNAS]
+        ))
+
+    jugadores = Jugador.__table__
+    connection.execute(update(jugadores).where(jugadores.c.id == jugador_id).values(
+        **{col: func.coalesce(jugadores.c[col], 0) + delta for col, delta in deltas.items()}
+    ))
+
+# Modelo -> (atributos de los que dependen sus contadores, función que los calcula)
+ESTADISTICAS_ORIGENES = {
+    EventoPartido: (('tipo_evento',), _valores_evento),
+    ConvocatoriaPartido: (('estado', 'minutos_jugados'), _valores_convocatoria)
+}
+
+def _estadisticas_listener(atributos, valores_de, signo):
+    def listener(mapper, connection, target):
+        valores = valores_de(*[getattr(target, a) for a in atributos])
+        _apply_estadisticas_delta(connection, target.jugador_id, target.partido_id, valores, signo)
+        _marcar_estadisticas_escritas(target)
+    return listener
+
+def _estadisticas_update_listener(atributos, valores_de):
+    def listener(mapper, connection, target):
+        state = inspect(target)
+        anteriores = {}
+        for atributo in ('jugador_id', 'partido_id') + atributos:
+            hist = state.attrs[atributo].history
+            if hist.has_changes():
+                anteriores[atributo] = hist.deleted[0] if hist.deleted else None
+        if not anteriores:
+            return
+
+        antes = {a: anteriores.get(a, getattr(target, a)) for a in ('jugador_id', 'partido_id') + atributos}
+        _apply_estadisticas_delta(connection, antes['jugador_id'], antes['partido_id'],
+                                  valores_de(*[antes[a] for a in atributos]), -1)
+        _apply_estadisticas_delta(connection, target.jugador_id, target.partido_id,
+                                  valores_de(*[getattr(target, a) for a in atributos]), 1)
+        _marcar_estadisticas_escritas(target)
+    return listener
+
+def _marcar_estadisticas_escritas(target):
+    # Los contadores se escriben con la conexión: la caché de lecturas no los ve en el flush
+    session = object_session(target)
+    if session is not None:
+        _marcar_tablas_escritas(session, {Jugador.__tablename__, EstadisticaJugador.__tablename__})
+
+for _modelo, (_atributos, _valores_de) in ESTADISTICAS_ORIGENES.items():
+    event.listen(_modelo, 'after_insert', _estadisticas_listener(_atributos, _valores_de, 1))
+    event.listen(_modelo, 'after_delete', _estadisticas_listener(_atributos, _valores_de, -1))
+    event.listen(_modelo, 'after_update', _estadisticas_update_listener(_atributos, _valores_de))
 
 class Multa(Base):
     __tablename__ = 'multas'
@@ -213,6 +523,11 @@ class Multa(Base):
     
     jugador = relationship("Jugador", back_populates="multas")
     pagos = relationship("PagoMulta", back_populates="multa")
+    
+    __table_args__ = (
+        # Incluye debe para que la suma de pendientes se resuelva solo con el índice
+        Index('ix_multas_pendientes', 'completamente_pagada', 'fecha', 'debe'),
+    )
 
 class PagoMulta(Base):
     __tablename__ = 'pagos_multas'
@@ -225,19 +540,175 @@ class PagoMulta(Base):
     
     multa = relationship("Multa", back_populates="pagos")
 
+class Trabajo(Base):
+    """Trabajo en segundo plano (importaciones, etc.) consultable desde cualquier worker"""
+    __tablename__ = 'trabajos'
+    
+    id = Column(String(36), primary_key=True)
+    tipo = Column(String(50), nullable=False)
+    estado = Column(String(20), nullable=False, default='pendiente')  # pendiente, en_curso, completado, error
+    progreso = Column(Integer, nullable=False, default=0)
+    mensaje = Column(String(200))
+    resultado = Column(Text)  # JSON
+    error = Column(Text)
+    fecha_creacion = Column(DateTime, default=datetime.utcnow)
+    fecha_inicio = Column(DateTime)
+    fecha_fin = Column(DateTime)
+
+class TareaProgramada(Base):
+    """Bloqueo y última ejecución de una tarea periódica compartida entre workers"""
+    __tablename__ = 'tareas_programadas'
+    
+    nombre = Column(String(50), primary_key=True)
+    propietario = Column(String(100))
+    bloqueado_hasta = Column(DateTime)
+    ultima_ejecucion = Column(DateTime)
+
 # Funciones para gestionar la base de datos
 
+def rebuild_ranking_puntuaciones(db, commit=True):
+    """
+    Recalcula desde cero la tabla ranking_puntuaciones a partir de puntuaciones
+
+    Con commit=False solo se envían los cambios (flush) y la transacción
+    queda abierta para que la confirme quien llama.
+    """
+    tabla = RankingPuntuacion.__table__
+    db.execute(delete(tabla))
+    db.execute(insert(tabla).from_select(
+        ['jugador_id', 'total_puntos', 'puntos_positivos', 'puntos_negativos', 'total_registros'],
+        select(
+            Puntuacion.jugador_id,
+            func.sum(Puntuacion.puntos),
+            func.sum(case((Puntuacion.puntos > 0, Puntuacion.puntos), else_=0)),
+            func.sum(case((Puntuacion.puntos <= 0, Puntuacion.puntos), else_=0)),
+            func.count(Puntuacion.id)
+        ).where(Puntuacion.jugador_id.isnot(None)).group_by(Puntuacion.jugador_id)
+    ))
+    if commit:
+        db.commit()
+    else:
+        db.flush()
+
+def temporadas_con_partidos(db):
+    """Temporadas entre el primer y el último partido registrados"""
+    primero, ultimo = db.execute(select(func.min(Partido.fecha), func.max(Partido.fecha))).one()
+    if primero is None:
+        return []
+    inicio, fin = (int(temporada_de(f).split('-')[0]) for f in (primero, ultimo))
+    return [f"{anio}-{anio + 1}" for anio in range(inicio, fin + 1)]
+
+def _consulta_estadisticas(temporada):
+    """Estadísticas por jugador de una temporada en una sola consulta agrupada"""
+    eventos, convocatorias, partidos = EventoPartido.__table__, ConvocatoriaPartido.__table__, Partido.__table__
+    inicio, fin = limites_temporada(temporada)
+    cero = literal(0)
+
+    # Una fila por evento o convocatoria con lo que suma a cada contador
+    por_evento = {
+        col: case((eventos.c.tipo_evento == tipo, 1), else_=0)
+        for tipo, col in EVENTOS_ESTADISTICAS.items()
+    }
+    de_eventos = select(eventos.c.jugador_id, *[
+        por_evento.get(col, cero).label(col) for col in ESTADISTICAS_COLUMNAS
+    ]).select_from(eventos.join(partidos, eventos.c.partido_id == partidos.c.id)).where(
+        partidos.c.fecha >= inicio, partidos.c.fecha < fin, eventos.c.jugador_id.isnot(None)
+    )
+
+    por_convocatoria = {
+        'minutos_jugados': func.coalesce(convocatorias.c.minutos_jugados, 0),
+        'partidos_titular': case((convocatorias.c.estado == 'titular', 1), else_=0),
+        'partidos_suplente': case((convocatorias.c.estado == 'suplente', 1), else_=0),
+        'convocatorias': case((convocatorias.c.estado.in_(['titular', 'suplente']), 1), else_=0)
+    }
+    de_convocatorias = select(convocatorias.c.jugador_id, *[
+        por_convocatoria.get(col, cero).label(col) for col in ESTADISTICAS_COLUMNAS
+    ]).select_from(convocatorias.join(partidos, convocatorias.c.partido_id == partidos.c.id)).where(
+        partidos.c.fecha >= inicio, partidos.c.fecha < fin, convocatorias.c.jugador_id.isnot(None)
+    )
+
+    origen = union_all(de_eventos, de_convocatorias).subquery()
+    totales = [func.sum(origen.c[col]) for col in ESTADISTICAS_COLUMNAS]
+    # Los no convocados sin minutos no generan fila
+    return select(origen.c.jugador_id, literal(temporada), *totales).group_by(
+        origen.c.jugador_id
+    ).having(or_(*[total != 0 for total in totales]))
+
+def rebuild_estadisticas_jugadores(db, temporadas=None, commit=True):
+    """
+    Recalcula desde cero las estadísticas a partir de eventos y convocatorias
+
+    Cada temporada se resuelve con una consulta agrupada (INSERT ... SELECT)
+    y después se rehacen los contadores de Jugador como la suma de todas
+    sus temporadas.
+
+    Args:
+        db: Sesión de base de datos
+        temporadas (list, optional): Temporadas a recalcular (por defecto todas)
+        commit (bool): Confirmar la transacción al terminar (False: solo flush)
+
+    Returns:
+        dict: Jugadores con estadísticas en cada temporada recalculada
+    """
+    tabla = EstadisticaJugador.__table__
+    for temporada in temporadas or []:
+        limites_temporada(temporada)  # ValueError antes de borrar nada si alguna no es válida
+    if temporadas is None:
+        temporadas = temporadas_con_partidos(db)
+        db.execute(delete(tabla))
+
+    conteos = {}
+    for temporada in temporadas:
+        db.execute(delete(tabla).where(tabla.c.temporada == temporada))
+        db.execute(insert(tabla).from_select(
+            ['jugador_id', 'temporada', *ESTADISTICAS_COLUMNAS], _consulta_estadisticas(temporada)
+        ))
+        conteos[temporada] = db.execute(
+            select(func.count()).select_from(tabla).where(tabla.c.temporada == temporada)
+        ).scalar()
+
+    jugadores = Jugador.__table__
+    db.execute(update(jugadores).values(**{
+        col: select(func.coalesce(func.sum(tabla.c[col]), 0)).where(
+            tabla.c.jugador_id == jugadores.c.id
+        ).scalar_subquery()
+        for col in ESTADISTICAS_COLUMNAS
+    }))
+    if commit:
+        db.commit()
+    else:
+        db.flush()
+    return conteos
+
 def init_database():
-    """Inicializa la base de datos y crea las tablas"""
-    Base.metadata.create_all(bind=engine)
+    """
+    Inicializa la base de datos, crea las tablas y aplica las migraciones
+
+    Tablas y migraciones se hacen con el bloqueo de migraciones (un solo
+    worker a la vez); si fallan la excepción se propaga para que el worker
+    no arranque con el esquema a medias.
+    """
+    from .migrations import run_migrations
+    run_migrations(engine, create_tables=True)
     
     # Crear usuario admin por defecto si no existe
     db = SessionLocal()
     try:
+        # Rellenar el ranking en bases de datos anteriores a la tabla agregada
+        ranking_vacio = db.query(RankingPuntuacion).first() is None
+        if ranking_vacio and db.query(Puntuacion).first() is not None:
+            rebuild_ranking_puntuaciones(db)
+        
+        # Y las estadísticas en las anteriores a estadisticas_jugadores
+        estadisticas_vacias = db.query(EstadisticaJugador).first() is None
+        if estadisticas_vacias and (db.query(EventoPartido).first() is not None or
+                                    db.query(ConvocatoriaPartido).first() is not None):
+            rebuild_estadisticas_jugadores(db)
+        
         existing_user = db.query(Usuario).filter(Usuario.username == 'admin').first()
         if not existing_user:
             import bcrypt
-            hashed_password = bcrypt.hashpw('admin123'.encode('utf-8'), bcrypt.gensalt())
+            hashed_password = bcrypt.hashpw('admin123'.encode('utf-8'), bcrypt.gensalt(rounds=AUTH_CONFIG['bcrypt_rounds']))
             admin_user = Usuario(
                 username='admin',
                 password_hash=hashed_password.decode('utf-8'),
@@ -261,14 +732,53 @@ def get_db():
     finally:
         db.close()
 
+# Invalidación de la caché de lecturas: se anotan las tablas escritas en cada
+# sesión y, al confirmar la transacción, se invalidan las entidades que leen de ellas
+
+def _marcar_tablas_escritas(session, tablas):
+    session.info.setdefault('cache_tablas', set()).update(tablas)
+
+@event.listens_for(SessionLocal, 'after_flush')
+def _cache_after_flush(session, flush_context):
+    objetos = list(session.new) + list(session.dirty) + list(session.deleted)
+    _marcar_tablas_escritas(session, {obj.__table__.name for obj in objetos if hasattr(obj, '__table__')})
+
+@event.listens_for(SessionLocal, 'do_orm_execute')
+def _cache_do_orm_execute(orm_execute_state):
+    # UPDATE/DELETE/INSERT en bloque (query.update(), session.execute(update(...)))
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        tabla = getattr(orm_execute_state.statement, 'table', None)
+        if tabla is not None:
+            _marcar_tablas_escritas(orm_execute_state.session, {tabla.name})
+
+@event.listens_for(SessionLocal, 'after_commit')
+def _cache_after_commit(session):
+    tablas = session.info.pop('cache_tablas', None)
+    if tablas:
+        query_cache.invalidate_tables(tablas)
+
+@event.listens_for(SessionLocal, 'after_rollback')
+def _cache_after_rollback(session):
+    session.info.pop('cache_tablas', None)
+
 class DatabaseManager:
-    """Clase para gestionar operaciones de base de datos"""
+    """
+    Clase para gestionar operaciones de base de datos
+    
+    Dentro de una petición de Flask todos los DatabaseManager comparten la
+    sesión de la petición (ScopedSession), que se cierra al terminarla. Fuera
+    de una petición (hilos de trabajos, scripts, tests) cada instancia abre
+    y cierra su propia sesión.
+    """
     
     def __init__(self):
-        self.db = SessionLocal()
+        self.scoped = in_request_scope()
+        self.db = ScopedSession() if self.scoped else SessionLocal()
     
     def close(self):
-        self.db.close()
+        # La sesión de la petición la cierra init_request_sessions al terminar
+        if not self.scoped:
+            self.db.close()
     
     def __enter__(self):
         return self
@@ -283,9 +793,102 @@ class DatabaseManager:
             query = query.filter(Jugador.activo == True)
         return query.all()
     
+    def get_jugadores_rows(self, activos_solo=True):
+        """Como get_jugadores, pero con filas de solo lectura servidas desde la caché"""
+        return query_cache.get_or_load_rows(
+            'jugadores', activos_solo, lambda: self.get_jugadores(activos_solo)
+        )
+    
     def get_jugador_by_id(self, jugador_id):
         return self.db.query(Jugador).filter(Jugador.id == jugador_id).first()
     
+    # Métodos con carga anticipada del jugador (evitan una consulta por fila)
+    def get_multas_with_jugador(self, limit=None):
+        """Obtiene las multas con su jugador cargado en la misma consulta"""
+        query = self.db.query(Multa).options(joinedload(Multa.jugador)).order_by(Multa.fecha.desc())
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+    
+    def get_multas_with_jugador_rows(self, limit=None):
+        """Como get_multas_with_jugador, pero con filas de solo lectura servidas desde la caché"""
+        return query_cache.get_or_load_rows(
+            'multas', limit, lambda: self.get_multas_with_jugador(limit), relaciones=('jugador',)
+        )
+    
+    def get_ranking_puntuaciones(self):
+        """Ranking de puntuación leído de la tabla agregada (un registro por jugador)"""
+        filas = self.db.query(RankingPuntuacion).options(
+            joinedload(RankingPuntuacion.jugador)
+        ).filter(RankingPuntuacion.total_registros > 0).order_by(
+            RankingPuntuacion.total_puntos.desc()
+        ).all()
+        
+        return [{
+            'jugador_id': fila.jugador_id,
+            'jugador_nombre': fila.jugador.nombre_futbolistico if fila.jugador else 'Desconocido',
+            'total_puntos': fila.total_puntos,
+            'puntos_positivos': fila.puntos_positivos,
+            'puntos_negativos': fila.puntos_negativos,
+            'total_registros': fila.total_registros,
+            'promedio_puntos': fila.total_puntos / fila.total_registros
+        } for fila in filas]
+
+    # Estadísticas precalculadas (tabla estadisticas_jugadores)
+    def get_estadisticas_jugador(self, jugador_id):
+        """Estadísticas de un jugador temporada a temporada, de la más antigua a la actual"""
+        filas = self.db.query(EstadisticaJugador).filter(
+            EstadisticaJugador.jugador_id == jugador_id
+        ).order_by(EstadisticaJugador.temporada).all()
+        return [{'temporada': fila.temporada, **{col: getattr(fila, col) for col in ESTADISTICAS_COLUMNAS}}
+                for fila in filas]
+
+    def get_estadisticas_temporada(self, temporada=None, orden='goles', limit=None):
+        """
+        Estadísticas de todos los jugadores en una temporada
+
+        Args:
+            temporada (str, optional): 'AAAA-AAAA' (por defecto la actual)
+            orden (str): Contador por el que ordenar, de mayor a menor
+            limit (int, optional): Número máximo de jugadores
+        """
+        if orden not in ESTADISTICAS_COLUMNAS:
+            raise ValueError(f"Orden no válido: {orden}. Opciones: {', '.join(ESTADISTICAS_COLUMNAS)}")
+
+        temporada = temporada or temporada_de(date.today())
+        query = self.db.query(EstadisticaJugador, Jugador.nombre_futbolistico).join(
+            Jugador, Jugador.id == EstadisticaJugador.jugador_id
+        ).filter(EstadisticaJugador.temporada == temporada).order_by(
+            getattr(EstadisticaJugador, orden).desc(), Jugador.nombre_futbolistico
+        )
+        if limit:
+            query = query.limit(limit)
+
+        return [{
+            'jugador_id': fila.jugador_id,
+            'jugador_nombre': nombre,
+            **{col: getattr(fila, col) for col in ESTADISTICAS_COLUMNAS}
+        } for fila, nombre in query.all()]
+
+    def get_resumen_temporadas(self):
+        """Totales del equipo por temporada: {temporada: {contador: total, 'jugadores': n}}"""
+        filas = self.db.query(
+            EstadisticaJugador.temporada,
+            func.count(EstadisticaJugador.jugador_id),
+            *[func.sum(getattr(EstadisticaJugador, col)) for col in ESTADISTICAS_COLUMNAS]
+        ).group_by(EstadisticaJugador.temporada).order_by(EstadisticaJugador.temporada).all()
+
+        return {
+            temporada: {'jugadores': jugadores, **dict(zip(ESTADISTICAS_COLUMNAS, totales))}
+            for temporada, jugadores, *totales in filas
+        }
+
+    def get_objetivos_with_jugador(self):
+        """Obtiene los objetivos individuales con su jugador cargado en la misma consulta"""
+        return self.db.query(ObjetivoIndividual).options(
+            joinedload(ObjetivoIndividual.jugador)
+        ).all()
+    
     def save(self, obj):
         """Guarda un objeto en la base de datos"""
         try:
@@ -324,6 +927,10 @@ class DatabaseManager:
     def get_calendario(self):
         return self.db.query(Calendario).order_by(Calendario.fecha.desc()).all()
     
+    def get_calendario_rows(self):
+        """Como get_calendario, pero con filas de solo lectura servidas desde la caché"""
+        return query_cache.get_or_load_rows('calendario', None, self.get_calendario)
+    
     def create_evento_calendario(self, **kwargs):
         evento = Calendario(**kwargs)
         self.db.add(evento)
@@ -331,9 +938,223 @@ class DatabaseManager:
         self.db.refresh(evento)
         return evento
     
+    def upsert_calendario(self, matches):
+        """
+        Inserta o actualiza partidos del calendario en bloque
+        
+        Los partidos existentes se leen con una única consulta sobre el rango
+        de fechas importado y se comparan en memoria: solo se escriben los
+        partidos nuevos o con algún dato distinto. Los valores None no
+        sobrescriben los datos ya guardados.
+        
+        Args:
+            matches (list): Diccionarios con columnas de Calendario
+        
+        Returns:
+            tuple: (creados, actualizados)
+        """
+        columnas = {c.name for c in Calendario.__table__.columns} - {'id', 'fecha_actualizacion'}
+        
+        # Un mismo partido puede aparecer en varias páginas: gana la última aparición
+        nuevos = {}
+        for match in matches:
+            if any(match.get(key) is None for key in CALENDARIO_KEY_COLUMNS):
+                continue
+            datos = {k: v for k, v in match.items() if k in columnas}
+            nuevos[tuple(datos[key] for key in CALENDARIO_KEY_COLUMNS)] = datos
+        
+        if not nuevos:
+            return 0, 0
+        
+        fechas = [key[0] for key in nuevos]
+        existentes = {
+            tuple(getattr(row, key) for key in CALENDARIO_KEY_COLUMNS): row
+            for row in self.db.execute(select(Calendario.__table__).where(
+                Calendario.fecha >= min(fechas),
+                Calendario.fecha <= max(fechas)
+            ))
+        }
+        
+        ahora = datetime.utcnow()
+        inserts, updates = [], []
+        for key, datos in nuevos.items():
+            actual = existentes.get(key)
+            if actual is None:
+                inserts.append({**datos, 'fecha_actualizacion': ahora})
+                continue
+            
+            cambios = {
+                k: v for k, v in datos.items()
+                if v is not None and getattr(actual, k) != v
+            }
+            if cambios:
+                updates.append({**{k: getattr(actual, k) for k in columnas}, **cambios,
+                                'id': actual.id, 'fecha_actualizacion': ahora})
+        
+        try:
+            filas = inserts + updates
+            if filas and self.db.get_bind().dialect.name in ('sqlite', 'postgresql'):
+                self.db.execute(self._calendario_upsert_statement(columnas), [
+                    {c: fila.get(c) for c in columnas | {'fecha_actualizacion'}} for fila in filas
+                ])
+            else:
+                if inserts:
+                    self.db.bulk_insert_mappings(Calendario, inserts)
+                if updates:
+                    self.db.bulk_update_mappings(Calendario, updates)
+                # Las escrituras en bloque no pasan por after_flush
+                _marcar_tablas_escritas(self.db, {'calendario'})
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            print(f"Error en la importación masiva del calendario: {str(e)}")
+            raise
+        
+        return len(inserts), len(updates)
+    
+    def _calendario_upsert_statement(self, columnas):
+        """INSERT ... ON CONFLICT sobre la clave del partido (SQLite y PostgreSQL)"""
+        if self.db.get_bind().dialect.name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        
+        stmt = dialect_insert(Calendario.__table__)
+        actualizables = sorted(columnas - set(CALENDARIO_KEY_COLUMNS)) + ['fecha_actualizacion']
+        return stmt.on_conflict_do_update(
+            index_elements=list(CALENDARIO_KEY_COLUMNS),
+            set_={c: func.coalesce(stmt.excluded[c], Calendario.__table__.c[c]) for c in actualizables}
+        )
+    
+    # Métodos para tareas programadas
+    def acquire_lock(self, nombre, propietario, ttl):
+        """
+        Intenta tomar el bloqueo de una tarea programada
+        
+        El UPDATE condicional es atómico en SQLite y PostgreSQL: solo un
+        worker puede tomar un bloqueo libre o caducado.
+        
+        Args:
+            nombre (str): Nombre de la tarea
+            propietario (str): Identificador del worker
+            ttl (int): Segundos tras los que el bloqueo caduca si no se libera
+        
+        Returns:
+            bool: True si el bloqueo es de este propietario
+        """
+        ahora = datetime.utcnow()
+        if self.db.get(TareaProgramada, nombre) is None:
+            try:
+                self.db.add(TareaProgramada(nombre=nombre))
+                self.db.commit()
+            except Exception:
+                # Otro worker ha creado la fila a la vez
+                self.db.rollback()
+        
+        resultado = self.db.execute(
+            update(TareaProgramada).where(
+                TareaProgramada.nombre == nombre,
+                (TareaProgramada.bloqueado_hasta == None) |
+                (TareaProgramada.bloqueado_hasta < ahora) |
+                (TareaProgramada.propietario == propietario)
+            ).values(propietario=propietario, bloqueado_hasta=ahora + timedelta(seconds=ttl))
+        )
+        self.db.commit()
+        return resultado.rowcount == 1
+    
+    def release_lock(self, nombre, propietario, ejecutada=True, reintentar_en=None):
+        """
+        Libera el bloqueo y, si la tarea se ejecutó, guarda la hora de ejecución
+        
+        Args:
+            reintentar_en (int, optional): Segundos durante los que ningún worker
+                puede volver a tomar el bloqueo (espera tras un fallo)
+        """
+        valores = {'propietario': None, 'bloqueado_hasta': None}
+        if ejecutada:
+            valores['ultima_ejecucion'] = datetime.utcnow()
+        if reintentar_en:
+            valores['bloqueado_hasta'] = datetime.utcnow() + timedelta(seconds=reintentar_en)
+        self.db.execute(
+            update(TareaProgramada).where(
+                TareaProgramada.nombre == nombre,
+                TareaProgramada.propietario == propietario
+            ).values(**valores)
+        )
+        self.db.commit()
+    
+    def get_tarea_programada(self, nombre):
+        return self.db.get(TareaProgramada, nombre)
+    
     # Métodos para entrenamientos
-    def get_entrenamientos(self):
-        return self.db.query(Entrenamiento).order_by(Entrenamiento.fecha.desc()).all()
+    def get_entrenamientos(self, limit=None):
+        query = self.db.query(Entrenamiento).order_by(Entrenamiento.fecha.desc())
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+    
+    def get_entrenamientos_rows(self, limit=None):
+        """Como get_entrenamientos, pero con filas de solo lectura servidas desde la caché"""
+        return query_cache.get_or_load_rows(
+            'entrenamientos', limit, lambda: self.get_entrenamientos(limit)
+        )
+    
+    def get_entrenamientos_asistencias_data(self, fecha_desde=None, fecha_hasta=None):
+        """
+        Carga entrenamientos y asistencias (con el nombre del jugador) en una
+        única consulta con JOIN, filtrando el rango de fechas en SQL.
+        
+        Devuelve la lista de diccionarios que espera la página de entrenamientos,
+        ordenada por número de entrenamiento descendente.
+        """
+        query = self.db.query(
+            Entrenamiento.id,
+            Entrenamiento.numero_entrenamiento,
+            Entrenamiento.fecha,
+            Entrenamiento.observaciones,
+            AsistenciaEntrenamiento.jugador_id,
+            AsistenciaEntrenamiento.entrena,
+            AsistenciaEntrenamiento.razon_ausencia,
+            AsistenciaEntrenamiento.observaciones.label('asistencia_observaciones'),
+            Jugador.nombre_futbolistico
+        ).outerjoin(
+            AsistenciaEntrenamiento, AsistenciaEntrenamiento.entrenamiento_id == Entrenamiento.id
+        ).outerjoin(
+            Jugador, Jugador.id == AsistenciaEntrenamiento.jugador_id
+        )
+        
+        if fecha_desde:
+            query = query.filter(Entrenamiento.fecha >= fecha_desde)
+        if fecha_hasta:
+            query = query.filter(Entrenamiento.fecha <= fecha_hasta)
+        
+        query = query.order_by(Entrenamiento.numero_entrenamiento.desc(), AsistenciaEntrenamiento.id)
+        
+        entrenamientos = {}
+        for row in query:
+            ent = entrenamientos.get(row.id)
+            if ent is None:
+                ent = entrenamientos[row.id] = {
+                    'id': row.id,
+                    'numero_entrenamiento': row.numero_entrenamiento,
+                    'fecha': row.fecha.strftime("%d/%m/%Y"),
+                    'observaciones': row.observaciones,
+                    'asistencias': []
+                }
+            
+            # Entrenamiento sin asistencias registradas (fila del OUTER JOIN vacía)
+            if row.jugador_id is None and row.entrena is None:
+                continue
+            
+            ent['asistencias'].append({
+                'jugador_id': row.jugador_id,
+                'jugador_nombre': row.nombre_futbolistico or 'Desconocido',
+                'entrena': row.entrena,
+                'razon_ausencia': row.razon_ausencia,
+                'observaciones': row.asistencia_observaciones
+            })
+        
+        return list(entrenamientos.values())
     
     def get_siguiente_numero_entrenamiento(self):
         ultimo = self.db.query(Entrenamiento).order_by(Entrenamiento.numero_entrenamiento.desc()).first()
@@ -355,6 +1176,30 @@ class DatabaseManager:
     def get_multas_pendientes(self):
         return self.db.query(Multa).filter(Multa.completamente_pagada == False).all()
     
+    def get_resumen_multas_por_jugador(self):
+        """Totales de multas por jugador agregados en la base de datos"""
+        filas = self.db.query(
+            Multa.jugador_id,
+            Jugador.nombre_futbolistico,
+            func.count(Multa.id),
+            func.coalesce(func.sum(Multa.multa), 0),
+            func.coalesce(func.sum(Multa.pagado), 0),
+            func.coalesce(func.sum(Multa.debe), 0),
+            func.sum(case((Multa.completamente_pagada == False, 1), else_=0))
+        ).outerjoin(Jugador, Jugador.id == Multa.jugador_id).group_by(
+            Multa.jugador_id, Jugador.nombre_futbolistico
+        ).order_by(func.sum(Multa.debe).desc()).all()
+        
+        return [{
+            'jugador_id': jugador_id,
+            'jugador_nombre': nombre or 'Desconocido',
+            'total_multas': total,
+            'total_importe': float(importe),
+            'total_pagado': float(pagado),
+            'total_debe': float(debe),
+            'multas_pendientes': int(pendientes or 0)
+        } for jugador_id, nombre, total, importe, pagado, debe, pendientes in filas]
+    
     def create_multa(self, **kwargs):
         kwargs['debe'] = kwargs.get('multa', 0) - kwargs.get('pagado', 0)
         kwargs['completamente_pagada'] = kwargs['debe'] <= 0
@@ -0,0 +1,225 @@
+# Migraciones versionadas del esquema de UD Atzeneta
+#
+# create_all solo crea las tablas que no existen: no añade índices ni columnas
+# a tablas ya creadas. Cada migración se aplica una única vez y su versión se
+# registra en la tabla schema_version, tanto en SQLite como en PostgreSQL.
+#
+# gunicorn arranca los workers sin --preload y todos llaman a init_database a
+# la vez: la creación de tablas y las migraciones se hacen con el bloqueo
+# 'migraciones' de tareas_programadas, así que solo un worker migra y el resto
+# espera a que termine y encuentra el esquema ya actualizado.
+
+import os
+import json
+import time
+import socket
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from sqlalchemy import (
+    MetaData, Table, Column, Index, Integer, String, Text, DateTime, func, select, insert, update, delete
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateTable
+from .db_manager import (
+    engine,
+    Base,
+    TareaProgramada,
+    Calendario,
+    Entrenamiento,
+    AsistenciaEntrenamiento,
+    ObjetivoIndividual,
+    Puntuacion,
+    Multa,
+    Partido,
+    CALENDARIO_KEY_COLUMNS
+)
+
+schema_metadata = MetaData()
+
+schema_version = Table(
+    'schema_version', schema_metadata,
+    Column('version', Integer, primary_key=True),
+    Column('descripcion', String(200)),
+    Column('fecha_aplicacion', DateTime, default=datetime.utcnow)
+)
+
+# Copia de los partidos que borra la migración 2 (para poder recuperarlos)
+calendario_duplicados = Table(
+    'calendario_duplicados', schema_metadata,
+    Column('id', Integer, primary_key=True),
+    Column('calendario_id', Integer, nullable=False),
+    Column('conservado_id', Integer, nullable=False),
+    Column('datos', Text, nullable=False),  # JSON con todas las columnas de la fila borrada
+    Column('fecha_borrado', DateTime, default=datetime.utcnow)
+)
+
+LOCK_NAME = 'migraciones'
+LOCK_TTL = 600       # segundos; solo caduca si el worker que migra muere a mitad
+LOCK_ESPERA = 300    # segundos que un worker espera a que otro termine de migrar
+
+def get_table_args_indexes(*models):
+    """Índices declarados en __table_args__ de los modelos (no los index=True de columna)"""
+    return [
+        arg for model in models
+        for arg in getattr(model, '__table_args__', ())
+        if isinstance(arg, Index)
+    ]
+
+# Modelos cuyos índices de consulta añade la migración 1
+QUERY_INDEX_MODELS = (
+    Calendario,
+    Entrenamiento,
+    AsistenciaEntrenamiento,
+    ObjetivoIndividual,
+    Puntuacion,
+    Multa
+)
+
+def _migration_001_indices_consultas(connection):
+    for index in get_table_args_indexes(*QUERY_INDEX_MODELS):
+        # El índice único del partido necesita antes eliminar duplicados (migración 2)
+        if index.name != 'ix_calendario_partido':
+            index.create(bind=connection, checkfirst=True)
+
+def _migration_002_partido_unico(connection):
+    """Elimina partidos duplicados y hace único ix_calendario_partido"""
+    tabla = Calendario.__table__
+    clave = [tabla.c[c] for c in CALENDARIO_KEY_COLUMNS]
+    
+    # Se conserva el partido más antiguo de cada grupo
+    duplicados = connection.execute(
+        select(func.min(tabla.c.id), *clave).group_by(*clave).having(func.count(tabla.c.id) > 1)
+    ).all()
+    
+    if duplicados:
+        connection.execute(CreateTable(calendario_duplicados, if_not_exists=True))
+    
+    for conservar, *valores in duplicados:
+        filas = connection.execute(select(tabla).where(
+            tabla.c.id != conservar,
+            *[columna == valor for columna, valor in zip(clave, valores)]
+        )).mappings().all()
+        sobrantes = [fila['id'] for fila in filas]
+        # Las filas borradas se guardan completas en calendario_duplicados y se avisan en el log
+        for fila in filas:
+            datos = json.dumps(dict(fila), default=str, ensure_ascii=False)
+            print(f"⚠️ Migración 2: partido duplicado {fila['id']} borrado (se conserva {conservar}): {datos}")
+            connection.execute(insert(calendario_duplicados).values(
+                calendario_id=fila['id'], conservado_id=conservar, datos=datos, fecha_borrado=datetime.utcnow()
+            ))
+        connection.execute(update(Partido.__table__).where(
+            Partido.calendario_id.in_(sobrantes)
+        ).values(calendario_id=conservar))
+        connection.execute(delete(tabla).where(tabla.c.id.in_(sobrantes)))
+    
+    index = next(i for i in tabla.indexes if i.name == 'ix_calendario_partido')
+    index.drop(bind=connection, checkfirst=True)
+    index.create(bind=connection)
+
+def _migration_003_indice_partidos_fecha(connection):
+    """Índice por fecha para recalcular las estadísticas de una temporada"""
+    for index in get_table_args_indexes(Partido):
+        index.create(bind=connection, checkfirst=True)
+
+# (versión, descripción, función) en orden de aplicación
+MIGRATIONS = [
+    (1, 'Índices para calendario, multas, puntuaciones, asistencias y objetivos',
+     _migration_001_indices_consultas),
+    (2, 'Partidos del calendario únicos por fecha, equipos y competición',
+     _migration_002_partido_unico),
+    (3, 'Índice de partidos por fecha para las estadísticas por temporada',
+     _migration_003_indice_partidos_fecha),
+]
+
+def get_schema_version(connection):
+    """Devuelve la última versión aplicada (0 si no hay ninguna)"""
+    schema_version.create(bind=connection, checkfirst=True)
+    versiones = connection.execute(select(schema_version.c.version)).scalars().all()
+    return max(versiones, default=0)
+
+def _bloquear(bind, propietario, ttl):
+    """Toma el bloqueo de migraciones si está libre o caducado (UPDATE condicional atómico)"""
+    tabla = TareaProgramada.__table__
+    ahora = datetime.utcnow()
+    with bind.begin() as connection:
+        resultado = connection.execute(update(tabla).where(
+            tabla.c.nombre == LOCK_NAME,
+            (tabla.c.bloqueado_hasta == None) | (tabla.c.bloqueado_hasta < ahora) |
+            (tabla.c.propietario == propietario)
+        ).values(propietario=propietario, bloqueado_hasta=ahora + timedelta(seconds=ttl)))
+    return resultado.rowcount == 1
+
+@contextmanager
+def migration_lock(bind=None, ttl=LOCK_TTL, espera=LOCK_ESPERA):
+    """
+    Bloqueo entre workers (y servidores) para crear tablas y migrar
+
+    Raises:
+        RuntimeError: Si otro worker sigue migrando pasados `espera` segundos
+    """
+    bind = bind or engine
+    tabla = TareaProgramada.__table__
+    propietario = f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+    
+    with bind.begin() as connection:
+        connection.execute(CreateTable(tabla, if_not_exists=True))
+    try:
+        with bind.begin() as connection:
+            connection.execute(insert(tabla).values(nombre=LOCK_NAME))
+    except IntegrityError:
+        pass  # La fila ya existe (o la ha creado otro worker a la vez)
+    
+    limite = time.monotonic() + espera
+    while not _bloquear(bind, propietario, ttl):
+        if time.monotonic() > limite:
+            raise RuntimeError(f"Otro proceso lleva más de {espera}s migrando la base de datos")
+        time.sleep(0.5)
+    try:
+        yield
+    finally:
+        with bind.begin() as connection:
+            connection.execute(update(tabla).where(
+                tabla.c.nombre == LOCK_NAME, tabla.c.propietario == propietario
+            ).values(propietario=None, bloqueado_hasta=None, ultima_ejecucion=datetime.utcnow()))
+
+def run_migrations(bind=None, target_version=None, create_tables=False):
+    """
+    Aplica las migraciones pendientes, cada una en su propia transacción
+
+    Todo se hace con migration_lock: si otro worker está migrando se espera
+    a que termine y después solo se aplica lo que siga pendiente.
+
+    Args:
+        bind: Engine sobre el que migrar (por defecto el de la aplicación)
+        target_version (int, optional): Última versión a aplicar
+        create_tables (bool): Crear antes las tablas que falten (create_all)
+
+    Returns:
+        list: Versiones aplicadas en esta ejecución
+    """
+    bind = bind or engine
+    aplicadas = []
+
+    with migration_lock(bind):
+        if create_tables:
+            Base.metadata.create_all(bind=bind)
+
+        with bind.begin() as connection:
+            actual = get_schema_version(connection)
+
+        for version, descripcion, migration in MIGRATIONS:
+            if version <= actual or (target_version is not None and version > target_version):
+                continue
+
+            with bind.begin() as connection:
+                migration(connection)
+                connection.execute(insert(schema_version).values(
+                    version=version,
+                    descripcion=descripcion,
+                    fecha_aplicacion=datetime.utcnow()
+                ))
+            aplicadas.append(version)
+            print(f"Migración {version} aplicada: {descripcion}")
+
+    return aplicadas
@@ -0,0 +1,347 @@
+"""
+Generador de datos sintéticos para UD Atzeneta
+
+Rellena todos los modelos de db_manager con temporadas completas y
+coherentes entre sí: plantilla con rotación entre temporadas, calendario
+(liga, copa y amistosos) con resultados, partidos jugados con convocatorias
+y eventos, entrenamientos con asistencia, puntuaciones, multas con sus
+pagos, objetivos mensuales, pesos y lesiones. La escala se mide en
+temporadas: 1 es una temporada normal, 10 y 100 simulan el histórico
+acumulado de años de uso.
+
+Los datos dependen solo de la semilla y de la fecha de referencia, así que
+dos ejecuciones con los mismos parámetros generan la misma base de datos.
+Se insertan en bloque y con identificadores explícitos, por lo que también
+se pueden añadir a una base de datos que ya tenga datos.
+"""
+
+import random
+from datetime import date, timedelta
+from typing import Dict, List
+from sqlalchemy import func, insert, select
+from .db_manager import (
+    SessionLocal,
+    engine as default_engine,
+    rebuild_ranking_puntuaciones,
+    rebuild_estadisticas_jugadores,
+    Usuario,
+    Jugador,
+    PesoJugador,
+    Lesion,
+    Calendario,
+    Partido,
+    EventoPartido,
+    ConvocatoriaPartido,
+    Entrenamiento,
+    AsistenciaEntrenamiento,
+    ObjetivoIndividual,
+    Puntuacion,
+    Multa,
+    PagoMulta
+)
+
+EQUIPO = "UD Atzeneta"
+
+# Volumen de una temporada normal del equipo
+TEMPORADA_NORMAL = {
+    'jugadores': 25,
+    'altas_por_temporada': 8,       # Jugadores que se renuevan cada temporada
+    'jornadas_liga': 30,
+    'rondas_copa': 4,
+    'amistosos': 6,
+    'convocados': 18,
+    'entrenamientos_semana': 3,
+    'puntuaciones_entrenamiento': 5,
+    'multas': 80,
+    'lesiones': 6,
+}
+
+NOMBRES = ['Pablo', 'Javi', 'Sergio', 'Álex', 'Dani', 'Raúl', 'Iván', 'Marcos', 'Rubén', 'Hugo',
+           'Adrián', 'Carlos', 'David', 'Jorge', 'Miguel', 'Toni', 'Vicent', 'Pau', 'Joan', 'Andreu']
+APELLIDOS = ['García', 'Martínez', 'López', 'Sánchez', 'Pérez', 'Gómez', 'Ferrer', 'Navarro',
+             'Castelló', 'Ribes', 'Segarra', 'Monfort', 'Bernat', 'Llorens', 'Tena', 'Vidal']
+POSICIONES = ['Portero'] * 3 + ['Defensa'] * 8 + ['Centrocampista'] * 8 + ['Delantero'] * 6
+RIVALES = ['CD Castellón B', 'CF Vilafamés', 'UD Alcora', 'CD Benicàssim', 'CF Borriol',
+           'UD Vall d\'Alba', 'CD Cabanes', 'CF Sant Joan de Moró', 'UD Les Useres', 'CD Costur',
+           'CF Lucena', 'UD Figueroles', 'CD Onda B', 'CF Betxí', 'UD Vila-real C', 'CD Almassora B']
+RAZONES_AUSENCIA = ['Lesión', 'Trabajo', 'Estudios', 'Enfermedad', 'Personal']
+CONCEPTOS = [('Puntualidad', 1), ('Esfuerzo', 2), ('MVP del entrenamiento', 3),
+             ('Llegada tarde', -1), ('Falta de actitud', -2)]
+RAZONES_MULTA = [('Llegada tarde', 5.0), ('Falta sin avisar', 10.0), ('Tarjeta por protestar', 10.0),
+                 ('Olvido de equipación', 5.0), ('Expulsión', 20.0)]
+OBJETIVOS = ['Mejorar resistencia', 'Reducir pérdidas de balón', 'Ganar duelos aéreos',
+             'Mejorar golpeo con pierna mala', 'Asistir a todos los entrenamientos']
+TIPOS_LESION = ['Esguince de tobillo', 'Rotura fibrilar', 'Sobrecarga muscular', 'Contusión', 'Tendinitis']
+
+
+def _siguiente_id(session, modelo) -> int:
+    return (session.scalar(select(func.max(modelo.id))) or 0) + 1
+
+
+def _inicio_temporada(hoy: date) -> date:
+    return date(hoy.year if hoy.month >= 8 else hoy.year - 1, 8, 1)
+
+
+def _dia_semana(desde: date, weekday: int) -> date:
+    """Primer día de la semana indicada (0 = lunes) a partir de una fecha"""
+    return desde + timedelta(days=(weekday - desde.weekday()) % 7)
+
+
+class _Generador:
+    """Acumula las filas de todas las tablas antes de insertarlas en bloque"""
+
+    def __init__(self, session, rng: random.Random, hoy: date, volumen: Dict):
+        self.rng = rng
+        self.hoy = hoy
+        self.volumen = volumen
+        self.filas = {modelo: [] for modelo in (
+            Usuario, Jugador, PesoJugador, Lesion, Calendario, Partido, EventoPartido,
+            ConvocatoriaPartido, Entrenamiento, AsistenciaEntrenamiento, ObjetivoIndividual,
+            Puntuacion, Multa, PagoMulta
+        )}
+        self.ids = {modelo: _siguiente_id(session, modelo) for modelo in self.filas}
+        # El número de entrenamiento es único en toda la tabla
+        self.numero_entrenamiento = (session.scalar(select(func.max(Entrenamiento.numero_entrenamiento))) or 0) + 1
+        self.calendario = []
+        self.meses = []
+
+    def _añadir(self, modelo, **valores) -> int:
+        id_ = self.ids[modelo]
+        self.ids[modelo] += 1
+        self.filas[modelo].append({'id': id_, **valores})
+        return id_
+
+    def usuarios(self):
+        # Hash bcrypt fijo (no corresponde a ninguna contraseña útil): calcularlo es lento
+        hash_fijo = '$2b$12$' + 'S' * 53
+        for rol in ('entrenador', 'delegado'):
+            id_ = self.ids[Usuario]
+            self._añadir(Usuario, username=f"{rol}_{id_}", password_hash=hash_fijo,
+                         email=f"{rol}_{id_}@udatzeneta.test", nombre=rol.capitalize(), activo=True)
+
+    def jugador(self, dorsal: int) -> int:
+        rng = self.rng
+        id_ = self.ids[Jugador]
+        nombre = rng.choice(NOMBRES)
+        return self._añadir(
+            Jugador,
+            nombre_futbolistico=f"{nombre} {id_}",
+            nombre=nombre,
+            apellidos=f"{rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}",
+            email=f"jugador{id_}@udatzeneta.test",
+            dni=f"{id_:08d}S",
+            telefono=f"6{rng.randint(10000000, 99999999)}",
+            dorsal=dorsal,
+            posicion=POSICIONES[(dorsal - 1) % len(POSICIONES)],
+            pierna_dominante=rng.choice(['Derecha', 'Derecha', 'Izquierda', 'Ambas']),
+            altura=round(rng.uniform(1.65, 1.92), 2)
+        )
+
+    def temporada(self, inicio: date, plantilla: List[int]):
+        fin = date(inicio.year + 1, 5, 31)
+        self._calendario(inicio, plantilla)
+        self._entrenamientos(inicio, fin, plantilla)
+        self._multas(inicio, fin, plantilla)
+        self._seguimiento(inicio, plantilla)
+        self._lesiones(inicio, fin, plantilla)
+
+    def _calendario(self, inicio: date, plantilla: List[int]):
+        rng, v = self.rng, self.volumen
+        liga = _dia_semana(inicio + timedelta(days=31), 6)  # Domingos desde septiembre
+        fechas = [('Amistoso', str(i + 1), inicio + timedelta(days=3 + i * 4)) for i in range(v['amistosos'])]
+        fechas += [('Liga', str(j + 1), liga + timedelta(weeks=j)) for j in range(v['jornadas_liga'])]
+        fechas += [('Copa', f"Ronda {r + 1}", liga + timedelta(weeks=4 * r + 2, days=3))
+                   for r in range(v['rondas_copa'])]
+
+        for competicion, jornada, fecha in fechas:
+            rival = rng.choice(RIVALES)
+            en_casa = rng.random() < 0.5
+            local, visitante = (EQUIPO, rival) if en_casa else (rival, EQUIPO)
+            jugado = fecha < self.hoy
+            goles_local = rng.choice([0, 1, 1, 2, 2, 3, 4]) if jugado else None
+            goles_visitante = rng.choice([0, 0, 1, 1, 2, 3]) if jugado else None
+            calendario_id = self._añadir(
+                Calendario, fecha=fecha, hora=rng.choice(['11:00', '16:00', '17:00', '18:30']),
+                competicion=competicion, jornada=jornada, equipo_local=local, equipo_visitante=visitante,
+                goles_equipo_local=goles_local, goles_equipo_visitante=goles_visitante,
+                arbitro=f"Árbitro {rng.randint(1, 40)}", campo=f"Campo de {local}", scrapeado=competicion != 'Amistoso'
+            )
+            self.calendario.append({'fecha': fecha, 'equipo_local': local,
+                                    'equipo_visitante': visitante, 'competicion': competicion})
+            if jugado:
+                goles = goles_local if en_casa else goles_visitante
+                self._partido(calendario_id, fecha, competicion, jornada, goles, plantilla)
+
+    def _partido(self, calendario_id, fecha, competicion, jornada, goles, plantilla):
+        rng = self.rng
+        partido_id = self._añadir(Partido, calendario_id=calendario_id, fecha=fecha,
+                                  competicion=competicion, jornada=jornada)
+
+        convocados = rng.sample(plantilla, min(self.volumen['convocados'], len(plantilla)))
+        titulares, suplentes = convocados[:11], convocados[11:]
+        entran = suplentes[:rng.randint(2, min(5, len(suplentes)))] if suplentes else []
+        minutos = {j: 90 for j in titulares}
+        for sustituto, sustituido in zip(entran, rng.sample(titulares, len(entran))):
+            minuto = rng.randint(46, 85)
+            minutos[sustituido] = minuto
+            minutos[sustituto] = 90 - minuto
+
+        for jugador_id in plantilla:
+            estado = 'titular' if jugador_id in titulares else 'suplente' if jugador_id in suplentes else 'no_convocado'
+            self._añadir(ConvocatoriaPartido, partido_id=partido_id, jugador_id=jugador_id,
+                         estado=estado, minutos_jugados=minutos.get(jugador_id, 0))
+
+        en_campo = [j for j in minutos if minutos[j] > 0]
+        eventos = [('gol', rng.choice(en_campo)) for _ in range(goles)]
+        eventos += [('asistencia', rng.choice(en_campo)) for _ in range(goles) if rng.random() < 0.7]
+        eventos += [('tarjeta_amarilla', rng.choice(en_campo)) for _ in range(rng.randint(0, 4))]
+        if rng.random() < 0.05:
+            eventos.append(('tarjeta_roja', rng.choice(en_campo)))
+        for tipo, jugador_id in eventos:
+            self._añadir(EventoPartido, partido_id=partido_id, jugador_id=jugador_id,
+                         minuto=rng.randint(1, 90), tipo_evento=tipo)
+
+    def _entrenamientos(self, inicio: date, fin: date, plantilla: List[int]):
+        rng, v = self.rng, self.volumen
+        dias = [0, 2, 4, 1, 3][:v['entrenamientos_semana']]
+        semana = _dia_semana(inicio, 0)
+
+        while semana <= fin:
+            for dia in dias:
+                fecha = semana + timedelta(days=dia)
+                if fecha > fin or fecha >= self.hoy:
+                    continue
+                entrenamiento_id = self._añadir(Entrenamiento, numero_entrenamiento=self.numero_entrenamiento, fecha=fecha)
+                self.numero_entrenamiento += 1
+
+                for jugador_id in plantilla:
+                    entrena = rng.random() < 0.88
+                    self._añadir(AsistenciaEntrenamiento, entrenamiento_id=entrenamiento_id, jugador_id=jugador_id,
+                                 entrena=entrena, razon_ausencia=None if entrena else rng.choice(RAZONES_AUSENCIA))
+
+                for jugador_id in rng.sample(plantilla, min(v['puntuaciones_entrenamiento'], len(plantilla))):
+                    concepto, puntos = rng.choice(CONCEPTOS)
+                    self._añadir(Puntuacion, jugador_id=jugador_id, fecha=fecha, puntos=puntos, concepto=concepto)
+            semana += timedelta(weeks=1)
+
+    def _multas(self, inicio: date, fin: date, plantilla: List[int]):
+        rng = self.rng
+        ultimo_dia = min(fin, self.hoy - timedelta(days=1))
+        if ultimo_dia < inicio:
+            return
+
+        for _ in range(self.volumen['multas']):
+            fecha = inicio + timedelta(days=rng.randint(0, (ultimo_dia - inicio).days))
+            razon, importe = rng.choice(RAZONES_MULTA)
+            # 60% pagadas, 20% con pago parcial y 20% pendientes
+            estado = rng.random()
+            pagos = [importe] if estado < 0.4 else [importe / 2, importe / 2] if estado < 0.6 else \
+                [importe / 2] if estado < 0.8 else []
+            pagado = sum(pagos)
+            multa_id = self._añadir(Multa, jugador_id=rng.choice(plantilla), fecha=fecha, razon_multa=razon,
+                                    multa=importe, pagado=pagado, debe=importe - pagado,
+                                    completamente_pagada=pagado >= importe)
+            for i, cantidad in enumerate(pagos):
+                self._añadir(PagoMulta, multa_id=multa_id, fecha_pago=min(fecha + timedelta(days=7 * (i + 1)), self.hoy),
+                             cantidad_pagada=cantidad)
+
+    def _seguimiento(self, inicio: date, plantilla: List[int]):
+        """Objetivos mensuales y peso mensual de cada jugador (septiembre a mayo)"""
+        rng = self.rng
+        for mes in range(9):
+            primero = date(inicio.year + (mes + 8) // 12, (mes + 8) % 12 + 1, 1)
+            if primero > self.hoy:
+                break
+            mes_str = primero.strftime("%Y-%m")
+            self.meses.append(mes_str)
+            cerrado = primero + timedelta(days=31) < self.hoy
+
+            for jugador_id in plantilla:
+                progreso = rng.randint(0, 100)
+                self._añadir(ObjetivoIndividual, jugador_id=jugador_id, objetivo=rng.choice(OBJETIVOS),
+                             fecha_inicio=primero, fecha_objetivo=primero + timedelta(days=27), mes=mes_str,
+                             progreso=progreso, completado=cerrado and progreso >= 70)
+                self._añadir(PesoJugador, jugador_id=jugador_id, fecha=primero,
+                             peso=round(rng.uniform(64.0, 88.0), 1))
+
+    def _lesiones(self, inicio: date, fin: date, plantilla: List[int]):
+        rng = self.rng
+        ultimo_dia = min(fin, self.hoy - timedelta(days=1))
+        if ultimo_dia < inicio:
+            return
+
+        for _ in range(self.volumen['lesiones']):
+            fecha_inicio = inicio + timedelta(days=rng.randint(0, (ultimo_dia - inicio).days))
+            fecha_fin = fecha_inicio + timedelta(days=rng.randint(7, 60))
+            activa = fecha_fin >= self.hoy
+            self._añadir(Lesion, jugador_id=rng.choice(plantilla), tipo_lesion=rng.choice(TIPOS_LESION),
+                         fecha_inicio=fecha_inicio, fecha_fin=None if activa else fecha_fin, activa=activa)
+
+
+def generate_synthetic_data(engine=None, temporadas: int = 1, semilla: int = 42,
+                            hoy: date = None, volumen: Dict = None) -> Dict:
+    """
+    Genera temporadas sintéticas completas y las inserta en bloque
+
+    La última temporada es la que contiene la fecha de referencia: sus
+    partidos y entrenamientos posteriores a esa fecha quedan pendientes y
+    su plantilla es la única activa.
+
+    Args:
+        engine: Engine donde insertar (por defecto el de la aplicación)
+        temporadas (int): Número de temporadas (1 = una temporada normal)
+        semilla (int): Semilla del generador aleatorio
+        hoy (date, optional): Fecha de referencia (por defecto hoy)
+        volumen (dict, optional): Cambios sobre TEMPORADA_NORMAL
+
+    Returns:
+        dict: Filas insertadas por tabla y datos para consultas de prueba
+            (ids de jugadores y entrenamientos, claves del calendario, meses)
+    """
+    hoy = hoy or date.today()
+    volumen = {**TEMPORADA_NORMAL, **(volumen or {})}
+    rng = random.Random(semilla)
+    primera = date(_inicio_temporada(hoy).year - (temporadas - 1), 8, 1)
+
+    session = SessionLocal(bind=engine or default_engine)
+    try:
+        gen = _Generador(session, rng, hoy, volumen)
+        gen.usuarios()
+
+        plantilla = [gen.jugador(dorsal) for dorsal in range(1, volumen['jugadores'] + 1)]
+        entrenamientos_inicio = gen.ids[Entrenamiento]
+        for t in range(temporadas):
+            if t > 0:
+                # Rotación: se marchan los primeros y llegan altas con sus dorsales
+                altas = volumen['altas_por_temporada']
+                plantilla = plantilla[altas:] + [gen.jugador(dorsal) for dorsal in range(1, altas + 1)]
+            gen.temporada(date(primera.year + t, 8, 1), plantilla)
+
+        # Solo la plantilla de la última temporada sigue en el equipo
+        activos = set(plantilla)
+        for fila in gen.filas[Jugador]:
+            fila['activo'] = fila['id'] in activos
+
+        for modelo, filas in gen.filas.items():
+            if filas:
+                session.execute(insert(modelo), filas)
+        session.commit()
+        # Las inserciones en bloque no pasan por los eventos que mantienen el ranking y las estadísticas
+        rebuild_ranking_puntuaciones(session)
+        rebuild_estadisticas_jugadores(session)
+    finally:
+        session.close()
+
+    conteos = {modelo.__tablename__: len(filas) for modelo, filas in gen.filas.items()}
+    print(f"🧪 Datos sintéticos: {temporadas} temporada(s), {conteos['jugadores']} jugadores, "
+          f"{conteos['calendario']} partidos, {conteos['asistencia_entrenamientos']} asistencias, "
+          f"{conteos['multas']} multas")
+    return {
+        'conteos': conteos,
+        'jugadores': [fila['id'] for fila in gen.filas[Jugador]],
+        'jugadores_activos': sorted(activos),
+        'entrenamientos': list(range(entrenamientos_inicio, gen.ids[Entrenamiento])),
+        'calendario': gen.calendario,
+        'meses': gen.meses,
+        'hoy': hoy,
+    }
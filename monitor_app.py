@@ -1,53 +1,90 @@
-# monitor_app.py - Script para monitorear la aplicación
+# monitor_app.py - Monitor en vivo de los callbacks de la aplicación
+#
+# Muestra los callbacks más lentos y los peores casos de N+1 (la misma
+# sentencia SQL repetida muchas veces en un callback) a partir de las
+# métricas de utils/metrics.py.
+#
+# Uso:
+#     python monitor_app.py                                   # http://localhost:8050/_metrics
+#     python monitor_app.py --url https://miapp.onrender.com/_metrics --token XXX
+#     python monitor_app.py --archivo metrics.jsonl           # METRICS_FILE (todos los workers)
+#     python monitor_app.py --una-vez
 
-import time
+import os
 import sys
+import json
+import time
+import argparse
+import urllib.request
 from datetime import datetime
 
-def monitor_logs():
-    """Monitorea los logs de la aplicación"""
-    
-    print("🔍 MONITOR: Iniciando monitoreo de la aplicación...")
-    print("=" * 60)
-    print("INSTRUCCIONES:")
-    print("1. Ejecuta este script en una terminal: python monitor_app.py")
-    print("2. En otra terminal ejecuta: python app.py")
-    print("3. Ve al calendario en el navegador")
-    print("4. Observa los mensajes que aparecen aquí")
-    print("=" * 60)
-    
-    print(f"\n🕐 {datetime.now().strftime('%H:%M:%S')} - Monitor iniciado")
-    print("Esperando que ejecutes 'python app.py' en otra terminal...\n")
-    
-    # Instrucciones específicas
-    print("🔍 QUÉ BUSCAR EN LOS LOGS:")
-    print("✅ Mensajes que empiecen con '🔄 CALENDARIO:'")
-    print("✅ Mensajes que empiecen con '🔥 [MAIN CALLBACK]'")
-    print("✅ Mensajes que empiecen con '📊 [TABLE]'")
-    print("✅ Mensajes que empiecen con '🔍 [RAW DATA]'")
-    print("\n❌ SI NO VES ESTOS MENSAJES:")
-    print("   → Los callbacks NO se están ejecutando")
-    print("   → Hay un problema en el registro de callbacks")
-    
-    print("\n🌐 EN EL NAVEGADOR DEBERÍAS VER:")
-    print("✅ Una página con información de debug")
-    print("✅ Contador de ejecuciones que aumenta")
-    print("✅ Datos raw que se actualizan")
-    print("✅ Una tabla con al menos 1 partido (el de prueba)")
-    
-    print("\n" + "=" * 60)
-    print("🚀 AHORA EJECUTA EN OTRA TERMINAL:")
-    print("   python app.py")
-    print("=" * 60)
-    
-    # Mantener el script vivo
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+def leer_endpoint(url, token=None):
+    """Resumen del worker que atiende la petición a /_metrics"""
+    if token:
+        url += ('&' if '?' in url else '?') + f"token={token}"
+    with urllib.request.urlopen(url, timeout=10) as respuesta:
+        return json.load(respuesta)['summary']
+
+def leer_archivo(ruta, ultimos=5000):
+    """Resumen de los últimos registros del fichero JSON lines (todos los workers)"""
+    from utils.metrics import summarize
+    with open(ruta, encoding='utf-8') as f:
+        registros = [json.loads(linea) for linea in f.readlines()[-ultimos:] if linea.strip()]
+    return summarize(registros)
+
+def _corta(texto, ancho):
+    texto = texto or '-'
+    return texto if len(texto) <= ancho else texto[:ancho - 1] + '…'
+
+def mostrar(resumen, top):
+    print(f"📈 Métricas de callbacks - {datetime.now().strftime('%H:%M:%S')} "
+          f"({sum(r['count'] for r in resumen)} llamadas, {len(resumen)} callbacks)")
+
+    print(f"\n🐢 Callbacks más lentos (p95)")
+    print(f"   {'callback':48} {'n':>5} {'media':>8} {'p95':>8} {'máx':>8} {'SQL':>6} {'KB':>7}")
+    for r in resumen[:top]:
+        print(f"   {_corta(r['callback'], 48):48} {r['count']:5} {r['avg_ms']:7.0f}ms "
+              f"{r['p95_ms']:7.0f}ms {r['max_ms']:7.0f}ms {r['avg_queries']:6.1f} "
+              f"{r['avg_response_bytes'] / 1024:7.1f}")
+
+    repetidos = sorted([r for r in resumen if r['max_repeat'] > 1],
+                       key=lambda r: r['max_repeat'], reverse=True)
+    print(f"\n🔁 Peores N+1 (misma sentencia repetida en un callback)")
+    if not repetidos:
+        print("   Ninguno")
+    for r in repetidos[:top]:
+        marca = '⚠️ ' if r['n_plus_one'] else '  '
+        print(f"   {marca}{_corta(r['callback'], 46):46} x{r['max_repeat']:<4} {_corta(r['repeated_sql'], 70)}")
+
+def monitor(args):
+    while True:
+        try:
+            resumen = leer_archivo(args.archivo) if args.archivo else leer_endpoint(args.url, args.token)
+            if not args.una_vez:
+                print("\033[2J\033[H", end='')
+            mostrar(resumen, args.top)
+        except Exception as e:
+            print(f"❌ No se pudieron leer las métricas: {e}")
+
+        if args.una_vez:
+            return
+        time.sleep(args.intervalo)
+
+def main():
+    parser = argparse.ArgumentParser(description='Monitor de callbacks de UD Atzeneta')
+    parser.add_argument('--url', default='http://localhost:8050/_metrics', help='Endpoint de métricas')
+    parser.add_argument('--token', default=os.environ.get('METRICS_TOKEN'), help='METRICS_TOKEN del servidor')
+    parser.add_argument('--archivo', help='Fichero METRICS_FILE en lugar del endpoint')
+    parser.add_argument('--intervalo', type=float, default=5, help='Segundos entre actualizaciones')
+    parser.add_argument('--top', type=int, default=10, help='Filas por tabla')
+    parser.add_argument('--una-vez', action='store_true', help='Mostrar una vez y salir')
+
     try:
-        while True:
-            time.sleep(5)
-            current_time = datetime.now().strftime('%H:%M:%S')
-            print(f"🕐 {current_time} - Monitor activo (Ctrl+C para salir)")
+        monitor(parser.parse_args())
     except KeyboardInterrupt:
         print("\n🛑 Monitor detenido")
 
 if __name__ == "__main__":
-    monitor_logs()
\ No newline at end of file
+    main()
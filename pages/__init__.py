@@ -1,42 +1,13 @@
 # Paquete de páginas para UD Atzeneta
 # Contiene todas las páginas de la aplicación y sus callbacks
+#
+# Los módulos de página no se importan aquí: pages.registry los importa la
+# primera vez que se necesitan (cada módulo registra sus callbacks al importarse)
 
-from . import (
-    dashboard,
-    calendario,
-    jugadores,
-    partidos,
-    entrenamientos,
-    objetivos,
-    puntuacion,
-    multas
-)
-
-# Registrar todos los callbacks al importar
-dashboard_callbacks = dashboard
-calendario_callbacks = calendario
-jugadores_callbacks = jugadores
-partidos_callbacks = partidos
-entrenamientos_callbacks = entrenamientos
-objetivos_callbacks = objetivos
-puntuacion_callbacks = puntuacion
-multas_callbacks = multas
+from .registry import PAGE_REGISTRY, PageRegistry, page_registry
 
 __all__ = [
-    'dashboard',
-    'calendario',
-    'jugadores', 
-    'partidos',
-    'entrenamientos',
-    'objetivos',
-    'puntuacion',
-    'multas',
-    'dashboard_callbacks',
-    'calendario_callbacks',
-    'jugadores_callbacks',
-    'partidos_callbacks',
-    'entrenamientos_callbacks',
-    'objetivos_callbacks',
-    'puntuacion_callbacks',
-    'multas_callbacks'
-]
\ No newline at end of file
+    'PAGE_REGISTRY',
+    'PageRegistry',
+    'page_registry'
+]
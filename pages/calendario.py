@@ -1,8 +1,8 @@
 # pages/calendario.py - VERSIÓN SUPER DEBUG
 
+import importlib.util
 import dash_bootstrap_components as dbc
 from dash import html, dcc, Input, Output, State, callback, dash_table, no_update
-import pandas as pd
 from datetime import datetime, date, timedelta
 from database.db_manager import DatabaseManager, Calendario
 from layouts.main_content import create_stats_card
@@ -11,14 +11,11 @@ from utils.header_utils import create_page_header
 
 print("🔄 CALENDARIO: Iniciando importaciones...")
 
-# Importar scraping con fallback
-try:
-    from utils.scraping import scraping_manager, FFCVScraper
-    SCRAPING_AVAILABLE = True
-    print("✅ CALENDARIO: Scraping manager importado correctamente")
-except ImportError as e:
-    SCRAPING_AVAILABLE = False
-    print(f"❌ CALENDARIO: Error importando scraping: {e}")
+# El scraping (requests, bs4) se importa al lanzar la importación, no al arrancar
+from utils.jobs import job_runner
+from utils.export import export_components, register_export_callbacks
+SCRAPING_AVAILABLE = all(importlib.util.find_spec(modulo) for modulo in ('requests', 'bs4'))
+print(f"{'✅' if SCRAPING_AVAILABLE else '❌'} CALENDARIO: Scraping disponible: {SCRAPING_AVAILABLE}")
 
 print("✅ CALENDARIO: Todas las importaciones completadas")
 
@@ -52,7 +49,11 @@ def create_calendario_layout():
                     dbc.Button([
                         html.I(className="fas fa-download me-2"),
                         "Importar FFCV"
-                    ], id="btn-scraping", color="success", outline=True)
+                    ], id="btn-scraping", color="success", outline=True),
+                    dbc.Button([
+                        html.I(className="fas fa-download me-2"),
+                        "Exportar"
+                    ], id="btn-exportar-calendario", color="secondary", outline=True)
                 ])
             ], width=4, className="text-end")
         ], className="mb-4"),
@@ -121,6 +122,9 @@ def create_calendario_layout():
         # STORES Y COMPONENTES
         dcc.Store(id="calendario-data", data={"inicializado": False}),
         dcc.Store(id="execution-counter", data=0),
+        dcc.Store(id="calendario-job-id"),
+        export_components("calendario"),
+        dcc.Interval(id="calendario-job-interval", interval=1000, disabled=True),
         dcc.Interval(
             id="debug-interval", 
             interval=2000,  # Cada 2 segundos
@@ -156,6 +160,8 @@ def register_calendario_callbacks():
     print("🔄 CALENDARIO: Iniciando registro de callbacks...")
     
     try:
+        register_export_callbacks("calendario", "btn-exportar-calendario")
+        
         # CALLBACK PRINCIPAL: Cargar datos
         @callback(
             [Output("calendario-data", "data"),
@@ -183,7 +189,7 @@ def register_calendario_callbacks():
                 # Test de base de datos
                 print("🔄 [MAIN CALLBACK] Conectando a base de datos...")
                 with DatabaseManager() as db:
-                    calendario = db.get_calendario()
+                    calendario = db.get_calendario_rows()
                     num_partidos = len(calendario) if calendario else 0
                     
                     print(f"📊 [MAIN CALLBACK] Partidos en BD: {num_partidos}")
@@ -349,6 +355,55 @@ def register_calendario_callbacks():
             
             return is_open
         
+        # CALLBACK IMPORTACIÓN FFCV (en segundo plano)
+        @callback(
+            [Output("scraping-status", "children"),
+             Output("calendario-job-id", "data"),
+             Output("calendario-job-interval", "disabled")],
+            Input("modal-import", "n_clicks"),
+            State("ffcv-url-input", "value"),
+            prevent_initial_call=True
+        )
+        def import_ffcv(n_clicks, ffcv_url):
+            """Encola la importación del calendario de la FFCV"""
+            if not n_clicks or not ffcv_url or not SCRAPING_AVAILABLE:
+                return no_update, no_update, no_update
+            
+            print(f"🌐 [IMPORT] Encolando importación de {ffcv_url}")
+            from utils.scraping import run_ffcv_import_job
+            job_id = job_runner.submit('importacion_ffcv', run_ffcv_import_job, [ffcv_url.strip()])
+            return "⏳ Importación en cola...", job_id, False
+        
+        @callback(
+            [Output("scraping-status", "children", allow_duplicate=True),
+             Output("calendario-job-interval", "disabled", allow_duplicate=True)],
+            Input("calendario-job-interval", "n_intervals"),
+            State("calendario-job-id", "data"),
+            prevent_initial_call=True
+        )
+        def poll_import_ffcv(n_intervals, job_id):
+            """Muestra el progreso de la importación (sin descargar ni parsear si no ha cambiado)"""
+            job = job_runner.get_job(job_id)
+            if job is None:
+                return no_update, True
+            if job['activo']:
+                return f"⏳ {job['progreso']}% - {job['mensaje']}", False
+            
+            timestamp = datetime.now().strftime('%H:%M:%S')
+            result = job['resultado']
+            
+            if job['estado'] == 'error' or not result['success']:
+                error = job['error'] or result['error']
+                print(f"❌ [IMPORT] {error}")
+                return f"❌ [{timestamp}] Error: {error}", True
+            if result.get('unchanged'):
+                print("✅ [IMPORT] Sin cambios")
+                return f"✅ [{timestamp}] Sin cambios desde la última importación", True
+            
+            print(f"✅ [IMPORT] {result['created']} nuevos, {result['updated']} actualizados")
+            return (f"✅ [{timestamp}] {result['created']} nuevos, "
+                    f"{result['updated']} actualizados ({result['elapsed_time']:.2f}s)"), True
+        
         # CALLBACK COUNTER
         @callback(
             Output("execution-counter", "data"),
@@ -370,12 +425,8 @@ def register_calendario_callbacks():
         traceback.print_exc()
         raise
 
-# Función para app.py
-def setup_calendario_callbacks(app):
-    """Configura los callbacks del calendario"""
-    print("🔧 CALENDARIO: Configurando callbacks SUPER DEBUG...")
-    register_calendario_callbacks()
-    print("✅ CALENDARIO: Configuración de callbacks completada")
+# Registrar callbacks al importar (una sola vez, como el resto de páginas)
+register_calendario_callbacks()
 
 # Layout por defecto
 print("🔄 CALENDARIO: Creando layout por defecto...")
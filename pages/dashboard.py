@@ -1,12 +1,12 @@
 import dash_bootstrap_components as dbc
-from dash import html, dcc, Input, Output, callback
+from dash import html, dcc, Input, Output, State, callback
 import plotly.graph_objs as go
-import plotly.express as px
-import pandas as pd
 from datetime import datetime, timedelta
 from database.db_manager import DatabaseManager
+from database.dashboard_stats import DashboardStats
 from layouts.main_content import create_page_header, create_stats_card
 from config.settings import COLORS
+from utils.export import export_components, register_export_callbacks
 
 def create_dashboard_layout():
     """Crea el layout del dashboard principal"""
@@ -65,7 +65,8 @@ def create_dashboard_layout():
             dbc.Col([
                 create_quick_actions_card()
             ], width=12, lg=4)
-        ])
+        ]),
+        export_components("dashboard")
     ])
 
 def create_main_stats_section():
@@ -198,6 +199,8 @@ def create_quick_actions_card():
 def register_dashboard_callbacks():
     """Registra los callbacks del dashboard"""
     
+    register_export_callbacks("dashboard", "export-dashboard")
+    
     @callback(
         [Output("main-stats-row", "children"),
          Output("calendar-overview-content", "children"),
@@ -211,22 +214,12 @@ def register_dashboard_callbacks():
         """Actualiza todos los datos del dashboard"""
         try:
             with DatabaseManager() as db:
-                # Estadísticas principales
-                jugadores_activos = len(db.get_jugadores(activos_solo=True))
-                entrenamientos_mes = len([e for e in db.get_entrenamientos() 
-                                        if e.fecha.month == datetime.now().month])
-                multas_pendientes = sum([m.debe for m in db.get_multas_pendientes()])
-                
-                # Próximo partido
-                calendario = db.get_calendario()
-                proximo_partido = None
-                dias_proximo = 0
-                
-                for evento in calendario:
-                    if evento.fecha >= datetime.now().date():
-                        proximo_partido = evento
-                        dias_proximo = (evento.fecha - datetime.now().date()).days
-                        break
+                # Estadísticas principales calculadas en la base de datos
+                resumen = DashboardStats(db).get_resumen()
+                jugadores_activos = resumen['jugadores_activos']
+                entrenamientos_mes = resumen['entrenamientos_mes']
+                multas_pendientes = resumen['multas_pendientes']
+                dias_proximo = resumen['dias_proximo']
                 
                 # Crear tarjetas de estadísticas
                 stats_cards = [
@@ -272,16 +265,16 @@ def register_dashboard_callbacks():
                 ]
                 
                 # Contenido del calendario
-                calendario_content = create_calendar_content(calendario[:5])
+                calendario_content = create_calendar_content(resumen['proximos_partidos'])
                 
                 # Actividad reciente
                 actividad_reciente = create_recent_activity_content(db)
                 
                 # Gráfico del calendario
-                calendar_fig = create_calendar_chart(calendario)
+                calendar_fig = create_calendar_chart(resumen['partidos_por_competicion'])
                 
                 # Gráfico de rendimiento
-                performance_fig = create_performance_chart(db)
+                performance_fig = create_performance_chart(resumen['top_goleadores'], resumen['temporada'])
                 
                 return stats_cards, calendario_content, actividad_reciente, calendar_fig, performance_fig
                 
@@ -322,7 +315,7 @@ def create_recent_activity_content(db):
     activities = []
     
     # Últimos entrenamientos
-    entrenamientos = db.get_entrenamientos()[:3]
+    entrenamientos = db.get_entrenamientos_rows(limit=3)
     for ent in entrenamientos:
         activities.append({
             'icon': 'fas fa-running',
@@ -332,9 +325,9 @@ def create_recent_activity_content(db):
         })
     
     # Últimas multas
-    multas = db.get_multas()[:2]
+    multas = db.get_multas_with_jugador_rows(limit=2)
     for multa in multas:
-        jugador = db.get_jugador_by_id(multa.jugador_id)
+        jugador = multa.jugador
         activities.append({
             'icon': 'fas fa-euro-sign',
             'text': f"Multa a {jugador.nombre_futbolistico if jugador else 'Jugador'}",
@@ -369,9 +362,9 @@ def create_recent_activity_content(db):
     
     return html.Div(items)
 
-def create_calendar_chart(calendario_data):
-    """Crea el gráfico del calendario"""
-    if not calendario_data:
+def create_calendar_chart(competiciones):
+    """Crea el gráfico del calendario a partir de {competicion: partidos}"""
+    if not competiciones:
         return go.Figure().add_annotation(
             text="No hay datos disponibles",
             xref="paper", yref="paper",
@@ -379,12 +372,6 @@ def create_calendar_chart(calendario_data):
             showarrow=False
         )
     
-    # Contar partidos por competición
-    competiciones = {}
-    for partido in calendario_data:
-        comp = partido.competicion
-        competiciones[comp] = competiciones.get(comp, 0) + 1
-    
     fig = go.Figure(data=[
         go.Pie(
             labels=list(competiciones.keys()),
@@ -403,31 +390,27 @@ def create_calendar_chart(calendario_data):
     
     return fig
 
-def create_performance_chart(db):
-    """Crea el gráfico de rendimiento"""
+def create_performance_chart(top_goleadores, temporada=None):
+    """Crea el gráfico de rendimiento a partir de [(nombre, goles)] precalculados"""
     try:
-        jugadores = db.get_jugadores()
-        if not jugadores:
+        if not top_goleadores:
             return go.Figure().add_annotation(
-                text="No hay datos de jugadores",
+                text=f"No hay goles en la temporada {temporada}" if temporada else "No hay datos de jugadores",
                 xref="paper", yref="paper",
                 x=0.5, y=0.5, xanchor='center', yanchor='middle',
                 showarrow=False
             )
         
-        # Top 5 goleadores
-        top_goleadores = sorted(jugadores, key=lambda x: x.goles, reverse=True)[:5]
-        
         fig = go.Figure(data=[
             go.Bar(
-                x=[j.nombre_futbolistico for j in top_goleadores],
-                y=[j.goles for j in top_goleadores],
+                x=[nombre for nombre, goles in top_goleadores],
+                y=[goles for nombre, goles in top_goleadores],
                 marker_color=COLORS['primary']
             )
         ])
         
         fig.update_layout(
-            title="Top 5 Goleadores",
+            title=f"Top 5 Goleadores {temporada}" if temporada else "Top 5 Goleadores",
             xaxis_title="Jugadores",
             yaxis_title="Goles",
             height=300,
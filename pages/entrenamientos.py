@@ -1,11 +1,11 @@
 import dash_bootstrap_components as dbc
 from dash import html, dcc, Input, Output, State, callback, dash_table
-import pandas as pd
 from datetime import datetime, date
 from database.db_manager import DatabaseManager, Entrenamiento, AsistenciaEntrenamiento
 from layouts.main_content import create_stats_card
 from config.settings import COLORS, RAZONES_AUSENCIA
 from utils.header_utils import create_page_header
+from utils.export import export_components, register_export_callbacks
 
 def create_entrenamientos_layout():
     """Crea el layout principal de la página de entrenamientos"""
@@ -51,7 +51,9 @@ def create_entrenamientos_layout():
         # Stores
         dcc.Store(id="entrenamientos-data"),
         dcc.Store(id="entrenamiento-selected"),
-        dcc.Store(id="jugadores-for-training")
+        dcc.Store(id="jugadores-for-training"),
+        dcc.Store(id="entrenamientos-page-load"),
+        export_components("entrenamientos")
     ])
 
 def create_entrenamientos_stats_section():
@@ -107,8 +109,7 @@ def create_entrenamientos_filters():
                     dbc.Label("Fecha Desde"),
                     dbc.Input(
                         id="filter-fecha-desde-ent",
-                        type="date",
-                        value=(datetime.now().replace(day=1)).strftime("%Y-%m-%d")
+                        type="date"
                     )
                 ], width=12, md=3),
                 
@@ -116,8 +117,7 @@ def create_entrenamientos_filters():
                     dbc.Label("Fecha Hasta"),
                     dbc.Input(
                         id="filter-fecha-hasta-ent",
-                        type="date",
-                        value=datetime.now().strftime("%Y-%m-%d")
+                        type="date"
                     )
                 ], width=12, md=3),
                 
@@ -176,8 +176,7 @@ def create_entrenamiento_modal():
                         dbc.Label("Fecha del Entrenamiento *"),
                         dbc.Input(
                             id="input-fecha-entrenamiento",
-                            type="date",
-                            value=datetime.now().strftime("%Y-%m-%d")
+                            type="date"
                         )
                     ], width=6),
                     dbc.Col([
@@ -372,6 +371,23 @@ def create_entrenamientos_table(data):
 def register_entrenamientos_callbacks():
     """Registra los callbacks de la página de entrenamientos"""
     
+    @callback(
+        [Output("filter-fecha-desde-ent", "value"),
+         Output("filter-fecha-hasta-ent", "value"),
+         Output("input-fecha-entrenamiento", "value")],
+        Input("entrenamientos-page-load", "data")
+    )
+    def set_default_dates(_):
+        """Fechas por defecto calculadas en cada visita (el layout está memoizado)"""
+        hoy = datetime.now()
+        return (
+            hoy.replace(day=1).strftime("%Y-%m-%d"),
+            hoy.strftime("%Y-%m-%d"),
+            hoy.strftime("%Y-%m-%d")
+        )
+    
+    register_export_callbacks("entrenamientos", "btn-exportar-entrenamientos")
+    
     @callback(
         [Output("entrenamientos-data", "data"),
          Output("jugadores-for-training", "data")],
@@ -384,46 +400,14 @@ def register_entrenamientos_callbacks():
         """Carga los datos de entrenamientos y jugadores"""
         try:
             with DatabaseManager() as db:
-                # Cargar entrenamientos
-                entrenamientos = db.get_entrenamientos()
-                
-                ent_data = []
-                for ent in entrenamientos:
-                    # Filtrar por fechas
-                    if fecha_desde:
-                        if ent.fecha < datetime.strptime(fecha_desde, "%Y-%m-%d").date():
-                            continue
-                    
-                    if fecha_hasta:
-                        if ent.fecha > datetime.strptime(fecha_hasta, "%Y-%m-%d").date():
-                            continue
-                    
-                    # Cargar asistencias
-                    asistencias = db.db.query(AsistenciaEntrenamiento).filter(
-                        AsistenciaEntrenamiento.entrenamiento_id == ent.id
-                    ).all()
-                    
-                    asistencias_data = []
-                    for asist in asistencias:
-                        jugador = db.get_jugador_by_id(asist.jugador_id)
-                        asistencias_data.append({
-                            'jugador_id': asist.jugador_id,
-                            'jugador_nombre': jugador.nombre_futbolistico if jugador else 'Desconocido',
-                            'entrena': asist.entrena,
-                            'razon_ausencia': asist.razon_ausencia,
-                            'observaciones': asist.observaciones
-                        })
-                    
-                    ent_data.append({
-                        'id': ent.id,
-                        'numero_entrenamiento': ent.numero_entrenamiento,
-                        'fecha': ent.fecha.strftime("%d/%m/%Y"),
-                        'observaciones': ent.observaciones,
-                        'asistencias': asistencias_data
-                    })
+                # Cargar entrenamientos y asistencias con una sola consulta
+                ent_data = db.get_entrenamientos_asistencias_data(
+                    fecha_desde=datetime.strptime(fecha_desde, "%Y-%m-%d").date() if fecha_desde else None,
+                    fecha_hasta=datetime.strptime(fecha_hasta, "%Y-%m-%d").date() if fecha_hasta else None
+                )
                 
                 # Cargar jugadores activos
-                jugadores = db.get_jugadores(activos_solo=True)
+                jugadores = db.get_jugadores_rows(activos_solo=True)
                 jugadores_data = [
                     {
                         'id': j.id,
@@ -433,7 +417,7 @@ def register_entrenamientos_callbacks():
                     } for j in jugadores
                 ]
                 
-                return sorted(ent_data, key=lambda x: x['numero_entrenamiento'], reverse=True), jugadores_data
+                return ent_data, jugadores_data
                 
         except Exception as e:
             print(f"Error cargando entrenamientos: {e}")
@@ -1,12 +1,16 @@
 import dash
 import dash_bootstrap_components as dbc
 from dash import html, dcc, Input, Output, State, callback, dash_table, no_update
-import pandas as pd
+from dash.exceptions import PreventUpdate
 from datetime import datetime, date
+from sqlalchemy import or_
 from database.db_manager import DatabaseManager, Jugador, PesoJugador
 from layouts.main_content import create_stats_card
 from config.settings import COLORS, POSICIONES
 from utils.header_utils import create_page_header
+from utils.table_paging import create_paged_table, paginate_query
+from utils.export import export_components, register_export_callbacks
+from auth.security import session_user
 
 def create_jugadores_layout():
     """Crea el layout principal de la página de jugadores"""
@@ -44,7 +48,8 @@ def create_jugadores_layout():
         
         # Store para datos
         dcc.Store(id="jugadores-data"),
-        dcc.Store(id="jugador-selected")
+        dcc.Store(id="jugador-selected"),
+        export_components("jugadores")
     ])
 
 def create_jugadores_stats_section():
@@ -286,31 +291,11 @@ def create_futbol_form():
             ], width=6)
         ], className="mb-3"),
         
-        dbc.Row([
-            dbc.Col([
-                dbc.Label("Goles"),
-                dbc.Input(id="input-goles", type="number", min=0, value=0)
-            ], width=4),
-            dbc.Col([
-                dbc.Label("Asistencias"),
-                dbc.Input(id="input-asistencias", type="number", min=0, value=0)
-            ], width=4),
-            dbc.Col([
-                dbc.Label("Minutos Jugados"),
-                dbc.Input(id="input-minutos", type="number", min=0, value=0)
-            ], width=4)
-        ], className="mb-3"),
-        
-        dbc.Row([
-            dbc.Col([
-                dbc.Label("Tarjetas Amarillas"),
-                dbc.Input(id="input-tarjetas-amarillas", type="number", min=0, value=0)
-            ], width=6),
-            dbc.Col([
-                dbc.Label("Tarjetas Rojas"),
-                dbc.Input(id="input-tarjetas-rojas", type="number", min=0, value=0)
-            ], width=6)
-        ])
+        dbc.Alert([
+            html.I(className="fas fa-info-circle me-2"),
+            "Goles, asistencias, tarjetas, minutos y convocatorias se calculan a partir de "
+            "los eventos y convocatorias de los partidos."
+        ], color="info", className="mb-0")
     ]
 
 def create_fisico_form():
@@ -343,10 +328,66 @@ def create_fisico_form():
         ])
     ]
 
+# Columnas de la tabla -> columnas SQL para filtrar y ordenar en servidor
+JUGADORES_TABLE_COLUMNS = {
+    'dorsal': Jugador.dorsal,
+    'nombre_futbolistico': Jugador.nombre_futbolistico,
+    'posicion': Jugador.posicion,
+    'goles': Jugador.goles,
+    'asistencias': Jugador.asistencias,
+    'tarjetas_amarillas': Jugador.tarjetas_amarillas,
+    'tarjetas_rojas': Jugador.tarjetas_rojas,
+    'minutos_jugados': Jugador.minutos_jugados,
+    'convocatorias': Jugador.convocatorias,
+    'activo': lambda operator, value: Jugador.activo == (str(value).lower() in ('true', '1', 'activo'))
+}
+
+def format_jugador_row(j):
+    """Convierte un jugador en una fila de la tabla"""
+    return {
+        'id': j.id,
+        'nombre_futbolistico': j.nombre_futbolistico,
+        'nombre_completo': f"{j.nombre} {j.apellidos}",
+        'dorsal': j.dorsal or "-",
+        'posicion': j.posicion or "-",
+        'goles': j.goles or 0,
+        'asistencias': j.asistencias or 0,
+        'tarjetas_amarillas': j.tarjetas_amarillas or 0,
+        'tarjetas_rojas': j.tarjetas_rojas or 0,
+        'minutos_jugados': j.minutos_jugados or 0,
+        'convocatorias': j.convocatorias or 0,
+        'activo': j.activo
+    }
+
+def build_jugadores_query(db, search_term=None, posicion_filter=None, estado_filter=None):
+    """Consulta de jugadores con los filtros de la barra de búsqueda"""
+    query = db.db.query(Jugador)
+    
+    if estado_filter == "active":
+        query = query.filter(Jugador.activo == True)
+    elif estado_filter == "inactive":
+        query = query.filter(Jugador.activo == False)
+    
+    if search_term:
+        pattern = f"%{search_term}%"
+        query = query.filter(or_(
+            Jugador.nombre_futbolistico.ilike(pattern),
+            Jugador.nombre.ilike(pattern),
+            Jugador.apellidos.ilike(pattern),
+            Jugador.posicion.ilike(pattern)
+        ))
+    
+    if posicion_filter and posicion_filter != "all":
+        query = query.filter(Jugador.posicion == posicion_filter)
+    
+    return query
+
 # Callbacks para la página de jugadores
 def register_jugadores_callbacks():
     """Registra todos los callbacks de la página de jugadores"""
     
+    register_export_callbacks("jugadores", "btn-exportar-jugadores")
+    
     @callback(
         Output("jugadores-data", "data"),
         [Input("btn-refresh-jugadores", "n_clicks"),
@@ -354,67 +395,25 @@ def register_jugadores_callbacks():
         prevent_initial_call=False
     )
     def load_jugadores_data(n_clicks, estado_filter):
-        """Carga los datos de jugadores"""
+        """Cuenta los jugadores (las filas las pide la tabla página a página)"""
         try:
             with DatabaseManager() as db:
-                if estado_filter == "active":
-                    jugadores = db.get_jugadores(activos_solo=True)
-                elif estado_filter == "inactive":
-                    jugadores = [j for j in db.get_jugadores(activos_solo=False) if not j.activo]
-                else:
-                    jugadores = db.get_jugadores(activos_solo=False)
-                
-                data = []
-                for j in jugadores:
-                    data.append({
-                        'id': j.id,
-                        'nombre_futbolistico': j.nombre_futbolistico,
-                        'nombre_completo': f"{j.nombre} {j.apellidos}",
-                        'dorsal': j.dorsal or "-",
-                        'posicion': j.posicion or "-",
-                        'goles': j.goles,
-                        'asistencias': j.asistencias,
-                        'tarjetas_amarillas': j.tarjetas_amarillas,
-                        'tarjetas_rojas': j.tarjetas_rojas,
-                        'activo': j.activo
-                    })
-                
-                return data
+                return {'total': build_jugadores_query(db, estado_filter=estado_filter).count()}
         except Exception as e:
             print(f"Error cargando jugadores: {e}")
-            return []
+            return {'total': 0}
     
     @callback(
         Output("jugadores-table-container", "children"),
-        [Input("jugadores-data", "data"),
-         Input("search-jugadores", "value"),
-         Input("filter-posicion", "value")]
+        Input("jugadores-data", "data")
     )
-    def update_jugadores_table(data, search_term, posicion_filter):
-        """Actualiza la tabla de jugadores"""
-        if not data:
+    def update_jugadores_table(data):
+        """Crea la tabla de jugadores (paginada, filtrada y ordenada en servidor)"""
+        if not data or not data.get('total'):
             return html.P("No hay jugadores registrados", className="text-center text-muted p-4")
         
-        # Filtrar datos
-        filtered_data = data
-        
-        if search_term:
-            filtered_data = [
-                j for j in filtered_data 
-                if search_term.lower() in j['nombre_futbolistico'].lower() or 
-                   search_term.lower() in j['nombre_completo'].lower() or
-                   search_term.lower() in (j['posicion'] or "").lower()
-            ]
-        
-        if posicion_filter and posicion_filter != "all":
-            filtered_data = [j for j in filtered_data if j['posicion'] == posicion_filter]
-        
-        # Crear DataFrame
-        df = pd.DataFrame(filtered_data)
-        
-        return dash_table.DataTable(
-            id="jugadores-table",
-            data=df.to_dict('records'),
+        return create_paged_table(
+            "jugadores-table",
             columns=[
                 {"name": "Dorsal", "id": "dorsal", "type": "text"},
                 {"name": "Nombre", "id": "nombre_futbolistico", "type": "text"},
@@ -423,18 +422,11 @@ def register_jugadores_callbacks():
                 {"name": "Asistencias", "id": "asistencias", "type": "numeric"},
                 {"name": "T.A.", "id": "tarjetas_amarillas", "type": "numeric"},
                 {"name": "T.R.", "id": "tarjetas_rojas", "type": "numeric"},
+                {"name": "Min.", "id": "minutos_jugados", "type": "numeric"},
+                {"name": "Conv.", "id": "convocatorias", "type": "numeric"},
                 {"name": "Estado", "id": "activo", "type": "text"}
             ],
-            style_cell={
-                'textAlign': 'left',
-                'padding': '12px',
-                'fontFamily': 'Arial'
-            },
-            style_header={
-                'backgroundColor': COLORS['primary'],
-                'color': 'white',
-                'fontWeight': 'bold'
-            },
+            page_size=10,
             style_data_conditional=[
                 {
                     'if': {'filter_query': '{activo} = False'},
@@ -442,12 +434,36 @@ def register_jugadores_callbacks():
                     'color': 'black',
                 }
             ],
-            row_selectable="single",
-            page_size=10,
-            sort_action="native",
-            filter_action="native"
+            row_selectable="single"
         )
     
+    @callback(
+        [Output("jugadores-table", "data"),
+         Output("jugadores-table", "page_count")],
+        [Input("jugadores-table", "page_current"),
+         Input("jugadores-table", "page_size"),
+         Input("jugadores-table", "sort_by"),
+         Input("jugadores-table", "filter_query"),
+         Input("search-jugadores", "value"),
+         Input("filter-posicion", "value"),
+         Input("filter-estado", "value"),
+         Input("jugadores-data", "data")]
+    )
+    def page_jugadores_table(page_current, page_size, sort_by, filter_query,
+                             search_term, posicion_filter, estado_filter, data):
+        """Devuelve solo la página visible de jugadores"""
+        try:
+            with DatabaseManager() as db:
+                query = build_jugadores_query(db, search_term, posicion_filter, estado_filter)
+                return paginate_query(
+                    query, JUGADORES_TABLE_COLUMNS, format_jugador_row,
+                    page_current, page_size, sort_by, filter_query,
+                    default_order=[Jugador.dorsal.asc(), Jugador.id.asc()]
+                )
+        except Exception as e:
+            print(f"Error paginando jugadores: {e}")
+            return [], 1
+    
     @callback(
         [Output("jugador-modal", "is_open"),
          Output("jugador-modal-title", "children"),
@@ -555,7 +571,7 @@ def register_jugadores_callbacks():
                 return dash.no_update, dash.no_update
         
         try:
-            # Crear el objeto Jugador con los valores por defecto
+            # Crear el objeto Jugador (las estadísticas salen de los partidos)
             jugador = Jugador(
                 nombre=inputs.get('input-nombre', ''),
                 apellidos=inputs.get('input-apellidos', ''),
@@ -567,10 +583,6 @@ def register_jugadores_callbacks():
                 posicion=inputs.get('input-posicion'),
                 peso=float(inputs['input-peso']) if inputs.get('input-peso') else None,
                 altura=float(inputs['input-altura']) if inputs.get('input-altura') else None,
-                goles=int(inputs.get('input-goles', 0)) if inputs.get('input-goles') is not None else 0,
-                asistencias=int(inputs.get('input-asistencias', 0)) if inputs.get('input-asistencias') is not None else 0,
-                tarjetas_amarillas=int(inputs.get('input-tarjetas-amarillas', 0)) if inputs.get('input-tarjetas-amarillas') is not None else 0,
-                tarjetas_rojas=int(inputs.get('input-tarjetas-rojas', 0)) if inputs.get('input-tarjetas-rojas') is not None else 0,
                 activo=True
             )
             
@@ -580,22 +592,8 @@ def register_jugadores_callbacks():
                 db.commit()
                 print(f"Jugador guardado con ID: {jugador.id}")
                 
-                # Obtener la lista actualizada de jugadores
-                jugadores = db.get_jugadores(activos_solo=True)
-                jugadores_data = [{
-                    'id': j.id,
-                    'nombre_futbolistico': j.nombre_futbolistico,
-                    'nombre_completo': f"{j.nombre} {j.apellidos}",
-                    'dorsal': j.dorsal or "-",
-                    'posicion': j.posicion or "-",
-                    'goles': j.goles or 0,
-                    'asistencias': j.asistencias or 0,
-                    'tarjetas_amarillas': j.tarjetas_amarillas or 0,
-                    'tarjetas_rojas': j.tarjetas_rojas or 0,
-                    'activo': j.activo
-                } for j in jugadores]
-                
-                return False, jugadores_data
+                # La tabla vuelve a pedir su página al cambiar el recuento
+                return False, {'total': build_jugadores_query(db).count()}
                 
         except Exception as e:
             print(f"Error al guardar el jugador: {str(e)}")
@@ -1,13 +1,15 @@
 import dash_bootstrap_components as dbc
 from dash import html, dcc, Input, Output, State, callback, dash_table
-import pandas as pd
 import plotly.graph_objs as go
-import plotly.express as px
 from datetime import datetime, date
-from database.db_manager import DatabaseManager, Multa, PagoMulta
+from sqlalchemy import func
+from sqlalchemy.orm import contains_eager
+from database.db_manager import DatabaseManager, Jugador, Multa, PagoMulta
 from layouts.main_content import create_stats_card
 from config.settings import COLORS
 from utils.header_utils import create_page_header
+from utils.table_paging import create_paged_table, paginate_query
+from utils.export import export_components, register_export_callbacks
 
 def create_multas_layout():
     """Crea el layout principal de la página de multas"""
@@ -28,7 +30,11 @@ def create_multas_layout():
                 dbc.Button([
                     html.I(className="fas fa-chart-pie me-2"),
                     "Estadísticas"
-                ], id="btn-stats-multas", color="info", outline=True)
+                ], id="btn-stats-multas", color="info", outline=True),
+                dbc.Button([
+                    html.I(className="fas fa-download me-2"),
+                    "Exportar"
+                ], id="btn-exportar-multas", color="secondary", outline=True)
             ]
         ),
         
@@ -57,7 +63,9 @@ def create_multas_layout():
         # Stores
         dcc.Store(id="multas-data"),
         dcc.Store(id="multa-selected"),
-        dcc.Store(id="jugadores-multas-data")
+        dcc.Store(id="jugadores-multas-data"),
+        dcc.Store(id="multas-page-load"),
+        export_components("multas")
     ])
 
 def create_multas_stats_section():
@@ -124,8 +132,7 @@ def create_multa_modal():
                         dbc.Label("Fecha *"),
                         dbc.Input(
                             id="input-fecha-multa",
-                            type="date",
-                            value=datetime.now().strftime("%Y-%m-%d")
+                            type="date"
                         )
                     ], width=6)
                 ], className="mb-3"),
@@ -222,8 +229,7 @@ def create_pago_modal():
                         dbc.Label("Fecha del Pago *"),
                         dbc.Input(
                             id="input-fecha-pago",
-                            type="date",
-                            value=datetime.now().strftime("%Y-%m-%d")
+                            type="date"
                         )
                     ], width=6),
                     dbc.Col([
@@ -281,10 +287,8 @@ def create_multas_stats_modal():
         ])
     ], id="multas-stats-modal", size="xl", is_open=False)
 
-def create_multas_activas_content(multas_data):
-    """Crea el contenido de multas activas (pendientes)"""
-    multas_pendientes = [m for m in multas_data if not m['completamente_pagada']]
-    
+def create_multas_activas_content(multas_pendientes):
+    """Crea el contenido de multas activas a partir de las filas de las pendientes"""
     if not multas_pendientes:
         return dbc.Alert([
             html.I(className="fas fa-check-circle fa-2x mb-3"),
@@ -353,15 +357,40 @@ def create_multas_activas_content(multas_data):
     
     return html.Div(cards)
 
-def create_multas_historial_content(multas_data):
-    """Crea el contenido del historial completo"""
-    if not multas_data:
+# Columnas del historial -> columnas SQL para filtrar y ordenar en servidor
+MULTAS_HISTORIAL_COLUMNS = {
+    'fecha': Multa.fecha,
+    'jugador_nombre': Jugador.nombre_futbolistico,
+    'razon_multa': Multa.razon_multa,
+    'multa': Multa.multa,
+    'pagado': Multa.pagado,
+    'debe': Multa.debe,
+    'estado': lambda operator, value: Multa.completamente_pagada == str(value).lower().startswith('pag')
+}
+
+def format_multa_row(multa):
+    """Convierte una multa (con su jugador cargado) en una fila de datos"""
+    jugador = multa.jugador
+    return {
+        'id': multa.id,
+        'jugador_id': multa.jugador_id,
+        'jugador_nombre': jugador.nombre_futbolistico if jugador else 'Desconocido',
+        'fecha': multa.fecha.strftime("%d/%m/%Y"),
+        'razon_multa': multa.razon_multa,
+        'multa': multa.multa,
+        'pagado': multa.pagado,
+        'debe': multa.debe,
+        'completamente_pagada': multa.completamente_pagada,
+        'estado': 'Pagada' if multa.completamente_pagada else 'Pendiente'
+    }
+
+def create_multas_historial_content(total_multas):
+    """Crea el contenido del historial completo (paginado en servidor)"""
+    if not total_multas:
         return html.P("No hay multas registradas", className="text-center text-muted p-4")
     
-    df = pd.DataFrame(multas_data)
-    
-    return dash_table.DataTable(
-        data=df.to_dict('records'),
+    return create_paged_table(
+        "multas-historial-table",
         columns=[
             {"name": "Fecha", "id": "fecha", "type": "datetime"},
             {"name": "Jugador", "id": "jugador_nombre", "type": "text"},
@@ -371,16 +400,6 @@ def create_multas_historial_content(multas_data):
             {"name": "Debe", "id": "debe", "type": "numeric", "format": {"specifier": "€.2f"}},
             {"name": "Estado", "id": "estado", "type": "text"}
         ],
-        style_cell={
-            'textAlign': 'left',
-            'padding': '12px',
-            'fontFamily': 'Arial'
-        },
-        style_header={
-            'backgroundColor': COLORS['primary'],
-            'color': 'white',
-            'fontWeight': 'bold'
-        },
         style_data_conditional=[
             {
                 'if': {'filter_query': '{estado} = Pendiente'},
@@ -392,42 +411,17 @@ def create_multas_historial_content(multas_data):
                 'backgroundColor': '#d4edda',
                 'color': 'black',
             }
-        ],
-        sort_action="native",
-        filter_action="native",
-        page_size=15
+        ]
     )
 
-def create_multas_resumen_content(multas_data, jugadores_data):
-    """Crea el contenido del resumen por jugador"""
-    if not multas_data:
+def create_multas_resumen_content(resumen):
+    """Crea el contenido del resumen por jugador (totales agregados en la base de datos)"""
+    if not resumen:
         return html.P("No hay datos para mostrar", className="text-center text-muted p-4")
     
-    # Agrupar multas por jugador
-    resumen = {}
-    for multa in multas_data:
-        jugador_id = multa['jugador_id']
-        if jugador_id not in resumen:
-            resumen[jugador_id] = {
-                'jugador_nombre': multa['jugador_nombre'],
-                'total_multas': 0,
-                'total_importe': 0,
-                'total_pagado': 0,
-                'total_debe': 0,
-                'multas_pendientes': 0
-            }
-        
-        resumen[jugador_id]['total_multas'] += 1
-        resumen[jugador_id]['total_importe'] += multa['multa']
-        resumen[jugador_id]['total_pagado'] += multa['pagado']
-        resumen[jugador_id]['total_debe'] += multa['debe']
-        
-        if not multa['completamente_pagada']:
-            resumen[jugador_id]['multas_pendientes'] += 1
-    
     # Crear cards para cada jugador
     cards = []
-    for jugador_id, datos in resumen.items():
+    for datos in resumen:
         # Determinar color según la deuda
         if datos['total_debe'] > 50:
             border_color = "danger"
@@ -479,6 +473,21 @@ def create_multas_resumen_content(multas_data, jugadores_data):
 def register_multas_callbacks():
     """Registra los callbacks de la página de multas"""
     
+    @callback(
+        [Output("input-fecha-multa", "value"),
+         Output("input-fecha-pago", "value")],
+        Input("multas-page-load", "data")
+    )
+    def set_default_dates(_):
+        """Fechas por defecto calculadas en cada visita (el layout está memoizado)"""
+        hoy = datetime.now()
+        return (
+            hoy.strftime("%Y-%m-%d"),
+            hoy.strftime("%Y-%m-%d")
+        )
+    
+    register_export_callbacks("multas", "btn-exportar-multas")
+    
     @callback(
         [Output("multas-data", "data"),
          Output("jugadores-multas-data", "data")],
@@ -486,30 +495,18 @@ def register_multas_callbacks():
         prevent_initial_call=False
     )
     def load_multas_data(n_clicks):
-        """Carga los datos de multas y jugadores"""
+        """Cuenta las multas y carga las opciones de jugadores (las filas se piden por pestaña o página)"""
         try:
             with DatabaseManager() as db:
-                # Cargar multas
-                multas = db.get_multas()
-                multas_data = []
-                
-                for multa in multas:
-                    jugador = db.get_jugador_by_id(multa.jugador_id)
-                    multas_data.append({
-                        'id': multa.id,
-                        'jugador_id': multa.jugador_id,
-                        'jugador_nombre': jugador.nombre_futbolistico if jugador else 'Desconocido',
-                        'fecha': multa.fecha.strftime("%d/%m/%Y"),
-                        'razon_multa': multa.razon_multa,
-                        'multa': multa.multa,
-                        'pagado': multa.pagado,
-                        'debe': multa.debe,
-                        'completamente_pagada': multa.completamente_pagada,
-                        'estado': 'Pagada' if multa.completamente_pagada else 'Pendiente'
-                    })
+                multas_data = {
+                    'total': db.db.query(func.count(Multa.id)).scalar() or 0,
+                    'pendientes': db.db.query(func.count(Multa.id)).filter(
+                        Multa.completamente_pagada == False
+                    ).scalar() or 0
+                }
                 
                 # Cargar jugadores
-                jugadores = db.get_jugadores(activos_solo=True)
+                jugadores = db.get_jugadores_rows(activos_solo=True)
                 jugadores_options = [
                     {"label": j.nombre_futbolistico, "value": j.id}
                     for j in jugadores
@@ -519,24 +516,58 @@ def register_multas_callbacks():
                 
         except Exception as e:
             print(f"Error cargando multas: {e}")
-            return [], []
+            return {'total': 0, 'pendientes': 0}, []
     
     @callback(
         Output("multas-content", "children"),
         [Input("multas-tabs", "active_tab"),
-         Input("multas-data", "data"),
-         Input("jugadores-multas-data", "data")]
+         Input("multas-data", "data")]
     )
-    def update_multas_content(active_tab, multas_data, jugadores_data):
+    def update_multas_content(active_tab, multas_data):
         """Actualiza el contenido según la pestaña activa"""
-        if active_tab == "tab-activas":
-            return create_multas_activas_content(multas_data)
-        elif active_tab == "tab-historial":
-            return create_multas_historial_content(multas_data)
-        elif active_tab == "tab-resumen":
-            return create_multas_resumen_content(multas_data, jugadores_data)
+        multas_data = multas_data or {}
+        try:
+            if active_tab == "tab-activas":
+                if not multas_data.get('pendientes'):
+                    return create_multas_activas_content([])
+                with DatabaseManager() as db:
+                    pendientes = db.db.query(Multa).outerjoin(Multa.jugador).options(
+                        contains_eager(Multa.jugador)
+                    ).filter(Multa.completamente_pagada == False).order_by(Multa.fecha.desc()).all()
+                    return create_multas_activas_content([format_multa_row(m) for m in pendientes])
+            elif active_tab == "tab-historial":
+                return create_multas_historial_content(multas_data.get('total'))
+            elif active_tab == "tab-resumen":
+                with DatabaseManager() as db:
+                    return create_multas_resumen_content(db.get_resumen_multas_por_jugador())
+        except Exception as e:
+            print(f"Error cargando multas: {e}")
+            return html.P("Error cargando multas", className="text-center text-danger p-4")
         return html.Div()
     
+    @callback(
+        [Output("multas-historial-table", "data"),
+         Output("multas-historial-table", "page_count")],
+        [Input("multas-historial-table", "page_current"),
+         Input("multas-historial-table", "page_size"),
+         Input("multas-historial-table", "sort_by"),
+         Input("multas-historial-table", "filter_query"),
+         Input("multas-data", "data")]
+    )
+    def page_multas_historial(page_current, page_size, sort_by, filter_query, multas_data):
+        """Devuelve solo la página visible del historial de multas"""
+        try:
+            with DatabaseManager() as db:
+                query = db.db.query(Multa).outerjoin(Multa.jugador).options(contains_eager(Multa.jugador))
+                return paginate_query(
+                    query, MULTAS_HISTORIAL_COLUMNS, format_multa_row,
+                    page_current, page_size, sort_by, filter_query,
+                    default_order=[Multa.fecha.desc(), Multa.id.desc()]
+                )
+        except Exception as e:
+            print(f"Error paginando multas: {e}")
+            return [], 1
+    
     @callback(
         [Output("multa-modal", "is_open")],
         [Input("btn-nueva-multa", "n_clicks"),
@@ -1,12 +1,12 @@
 import dash_bootstrap_components as dbc
 from dash import html, dcc, Input, Output, State, callback, dash_table
-import pandas as pd
 import plotly.graph_objs as go
 from datetime import datetime, date, timedelta
 from database.db_manager import DatabaseManager, ObjetivoIndividual
 from layouts.main_content import create_stats_card
 from config.settings import COLORS
 from utils.header_utils import create_page_header
+from utils.export import export_components, register_export_callbacks
 
 def create_objetivos_layout():
     """Crea el layout principal de la página de objetivos"""
@@ -56,7 +56,9 @@ def create_objetivos_layout():
         # Stores
         dcc.Store(id="objetivos-data"),
         dcc.Store(id="objetivo-selected"),
-        dcc.Store(id="jugadores-objetivos-data")
+        dcc.Store(id="jugadores-objetivos-data"),
+        dcc.Store(id="objetivos-page-load"),
+        export_components("objetivos")
     ])
 
 def create_objetivos_stats_section():
@@ -137,8 +139,7 @@ def create_objetivos_filters():
                         id="filter-mes-objetivos",
                         options=[{"label": "Todos", "value": "all"}] +
                                [{"label": f"{i:02d}/2025", "value": f"2025-{i:02d}"} 
-                                for i in range(1, 13)],
-                        value=datetime.now().strftime("%Y-%m")
+                                for i in range(1, 13)]
                     )
                 ], width=12, md=3),
                 
@@ -202,8 +203,7 @@ def create_objetivo_modal():
                         dbc.Label("Mes/Año *"),
                         dbc.Input(
                             id="input-mes-objetivo",
-                            type="month",
-                            value=datetime.now().strftime("%Y-%m")
+                            type="month"
                         )
                     ], width=6)
                 ], className="mb-3"),
@@ -234,16 +234,14 @@ def create_objetivo_modal():
                         dbc.Label("Fecha de Inicio *"),
                         dbc.Input(
                             id="input-fecha-inicio-objetivo",
-                            type="date",
-                            value=datetime.now().strftime("%Y-%m-%d")
+                            type="date"
                         )
                     ], width=6),
                     dbc.Col([
                         dbc.Label("Fecha Objetivo"),
                         dbc.Input(
                             id="input-fecha-objetivo-objetivo",
-                            type="date",
-                            value=(datetime.now() + timedelta(days=30)).strftime("%Y-%m-%d")
+                            type="date"
                         )
                     ], width=6)
                 ], className="mb-3"),
@@ -439,6 +437,25 @@ def create_objetivos_summary(objetivos_data):
 def register_objetivos_callbacks():
     """Registra los callbacks de la página de objetivos"""
     
+    @callback(
+        [Output("filter-mes-objetivos", "value"),
+         Output("input-mes-objetivo", "value"),
+         Output("input-fecha-inicio-objetivo", "value"),
+         Output("input-fecha-objetivo-objetivo", "value")],
+        Input("objetivos-page-load", "data")
+    )
+    def set_default_dates(_):
+        """Fechas por defecto calculadas en cada visita (el layout está memoizado)"""
+        hoy = datetime.now()
+        return (
+            hoy.strftime("%Y-%m"),
+            hoy.strftime("%Y-%m"),
+            hoy.strftime("%Y-%m-%d"),
+            (hoy + timedelta(days=30)).strftime("%Y-%m-%d")
+        )
+    
+    register_export_callbacks("objetivos", "btn-exportar-objetivos")
+    
     @callback(
         [Output("objetivos-data", "data"),
          Output("jugadores-objetivos-data", "data")],
@@ -453,13 +470,13 @@ def register_objetivos_callbacks():
         try:
             with DatabaseManager() as db:
                 # Cargar objetivos
-                objetivos = db.db.query(ObjetivoIndividual).all()
+                objetivos = db.get_objetivos_with_jugador()
                 objetivos_data = []
                 
                 today = date.today()
                 
                 for objetivo in objetivos:
-                    jugador = db.get_jugador_by_id(objetivo.jugador_id)
+                    jugador = objetivo.jugador
                     
                     # Filtrar por jugador
                     if jugador_filter != "all" and str(objetivo.jugador_id) != jugador_filter:
@@ -497,7 +514,7 @@ def register_objetivos_callbacks():
                     })
                 
                 # Cargar jugadores
-                jugadores = db.get_jugadores(activos_solo=True)
+                jugadores = db.get_jugadores_rows(activos_solo=True)
                 jugadores_options = [
                     {"label": j.nombre_futbolistico, "value": j.id}
                     for j in jugadores
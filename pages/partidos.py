@@ -1,12 +1,14 @@
 import dash_bootstrap_components as dbc
-from dash import html, dcc, Input, Output, State, callback, dash_table
-import pandas as pd
+from dash import html, dcc, Input, Output, State, callback, dash_table, no_update
 from datetime import datetime, date
-from database.db_manager import DatabaseManager, Partido, EventoPartido, ConvocatoriaPartido
+from sqlalchemy import case, func
+from database.db_manager import DatabaseManager, Calendario, Partido, EventoPartido, ConvocatoriaPartido
 from layouts.main_content import create_stats_card
 from config.settings import COLORS, COMPETICIONES
 from utils.header_utils import create_page_header
-from utils.scraping import scraping_manager
+from utils.jobs import job_runner
+from utils.table_paging import create_paged_table, paginate_query
+from utils.export import export_components, register_export_callbacks
 
 def create_partidos_layout():
     """Crea el layout principal de la página de partidos"""
@@ -175,7 +177,11 @@ def create_partidos_layout():
                 dbc.Button([
                     html.I(className="fas fa-download me-2"),
                     "Importar FFCV"
-                ], id="btn-scraping-ffcv", color="warning", outline=True)
+                ], id="btn-scraping-ffcv", color="warning", outline=True),
+                dbc.Button([
+                    html.I(className="fas fa-download me-2"),
+                    "Exportar"
+                ], id="btn-exportar-partidos", color="secondary", outline=True)
             ]
         ),
         
@@ -212,7 +218,12 @@ def create_partidos_layout():
         dcc.Store(id="partidos-data"),
         dcc.Store(id="partido-control-selected"),
         dcc.Store(id="jugadores-convocatoria"),
-        dcc.Store(id="scraping-status")  # NUEVO
+        dcc.Store(id="scraping-status"),  # NUEVO
+        
+        # Importación en segundo plano: id del trabajo y consulta periódica de su estado
+        dcc.Store(id="scraping-job-id"),
+        dcc.Interval(id="scraping-job-interval", interval=1000, disabled=True),
+        export_components("partidos")
     ])
 
 # NUEVA FUNCIÓN: Sección de configuración de scraping
@@ -226,11 +237,12 @@ def create_scraping_config_section():
             dbc.CardBody([
                 dbc.Row([
                     dbc.Col([
-                        dbc.Label("URL del Calendario FFCV"),
-                        dbc.Input(
+                        dbc.Label("URLs de los Calendarios FFCV (una por línea)"),
+                        dbc.Textarea(
                             id="input-ffcv-url",
                             placeholder="https://resultadosffcv.isquad.es/equipo_calendario.php?...",
-                            value="https://resultadosffcv.isquad.es/equipo_calendario.php?id_temp=20&id_modalidad=33327&id_competicion=903498407&id_equipo=18331&torneo_equipo=903498408&id_torneo=903498408"
+                            value="https://resultadosffcv.isquad.es/equipo_calendario.php?id_temp=20&id_modalidad=33327&id_competicion=903498407&id_equipo=18331&torneo_equipo=903498408&id_torneo=903498408",
+                            rows=3
                         )
                     ], width=8),
                     dbc.Col([
@@ -263,6 +275,54 @@ def create_scraping_modal():
         ])
     ], id="scraping-modal", size="lg", is_open=False)
 
+def parse_ffcv_urls(value):
+    """Lista de URLs del campo de importación (una por línea)"""
+    return [url.strip() for url in (value or '').splitlines() if url.strip()]
+
+def create_import_progress_content(job):
+    """Contenido del modal mientras la importación está en curso"""
+    progreso = job['progreso'] if job else 0
+    mensaje = job['mensaje'] if job else "En cola"
+    return html.Div([
+        html.P([html.I(className="fas fa-spinner fa-spin me-2"), mensaje]),
+        dbc.Progress(value=progreso, label=f"{progreso}%", striped=True, animated=True, color="warning"),
+        html.Small("Puedes cerrar esta ventana: la importación continúa en segundo plano.",
+                   className="text-muted")
+    ])
+
+def create_import_result_content(result):
+    """Contenido del modal con el resultado de una importación terminada"""
+    if not result['success']:
+        return dbc.Alert([
+            html.H5("Error en la Importación", className="alert-heading"),
+            html.P(f"Error: {result['error']}")
+        ], color="danger")
+    
+    if result.get('unchanged'):
+        return dbc.Alert([
+            html.H5("Sin cambios", className="alert-heading"),
+            html.P("El calendario de la FFCV no ha cambiado desde la última importación."),
+            html.P([
+                html.Strong("Tiempo: "), f"{result['elapsed_time']:.2f} segundos"
+            ])
+        ], color="info")
+    
+    return dbc.Alert([
+        html.H5("¡Importación Exitosa!", className="alert-heading"),
+        html.P(f"Se han importado {result['total_matches']} partidos."),
+        html.Hr(),
+        html.P([
+            html.Strong("Nuevos: "), f"{result['created']} partidos", html.Br(),
+            html.Strong("Actualizados: "), f"{result['updated']} partidos", html.Br(),
+            html.Strong("Tiempo: "), f"{result['elapsed_time']:.2f} segundos"
+        ]),
+        html.Ul([
+            html.Li(f"{page['url']}: {page['matches']} partidos" if page['success']
+                    else f"{page['url']}: {page['error']}")
+            for page in result.get('pages', [])
+        ]) if len(result.get('pages', [])) > 1 else html.Div()
+    ], color="success")
+
 # ACTUALIZAR la función register_partidos_callbacks() con estos nuevos callbacks:
 def register_partidos_callbacks():
     """Registra todos los callbacks de partidos"""
@@ -291,11 +351,16 @@ def register_partidos_callbacks():
     )
     def test_ffcv_connection(n_clicks, ffcv_url):
         """Prueba la conexión con la FFCV"""
-        if not n_clicks or not ffcv_url:
+        urls = parse_ffcv_urls(ffcv_url)
+        if not n_clicks or not urls:
             return html.Div()
         
         try:
-            # Configurar el scraper
+            # El scraping (requests, bs4) se importa solo al usarlo
+            from utils.scraping import scraping_manager
+            
+            # Configurar el scraper (se prueba la primera URL)
+            ffcv_url = urls[0]
             scraping_manager.configure_ffcv_scraper(ffcv_url)
             
             # Probar conexión
@@ -492,10 +557,11 @@ def create_jugadores_section(title, jugadores, section_type, max_players=None):
         ])
     ])
 
-def create_proximos_partidos_content(partidos_data):
-    """Crea el contenido de próximos partidos"""
-    proximos = [p for p in partidos_data if p.get('fecha_obj', date.today()) >= date.today()]
-    
+# Próximos partidos que se muestran como tarjetas
+MAX_PROXIMOS_PARTIDOS = 6
+
+def create_proximos_partidos_content(proximos):
+    """Crea el contenido de próximos partidos a partir de sus filas, del más cercano al más lejano"""
     if not proximos:
         return dbc.Alert([
             html.I(className="fas fa-calendar-times fa-2x mb-3"),
@@ -504,7 +570,7 @@ def create_proximos_partidos_content(partidos_data):
         ], color="info", className="text-center")
     
     cards = []
-    for partido in proximos[:6]:  # Mostrar máximo 6
+    for partido in proximos[:MAX_PROXIMOS_PARTIDOS]:
         # Determinar días restantes
         dias_restantes = (partido.get('fecha_obj', date.today()) - date.today()).days
         
@@ -570,18 +636,87 @@ def create_proximos_partidos_content(partidos_data):
         dbc.Col(card, width=12, md=6, lg=4) for card in cards
     ])
 
-def create_partidos_jugados_content(partidos_data):
-    """Crea el contenido de partidos jugados"""
-    jugados = [p for p in partidos_data if p.get('fecha_obj', date.today()) < date.today()]
+CLUB_NAME = "UD Atzeneta"
+
+# Columnas de partidos jugados -> expresiones SQL para filtrar y ordenar en servidor
+PARTIDOS_JUGADOS_COLUMNS = {
+    'fecha': Calendario.fecha,
+    'competicion': Calendario.competicion,
+    'rival': case(
+        (Calendario.equipo_local == CLUB_NAME, Calendario.equipo_visitante),
+        else_=Calendario.equipo_local
+    ),
+    'local_visitante': case(
+        (Calendario.equipo_local == CLUB_NAME, "Local"),
+        else_="Visitante"
+    ),
+    'campo': Calendario.campo
+}
+
+def format_partido_row(evento):
+    """Convierte un evento del calendario en una fila de datos de partido"""
+    # Determinar rival y si es local o visitante
+    if evento.equipo_local == CLUB_NAME:
+        rival = evento.equipo_visitante
+        local_visitante = "Local"
+    else:
+        rival = evento.equipo_local
+        local_visitante = "Visitante"
     
-    if not jugados:
-        return html.P("No hay partidos jugados registrados", className="text-center text-muted p-4")
+    # Determinar resultado
+    if evento.goles_equipo_local is not None and evento.goles_equipo_visitante is not None:
+        if evento.equipo_local == CLUB_NAME:
+            goles_favor, goles_contra = evento.goles_equipo_local, evento.goles_equipo_visitante
+        else:
+            goles_favor, goles_contra = evento.goles_equipo_visitante, evento.goles_equipo_local
+        
+        if goles_favor > goles_contra:
+            resultado = f"Victoria {goles_favor}-{goles_contra}"
+        elif goles_favor < goles_contra:
+            resultado = f"Derrota {goles_favor}-{goles_contra}"
+        else:
+            resultado = f"Empate {goles_favor}-{goles_contra}"
+    else:
+        resultado = "Por jugar"
     
-    # Crear tabla
-    df = pd.DataFrame(jugados)
+    return {
+        'id': evento.id,
+        'fecha': evento.fecha.strftime("%d/%m/%Y"),
+        'fecha_obj': evento.fecha,
+        'hora': evento.hora,
+        'competicion': evento.competicion,
+        'jornada': evento.jornada,
+        'equipo_local': evento.equipo_local,
+        'equipo_visitante': evento.equipo_visitante,
+        'rival': rival,
+        'local_visitante': local_visitante,
+        'resultado': resultado,
+        'campo': evento.campo,
+        'arbitro': evento.arbitro
+    }
+
+def format_partido_jugado_row(evento):
+    """Fila de la tabla de partidos jugados (sin el objeto fecha)"""
+    row = format_partido_row(evento)
+    row.pop('fecha_obj')
+    return row
+
+def count_partidos(db, hoy=None):
+    """Recuento de partidos jugados y próximos (lo único que guarda el store de la página)"""
+    hoy = hoy or date.today()
+    jugados, proximos = db.db.query(
+        func.sum(case((Calendario.fecha < hoy, 1), else_=0)),
+        func.sum(case((Calendario.fecha >= hoy, 1), else_=0))
+    ).one()
+    return {'jugados': jugados or 0, 'proximos': proximos or 0}
+
+def create_partidos_jugados_content(total_jugados):
+    """Crea el contenido de partidos jugados (paginado en servidor)"""
+    if not total_jugados:
+        return html.P("No hay partidos jugados registrados", className="text-center text-muted p-4")
     
-    return dash_table.DataTable(
-        data=df.to_dict('records'),
+    return create_paged_table(
+        "partidos-jugados-table",
         columns=[
             {"name": "Fecha", "id": "fecha", "type": "datetime"},
             {"name": "Competición", "id": "competicion", "type": "text"},
@@ -590,16 +725,6 @@ def create_partidos_jugados_content(partidos_data):
             {"name": "Local/Visitante", "id": "local_visitante", "type": "text"},
             {"name": "Campo", "id": "campo", "type": "text"}
         ],
-        style_cell={
-            'textAlign': 'left',
-            'padding': '12px',
-            'fontFamily': 'Arial'
-        },
-        style_header={
-            'backgroundColor': COLORS['primary'],
-            'color': 'white',
-            'fontWeight': 'bold'
-        },
         style_data_conditional=[
             {
                 'if': {'filter_query': '{resultado} contains Victoria'},
@@ -611,15 +736,15 @@ def create_partidos_jugados_content(partidos_data):
                 'backgroundColor': '#f8d7da',
                 'color': 'black',
             }
-        ],
-        sort_action="native",
-        page_size=15
+        ]
     )
 
 # Callbacks para partidos
 def register_partidos_callbacks():
     """Registra todos los callbacks de partidos"""
     
+    register_export_callbacks("partidos", "btn-exportar-partidos")
+    
     @callback(
         [Output("partidos-data", "data"),
          Output("jugadores-convocatoria", "data")],
@@ -627,59 +752,13 @@ def register_partidos_callbacks():
         prevent_initial_call=False
     )
     def load_partidos_data(n_clicks):
-        """Carga los datos de partidos"""
+        """Cuenta los partidos y carga los jugadores para convocatorias"""
         try:
             with DatabaseManager() as db:
-                # Obtener partidos del calendario
-                calendario = db.get_calendario()
-                partidos_data = []
-                
-                for evento in calendario:
-                    # Determinar rival y si es local o visitante
-                    if evento.equipo_local == "UD Atzeneta":
-                        rival = evento.equipo_visitante
-                        local_visitante = "Local"
-                    else:
-                        rival = evento.equipo_local
-                        local_visitante = "Visitante"
-                    
-                    # Determinar resultado
-                    if evento.goles_equipo_local is not None and evento.goles_equipo_visitante is not None:
-                        if evento.equipo_local == "UD Atzeneta":
-                            if evento.goles_equipo_local > evento.goles_equipo_visitante:
-                                resultado = f"Victoria {evento.goles_equipo_local}-{evento.goles_equipo_visitante}"
-                            elif evento.goles_equipo_local < evento.goles_equipo_visitante:
-                                resultado = f"Derrota {evento.goles_equipo_local}-{evento.goles_equipo_visitante}"
-                            else:
-                                resultado = f"Empate {evento.goles_equipo_local}-{evento.goles_equipo_visitante}"
-                        else:
-                            if evento.goles_equipo_visitante > evento.goles_equipo_local:
-                                resultado = f"Victoria {evento.goles_equipo_visitante}-{evento.goles_equipo_local}"
-                            elif evento.goles_equipo_visitante < evento.goles_equipo_local:
-                                resultado = f"Derrota {evento.goles_equipo_visitante}-{evento.goles_equipo_local}"
-                            else:
-                                resultado = f"Empate {evento.goles_equipo_visitante}-{evento.goles_equipo_local}"
-                    else:
-                        resultado = "Por jugar"
-                    
-                    partidos_data.append({
-                        'id': evento.id,
-                        'fecha': evento.fecha.strftime("%d/%m/%Y"),
-                        'fecha_obj': evento.fecha,
-                        'hora': evento.hora,
-                        'competicion': evento.competicion,
-                        'jornada': evento.jornada,
-                        'equipo_local': evento.equipo_local,
-                        'equipo_visitante': evento.equipo_visitante,
-                        'rival': rival,
-                        'local_visitante': local_visitante,
-                        'resultado': resultado,
-                        'campo': evento.campo,
-                        'arbitro': evento.arbitro
-                    })
+                partidos_data = count_partidos(db)
                 
                 # Cargar jugadores para convocatorias
-                jugadores = db.get_jugadores(activos_solo=True)
+                jugadores = db.get_jugadores_rows(activos_solo=True)
                 jugadores_data = [
                     {
                         'id': j.id,
@@ -695,7 +774,7 @@ def register_partidos_callbacks():
                 
         except Exception as e:
             print(f"Error cargando partidos: {e}")
-            return [], []
+            return {'jugados': 0, 'proximos': 0}, []
     
     @callback(
         Output("partidos-content", "children"),
@@ -704,16 +783,50 @@ def register_partidos_callbacks():
     )
     def update_partidos_content(active_tab, partidos_data):
         """Actualiza el contenido según la pestaña activa"""
+        partidos_data = partidos_data or {}
         if active_tab == "tab-proximos":
-            return create_proximos_partidos_content(partidos_data)
+            if not partidos_data.get('proximos'):
+                return create_proximos_partidos_content([])
+            try:
+                with DatabaseManager() as db:
+                    proximos = db.db.query(Calendario).filter(Calendario.fecha >= date.today()).order_by(
+                        Calendario.fecha.asc(), Calendario.hora.asc()
+                    ).limit(MAX_PROXIMOS_PARTIDOS).all()
+                    return create_proximos_partidos_content([format_partido_row(p) for p in proximos])
+            except Exception as e:
+                print(f"Error cargando próximos partidos: {e}")
+                return html.P("Error cargando partidos", className="text-center text-danger p-4")
         elif active_tab == "tab-jugados":
-            return create_partidos_jugados_content(partidos_data)
+            return create_partidos_jugados_content(partidos_data.get('jugados'))
         elif active_tab == "tab-convocatorias":
             return html.P("Gestión de convocatorias en desarrollo", className="text-center text-muted p-4")
         elif active_tab == "tab-eventos":
             return html.P("Gestión de eventos en desarrollo", className="text-center text-muted p-4")
         return html.Div()
     
+    @callback(
+        [Output("partidos-jugados-table", "data"),
+         Output("partidos-jugados-table", "page_count")],
+        [Input("partidos-jugados-table", "page_current"),
+         Input("partidos-jugados-table", "page_size"),
+         Input("partidos-jugados-table", "sort_by"),
+         Input("partidos-jugados-table", "filter_query"),
+         Input("partidos-data", "data")]
+    )
+    def page_partidos_jugados(page_current, page_size, sort_by, filter_query, partidos_data):
+        """Devuelve solo la página visible de partidos jugados"""
+        try:
+            with DatabaseManager() as db:
+                query = db.db.query(Calendario).filter(Calendario.fecha < date.today())
+                return paginate_query(
+                    query, PARTIDOS_JUGADOS_COLUMNS, format_partido_jugado_row,
+                    page_current, page_size, sort_by, filter_query,
+                    default_order=[Calendario.fecha.desc(), Calendario.id.desc()]
+                )
+        except Exception as e:
+            print(f"Error paginando partidos jugados: {e}")
+            return [], 1
+    
     @callback(
         [Output("convocatoria-modal", "is_open")],
         [Input("btn-gestionar-convocatoria", "n_clicks"),
@@ -737,116 +850,78 @@ def register_partidos_callbacks():
             return [False]
         
         return [is_open]
-# NUEVO: Callback para importar datos de FFCV
+    # Importación FFCV: se encola un trabajo y la interfaz consulta su estado
     @callback(
         [Output("scraping-modal", "is_open"),
          Output("scraping-modal-content", "children"),
-         Output("partidos-data", "data", allow_duplicate=True)],
+         Output("scraping-job-id", "data"),
+         Output("scraping-job-interval", "disabled")],
         [Input("btn-import-ffcv", "n_clicks"),
          Input("btn-close-scraping-modal", "n_clicks")],
         [State("input-ffcv-url", "value"),
-         State("scraping-modal", "is_open"),
-         State("partidos-data", "data")],
+         State("scraping-modal", "is_open")],
         prevent_initial_call=True
     )
-    def import_ffcv_data(btn_import, btn_close, ffcv_url, modal_open, current_data):
-        """Importa datos desde FFCV"""
+    def import_ffcv_data(btn_import, btn_close, ffcv_url, modal_open):
+        """Lanza la importación desde FFCV en segundo plano"""
         from dash.callback_context import triggered
         
         if not triggered:
-            return modal_open, html.Div(), current_data
+            return modal_open, no_update, no_update, no_update
         
         trigger_id = triggered[0]['prop_id'].split('.')[0]
         
         if trigger_id == "btn-close-scraping-modal":
-            return False, html.Div(), current_data
+            # El trabajo sigue en curso; el intervalo sigue activo para recargar los datos al terminar
+            return False, no_update, no_update, no_update
         
-        if trigger_id == "btn-import-ffcv" and ffcv_url:
+        urls = parse_ffcv_urls(ffcv_url)
+        if trigger_id == "btn-import-ffcv" and urls:
             try:
-                # Configurar y ejecutar scraping
-                scraping_manager.configure_ffcv_scraper(ffcv_url)
-                result = scraping_manager.perform_ffcv_scraping()
-                
-                if result['success']:
-                    # Recargar datos de partidos
-                    with DatabaseManager() as db:
-                        calendario = db.get_calendario()
-                        partidos_data = []
-                        
-                        for evento in calendario:
-                            # Determinar rival y si es local o visitante
-                            if evento.equipo_local == "U.D. Atzeneta de Castellón 'A'":
-                                rival = evento.equipo_visitante
-                                local_visitante = "Local"
-                            else:
-                                rival = evento.equipo_local
-                                local_visitante = "Visitante"
-                            
-                            # Determinar resultado
-                            if evento.goles_equipo_local is not None and evento.goles_equipo_visitante is not None:
-                                if evento.equipo_local == "U.D. Atzeneta de Castellón 'A'":
-                                    if evento.goles_equipo_local > evento.goles_equipo_visitante:
-                                        resultado = f"Victoria {evento.goles_equipo_local}-{evento.goles_equipo_visitante}"
-                                    elif evento.goles_equipo_local < evento.goles_equipo_visitante:
-                                        resultado = f"Derrota {evento.goles_equipo_local}-{evento.goles_equipo_visitante}"
-                                    else:
-                                        resultado = f"Empate {evento.goles_equipo_local}-{evento.goles_equipo_visitante}"
-                                else:
-                                    if evento.goles_equipo_visitante > evento.goles_equipo_local:
-                                        resultado = f"Victoria {evento.goles_equipo_visitante}-{evento.goles_equipo_local}"
-                                    elif evento.goles_equipo_visitante < evento.goles_equipo_local:
-                                        resultado = f"Derrota {evento.goles_equipo_visitante}-{evento.goles_equipo_local}"
-                                    else:
-                                        resultado = f"Empate {evento.goles_equipo_visitante}-{evento.goles_equipo_local}"
-                            else:
-                                resultado = "Por jugar"
-                            
-                            partidos_data.append({
-                                'id': evento.id,
-                                'fecha': evento.fecha.strftime("%d/%m/%Y"),
-                                'fecha_obj': evento.fecha,
-                                'hora': evento.hora,
-                                'competicion': evento.competicion,
-                                'jornada': evento.jornada,
-                                'equipo_local': evento.equipo_local,
-                                'equipo_visitante': evento.equipo_visitante,
-                                'rival': rival,
-                                'local_visitante': local_visitante,
-                                'resultado': resultado,
-                                'campo': evento.campo,
-                                'arbitro': evento.arbitro
-                            })
-                    
-                    modal_content = dbc.Alert([
-                        html.H5("¡Importación Exitosa!", className="alert-heading"),
-                        html.P(f"Se han importado {result['total_matches']} partidos."),
-                        html.Hr(),
-                        html.P([
-                            html.Strong("Nuevos: "), f"{result['created']} partidos", html.Br(),
-                            html.Strong("Actualizados: "), f"{result['updated']} partidos", html.Br(),
-                            html.Strong("Tiempo: "), f"{result['elapsed_time']:.2f} segundos"
-                        ])
-                    ], color="success")
-                    
-                    return True, modal_content, partidos_data
-                    
-                else:
-                    modal_content = dbc.Alert([
-                        html.H5("Error en la Importación", className="alert-heading"),
-                        html.P(f"Error: {result['error']}")
-                    ], color="danger")
-                    
-                    return True, modal_content, current_data
-                    
+                from utils.scraping import run_ffcv_import_job
+                job_id = job_runner.submit('importacion_ffcv', run_ffcv_import_job, urls)
+                return True, create_import_progress_content(None), job_id, False
             except Exception as e:
                 modal_content = dbc.Alert([
                     html.H5("Error Inesperado", className="alert-heading"),
                     html.P(f"Error: {str(e)}")
                 ], color="danger")
-                
-                return True, modal_content, current_data
+                return True, modal_content, None, True
+        
+        return modal_open, no_update, no_update, no_update
+    
+    @callback(
+        [Output("scraping-modal-content", "children", allow_duplicate=True),
+         Output("scraping-job-interval", "disabled", allow_duplicate=True),
+         Output("partidos-data", "data", allow_duplicate=True)],
+        Input("scraping-job-interval", "n_intervals"),
+        State("scraping-job-id", "data"),
+        prevent_initial_call=True
+    )
+    def poll_ffcv_import(n_intervals, job_id):
+        """Muestra el progreso de la importación y recarga los partidos al terminar"""
+        job = job_runner.get_job(job_id)
+        if job is None:
+            return no_update, True, no_update
+        
+        if job['activo']:
+            return create_import_progress_content(job), False, no_update
+        
+        if job['estado'] == 'error':
+            modal_content = dbc.Alert([
+                html.H5("Error Inesperado", className="alert-heading"),
+                html.P(f"Error: {job['error']}")
+            ], color="danger")
+            return modal_content, True, no_update
+        
+        result = job['resultado']
+        if not result['success'] or result.get('unchanged'):
+            return create_import_result_content(result), True, no_update
+        
+        with DatabaseManager() as db:
+            partidos_data = count_partidos(db)
         
-        return modal_open, html.Div(), current_data
+        return create_import_result_content(result), True, partidos_data
 
 # Registrar callbacks al importar
 if 'register_partidos_callbacks' in globals():
@@ -1,13 +1,15 @@
 import dash_bootstrap_components as dbc
 from dash import html, dcc, Input, Output, State, callback, dash_table
-import pandas as pd
 import plotly.graph_objs as go
-import plotly.express as px
 from datetime import datetime, date, timedelta
-from database.db_manager import DatabaseManager, Puntuacion
+from sqlalchemy import func
+from sqlalchemy.orm import contains_eager
+from database.db_manager import DatabaseManager, Jugador, Puntuacion
 from layouts.main_content import create_stats_card
 from config.settings import COLORS
 from utils.header_utils import create_page_header
+from utils.table_paging import create_paged_table, paginate_query
+from utils.export import export_components, register_export_callbacks
 
 def create_puntuacion_layout():
     """Crea el layout principal de la página de puntuación"""
@@ -28,7 +30,11 @@ def create_puntuacion_layout():
                 dbc.Button([
                     html.I(className="fas fa-chart-bar me-2"),
                     "Estadísticas"
-                ], id="btn-stats-puntuacion", color="info", outline=True)
+                ], id="btn-stats-puntuacion", color="info", outline=True),
+                dbc.Button([
+                    html.I(className="fas fa-download me-2"),
+                    "Exportar"
+                ], id="btn-exportar-puntuacion", color="secondary", outline=True)
             ]
         ),
         
@@ -58,7 +64,9 @@ def create_puntuacion_layout():
         # Stores
         dcc.Store(id="puntuaciones-data"),
         dcc.Store(id="ranking-data"),
-        dcc.Store(id="jugadores-puntuacion-data")
+        dcc.Store(id="jugadores-puntuacion-data"),
+        dcc.Store(id="puntuacion-page-load"),
+        export_components("puntuacion")
     ])
 
 def create_puntuacion_stats_section():
@@ -141,8 +149,7 @@ def create_puntuacion_modal():
                         dbc.Label("Fecha *"),
                         dbc.Input(
                             id="input-fecha-puntuacion",
-                            type="date",
-                            value=datetime.now().strftime("%Y-%m-%d")
+                            type="date"
                         )
                     ], width=6)
                 ], className="mb-3"),
@@ -422,15 +429,35 @@ def create_ranking_table(ranking_data):
         html.Tbody(table_rows)
     ], striped=True, hover=True, responsive=True)
 
-def create_historial_content(puntuaciones_data):
-    """Crea el contenido del historial de puntuaciones"""
-    if not puntuaciones_data:
+# Columnas del historial -> columnas SQL para filtrar y ordenar en servidor
+PUNTUACIONES_HISTORIAL_COLUMNS = {
+    'fecha': Puntuacion.fecha,
+    'jugador_nombre': Jugador.nombre_futbolistico,
+    'puntos': Puntuacion.puntos,
+    'concepto': Puntuacion.concepto,
+    'observaciones': Puntuacion.observaciones
+}
+
+def format_puntuacion_row(punt):
+    """Convierte una puntuación (con su jugador cargado) en una fila de datos"""
+    jugador = punt.jugador
+    return {
+        'id': punt.id,
+        'jugador_id': punt.jugador_id,
+        'jugador_nombre': jugador.nombre_futbolistico if jugador else 'Desconocido',
+        'fecha': punt.fecha.strftime("%d/%m/%Y"),
+        'puntos': punt.puntos,
+        'concepto': punt.concepto,
+        'observaciones': punt.observaciones
+    }
+
+def create_historial_content(total_puntuaciones):
+    """Crea el contenido del historial de puntuaciones (paginado en servidor)"""
+    if not total_puntuaciones:
         return html.P("No hay puntuaciones registradas", className="text-center text-muted p-4")
     
-    df = pd.DataFrame(puntuaciones_data)
-    
-    return dash_table.DataTable(
-        data=df.to_dict('records'),
+    return create_paged_table(
+        "puntuaciones-historial-table",
         columns=[
             {"name": "Fecha", "id": "fecha", "type": "datetime"},
             {"name": "Jugador", "id": "jugador_nombre", "type": "text"},
@@ -439,18 +466,10 @@ def create_historial_content(puntuaciones_data):
             {"name": "Observaciones", "id": "observaciones", "type": "text"}
         ],
         style_cell={
-            'textAlign': 'left',
-            'padding': '12px',
-            'fontFamily': 'Arial',
             'maxWidth': '200px',
             'overflow': 'hidden',
             'textOverflow': 'ellipsis'
         },
-        style_header={
-            'backgroundColor': COLORS['primary'],
-            'color': 'white',
-            'fontWeight': 'bold'
-        },
         style_data_conditional=[
             {
                 'if': {'filter_query': '{puntos} > 0'},
@@ -462,16 +481,23 @@ def create_historial_content(puntuaciones_data):
                 'backgroundColor': '#f8d7da',
                 'color': 'black',
             }
-        ],
-        sort_action="native",
-        filter_action="native",
-        page_size=15
+        ]
     )
 
 # Callbacks para puntuación
 def register_puntuacion_callbacks():
     """Registra los callbacks de la página de puntuación"""
     
+    @callback(
+        Output("input-fecha-puntuacion", "value"),
+        Input("puntuacion-page-load", "data")
+    )
+    def set_default_dates(_):
+        """Fecha por defecto calculada en cada visita (el layout está memoizado)"""
+        return datetime.now().strftime("%Y-%m-%d")
+    
+    register_export_callbacks("puntuacion", "btn-exportar-puntuacion")
+    
     @callback(
         [Output("puntuaciones-data", "data"),
          Output("ranking-data", "data"),
@@ -480,58 +506,16 @@ def register_puntuacion_callbacks():
         prevent_initial_call=False
     )
     def load_puntuacion_data(n_clicks):
-        """Carga los datos de puntuación"""
+        """Carga el ranking y las opciones de jugadores (el historial se pide página a página)"""
         try:
             with DatabaseManager() as db:
-                # Cargar puntuaciones
-                puntuaciones = db.db.query(Puntuacion).order_by(Puntuacion.fecha.desc()).all()
-                puntuaciones_data = []
+                puntuaciones_data = {'total': db.db.query(func.count(Puntuacion.id)).scalar() or 0}
                 
-                for punt in puntuaciones:
-                    jugador = db.get_jugador_by_id(punt.jugador_id)
-                    puntuaciones_data.append({
-                        'id': punt.id,
-                        'jugador_id': punt.jugador_id,
-                        'jugador_nombre': jugador.nombre_futbolistico if jugador else 'Desconocido',
-                        'fecha': punt.fecha.strftime("%d/%m/%Y"),
-                        'puntos': punt.puntos,
-                        'concepto': punt.concepto,
-                        'observaciones': punt.observaciones
-                    })
-                
-                # Calcular ranking
-                ranking_dict = {}
-                for punt in puntuaciones_data:
-                    jugador_id = punt['jugador_id']
-                    if jugador_id not in ranking_dict:
-                        ranking_dict[jugador_id] = {
-                            'jugador_id': jugador_id,
-                            'jugador_nombre': punt['jugador_nombre'],
-                            'total_puntos': 0,
-                            'puntos_positivos': 0,
-                            'puntos_negativos': 0,
-                            'total_registros': 0
-                        }
-                    
-                    puntos = punt['puntos']
-                    ranking_dict[jugador_id]['total_puntos'] += puntos
-                    ranking_dict[jugador_id]['total_registros'] += 1
-                    
-                    if puntos > 0:
-                        ranking_dict[jugador_id]['puntos_positivos'] += puntos
-                    else:
-                        ranking_dict[jugador_id]['puntos_negativos'] += puntos
-                
-                # Calcular promedios y ordenar
-                ranking_data = []
-                for jugador_id, data in ranking_dict.items():
-                    data['promedio_puntos'] = data['total_puntos'] / data['total_registros'] if data['total_registros'] > 0 else 0
-                    ranking_data.append(data)
-                
-                ranking_data.sort(key=lambda x: x['total_puntos'], reverse=True)
+                # Ranking mantenido de forma incremental en la tabla agregada
+                ranking_data = db.get_ranking_puntuaciones()
                 
                 # Cargar jugadores
-                jugadores = db.get_jugadores(activos_solo=True)
+                jugadores = db.get_jugadores_rows(activos_solo=True)
                 jugadores_options = [
                     {"label": j.nombre_futbolistico, "value": j.id}
                     for j in jugadores
@@ -541,7 +525,7 @@ def register_puntuacion_callbacks():
                 
         except Exception as e:
             print(f"Error cargando puntuaciones: {e}")
-            return [], [], []
+            return {'total': 0}, [], []
     
     @callback(
         Output("puntuacion-content", "children"),
@@ -554,13 +538,38 @@ def register_puntuacion_callbacks():
         if active_tab == "tab-ranking":
             return create_ranking_content(ranking_data)
         elif active_tab == "tab-historial":
-            return create_historial_content(puntuaciones_data)
+            return create_historial_content((puntuaciones_data or {}).get('total'))
         elif active_tab == "tab-evolucion":
             return html.P("Gráficos de evolución en desarrollo", className="text-center text-muted p-4")
         elif active_tab == "tab-comparativas":
             return html.P("Análisis comparativo en desarrollo", className="text-center text-muted p-4")
         return html.Div()
     
+    @callback(
+        [Output("puntuaciones-historial-table", "data"),
+         Output("puntuaciones-historial-table", "page_count")],
+        [Input("puntuaciones-historial-table", "page_current"),
+         Input("puntuaciones-historial-table", "page_size"),
+         Input("puntuaciones-historial-table", "sort_by"),
+         Input("puntuaciones-historial-table", "filter_query"),
+         Input("puntuaciones-data", "data")]
+    )
+    def page_puntuaciones_historial(page_current, page_size, sort_by, filter_query, puntuaciones_data):
+        """Devuelve solo la página visible del historial de puntuaciones"""
+        try:
+            with DatabaseManager() as db:
+                query = db.db.query(Puntuacion).outerjoin(Puntuacion.jugador).options(
+                    contains_eager(Puntuacion.jugador)
+                )
+                return paginate_query(
+                    query, PUNTUACIONES_HISTORIAL_COLUMNS, format_puntuacion_row,
+                    page_current, page_size, sort_by, filter_query,
+                    default_order=[Puntuacion.fecha.desc(), Puntuacion.id.desc()]
+                )
+        except Exception as e:
+            print(f"Error paginando puntuaciones: {e}")
+            return [], 1
+    
     @callback(
         [Output("puntuacion-modal", "is_open")],
         [Input("btn-nueva-puntuacion", "n_clicks"),
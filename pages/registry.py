@@ -0,0 +1,107 @@
+# pages/registry.py - Registro de páginas de la aplicación
+#
+# Cada ruta se asocia a su módulo de pages/. Los módulos se importan la
+# primera vez que se piden (o desde el hilo de precarga de app.py) y al
+# importarse registran sus callbacks, así que cada callback se registra una
+# sola vez. Los layouts se construyen una vez al importar el módulo y se
+# reutilizan en cada navegación, así que no pueden depender del momento en
+# que se construyen: los datos llegan por callbacks y los valores que cambian
+# con el día (fechas por defecto de filtros y formularios) los pone un
+# callback de la página al cargarla.
+
+import time
+import importlib
+import threading
+from utils.startup_profile import startup_phase
+
+PAGE_REGISTRY = {
+    '/dashboard': {'module': 'dashboard', 'title': 'Dashboard', 'icon': 'fas fa-tachometer-alt'},
+    '/calendario': {'module': 'calendario', 'title': 'Calendario', 'icon': 'fas fa-calendar'},
+    '/jugadores': {'module': 'jugadores', 'title': 'Jugadores', 'icon': 'fas fa-users'},
+    '/partidos': {'module': 'partidos', 'title': 'Partidos', 'icon': 'fas fa-futbol'},
+    '/entrenamientos': {'module': 'entrenamientos', 'title': 'Entrenamientos', 'icon': 'fas fa-running'},
+    '/objetivos': {'module': 'objetivos', 'title': 'Objetivos', 'icon': 'fas fa-bullseye'},
+    '/puntuacion': {'module': 'puntuacion', 'title': 'Puntuación', 'icon': 'fas fa-star'},
+    '/multas': {'module': 'multas', 'title': 'Multas', 'icon': 'fas fa-euro-sign'},
+}
+
+DEFAULT_PATH = '/dashboard'
+
+class PageRegistry:
+    """Importación perezosa de las páginas y memoización de sus layouts"""
+
+    def __init__(self, pages=None, package='pages'):
+        self.pages = pages or PAGE_REGISTRY
+        self.package = package
+        self.load_times = {}
+        self._modules = {}
+        self._layouts = {}
+        self._lock = threading.RLock()
+        self._warm_up_thread = None
+
+    def resolve(self, pathname):
+        """Ruta registrada para pathname (el dashboard para '/' o rutas desconocidas)"""
+        return pathname if pathname in self.pages else DEFAULT_PATH
+
+    def get_page(self, pathname):
+        return self.pages[self.resolve(pathname)]
+
+    def get_module(self, pathname):
+        """Importa (una sola vez) el módulo de la página"""
+        path = self.resolve(pathname)
+        module = self._modules.get(path)
+        if module is not None:
+            return module
+
+        with self._lock:
+            if path not in self._modules:
+                inicio = time.perf_counter()
+                self._modules[path] = importlib.import_module(f"{self.package}.{self.pages[path]['module']}")
+                self.load_times[path] = time.perf_counter() - inicio
+            return self._modules[path]
+
+    def get_layout(self, pathname):
+        """Layout memoizado de la página"""
+        path = self.resolve(pathname)
+        layout = self._layouts.get(path)
+        if layout is not None:
+            return layout
+
+        module = self.get_module(path)
+        with self._lock:
+            if path not in self._layouts:
+                factory = getattr(module, f"create_{self.pages[path]['module']}_layout", None)
+                layout = getattr(module, 'layout', None)
+                if layout is None and factory is None:
+                    raise AttributeError(f"El módulo {module.__name__} no define layout")
+                self._layouts[path] = layout if layout is not None else factory()
+            return self._layouts[path]
+
+    def is_loaded(self, pathname):
+        return self.resolve(pathname) in self._modules
+
+    def warm_up(self):
+        """Importa todas las páginas (registra sus callbacks y construye sus layouts)"""
+        inicio = time.perf_counter()
+        with startup_phase('precarga de páginas'):
+            for path in self.pages:
+                try:
+                    self.get_layout(path)
+                except Exception as e:
+                    print(f"Error precargando la página {path}: {e}")
+        print(f"✅ Páginas precargadas en {time.perf_counter() - inicio:.2f}s")
+
+    def start_warm_up(self):
+        """Precarga las páginas en un hilo para no retrasar el arranque del worker"""
+        if self._warm_up_thread is None:
+            self._warm_up_thread = threading.Thread(target=self.warm_up, name='precarga-paginas', daemon=True)
+            self._warm_up_thread.start()
+        return self._warm_up_thread
+
+    def wait_warm_up(self, timeout=None):
+        """Espera a que termine la precarga (si se ha iniciado)"""
+        if self._warm_up_thread is not None:
+            self._warm_up_thread.join(timeout)
+
+# Instancia global usada por app.py
+page_registry = PageRegistry()
@@ -7,6 +7,7 @@ Uso:
     python setup.py install    # Instalación completa
     python setup.py configure  # Solo configuración
     python setup.py test       # Ejecutar tests
+    python setup.py --profile-startup  # Tiempos de importación e inicialización
 """
 
 import os
@@ -149,6 +150,21 @@ def run_tests():
         print("⚠️  pytest no está instalado, omitiendo tests...")
         return True
 
+def profile_startup():
+    """Muestra cuánto tarda cada importación y fase del arranque de la aplicación"""
+    print("\n⏱️  Perfilando el arranque de la aplicación...")
+    
+    try:
+        sys.path.insert(0, os.getcwd())
+        from utils.startup_profile import profile_startup as run_profile, print_startup_profile
+        
+        print_startup_profile(run_profile())
+        return True
+        
+    except Exception as e:
+        print(f"❌ Error perfilando el arranque: {e}")
+        return False
+
 def check_application():
     """Verifica que la aplicación se puede importar correctamente"""
     print("\n🔍 Verificando aplicación...")
@@ -314,12 +330,20 @@ def main():
     """Función principal"""
     parser = argparse.ArgumentParser(description='Setup para UD Atzeneta')
     parser.add_argument('command', 
+                       nargs='?',
                        choices=['install', 'configure', 'test'], 
                        help='Comando a ejecutar')
+    parser.add_argument('--profile-startup',
+                       action='store_true',
+                       help='Mide las importaciones y la inicialización al arrancar la aplicación')
     
     args = parser.parse_args()
     
-    if args.command == 'install':
+    if args.profile_startup:
+        success = profile_startup()
+    elif args.command is None:
+        parser.error('Indica un comando o --profile-startup')
+    elif args.command == 'install':
         success = install_full()
     elif args.command == 'configure':
         success = configure_only()
@@ -0,0 +1,145 @@
+"""
+Tests de los datos sintéticos y del backup y la restauración en streaming
+Ejecutar con: python -m pytest test_backup.py -v
+"""
+
+import pytest
+import os
+from datetime import date
+import tempfile
+
+from database.db_manager import (
+    rebuild_ranking_puntuaciones, Jugador, Puntuacion
+)
+
+
+class TestSyntheticData:
+    """Tests para el generador de temporadas sintéticas"""
+    
+    def generar(self, tmp, temporadas, hoy=date(2024, 6, 1)):
+        from database.db_manager import Base, create_db_engine
+        from database.synthetic_data import generate_synthetic_data
+        
+        engine = create_db_engine(f"sqlite:///{os.path.join(tmp, 'sintetico.db')}")
+        Base.metadata.create_all(bind=engine)
+        return engine, generate_synthetic_data(engine, temporadas=temporadas, hoy=hoy)
+    
+    def test_rellena_todos_los_modelos(self):
+        """Todas las tablas de datos reciben filas y solo la última plantilla queda activa"""
+        from sqlalchemy import func, select
+        from database.db_manager import Jugador, RankingPuntuacion
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, datos = self.generar(tmp, temporadas=2)
+            with engine.connect() as conn:
+                activos = conn.scalar(select(func.count()).where(Jugador.activo == True))
+                ranking = conn.scalar(select(func.count()).select_from(RankingPuntuacion))
+            engine.dispose()
+        
+        assert all(n > 0 for n in datos['conteos'].values())
+        assert activos == len(datos['jugadores_activos']) == 25
+        assert ranking > 0
+        # Temporada completa: 25 jugadores convocables en cada partido jugado
+        assert datos['conteos']['convocatorias_partido'] == 25 * datos['conteos']['partidos']
+    
+    def test_escala_y_determinismo(self):
+        """El volumen crece con las temporadas y la misma semilla repite los datos"""
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, una = self.generar(tmp, temporadas=1)
+            engine.dispose()
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, otra = self.generar(tmp, temporadas=1)
+            engine.dispose()
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, tres = self.generar(tmp, temporadas=3)
+            engine.dispose()
+        
+        assert una['conteos'] == otra['conteos']
+        assert una['calendario'] == otra['calendario']
+        assert tres['conteos']['calendario'] == 3 * una['conteos']['calendario']
+        assert tres['conteos']['asistencia_entrenamientos'] > 2 * una['conteos']['asistencia_entrenamientos']
+
+
+class TestStreamingBackup:
+    """Tests para el backup y la restauración en streaming"""
+    
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        from database.db_manager import Base, create_db_engine
+        from database.synthetic_data import generate_synthetic_data
+        
+        self.tmp = tempfile.TemporaryDirectory()
+        self.origen = create_db_engine(f"sqlite:///{os.path.join(self.tmp.name, 'origen.db')}")
+        self.destino = create_db_engine(f"sqlite:///{os.path.join(self.tmp.name, 'destino.db')}")
+        Base.metadata.create_all(bind=self.origen)
+        Base.metadata.create_all(bind=self.destino)
+        generate_synthetic_data(self.origen, temporadas=2, hoy=date(2024, 6, 1))
+        self.backup = os.path.join(self.tmp.name, 'backup.ndjson.gz')
+    
+    def teardown_method(self):
+        """Limpieza después de cada test"""
+        self.origen.dispose()
+        self.destino.dispose()
+        self.tmp.cleanup()
+    
+    def filas(self, engine, tabla):
+        from sqlalchemy import text
+        with engine.connect() as conn:
+            return conn.execute(text(f"SELECT * FROM {tabla} ORDER BY 1")).fetchall()
+    
+    def test_backup_y_restauracion_completos(self):
+        """La restauración reproduce todas las tablas, fechas incluidas, y recalcula el ranking"""
+        from database.backup import write_backup, restore_backup, BACKUP_TABLES
+        
+        escritas = write_backup(self.backup, self.origen, batch_size=100)
+        # Lotes pequeños para que cada tabla se inserte en varios
+        restauradas = restore_backup(self.backup, self.destino, batch_size=100)
+        
+        assert escritas == restauradas
+        assert set(escritas) == set(BACKUP_TABLES)
+        for tabla in list(BACKUP_TABLES) + ['ranking_puntuaciones']:
+            assert self.filas(self.origen, tabla) == self.filas(self.destino, tabla), tabla
+    
+    def test_backup_truncado_no_modifica_nada(self):
+        """Un fichero sin el resumen final se rechaza sin tocar los datos actuales"""
+        import gzip
+        from database.backup import write_backup, restore_backup
+        
+        write_backup(self.backup, self.origen)
+        with gzip.open(self.backup, 'rt', encoding='utf-8') as f:
+            lineas = f.readlines()
+        truncado = os.path.join(self.tmp.name, 'truncado.ndjson.gz')
+        with gzip.open(truncado, 'wt', encoding='utf-8') as f:
+            f.writelines(lineas[:len(lineas) // 2])
+        
+        antes = self.filas(self.origen, 'jugadores')
+        with pytest.raises(ValueError):
+            restore_backup(truncado, self.origen)
+        assert self.filas(self.origen, 'jugadores') == antes
+    
+    def test_fallo_en_estadisticas_no_modifica_nada(self, monkeypatch):
+        """Si falla el recálculo de estadísticas no queda nada restaurado"""
+        import database.backup as backup
+        from sqlalchemy import insert
+        from database.db_manager import SessionLocal, rebuild_ranking_puntuaciones
+        
+        backup.write_backup(self.backup, self.origen)
+        with self.destino.begin() as conn:
+            conn.execute(insert(Jugador.__table__).values(id=1, nombre_futbolistico="Anterior",
+                                                          nombre="Jugador", apellidos="Anterior"))
+            conn.execute(insert(Puntuacion.__table__).values(jugador_id=1, fecha=date(2024, 1, 1),
+                                                             puntos=3, concepto="Anterior"))
+        session = SessionLocal(bind=self.destino)
+        rebuild_ranking_puntuaciones(session)
+        session.close()
+        
+        def falla(db, temporadas=None, commit=True):
+            raise RuntimeError("fallo al recalcular estadísticas")
+        monkeypatch.setattr(backup, 'rebuild_estadisticas_jugadores', falla)
+        
+        antes = {tabla: self.filas(self.destino, tabla)
+                 for tabla in ('jugadores', 'puntuaciones', 'ranking_puntuaciones')}
+        with pytest.raises(RuntimeError):
+            backup.restore_backup(self.backup, self.destino)
+        for tabla, filas in antes.items():
+            assert self.filas(self.destino, tabla) == filas, tabla
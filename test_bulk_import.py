@@ -0,0 +1,131 @@
+"""
+Tests de la importación masiva desde CSV
+Ejecutar con: python -m pytest test_bulk_import.py -v
+"""
+
+import pytest
+import os
+from datetime import date
+import tempfile
+
+from database.db_manager import Jugador, AsistenciaEntrenamiento
+from utils.helpers import validate_email, validate_dni, validate_phone
+
+
+class TestBulkImport:
+    """Tests para la importación masiva desde CSV"""
+    
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        from database.db_manager import Base, create_db_engine
+        
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_db_engine(f"sqlite:///{os.path.join(self.tmp.name, 'importacion.db')}")
+        Base.metadata.create_all(bind=self.engine)
+    
+    def teardown_method(self):
+        """Limpieza después de cada test"""
+        self.engine.dispose()
+        self.tmp.cleanup()
+    
+    def csv(self, nombre, contenido):
+        ruta = os.path.join(self.tmp.name, nombre)
+        with open(ruta, 'w', encoding='utf-8') as f:
+            f.write(contenido)
+        return ruta
+    
+    def test_validacion_por_lotes_igual_que_helpers(self):
+        """Los validadores por columnas dan el mismo resultado que los de utils.helpers"""
+        import pandas as pd
+        from utils.bulk_import import valid_dni_series, valid_email_series, valid_phone_series
+        
+        dnis = ['12345678Z', '12345678z', '12345678A', '1234567Z', 'X1234567L', '']
+        emails = ['test@example.com', 'a.b+c@dominio.es', 'invalid-email', '@example.com', 'a@b', '']
+        telefonos = ['612345678', '+34 612 345 678', '912-345-678', '123456789', '+44612345678', '']
+        
+        assert valid_dni_series(pd.Series(dnis)).tolist() == [validate_dni(d) for d in dnis]
+        assert valid_email_series(pd.Series(emails)).tolist() == [validate_email(e) for e in emails]
+        assert valid_phone_series(pd.Series(telefonos)).tolist() == [validate_phone(t) for t in telefonos]
+    
+    def test_importa_validas_y_rechaza_por_fila(self):
+        """Las filas incorrectas van al fichero de rechazos con su línea y motivo"""
+        import csv as csv_module
+        from sqlalchemy import func, select
+        from utils.bulk_import import import_csv
+        from database.db_manager import Jugador
+        
+        ruta = self.csv('jugadores.csv',
+                        "nombre_futbolistico,nombre,apellidos,email,dni,dorsal\n"
+                        "Pepe,José,García,pepe@club.es,12345678Z,9\n"
+                        "Malo,M,M,sin-arroba,12345678A,x\n"
+                        "Repe,R,R,,12345678z,10\n"
+                        "Otro,O,O,,,11\n")
+        resultado = import_csv('jugadores', ruta, engine=self.engine, chunk_size=2)
+        
+        assert resultado['importados'] == 2
+        assert resultado['rechazados'] == 2
+        with open(resultado['rechazos'], encoding='utf-8') as f:
+            rechazos = {fila['fila']: fila['motivo'] for fila in csv_module.DictReader(f)}
+        assert set(rechazos) == {'3', '4'}
+        assert 'email' in rechazos['3'] and 'dni' in rechazos['3'] and 'dorsal' in rechazos['3']
+        # El duplicado está en otro bloque: se detecta con los DNI ya importados
+        assert 'DNI' in rechazos['4']
+        
+        # Al reimportar, los jugadores con DNI ya registrado se rechazan
+        repetida = import_csv('jugadores', ruta, engine=self.engine)
+        assert repetida['rechazados'] == 3
+        with self.engine.connect() as conn:
+            assert conn.scalar(select(func.count()).where(Jugador.dni.isnot(None))) == 1
+    
+    def test_interrupcion_recalcula_ranking_de_lo_importado(self, monkeypatch):
+        """Si falla un bloque posterior, lo ya importado se conserva y entra en el ranking"""
+        from sqlalchemy import insert, select
+        from utils.bulk_import import BulkImporter
+        from database.db_manager import RankingPuntuacion
+        
+        with self.engine.begin() as conn:
+            conn.execute(insert(Jugador.__table__).values(id=1, nombre_futbolistico="Pepe",
+                                                          nombre="José", apellidos="García"))
+        ruta = self.csv('puntuaciones.csv',
+                        "jugador_id,fecha,puntos\n1,2024-01-01,3\n1,2024-01-02,2\n1,2024-01-03,5\n")
+        
+        importador = BulkImporter('puntuaciones', engine=self.engine, chunk_size=2)
+        procesar = importador._procesar_bloque
+        llamadas = []
+        def falla_segundo_bloque(bloque):
+            llamadas.append(bloque)
+            if len(llamadas) == 2:
+                raise RuntimeError("fallo en el segundo bloque")
+            return procesar(bloque)
+        monkeypatch.setattr(importador, '_procesar_bloque', falla_segundo_bloque)
+        
+        with pytest.raises(RuntimeError):
+            importador.run(ruta)
+        with self.engine.connect() as conn:
+            assert conn.scalar(select(RankingPuntuacion.total_puntos).where(
+                RankingPuntuacion.jugador_id == 1)) == 5
+    
+    def test_entidades_con_referencias(self):
+        """Multas y asistencias resuelven el jugador por DNI y crean los entrenamientos nuevos"""
+        from sqlalchemy import select
+        from utils.bulk_import import import_csv
+        from database.db_manager import Multa, AsistenciaEntrenamiento, Entrenamiento
+        
+        import_csv('jugadores', self.csv('jugadores.csv', "nombre_futbolistico,nombre,apellidos,dni\nPepe,José,García,12345678Z\n"),
+                   engine=self.engine)
+        multas = import_csv('multas', self.csv('multas.csv',
+                            "dni_jugador,fecha,razon_multa,multa,pagado\n"
+                            "12345678z,05/02/2024,Llegada tarde,\"7,5\",\n"
+                            "12345678Z,2024-02-06,Expulsión,20,25\n"), engine=self.engine)
+        asistencias = import_csv('asistencias', self.csv('asistencias.csv',
+                                 "jugador_id,numero_entrenamiento,fecha_entrenamiento,entrena\n"
+                                 "1,1,2024-01-01,no\n1,2,,si\n"), engine=self.engine)
+        
+        assert (multas['importados'], multas['rechazados']) == (1, 1)
+        assert (asistencias['importados'], asistencias['rechazados']) == (1, 1)
+        with self.engine.connect() as conn:
+            multa = conn.execute(select(Multa.jugador_id, Multa.fecha, Multa.debe, Multa.completamente_pagada)).one()
+            asistencia = conn.execute(select(AsistenciaEntrenamiento.entrena, Entrenamiento.numero_entrenamiento)
+                                      .join(Entrenamiento)).one()
+        assert multa == (1, date(2024, 2, 5), 7.5, False)
+        assert asistencia == (False, 1)
@@ -0,0 +1,503 @@
+"""
+Tests de la importación del calendario: upsert, scraping FFCV y sincronización automática
+Ejecutar con: python -m pytest test_calendario_sync.py -v
+"""
+
+import pytest
+import os
+from datetime import datetime, date
+import tempfile
+import time
+import uuid
+
+from database.db_manager import DatabaseManager, init_database, Calendario, Partido
+
+
+class TestCalendarioUpsert:
+    """Tests para la importación masiva del calendario"""
+    
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        init_database()
+        self.competicion = f"Liga {uuid.uuid4().hex[:8]}"
+    
+    def _matches(self, goles_local=1):
+        return [{
+            'fecha': date(2098, 3, 1 + i % 20),
+            'competicion': self.competicion,
+            'jornada': str(i + 1),
+            'equipo_local': "UD Atzeneta",
+            'equipo_visitante': f"Rival {i}",
+            'goles_equipo_local': goles_local if i < 10 else None,
+            'goles_equipo_visitante': 0,
+            'hora': "17:00",
+            'scrapeado': True
+        } for i in range(40)]
+    
+    def test_upsert_counts_and_statements(self, count_queries):
+        """Crear y actualizar partidos cuesta un número fijo de sentencias"""
+        with DatabaseManager() as db:
+            (created, updated), queries = count_queries(
+                lambda: db.upsert_calendario(self._matches())
+            )
+            assert (created, updated) == (40, 0)
+            assert queries <= 4
+            
+            # Solo cambian los 10 partidos con goles locales
+            (created, updated), queries = count_queries(
+                lambda: db.upsert_calendario(self._matches(goles_local=3))
+            )
+            assert (created, updated) == (0, 10)
+            assert queries <= 4
+            
+            assert db.upsert_calendario(self._matches(goles_local=3)) == (0, 0)
+            
+            partidos = db.db.query(Calendario).filter(
+                Calendario.competicion == self.competicion
+            ).all()
+            assert len(partidos) == 40
+            assert sorted(p.goles_equipo_local for p in partidos if p.goles_equipo_local)[-1] == 3
+    
+    def test_none_values_keep_existing_data(self):
+        """Un valor vacío en el scraping no borra datos guardados"""
+        from utils.scraping import FFCVScraper
+        
+        match = self._matches()[0]
+        scraper = FFCVScraper()
+        assert scraper.update_database([dict(match, arbitro="Árbitro Test")]) == (1, 0)
+        assert scraper.update_database([dict(match, goles_equipo_local=2)]) == (0, 1)
+        
+        with DatabaseManager() as db:
+            partido = db.db.query(Calendario).filter(
+                Calendario.competicion == self.competicion
+            ).one()
+            assert partido.arbitro == "Árbitro Test"
+            assert partido.goles_equipo_local == 2
+    
+    def test_migration_removes_duplicates(self):
+        """La migración 2 elimina duplicados antes de crear el índice único"""
+        from sqlalchemy import create_engine, insert, select, inspect as sa_inspect
+        from database.db_manager import Base, Partido
+        from database.migrations import (
+            run_migrations, get_table_args_indexes, QUERY_INDEX_MODELS, calendario_duplicados
+        )
+        
+        test_engine = create_engine('sqlite://')
+        Base.metadata.create_all(bind=test_engine)
+        for index in get_table_args_indexes(*QUERY_INDEX_MODELS):
+            index.drop(bind=test_engine)
+        
+        partido = {'fecha': date(2024, 9, 1), 'competicion': "Liga",
+                   'equipo_local': "UD Atzeneta", 'equipo_visitante': "Rival FC"}
+        with test_engine.begin() as conn:
+            conn.execute(insert(Calendario.__table__), [partido, partido, partido])
+            conn.execute(insert(Partido.__table__).values(
+                calendario_id=3, fecha=date(2024, 9, 1), competicion="Liga"
+            ))
+        
+        run_migrations(test_engine)
+        
+        with test_engine.connect() as conn:
+            assert conn.execute(select(Calendario.id)).scalars().all() == [1]
+            assert conn.execute(select(Partido.calendario_id)).scalar() == 1
+            # Las filas borradas quedan guardadas en calendario_duplicados
+            copias = conn.execute(select(
+                calendario_duplicados.c.calendario_id, calendario_duplicados.c.conservado_id
+            ).order_by(calendario_duplicados.c.calendario_id)).all()
+            assert copias == [(2, 1), (3, 1)]
+        indices = {i['name']: i for i in sa_inspect(test_engine).get_indexes('calendario')}
+        assert indices['ix_calendario_partido']['unique']
+
+
+class TestConcurrentScraping:
+    """Tests para el scraping concurrente de varios calendarios FFCV"""
+    
+    FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'ffcv')
+    
+    def setup_method(self):
+        """Levanta un servidor HTTP local que sirve las páginas guardadas"""
+        import threading
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+        
+        from config.settings import SCRAPING_CONFIG
+        
+        init_database()
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache_dir_original = SCRAPING_CONFIG['cache_dir']
+        SCRAPING_CONFIG['cache_dir'] = self.cache_dir
+        
+        self.requests_log = []
+        self.fail_once = {'/calendario_b.html'}
+        # Solo calendario_a responde con ETag; calendario_b se compara por hash
+        self.etag_paths = {'/calendario_a.html'}
+        fixtures_dir, log, fail_once, etag_paths = (
+            self.FIXTURES_DIR, self.requests_log, self.fail_once, self.etag_paths
+        )
+        
+        class FixtureHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                log.append((self.path, time.monotonic(), self.headers.get('If-None-Match')))
+                if self.path in fail_once:
+                    fail_once.discard(self.path)
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                path = os.path.join(fixtures_dir, os.path.basename(self.path))
+                if not os.path.exists(path):
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                with open(path, 'rb') as f:
+                    content = f.read()
+                etag = '"%s"' % uuid.uuid5(uuid.NAMESPACE_URL, content.decode('utf-8')).hex
+                if self.path in etag_paths and self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                if self.path in etag_paths:
+                    self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+            
+            def log_message(self, *args):
+                pass
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FixtureHandler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def teardown_method(self):
+        import shutil
+        from config.settings import SCRAPING_CONFIG
+        
+        self.server.shutdown()
+        self.server.server_close()
+        SCRAPING_CONFIG['cache_dir'] = self.cache_dir_original
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+    
+    def test_fetch_retries_and_host_delay(self, monkeypatch):
+        """Los 503 se reintentan y las peticiones al mismo host respetan el intervalo"""
+        from config.settings import SCRAPING_CONFIG
+        from utils.scraping import FFCVScraper
+        
+        monkeypatch.setitem(SCRAPING_CONFIG, 'delay_between_requests', 0.2)
+        monkeypatch.setitem(SCRAPING_CONFIG, 'retry_backoff', 0.05)
+        
+        scraped = FFCVScraper().scrape_ffcv_calendars([
+            f"{self.base_url}/calendario_a.html",
+            {'url': f"{self.base_url}/calendario_b.html", 'competicion': 'Copa'},
+            f"{self.base_url}/no_existe.html",
+        ], max_workers=3, parse_workers=2)
+        
+        pages = {page['url'].rsplit('/', 1)[-1]: page for page in scraped['pages']}
+        assert pages['calendario_a.html']['matches'] == 8
+        assert pages['calendario_b.html']['success'] and pages['calendario_b.html']['matches'] == 6
+        assert not pages['no_existe.html']['success']
+        assert len(scraped['matches']) == 14
+        assert {m['competicion'] for m in scraped['matches'] if "'B'" in m['equipo_local'] + m['equipo_visitante']} == {'Copa'}
+        
+        # 404 sin reintentos; 503 reintentado una vez
+        paths = [path for path, _, _ in self.requests_log]
+        assert paths.count('/no_existe.html') == 1
+        assert paths.count('/calendario_b.html') == 2
+        instantes = sorted(t for _, t, _ in self.requests_log)
+        assert all(b - a >= 0.18 for a, b in zip(instantes, instantes[1:]))
+    
+    def test_multi_scraping_single_bulk_write(self, monkeypatch):
+        """Todos los calendarios se guardan con una única escritura masiva"""
+        from config.settings import SCRAPING_CONFIG
+        from utils.scraping import ScrapingManager, FFCVScraper
+        
+        monkeypatch.setitem(SCRAPING_CONFIG, 'delay_between_requests', 0)
+        monkeypatch.setitem(SCRAPING_CONFIG, 'retry_backoff', 0)
+        
+        writes = []
+        original = FFCVScraper.update_database
+        monkeypatch.setattr(FFCVScraper, 'update_database',
+                            lambda scraper, matches: writes.append(len(matches)) or original(scraper, matches))
+        
+        manager = ScrapingManager()
+        manager.configure_ffcv_urls([f"{self.base_url}/calendario_a.html", f"{self.base_url}/calendario_b.html"])
+        result = manager.perform_ffcv_multi_scraping()
+        
+        assert result['success']
+        assert result['total_matches'] == 14
+        assert writes == [14]
+        
+        # Una segunda importación no cambia nada
+        self.fail_once.add('/calendario_b.html')
+        result = manager.perform_ffcv_multi_scraping()
+        assert (result['created'], result['updated']) == (0, 0)
+        
+        # Forzando se vuelve a parsear y escribir
+        result = manager.perform_ffcv_multi_scraping(force=True)
+        assert result['total_matches'] == 14 and not result['unchanged']
+        assert writes == [14, 14]
+        
+        with DatabaseManager() as db:
+            assert db.db.query(Calendario).filter(
+                Calendario.equipo_local.like("U.D. Atzeneta de Castellón%")
+            ).count() >= 7
+
+
+    def test_conditional_get_skips_unchanged_pages(self, monkeypatch):
+        """Las páginas sin cambios (304 o mismo hash) no se parsean ni se escriben"""
+        from config.settings import SCRAPING_CONFIG
+        from utils import scraping
+        
+        monkeypatch.setitem(SCRAPING_CONFIG, 'delay_between_requests', 0)
+        self.fail_once.clear()
+        
+        parsed = []
+        original = scraping.parse_ffcv_content
+        monkeypatch.setattr(scraping, 'parse_ffcv_content',
+                            lambda content, competicion='Liga': parsed.append(competicion) or original(content, competicion))
+        
+        manager = scraping.ScrapingManager()
+        manager.configure_ffcv_urls([f"{self.base_url}/calendario_a.html", f"{self.base_url}/calendario_b.html"])
+        assert manager.perform_ffcv_multi_scraping()['success']
+        assert len(parsed) == 2
+        
+        self.requests_log.clear()
+        result = manager.perform_ffcv_multi_scraping()
+        assert result['success'] and result['unchanged']
+        assert result['total_matches'] == 0
+        assert len(parsed) == 2
+        
+        # calendario_a se revalida con ETag (304); calendario_b se descarga y se compara el hash
+        etags = {path: etag for path, _, etag in self.requests_log}
+        assert etags['/calendario_a.html'] is not None
+        assert etags['/calendario_b.html'] is None
+
+
+    def test_cache_written_only_after_import(self, monkeypatch):
+        """Si falla la escritura las páginas no quedan en la caché y se vuelven a parsear"""
+        from config.settings import SCRAPING_CONFIG
+        from utils import scraping
+
+        monkeypatch.setitem(SCRAPING_CONFIG, 'delay_between_requests', 0)
+        self.fail_once.clear()
+
+        def fallar(scraper, matches):
+            raise RuntimeError('base de datos bloqueada')
+
+        manager = scraping.ScrapingManager()
+        manager.configure_ffcv_urls([f"{self.base_url}/calendario_a.html"])
+        manager.ffcv_scraper.cache.clear()
+        monkeypatch.setattr(scraping.FFCVScraper, 'update_database', fallar)
+        result = manager.perform_ffcv_multi_scraping()
+        assert not result['success'] and 'bloqueada' in result['error']
+        assert manager.ffcv_scraper.cache.load(f"{self.base_url}/calendario_a.html") is None
+
+        monkeypatch.undo()
+        monkeypatch.setitem(SCRAPING_CONFIG, 'delay_between_requests', 0)
+        result = manager.perform_ffcv_multi_scraping()
+        assert result['success'] and not result['unchanged'] and result['total_matches'] == 8
+        assert manager.perform_ffcv_multi_scraping()['unchanged']
+
+
+    def test_single_scraping_keeps_configured_urls(self, monkeypatch):
+        """Importar solo la primera URL no borra el resto de calendarios configurados"""
+        from config.settings import SCRAPING_CONFIG
+        from utils.scraping import ScrapingManager
+
+        monkeypatch.setitem(SCRAPING_CONFIG, 'delay_between_requests', 0)
+        self.fail_once.clear()
+
+        manager = ScrapingManager()
+        urls = [f"{self.base_url}/calendario_a.html", f"{self.base_url}/calendario_b.html"]
+        manager.configure_ffcv_urls(urls)
+        self.requests_log.clear()
+
+        assert manager.perform_ffcv_scraping(force=True)['success']
+        assert [path for path, _, _ in self.requests_log] == ['/calendario_a.html']
+        assert manager.ffcv_urls == urls
+
+
+    def test_import_job_reports_progress(self, monkeypatch):
+        """La importación en segundo plano deja su progreso y resultado en la base de datos"""
+        from config.settings import SCRAPING_CONFIG
+        from utils.jobs import JobRunner
+        from utils.scraping import run_ffcv_import_job
+        
+        monkeypatch.setitem(SCRAPING_CONFIG, 'delay_between_requests', 0)
+        monkeypatch.setitem(SCRAPING_CONFIG, 'retry_backoff', 0)
+        
+        progresos = []
+        def job(set_progress, urls):
+            return run_ffcv_import_job(lambda p, m=None: progresos.append(p) or set_progress(p, m), urls)
+        
+        runner = JobRunner(max_workers=1)
+        job_id = runner.submit('importacion_ffcv', job, [
+            f"{self.base_url}/calendario_a.html", f"{self.base_url}/calendario_b.html"
+        ])
+        trabajo = runner.wait(job_id, timeout=30)
+        
+        assert trabajo['estado'] == 'completado' and not trabajo['activo']
+        assert trabajo['resultado']['success']
+        assert trabajo['resultado']['total_matches'] == 14
+        assert progresos == sorted(progresos) and progresos[-1] == 90
+
+
+class TestFFCVParser:
+    """Tests para el parser rápido de calendarios FFCV"""
+    
+    FIXTURES = sorted(
+        os.path.join(TestConcurrentScraping.FIXTURES_DIR, nombre)
+        for nombre in os.listdir(TestConcurrentScraping.FIXTURES_DIR) if nombre.endswith('.html')
+    )
+    
+    def _backends(self):
+        from utils.ffcv_parser import lxml_available
+        return ['html.parser', 'lxml'] if lxml_available() else ['html.parser']
+    
+    @pytest.mark.parametrize('pagina', FIXTURES, ids=os.path.basename)
+    def test_same_matches_as_full_tree_parser(self, pagina):
+        """Cada backend devuelve los mismos partidos que el parseo del árbol completo"""
+        from bs4 import BeautifulSoup
+        from utils.scraping import FFCVScraper
+        
+        with open(pagina, 'rb') as f:
+            content = f.read()
+        
+        scraper = FFCVScraper()
+        referencia = scraper.parse_ffcv_calendar(BeautifulSoup(content, 'html.parser'))
+        assert referencia
+        for backend in self._backends():
+            assert scraper.parse_ffcv_html(content, backend=backend) == referencia
+    
+    def test_standalone_script_uses_shared_rows(self):
+        """El script de scraping_calendario_ffcv conserva su formato de salida"""
+        from scraping_calendario_ffcv.scraping import parse_partidos
+        
+        with open(self.FIXTURES[0], 'rb') as f:
+            partidos = parse_partidos(f.read())
+        
+        assert partidos[0]['fecha'] == '07-09-2025'
+        assert partidos[0]['tipo_competicion'] == 'Liga'
+        assert partidos[0]['jornada'] == '1'
+        assert partidos[0]['arbitro'] is None
+    
+    def test_auto_backend(self):
+        """'auto' elige lxml solo si está instalado"""
+        from utils.ffcv_parser import get_parser_backend, lxml_available
+        
+        assert get_parser_backend('auto') == ('lxml' if lxml_available() else 'html.parser')
+        assert get_parser_backend('html.parser') == 'html.parser'
+
+
+class TestSyncScheduler:
+    """Tests para la sincronización automática con la FFCV"""
+    
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        init_database()
+        self.lock_name = f"sync_test_{uuid.uuid4().hex[:8]}"
+    
+    def test_interval_tighter_in_match_window(self):
+        """En la ventana de un partido se sincroniza con más frecuencia"""
+        from config.settings import SCRAPING_CONFIG
+        from utils.scheduler import intervalo_sincronizacion
+        
+        with DatabaseManager() as db:
+            db.create_evento_calendario(
+                fecha=date(2097, 5, 10),
+                hora="17:00",
+                competicion="Liga",
+                equipo_local="UD Atzeneta",
+                equipo_visitante=f"Rival {self.lock_name}"
+            )
+            
+            partido = SCRAPING_CONFIG['sync_interval_partido']
+            normal = SCRAPING_CONFIG['sync_interval_normal']
+            assert intervalo_sincronizacion(db, datetime(2097, 5, 10, 18, 45)) == partido
+            assert intervalo_sincronizacion(db, datetime(2097, 5, 10, 16, 45)) == partido
+            assert intervalo_sincronizacion(db, datetime(2097, 5, 10, 10, 0)) == normal
+            assert intervalo_sincronizacion(db, datetime(2097, 5, 13, 18, 0)) == normal
+    
+    def test_lock_is_exclusive_until_released(self):
+        """Solo un worker puede tener el bloqueo de la tarea"""
+        with DatabaseManager() as db:
+            assert db.acquire_lock(self.lock_name, 'worker-a', ttl=60)
+            assert not db.acquire_lock(self.lock_name, 'worker-b', ttl=60)
+            db.release_lock(self.lock_name, 'worker-a')
+            assert db.acquire_lock(self.lock_name, 'worker-b', ttl=60)
+            assert db.get_tarea_programada(self.lock_name).ultima_ejecucion is not None
+    
+    def test_expired_lock_can_be_taken(self):
+        """Un bloqueo caducado (worker caído) lo puede tomar otro worker"""
+        with DatabaseManager() as db:
+            assert db.acquire_lock(self.lock_name, 'worker-a', ttl=-1)
+            assert db.acquire_lock(self.lock_name, 'worker-b', ttl=60)
+    
+    def test_only_one_worker_syncs_per_interval(self):
+        """Dos workers que despiertan a la vez solo scrapean una vez"""
+        from utils.scheduler import SyncScheduler
+        
+        llamadas = []
+        def scrape(urls):
+            llamadas.append(urls)
+            return {'success': True, 'unchanged': True, 'created': 0, 'updated': 0}
+        
+        worker_a = SyncScheduler(urls=['http://ffcv/a'], lock_name=self.lock_name, scrape=scrape)
+        worker_b = SyncScheduler(urls=['http://ffcv/a'], lock_name=self.lock_name, scrape=scrape)
+        
+        assert worker_a.run_once() is not None
+        assert worker_b.run_once() is None
+        assert worker_a.run_once() is None
+        assert len(llamadas) == 1
+        
+        # Sin URLs configuradas no se hace nada
+        assert SyncScheduler(urls=[], lock_name=self.lock_name, scrape=scrape).start() is False
+
+    def test_failed_scrape_is_retried_before_interval(self):
+        """Un scraping con success=False no se registra como ejecución y se reintenta"""
+        from utils.scheduler import SyncScheduler
+        
+        resultados = [{'success': False, 'error': "FFCV no responde"},
+                      {'success': True, 'unchanged': True, 'created': 0, 'updated': 0}]
+        worker = SyncScheduler(urls=['http://ffcv/a'], lock_name=self.lock_name,
+                               scrape=lambda urls: resultados.pop(0))
+        
+        assert worker.run_once() == {'success': False, 'error': "FFCV no responde"}
+        with DatabaseManager() as db:
+            tarea = db.get_tarea_programada(self.lock_name)
+            assert tarea.ultima_ejecucion is None
+            assert tarea.bloqueado_hasta > datetime.utcnow()
+        
+        # Durante la espera tras el fallo nadie reintenta; al acabar la espera sí
+        assert worker.run_once() is None
+        with DatabaseManager() as db:
+            db.get_tarea_programada(self.lock_name).bloqueado_hasta = datetime.utcnow()
+            db.db.commit()
+        assert worker.run_once()['success']
+        assert resultados == []
+        with DatabaseManager() as db:
+            assert db.get_tarea_programada(self.lock_name).ultima_ejecucion is not None
+    
+    def test_loop_survives_errors(self, monkeypatch):
+        """Un error al comprobar la sincronización no detiene el hilo"""
+        import threading
+        from config.settings import SCRAPING_CONFIG
+        from utils.scheduler import SyncScheduler
+
+        monkeypatch.setitem(SCRAPING_CONFIG, 'sync_check_interval', 0.01)
+        scheduler = SyncScheduler(urls=['http://ffcv/a'], lock_name=self.lock_name)
+        vueltas = []
+        segunda = threading.Event()
+
+        def run_once():
+            vueltas.append(1)
+            if len(vueltas) == 1:
+                raise RuntimeError("database is locked")
+            segunda.set()
+
+        monkeypatch.setattr(scheduler, 'run_once', run_once)
+        assert scheduler.start()
+        try:
+            assert segunda.wait(5)
+        finally:
+            scheduler.stop()
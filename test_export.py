@@ -0,0 +1,129 @@
+"""
+Tests de la exportación a CSV y Excel y de su descarga
+Ejecutar con: python -m pytest test_export.py -v
+"""
+
+import pytest
+import os
+from datetime import date
+import tempfile
+import uuid
+
+from database.db_manager import init_database
+
+
+class TestStreamingExport:
+    """Tests para la exportación en streaming a CSV y Excel"""
+    
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        from database.db_manager import Base, create_db_engine
+        from database.synthetic_data import generate_synthetic_data
+        
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = create_db_engine(f"sqlite:///{os.path.join(self.tmp.name, 'exportacion.db')}")
+        Base.metadata.create_all(bind=self.engine)
+        self.datos = generate_synthetic_data(self.engine, temporadas=1)
+    
+    def teardown_method(self):
+        """Limpieza después de cada test"""
+        self.engine.dispose()
+        self.tmp.cleanup()
+    
+    def test_csv_de_todas_las_tablas(self):
+        """Cada tabla se exporta completa en lotes, sin contraseñas y con el nombre del jugador"""
+        import csv as csv_module
+        from utils.export import EXPORT_ENTITIES, write_csv
+        
+        for entidad in EXPORT_ENTITIES:
+            ruta = os.path.join(self.tmp.name, f"{entidad}.csv")
+            filas = write_csv(entidad, ruta, self.engine, chunk_size=7)
+            with open(ruta, encoding='utf-8') as f:
+                lineas = list(csv_module.reader(f))
+            
+            esperadas = self.datos['conteos'].get(entidad, len(lineas) - 1)
+            assert filas == len(lineas) - 1 == esperadas
+            assert 'password_hash' not in lineas[0]
+            if 'jugador_id' in lineas[0]:
+                assert lineas[0][-1] == 'jugador'
+    
+    def test_anchos_con_muestra_acotada(self):
+        """El ancho de columna solo mira la muestra y tiene un máximo"""
+        from utils.export import column_widths, MAX_COLUMN_WIDTH
+        
+        anchos = column_widths(['id', 'fecha', 'observaciones'], [
+            [1, date(2024, 1, 1), None],
+            [100, date(2024, 1, 2), 'x' * 200]
+        ])
+        assert anchos == [5, 12, MAX_COLUMN_WIDTH]
+    
+    def test_excel_por_pagina(self):
+        """Cada página exporta sus tablas, una hoja por tabla"""
+        import zipfile
+        from utils.export import PAGE_EXPORTS, write_xlsx
+        pytest.importorskip('xlsxwriter')
+        
+        ruta = os.path.join(self.tmp.name, 'partidos.xlsx')
+        conteos = write_xlsx(PAGE_EXPORTS['partidos'], ruta, self.engine, chunk_size=10)
+        
+        assert list(conteos) == PAGE_EXPORTS['partidos']
+        assert conteos['eventos_partido'] == self.datos['conteos']['eventos_partido']
+        with zipfile.ZipFile(ruta) as xlsx:
+            hojas = [n for n in xlsx.namelist() if n.startswith('xl/worksheets/sheet')]
+        assert len(hojas) == 3
+    
+    def test_descarga_de_pagina(self, monkeypatch):
+        """La exportación se genera en un trabajo y se descarga desde disco con un enlace firmado"""
+        from flask import Flask
+        from config.settings import APP_CONFIG
+        from utils.jobs import job_runner
+        from utils.export import run_export_job, export_download_url, init_export_downloads
+        
+        init_database()
+        monkeypatch.setitem(APP_CONFIG, 'export_dir', os.path.join(self.tmp.name, 'exports'))
+        job_id = job_runner.submit('exportacion', run_export_job, ['multas', 'pagos_multas'], 'multas', self.engine)
+        job = job_runner.wait(job_id, timeout=60)
+        assert job['estado'] == 'completado'
+        assert job['resultado']['fichero'].startswith('multas_')
+        
+        servidor = Flask(__name__)
+        init_export_downloads(servidor)
+        cliente = servidor.test_client()
+        
+        respuesta = cliente.get(export_download_url(job_id))
+        assert respuesta.status_code == 200
+        assert job['resultado']['fichero'] in respuesta.headers['Content-Disposition']
+        with open(job['resultado']['ruta'], 'rb') as f:
+            assert respuesta.data == f.read()
+        respuesta.close()
+        
+        # Un token manipulado o de otro trabajo no descarga nada
+        assert cliente.get(export_download_url(job_id) + 'x').status_code == 403
+        assert cliente.get(export_download_url(str(uuid.uuid4()))).status_code == 404
+
+    def test_descarga_exige_sesion(self):
+        """Los botones de exportar no encolan nada sin una sesión válida"""
+        import app
+        from utils.jobs import job_runner
+
+        salidas = [('dashboard-export-job', 'data'), ('dashboard-export-interval', 'disabled'),
+                   ('dashboard-export-status', 'children')]
+        peticion = {
+            'output': '..' + '...'.join(f'{i}.{p}' for i, p in salidas) + '..',
+            'outputs': [{'id': i, 'property': p} for i, p in salidas],
+            'inputs': [{'id': 'export-dashboard', 'property': 'n_clicks', 'value': 1}],
+            'state': [{'id': 'session-store', 'property': 'data',
+                       'value': {'authenticated': True, 'user': 'admin', 'token': 'falso'}}],
+            'changedPropIds': ['export-dashboard.n_clicks']
+        }
+        cliente = app.server.test_client()
+        cliente.get('/_dash-dependencies')
+        respuesta = cliente.post('/_dash-update-component', json=peticion)
+        assert respuesta.status_code == 204
+
+        from auth.security import create_session_data
+        peticion['state'][0]['value'] = create_session_data('admin')
+        respuesta = cliente.post('/_dash-update-component', json=peticion)
+        assert respuesta.status_code == 200
+        job_id = respuesta.get_json()['response']['dashboard-export-job']['data']
+        assert job_runner.wait(job_id, timeout=60)['tipo'] == 'exportacion'
@@ -0,0 +1,77 @@
+"""
+Tests de los trabajos en segundo plano
+Ejecutar con: python -m pytest test_jobs.py -v
+"""
+
+from datetime import datetime
+import time
+import uuid
+
+from database.db_manager import DatabaseManager, init_database
+
+
+class TestJobRunner:
+    """Tests para los trabajos en segundo plano"""
+    
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        init_database()
+    
+    def test_job_progress_and_result_persisted(self):
+        """El estado, el progreso y el resultado se guardan en la tabla trabajos"""
+        import threading
+        from utils.jobs import JobRunner
+        
+        continuar = threading.Event()
+        
+        def tarea(set_progress, total):
+            set_progress(50, "Mitad")
+            continuar.wait(5)
+            return {'total': total}
+        
+        runner = JobRunner(max_workers=1)
+        job_id = runner.submit('prueba', tarea, 3)
+        
+        # Mientras está en curso, cualquier proceso puede leer su estado
+        for _ in range(100):
+            trabajo = runner.get_job(job_id)
+            if trabajo['progreso'] == 50:
+                break
+            time.sleep(0.01)
+        assert trabajo['activo'] and trabajo['mensaje'] == "Mitad"
+        
+        continuar.set()
+        trabajo = runner.wait(job_id, timeout=5)
+        assert trabajo['estado'] == 'completado'
+        assert trabajo['progreso'] == 100
+        assert trabajo['resultado'] == {'total': 3}
+    
+    def test_job_error_is_recorded(self):
+        """Una excepción deja el trabajo en estado error con su mensaje"""
+        from utils.jobs import JobRunner
+        
+        def tarea(set_progress):
+            raise ValueError("fallo de prueba")
+        
+        runner = JobRunner(max_workers=1)
+        trabajo = runner.wait(runner.submit('prueba', tarea), timeout=5)
+        assert trabajo['estado'] == 'error'
+        assert trabajo['error'] == "fallo de prueba"
+        assert runner.get_job('no-existe') is None
+
+    def test_stale_job_marked_as_error(self):
+        """Un trabajo que quedó en curso de un worker muerto deja de estar activo"""
+        from datetime import timedelta
+        from database.db_manager import Trabajo
+        from utils.jobs import JobRunner
+
+        job_id = str(uuid.uuid4())
+        with DatabaseManager() as db:
+            db.db.add(Trabajo(id=job_id, tipo='prueba', estado='en_curso', progreso=40,
+                              fecha_inicio=datetime.utcnow() - timedelta(hours=2)))
+            db.db.commit()
+
+        assert JobRunner(timeout=3 * 3600).get_job(job_id)['activo']
+        trabajo = JobRunner(timeout=60).get_job(job_id)
+        assert trabajo['estado'] == 'error' and not trabajo['activo']
+        assert trabajo['mensaje'] == 'Interrumpido'
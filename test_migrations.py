@@ -0,0 +1,59 @@
+"""
+Tests de las migraciones versionadas del esquema
+Ejecutar con: python -m pytest test_migrations.py -v
+"""
+
+import os
+import tempfile
+
+
+class TestMigrations:
+    """Tests para el ejecutor de migraciones versionadas"""
+    
+    def test_migrations_add_indexes_once(self):
+        """Las migraciones añaden los índices a una base de datos antigua una sola vez"""
+        from sqlalchemy import create_engine, inspect as sa_inspect
+        from database.db_manager import Base, Calendario
+        from database.migrations import (
+            run_migrations, get_table_args_indexes, QUERY_INDEX_MODELS, MIGRATIONS
+        )
+        
+        test_engine = create_engine('sqlite://')
+        Base.metadata.create_all(bind=test_engine)
+        for index in get_table_args_indexes(*QUERY_INDEX_MODELS):
+            index.drop(bind=test_engine)
+        
+        nombres = {i['name'] for i in sa_inspect(test_engine).get_indexes('calendario')}
+        assert 'ix_calendario_partido' not in nombres
+        
+        assert run_migrations(test_engine) == [v for v, _, _ in MIGRATIONS]
+        nombres = {i['name'] for i in sa_inspect(test_engine).get_indexes('calendario')}
+        assert {'ix_calendario_fecha', 'ix_calendario_partido'} <= nombres
+        
+        # Una segunda ejecución no vuelve a aplicar nada
+        assert run_migrations(test_engine) == []
+    
+    def test_concurrent_workers_migrate_once(self):
+        """Varios workers arrancando a la vez aplican cada migración una sola vez"""
+        import threading
+        from sqlalchemy import create_engine, select, func
+        from database.migrations import run_migrations, schema_version, MIGRATIONS
+        
+        ruta = os.path.join(tempfile.mkdtemp(), 'workers.db')
+        resultados = []
+        
+        def worker():
+            # Cada worker tiene su propio engine, como los procesos de gunicorn
+            worker_engine = create_engine(f'sqlite:///{ruta}', connect_args={'timeout': 30})
+            resultados.append(run_migrations(worker_engine, create_tables=True))
+        
+        hilos = [threading.Thread(target=worker) for _ in range(4)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        
+        assert len(resultados) == 4
+        assert sorted(v for aplicadas in resultados for v in aplicadas) == [v for v, _, _ in MIGRATIONS]
+        with create_engine(f'sqlite:///{ruta}').connect() as conn:
+            assert conn.execute(select(func.count()).select_from(schema_version)).scalar() == len(MIGRATIONS)
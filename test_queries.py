@@ -0,0 +1,425 @@
+"""
+Tests de las consultas de lectura: carga anticipada, estadísticas del dashboard,
+ranking, caché de lecturas y estadísticas de jugadores
+Ejecutar con: python -m pytest test_queries.py -v
+"""
+
+import pytest
+import os
+from datetime import date
+import tempfile
+import time
+import uuid
+
+from database.db_manager import (
+    DatabaseManager, init_database, rebuild_ranking_puntuaciones, rebuild_estadisticas_jugadores,
+    temporada_de, Jugador, Calendario, AsistenciaEntrenamiento, Puntuacion, Partido, EventoPartido,
+    ConvocatoriaPartido
+)
+from database.dashboard_stats import DashboardStats
+
+
+class TestEagerLoading:
+    """Tests para las consultas con carga anticipada de jugadores"""
+    
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        init_database()
+    
+    def test_multas_with_jugador_constant_queries(self, count_queries):
+        """Las multas con jugador se cargan con un número fijo de consultas"""
+        with DatabaseManager() as db:
+            for i in range(5):
+                jugador = db.create_jugador(
+                    nombre_futbolistico=f'Eager {i}',
+                    nombre='Eager',
+                    apellidos='Loading'
+                )
+                db.create_multa(
+                    jugador_id=jugador.id,
+                    fecha=date(2024, 10, i + 1),
+                    razon_multa='Llegada tarde',
+                    multa=5.0
+                )
+        
+        with DatabaseManager() as db:
+            def load():
+                return [(m.id, m.jugador.nombre_futbolistico if m.jugador else None)
+                        for m in db.get_multas_with_jugador()]
+            
+            rows, queries = count_queries(load)
+            assert len(rows) >= 5
+            assert queries == 1
+    
+    def test_entrenamientos_asistencias_data_single_query(self, count_queries):
+        """El cargador masivo usa una consulta y filtra las fechas en SQL"""
+        with DatabaseManager() as db:
+            jugador = db.create_jugador(
+                nombre_futbolistico='Bulk Ent',
+                nombre='Bulk',
+                apellidos='Entrenamiento'
+            )
+            dentro = db.create_entrenamiento(fecha=date(2098, 3, 10))
+            db.create_entrenamiento(fecha=date(2098, 3, 11))
+            fuera = db.create_entrenamiento(fecha=date(2098, 5, 1))
+            for ent in (dentro, fuera):
+                db.save(AsistenciaEntrenamiento(
+                    entrenamiento_id=ent.id,
+                    jugador_id=jugador.id,
+                    entrena=False,
+                    razon_ausencia='Lesión'
+                ))
+            dentro_id, fuera_id, jugador_id = dentro.id, fuera.id, jugador.id
+        
+        with DatabaseManager() as db:
+            data, queries = count_queries(lambda: db.get_entrenamientos_asistencias_data(
+                fecha_desde=date(2098, 3, 10), fecha_hasta=date(2098, 3, 31)
+            ))
+            
+            assert queries == 1
+            numeros = [e['numero_entrenamiento'] for e in data]
+            assert numeros == sorted(numeros, reverse=True)
+            assert all(e['fecha'].endswith('/03/2098') for e in data)
+            
+            por_id = {e['id']: e for e in data}
+            assert por_id[dentro_id]['fecha'] == '10/03/2098'
+            assert por_id[dentro_id]['asistencias'][-1] == {
+                'jugador_id': jugador_id,
+                'jugador_nombre': 'Bulk Ent',
+                'entrena': False,
+                'razon_ausencia': 'Lesión',
+                'observaciones': None
+            }
+            assert fuera_id not in por_id
+
+
+class TestDashboardStats:
+    """Tests para las estadísticas agregadas del dashboard"""
+    
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        init_database()
+    
+    def test_aggregates_follow_new_rows(self):
+        """Los contadores y sumas reflejan los nuevos registros"""
+        with DatabaseManager() as db:
+            stats = DashboardStats(db)
+            jugadores_antes = stats.count_jugadores_activos()
+            multas_antes = stats.sum_multas_pendientes()
+            
+            jugador = db.create_jugador(
+                nombre_futbolistico='Stats Player',
+                nombre='Stats',
+                apellidos='Player'
+            )
+            partido = db.save(Partido(fecha=date(2099, 9, 1), competicion='Liga'))
+            for minuto in (10, 20, 30):
+                db.save(EventoPartido(partido_id=partido.id, jugador_id=jugador.id, minuto=minuto, tipo_evento='gol'))
+            db.create_multa(
+                jugador_id=jugador.id,
+                fecha=date(2024, 10, 1),
+                razon_multa='Llegada tarde',
+                multa=12.5
+            )
+            
+            assert stats.count_jugadores_activos() == jugadores_antes + 1
+            assert stats.sum_multas_pendientes() == pytest.approx(multas_antes + 12.5)
+            assert stats.get_top_goleadores(limit=1, temporada='2099-2100')[0] == ('Stats Player', 3)
+    
+    def test_next_match_is_closest_upcoming(self):
+        """El próximo partido es el más cercano a partir de la fecha indicada"""
+        hoy = date(2099, 1, 1)
+        with DatabaseManager() as db:
+            sufijo = uuid.uuid4().hex[:8]
+            for dia in (20, 5, 12):
+                db.create_evento_calendario(
+                    fecha=date(2099, 1, dia),
+                    competicion="Liga",
+                    equipo_local="UD Atzeneta",
+                    equipo_visitante=f"Rival {dia} {sufijo}"
+                )
+            
+            resumen = DashboardStats(db).get_resumen(hoy=hoy)
+            assert resumen['proximo_partido'].fecha == date(2099, 1, 5)
+            assert resumen['dias_proximo'] == 4
+            fechas = [p.fecha for p in resumen['proximos_partidos']]
+            assert fechas == sorted(fechas)
+
+
+class TestRankingPuntuacion:
+    """Tests para el ranking de puntuación mantenido de forma incremental"""
+    
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        init_database()
+    
+    def _ranking_de(self, db, jugador_id):
+        return next(r for r in db.get_ranking_puntuaciones() if r['jugador_id'] == jugador_id)
+    
+    def test_ranking_follows_insert_update_delete(self):
+        """El agregado se actualiza al insertar, modificar y borrar puntuaciones"""
+        with DatabaseManager() as db:
+            a = db.create_jugador(nombre_futbolistico='Rank A', nombre='Rank', apellidos='A')
+            b = db.create_jugador(nombre_futbolistico='Rank B', nombre='Rank', apellidos='B')
+            
+            p1 = db.save(Puntuacion(jugador_id=a.id, fecha=date(2024, 9, 1), puntos=5))
+            db.save(Puntuacion(jugador_id=a.id, fecha=date(2024, 9, 2), puntos=-2))
+            
+            ranking_a = self._ranking_de(db, a.id)
+            assert ranking_a['total_puntos'] == 3
+            assert ranking_a['puntos_positivos'] == 5
+            assert ranking_a['puntos_negativos'] == -2
+            assert ranking_a['total_registros'] == 2
+            assert ranking_a['promedio_puntos'] == pytest.approx(1.5)
+            
+            # Mover la puntuación positiva al jugador B con otro valor
+            p1.jugador_id = b.id
+            p1.puntos = 7
+            db.db.commit()
+            
+            assert self._ranking_de(db, a.id)['total_puntos'] == -2
+            ranking_b = self._ranking_de(db, b.id)
+            assert ranking_b['total_puntos'] == 7
+            assert ranking_b['total_registros'] == 1
+            
+            db.db.delete(p1)
+            db.db.commit()
+            assert all(r['jugador_id'] != b.id for r in db.get_ranking_puntuaciones())
+    
+    def test_rebuild_matches_incremental(self):
+        """Recalcular desde cero produce el mismo ranking"""
+        with DatabaseManager() as db:
+            jugador = db.create_jugador(nombre_futbolistico='Rank C', nombre='Rank', apellidos='C')
+            for puntos in (3, 0, -4, 10):
+                db.save(Puntuacion(jugador_id=jugador.id, fecha=date(2024, 9, 1), puntos=puntos))
+            
+            incremental = db.get_ranking_puntuaciones()
+            rebuild_ranking_puntuaciones(db.db)
+            assert db.get_ranking_puntuaciones() == incremental
+
+
+class TestQueryCache:
+    """Tests para la caché de lecturas de DatabaseManager"""
+    
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        from database.cache import query_cache
+        init_database()
+        self.cache = query_cache
+        self.cache.clear()
+    
+    def _stats(self, entity):
+        return dict(self.cache.stats()[entity])
+    
+    def test_hits_and_write_invalidation(self):
+        """Las lecturas repetidas salen de la caché y las escrituras la invalidan"""
+        nombre = f"Cache {uuid.uuid4().hex[:8]}"
+        with DatabaseManager() as db:
+            db.get_jugadores_rows(activos_solo=True)
+            antes = self._stats('jugadores')
+            
+            jugadores = db.get_jugadores_rows(activos_solo=True)
+            assert self._stats('jugadores')['hits'] == antes['hits'] + 1
+            assert all(j.nombre_futbolistico for j in jugadores)
+            
+            jugador = db.create_jugador(nombre_futbolistico=nombre, nombre="Cache", apellidos="Test")
+            assert nombre in [j.nombre_futbolistico for j in db.get_jugadores_rows(activos_solo=True)]
+            assert self._stats('jugadores')['misses'] == antes['misses'] + 1
+            
+            db.update_jugador(jugador.id, activo=False)
+            assert nombre not in [j.nombre_futbolistico for j in db.get_jugadores_rows(activos_solo=True)]
+    
+    def test_multa_invalidation(self):
+        """Crear y pagar multas invalida las multas cacheadas"""
+        with DatabaseManager() as db:
+            jugador = db.create_jugador(nombre_futbolistico=f"Multa {uuid.uuid4().hex[:8]}",
+                                        nombre="Cache", apellidos="Multa")
+            multa = db.create_multa(jugador_id=jugador.id, fecha=date(2097, 5, 1),
+                                    razon_multa="Llegada tarde", multa=10.0)
+            
+            cacheada = next(m for m in db.get_multas_with_jugador_rows() if m.id == multa.id)
+            assert cacheada.jugador.nombre_futbolistico == jugador.nombre_futbolistico
+            assert cacheada.debe == 10.0
+            
+            db.pagar_multa(multa.id, 4.0)
+            cacheada = next(m for m in db.get_multas_with_jugador_rows() if m.id == multa.id)
+            assert cacheada.debe == 6.0
+    
+    def test_cached_rows_outlive_session(self):
+        """Las filas cacheadas no dependen de la sesión que las cargó"""
+        from database.cache import CachedRow
+        with DatabaseManager() as db:
+            jugador = db.create_jugador(nombre_futbolistico=f"Fila {uuid.uuid4().hex[:8]}",
+                                        nombre="Cache", apellidos="Fila")
+            db.create_multa(jugador_id=jugador.id, fecha=date(2097, 5, 2),
+                            razon_multa="Llegada tarde", multa=5.0)
+            db.get_multas_with_jugador_rows()
+        with DatabaseManager() as db:
+            multas = db.get_multas_with_jugador_rows()
+
+        multa = next(m for m in multas if m.jugador and m.jugador.id == jugador.id)
+        assert isinstance(multa, CachedRow)
+        assert multa.jugador.nombre_futbolistico == jugador.nombre_futbolistico
+        with pytest.raises(AttributeError):
+            multa.debe = 0
+    
+    def test_public_getters_return_orm_objects(self):
+        """get_jugadores y compañía siguen devolviendo objetos ORM modificables"""
+        with DatabaseManager() as db:
+            jugador = db.create_jugador(nombre_futbolistico=f"ORM {uuid.uuid4().hex[:8]}",
+                                        nombre="Cache", apellidos="ORM")
+            db.create_multa(jugador_id=jugador.id, fecha=date(2097, 5, 3),
+                            razon_multa="Llegada tarde", multa=5.0)
+            
+            orm = next(j for j in db.get_jugadores() if j.id == jugador.id)
+            assert isinstance(orm, Jugador)
+            orm.telefono = "600000000"
+            db.db.commit()
+            assert db.get_jugador_by_id(jugador.id).telefono == "600000000"
+            
+            multa = next(m for m in db.get_multas_with_jugador() if m.jugador_id == jugador.id)
+            assert multa.jugador.puntuaciones == []
+            assert all(isinstance(p, Calendario) for p in db.get_calendario())
+
+    def test_upsert_calendario_invalidation(self):
+        """La importación del calendario invalida el calendario cacheado"""
+        competicion = f"Liga {uuid.uuid4().hex[:8]}"
+        with DatabaseManager() as db:
+            db.get_calendario_rows()
+            db.upsert_calendario([{'fecha': date(2097, 6, 1), 'competicion': competicion,
+                                   'equipo_local': "UD Atzeneta", 'equipo_visitante': "Rival"}])
+            assert competicion in [p.competicion for p in db.get_calendario_rows()]
+    
+    def test_ttl_and_lru_bounds(self):
+        """Las entradas caducan según su TTL y el backend en memoria respeta el límite"""
+        from database.cache import QueryCache
+        cache = QueryCache({'backend': 'memory', 'max_entries': 3, 'ttl': {'jugadores': 0.05}})
+        cargas = []
+        
+        def loader(valor):
+            return lambda: cargas.append(valor) or valor
+        
+        assert cache.get_or_load('jugadores', 1, loader(1)) == 1
+        assert cache.get_or_load('jugadores', 1, loader(1)) == 1
+        assert cargas == [1]
+        time.sleep(0.1)
+        cache.get_or_load('jugadores', 1, loader(1))
+        assert cargas == [1, 1]
+        
+        for valor in range(2, 7):
+            cache.get_or_load('jugadores', valor, loader(valor))
+        assert len(cache.backend) == 3
+        assert cache.stats()['jugadores']['misses'] == 7
+    
+    def test_shared_sqlite_backend(self):
+        """Dos cachés sobre el mismo fichero SQLite se invalidan entre sí"""
+        from database.cache import QueryCache
+        with tempfile.TemporaryDirectory() as tmp:
+            config = {'backend': 'sqlite', 'url': os.path.join(tmp, 'cache.db')}
+            worker_a, worker_b = QueryCache(config), QueryCache(config)
+            
+            assert worker_a.get_or_load('calendario', None, lambda: ['v1']) == ['v1']
+            assert worker_b.get_or_load('calendario', None, lambda: ['otro']) == ['v1']
+            assert worker_b.stats()['calendario']['hits'] == 1
+            
+            worker_b.invalidate_tables({'calendario'})
+            assert worker_a.get_or_load('calendario', None, lambda: ['v2']) == ['v2']
+
+
+class TestEstadisticasJugador:
+    """Tests para las estadísticas de jugadores derivadas de eventos y convocatorias"""
+    
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        init_database()
+    
+    def _jugador(self, db):
+        sufijo = uuid.uuid4().hex[:8]
+        return db.create_jugador(nombre_futbolistico=f'Est {sufijo}', nombre='Est', apellidos=sufijo)
+    
+    def test_season_boundaries(self):
+        """La temporada empieza el 1 de agosto"""
+        assert temporada_de(date(2024, 7, 31)) == '2023-2024'
+        assert temporada_de(date(2024, 8, 1)) == '2024-2025'
+
+    def test_season_validation(self):
+        """Solo se aceptan temporadas 'AAAA-AAAA' de años consecutivos"""
+        import argparse
+        from admin import temporada_arg
+        from database.db_manager import es_temporada, rebuild_estadisticas_jugadores
+
+        assert es_temporada(temporada_de(date(2024, 9, 1)))
+        for texto in ('2024', '2024-2026', '2024/2025', '24-25', '2024-2025 ', 'abcd-abce'):
+            assert not es_temporada(texto)
+            with pytest.raises(argparse.ArgumentTypeError):
+                temporada_arg(texto)
+        assert temporada_arg('2024-2025') == '2024-2025'
+        with DatabaseManager() as db:
+            with pytest.raises(ValueError):
+                rebuild_estadisticas_jugadores(db.db, ['2024-2026'])
+
+    def test_counters_follow_events_and_callups(self):
+        """Los contadores del jugador y de la temporada se actualizan al guardar"""
+        with DatabaseManager() as db:
+            jugador = self._jugador(db)
+            otro = self._jugador(db)
+            partido = db.save(Partido(fecha=date(2098, 10, 5), competicion='Liga'))
+            
+            db.save(ConvocatoriaPartido(partido_id=partido.id, jugador_id=jugador.id, estado='titular', minutos_jugados=75))
+            gol = db.save(EventoPartido(partido_id=partido.id, jugador_id=jugador.id, minuto=12, tipo_evento='gol'))
+            tarjeta = db.save(EventoPartido(partido_id=partido.id, jugador_id=jugador.id, minuto=40,
+                                            tipo_evento='tarjeta_amarilla'))
+            
+            db.db.refresh(jugador)
+            assert (jugador.goles, jugador.tarjetas_amarillas, jugador.minutos_jugados) == (1, 1, 75)
+            assert (jugador.partidos_titular, jugador.convocatorias) == (1, 1)
+            
+            # Cambiar el tipo y el jugador de un evento mueve sus contadores
+            tarjeta.tipo_evento = 'tarjeta_roja'
+            gol.jugador_id = otro.id
+            db.db.commit()
+            
+            temporada = db.get_estadisticas_jugador(jugador.id)
+            assert [t['temporada'] for t in temporada] == ['2098-2099']
+            assert (temporada[0]['goles'], temporada[0]['tarjetas_amarillas'], temporada[0]['tarjetas_rojas']) == (0, 0, 1)
+            assert db.get_estadisticas_jugador(otro.id)[0]['goles'] == 1
+            
+            db.db.delete(gol)
+            db.db.commit()
+            assert db.get_estadisticas_jugador(otro.id) == []
+            db.db.refresh(otro)
+            assert otro.goles == 0
+    
+    def test_rebuild_matches_incremental(self):
+        """Recalcular desde cero produce las mismas estadísticas y contadores"""
+        with DatabaseManager() as db:
+            jugador = self._jugador(db)
+            for fecha in (date(2097, 9, 1), date(2098, 3, 1), date(2098, 9, 1)):
+                partido = db.save(Partido(fecha=fecha, competicion='Liga'))
+                db.save(ConvocatoriaPartido(partido_id=partido.id, jugador_id=jugador.id, estado='suplente', minutos_jugados=20))
+                db.save(EventoPartido(partido_id=partido.id, jugador_id=jugador.id, minuto=80, tipo_evento='asistencia'))
+            
+            incremental = db.get_estadisticas_jugador(jugador.id)
+            assert [(t['temporada'], t['asistencias'], t['minutos_jugados']) for t in incremental] == [
+                ('2097-2098', 2, 40), ('2098-2099', 1, 20)
+            ]
+            
+            rebuild_estadisticas_jugadores(db.db)
+            assert db.get_estadisticas_jugador(jugador.id) == incremental
+            db.db.refresh(jugador)
+            assert (jugador.asistencias, jugador.partidos_suplente, jugador.minutos_jugados) == (3, 3, 60)
+    
+    def test_season_rollup(self):
+        """Las estadísticas de una temporada salen ordenadas y con los totales del equipo"""
+        with DatabaseManager() as db:
+            a, b = self._jugador(db), self._jugador(db)
+            partido = db.save(Partido(fecha=date(2096, 11, 1), competicion='Liga'))
+            for jugador, goles in ((a, 1), (b, 2)):
+                for minuto in range(goles):
+                    db.save(EventoPartido(partido_id=partido.id, jugador_id=jugador.id, minuto=minuto, tipo_evento='gol'))
+            
+            filas = db.get_estadisticas_temporada('2096-2097')
+            assert [(f['jugador_id'], f['goles']) for f in filas] == [(b.id, 2), (a.id, 1)]
+            assert db.get_resumen_temporadas()['2096-2097']['goles'] == 3
+            with pytest.raises(ValueError):
+                db.get_estadisticas_temporada('2096-2097', orden='nombre')
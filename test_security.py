@@ -0,0 +1,253 @@
+"""
+Tests de la seguridad del login y del almacén de sesiones
+Ejecutar con: python -m pytest test_security.py -v
+"""
+
+import pytest
+import os
+import tempfile
+import time
+import uuid
+
+from database.db_manager import init_database, Usuario
+from utils.session_manager import SessionManager
+
+
+class TestLoginSecurity:
+    """Tests para los límites de login, el pool de bcrypt y los tokens de sesión"""
+    
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        from auth.security import clear_login_state
+        
+        init_database()
+        clear_login_state()
+    
+    def teardown_method(self):
+        """Limpieza después de cada test"""
+        from auth.security import clear_login_state
+        clear_login_state()
+    
+    def crear_usuario(self, password, rounds):
+        import bcrypt
+        from database.db_manager import SessionLocal, Usuario
+        
+        username = f"test_{uuid.uuid4().hex[:8]}"
+        session = SessionLocal()
+        session.add(Usuario(
+            username=username,
+            password_hash=bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+        ))
+        session.commit()
+        session.close()
+        return username
+    
+    def test_cubo_de_tokens(self):
+        """El cubo permite ráfagas hasta su capacidad y se rellena con el tiempo"""
+        from auth.security import RateLimiter
+        
+        ahora = [0.0]
+        limiter = RateLimiter(2, 10, max_claves=2, reloj=lambda: ahora[0])
+        
+        assert limiter.consume('1.2.3.4') == 0
+        assert limiter.consume('1.2.3.4') == 0
+        assert limiter.consume('1.2.3.4') == pytest.approx(5.0)
+        ahora[0] = 5.0
+        assert limiter.consume('1.2.3.4') == 0
+        
+        # Solo se recuerdan max_claves claves
+        limiter.consume('5.6.7.8')
+        limiter.consume('9.9.9.9')
+        assert '1.2.3.4' not in limiter._cubos
+    
+    def test_limite_por_usuario(self, monkeypatch):
+        """Los intentos distintos gastan tokens; repetir el mismo intento reutiliza el resultado"""
+        from auth import security
+        
+        monkeypatch.setattr(security, 'user_limiter', security.RateLimiter(2, 60))
+        username = self.crear_usuario('correcta', rounds=4)
+        
+        assert security.check_login(username, 'mala1', '10.0.0.1')['motivo'] == 'credenciales'
+        assert security.check_login(username, 'mala1', '10.0.0.1')['motivo'] == 'credenciales'
+        assert security.check_login(username, 'mala2', '10.0.0.1')['motivo'] == 'credenciales'
+        
+        resultado = security.check_login(username, 'correcta', '10.0.0.1')
+        assert resultado['ok'] is False
+        assert resultado['motivo'] == 'limite'
+        assert resultado['reintentar_en'] > 0
+        
+        # Los intentos fallidos desde otra IP no bloquean al usuario legítimo
+        assert security.check_login(username, 'correcta', '10.0.0.2')['ok'] is True
+    
+    def test_x_forwarded_for_sin_proxies(self, monkeypatch):
+        """Sin proxies de confianza la IP es la de la conexión, no la de X-Forwarded-For"""
+        from flask import Flask
+        from auth import security
+        
+        servidor = Flask(__name__)
+        cabeceras = {'X-Forwarded-For': '1.2.3.4, 10.0.0.5'}
+        entorno = {'REMOTE_ADDR': '10.0.0.9'}
+        
+        monkeypatch.setitem(security.AUTH_CONFIG, 'trusted_proxies', 0)
+        with servidor.test_request_context(headers=cabeceras, environ_base=entorno):
+            assert security.client_ip() == '10.0.0.9'
+        
+        monkeypatch.setitem(security.AUTH_CONFIG, 'trusted_proxies', 1)
+        with servidor.test_request_context(headers=cabeceras, environ_base=entorno):
+            assert security.client_ip() == '10.0.0.5'
+    
+    def test_una_sola_comprobacion_por_intento_y_rehash(self, monkeypatch):
+        """Dos callbacks del mismo clic esperan un único bcrypt y el hash se actualiza al coste configurado"""
+        import threading
+        from auth import security
+        from database.db_manager import SessionLocal, Usuario
+        
+        monkeypatch.setitem(security.AUTH_CONFIG, 'bcrypt_rounds', 5)
+        username = self.crear_usuario('secreta', rounds=4)
+        
+        llamadas = []
+        verificar = security._verificar
+        monkeypatch.setattr(security, '_verificar', lambda u, p: llamadas.append(u) or verificar(u, p))
+        
+        resultados = []
+        hilos = [threading.Thread(target=lambda: resultados.append(security.check_login(username, 'secreta', '10.0.0.9')))
+                 for _ in range(2)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        
+        assert [r['ok'] for r in resultados] == [True, True]
+        assert llamadas == [username]
+        
+        session = SessionLocal()
+        password_hash = session.query(Usuario).filter(Usuario.username == username).one().password_hash
+        session.close()
+        assert password_hash.startswith('$2b$05$')
+        assert security.needs_rehash(password_hash) is False
+    
+    def test_token_de_sesion(self, monkeypatch):
+        """La sesión solo es válida con un token firmado del mismo usuario y sin caducar"""
+        from auth import security
+        
+        sesion = security.create_session_data('admin')
+        assert security.session_user(sesion) == 'admin'
+        assert security.session_user({'authenticated': True, 'user': 'admin'}) is None
+        assert security.session_user({**sesion, 'user': 'otro'}) is None
+        assert security.session_user({**sesion, 'token': sesion['token'] + 'x'}) is None
+        
+        monkeypatch.setitem(security.AUTH_CONFIG, 'token_ttl', -1)
+        assert security.session_user(sesion) is None
+
+    def test_token_de_otra_sesion(self):
+        """Un token firmado para un usuario no vale con la sesión guardada de otro"""
+        from auth import security
+
+        ajena = security.create_session_data('otro_usuario')
+        token = security.create_session_token('admin', ajena['session_id'])
+        assert security.session_user({**ajena, 'user': 'admin', 'token': token}) is None
+
+    def test_clave_secreta_generada(self, monkeypatch, tmp_path):
+        """Sin SECRET_KEY se genera una clave aleatoria que se reutiliza desde el fichero"""
+        from auth import security
+
+        ruta = tmp_path / 'clave'
+        monkeypatch.setitem(security.APP_CONFIG, 'secret_key', None)
+        monkeypatch.setitem(security.APP_CONFIG, 'secret_key_file', str(ruta))
+        monkeypatch.setattr(security, '_clave_generada', None)
+
+        clave = security.secret_key()
+        assert len(clave) >= 32 and ruta.read_text() == clave
+        monkeypatch.setattr(security, '_clave_generada', None)
+        assert security.secret_key() == clave
+
+    def test_sin_credenciales_fijas(self):
+        """admin / admin123 solo entra si es la contraseña guardada del usuario"""
+        import app
+        from auth.security import hash_password
+        from database.db_manager import SessionLocal, Usuario
+
+        session = SessionLocal()
+        admin = session.query(Usuario).filter(Usuario.username == 'admin').one()
+        original = admin.password_hash
+        admin.password_hash = hash_password('otra-contraseña')
+        session.commit()
+        try:
+            sesion, destino = app.handle_login(1, 'admin', 'admin123')
+            assert not sesion['authenticated'] and destino == '/'
+        finally:
+            admin.password_hash = original
+            session.commit()
+            session.close()
+
+
+class TestSessionStore:
+    """Tests para los almacenes de sesiones"""
+    
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.tmp.name, 'sesiones.db')
+    
+    def teardown_method(self):
+        """Limpieza después de cada test"""
+        SessionManager().configure({'backend': 'memory'})
+        self.tmp.cleanup()
+    
+    def backends(self):
+        from utils.session_store import MemorySessionBackend, SQLiteSessionBackend
+        return [MemorySessionBackend(), SQLiteSessionBackend(self.ruta)]
+    
+    def test_caducidad_y_limpieza(self):
+        """Limpiar solo borra las sesiones caducadas, también tras extender alguna"""
+        for backend in self.backends():
+            for i, expira in enumerate([10, 20, 30]):
+                backend.put(f"s{i}", {'user_id': 'ana'}, expira)
+            backend.put('s0', {'user_id': 'ana'}, 40)  # extensión: la entrada anterior queda obsoleta
+            
+            assert backend.get('s1', 15) is not None
+            assert backend.get('s1', 25) is None
+            assert backend.cleanup(25) == 1
+            assert set(backend.active(25)) == {'s0', 's2'}
+            assert backend.cleanup(35) == 1
+            assert set(backend.active(35)) == {'s0'}
+    
+    def test_indice_por_usuario(self):
+        """Las sesiones de un usuario se obtienen y se borran sin recorrer las demás"""
+        for backend in self.backends():
+            backend.put('a1', {'user_id': 'ana'}, 100)
+            backend.put('a2', {'user_id': 'ana'}, 100)
+            backend.put('b1', {'user_id': 'bea'}, 100)
+            
+            assert len(backend.user_sessions('ana', 0)) == 2
+            assert backend.count_users(0) == 2
+            assert backend.delete_user('ana') == 2
+            assert backend.user_sessions('ana', 0) == []
+            assert backend.get('b1', 0) == {'user_id': 'bea'}
+    
+    def test_compartido_entre_workers(self):
+        """Con SQLite una sesión creada en un worker se valida y se cierra desde otro"""
+        from utils.session_store import SQLiteSessionBackend
+        from utils.session_manager import DashSessionManager
+        
+        manager = SessionManager()
+        manager.configure({'backend': 'sqlite', 'url': self.ruta})
+        dash_sessions = DashSessionManager(manager)
+        sesion = dash_sessions.create_dash_session('admin')
+        
+        otro_worker = SQLiteSessionBackend(self.ruta)
+        assert otro_worker.get(sesion['session_id'], time.time())['username'] == 'admin'
+        assert dash_sessions.validate_dash_session(sesion) is True
+        
+        assert otro_worker.delete(sesion['session_id']) is True
+        assert dash_sessions.validate_dash_session(sesion) is False
+        assert manager.get_session_stats()['active_sessions'] == 0
+    
+    def test_logout_invalida_el_token(self):
+        """Tras el logout el token firmado ya no autentica"""
+        from auth.security import create_session_data, destroy_session_data, session_user
+        
+        sesion = create_session_data('admin')
+        assert session_user(sesion) == 'admin'
+        destroy_session_data(sesion)
+        assert session_user(sesion) is None
@@ -0,0 +1,165 @@
+"""
+Tests del arranque: registro de páginas, perfil de arranque y métricas de callbacks
+Ejecutar con: python -m pytest test_startup.py -v
+"""
+
+import sys
+import os
+from datetime import datetime
+import tempfile
+
+
+class TestPageRegistry:
+    """Tests para el registro de páginas y la carga de layouts"""
+    
+    def test_layouts_are_memoized(self):
+        """Cada página se importa y construye una sola vez"""
+        from pages.registry import PageRegistry
+        registry = PageRegistry()
+        
+        layout = registry.get_layout('/multas')
+        assert registry.is_loaded('/multas')
+        assert registry.get_layout('/multas') is layout
+        assert registry.resolve('/no-existe') == '/dashboard'
+        assert registry.get_page('/') is registry.pages['/dashboard']
+
+    def test_memoized_layouts_have_no_dates(self):
+        """Las fechas por defecto no se congelan en el layout memoizado"""
+        import json
+        from plotly.utils import PlotlyJSONEncoder
+        from pages.registry import PageRegistry
+        registry = PageRegistry()
+
+        hoy = datetime.now().strftime("%Y-%m-%d")
+        for pagina in ('/entrenamientos', '/objetivos', '/multas', '/puntuacion'):
+            layout = json.dumps(registry.get_layout(pagina), cls=PlotlyJSONEncoder)
+            assert hoy not in layout, pagina
+
+        import app
+        deps = app.server.test_client().get('/_dash-dependencies').get_json()
+        outputs = ' '.join(dep['output'] for dep in deps)
+        assert 'filter-fecha-hasta-ent.value' in outputs
+        assert 'input-fecha-multa.value' in outputs
+
+    def test_callbacks_registered_before_first_request(self):
+        """La lista de callbacks que recibe el navegador incluye todas las páginas"""
+        import app
+        
+        deps = app.server.test_client().get('/_dash-dependencies').get_json()
+        outputs = ' '.join(dep['output'] for dep in deps)
+        assert 'scraping-status.children' in outputs
+        assert 'multas-data.data' in outputs
+        
+        from auth.security import create_session_data
+        
+        sesion = create_session_data('admin')
+        assert app.display_page('/calendario', sesion) is app.display_page('/calendario', sesion)
+
+
+class TestStartupProfile:
+    """Tests para el perfil y el aligeramiento del arranque"""
+    
+    def test_parse_importtime_groups_by_package(self):
+        """El tiempo propio de cada módulo se suma en su paquete de primer nivel"""
+        from utils.startup_profile import parse_importtime
+        
+        salida = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:      1500 |       1500 |   sqlalchemy.orm",
+            "import time:       500 |       2000 | sqlalchemy",
+            "import time:       250 |        250 | app",
+        ])
+        assert parse_importtime(salida) == {'sqlalchemy': 0.002, 'app': 0.00025}
+    
+    def test_app_starts_without_heavy_modules(self):
+        """Arrancar la aplicación no carga pandas ni las librerías de scraping"""
+        import json
+        import subprocess
+        
+        script = ("import io, sys, json, contextlib\n"
+                  "with contextlib.redirect_stdout(io.StringIO()):\n"
+                  "    import app\n"
+                  "    app.page_registry.wait_warm_up()\n"
+                  "print(json.dumps([m for m in ('pandas', 'plotly.express', 'bs4', 'requests') if m in sys.modules]))")
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {**os.environ, 'DATABASE_URL': f"sqlite:///{os.path.join(tmp, 'arranque.db')}"}
+            salida = subprocess.run([sys.executable, '-c', script], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                    env=env, capture_output=True, text=True, check=True)
+        assert json.loads(salida.stdout.strip().splitlines()[-1]) == []
+
+
+class TestCallbackMetrics:
+    """Tests para la instrumentación de los callbacks"""
+    
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        from flask import Flask
+        from sqlalchemy import create_engine, text
+        from utils.metrics import init_metrics
+        
+        self.engine = create_engine('sqlite://')
+        self.server = Flask(__name__)
+        self.metrics = init_metrics(self.server, self.engine, config={
+            'enabled': True, 'max_records': 3, 'token': 'secreto', 'n_plus_one_threshold': 5
+        })
+        
+        @self.server.route('/_dash-update-component', methods=['POST'])
+        def update_component():
+            with self.engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                for i in range(6):
+                    conn.execute(text("SELECT :i"), {'i': i})
+            return {'response': 'x' * 100}
+    
+    def _llamar(self, output="..tabla.data...resumen.children.."):
+        return self.server.test_client().post('/_dash-update-component', json={
+            'output': output, 'changedPropIds': ['boton.n_clicks']
+        })
+    
+    def test_records_queries_and_n_plus_one(self):
+        """Cada callback registra duración, sentencias, repeticiones y tamaños"""
+        assert self._llamar().status_code == 200
+        
+        registro = self.metrics.recent()[-1]
+        assert registro['callback'] == "tabla.data | resumen.children"
+        assert registro['triggered'] == ['boton.n_clicks']
+        assert registro['queries'] == 7
+        assert registro['max_repeat'] == 6
+        assert registro['n_plus_one']
+        assert registro['repeated_sql'] == "SELECT ?"
+        assert registro['response_bytes'] > 100
+        assert registro['duration_ms'] >= 0
+    
+    def test_endpoint_summary_and_ring_buffer(self):
+        """/_metrics exige el token y resume el buffer circular"""
+        for _ in range(5):
+            self._llamar()
+        cliente = self.server.test_client()
+        
+        assert cliente.get('/_metrics').status_code == 403
+        datos = cliente.get('/_metrics?token=secreto').get_json()
+        assert len(datos['records']) == 3
+        assert datos['summary'][0]['count'] == 3
+        assert datos['summary'][0]['n_plus_one']
+
+    def test_endpoint_closed_without_token(self):
+        """Sin METRICS_TOKEN configurado /_metrics no responde a nadie"""
+        from flask import Flask
+        from sqlalchemy import create_engine
+        from utils.metrics import init_metrics
+
+        server = Flask(__name__)
+        init_metrics(server, create_engine('sqlite://'), config={'enabled': True, 'token': None})
+        cliente = server.test_client()
+        assert cliente.get('/_metrics').status_code == 403
+        assert cliente.get('/_metrics?token=').status_code == 403
+
+    def test_monitor_shows_offenders(self, capsys):
+        """El monitor lista los callbacks lentos y los N+1"""
+        import monitor_app
+        
+        self._llamar()
+        monitor_app.mostrar(self.metrics.summary(), top=5)
+        salida = capsys.readouterr().out
+        assert "tabla.data | resumen.children" in salida
+        assert "x6" in salida
@@ -0,0 +1,73 @@
+"""
+Tests de la paginación, filtros y orden de las tablas en el servidor
+Ejecutar con: python -m pytest test_table_paging.py -v
+"""
+
+import uuid
+
+from database.db_manager import DatabaseManager, init_database, Jugador, Calendario
+from utils.table_paging import parse_filter_query, paginate_query
+
+
+class TestTablePaging:
+    """Tests para la paginación de tablas en servidor"""
+    
+    def setup_method(self):
+        """Configuración antes de cada test"""
+        init_database()
+    
+    def test_parse_filter_query(self):
+        """El filter_query de Dash se traduce a condiciones"""
+        conditions = parse_filter_query('{goles} >= 5 && {nombre} contains "Pep" && {posicion} eq Portero')
+        assert conditions == [
+            ('goles', 'ge', '5'),
+            ('nombre', 'contains', 'Pep'),
+            ('posicion', 'eq', 'Portero')
+        ]
+        assert parse_filter_query('') == []
+
+    def test_operator_taken_after_column(self):
+        """Un valor que contiene un operador ('ge', 'lt', '>') no cambia el operador"""
+        assert parse_filter_query('{nombre} contains "jorge a"') == [('nombre', 'contains', 'jorge a')]
+        assert parse_filter_query('{nombre} contains jorge') == [('nombre', 'contains', 'jorge')]
+        assert parse_filter_query('{nombre} eq "salt > 3"') == [('nombre', 'eq', 'salt > 3')]
+        assert parse_filter_query('{goles}>=2') == [('goles', 'ge', '2')]
+        assert parse_filter_query('nombre ge 3') == []
+
+    def test_numbers_only_converted_for_numeric_columns(self):
+        """contains conserva el texto y las comparaciones numéricas usan el tipo de la columna"""
+        from sqlalchemy.dialects import sqlite
+        from utils.table_paging import build_condition
+        
+        def sql(condicion):
+            return str(condicion.compile(dialect=sqlite.dialect(), compile_kwargs={'literal_binds': True}))
+        
+        assert "'%5%'" in sql(build_condition(Calendario.jornada, 'contains', '5'))
+        assert "'%5%'" in sql(build_condition(Jugador.dorsal, 'contains', '5'))
+        assert sql(build_condition(Jugador.goles, 'ge', '5')).endswith('>= 5')
+        assert sql(build_condition(Calendario.jornada, 'eq', '5')).endswith("= '5'")
+    
+    def test_paginate_query_filters_sorts_and_pages(self):
+        """Solo se devuelve la página visible de la consulta filtrada"""
+        posicion = f'Pag-{uuid.uuid4().hex[:8]}'
+        with DatabaseManager() as db:
+            for i in range(7):
+                db.create_jugador(
+                    nombre_futbolistico=f'Paged {i}',
+                    nombre='Paged',
+                    apellidos='Player',
+                    posicion=posicion,
+                    goles=i
+                )
+            
+            columns = {'nombre': Jugador.nombre_futbolistico, 'goles': Jugador.goles}
+            query = db.db.query(Jugador).filter(Jugador.posicion == posicion)
+            rows, page_count = paginate_query(
+                query, columns, lambda j: {'nombre': j.nombre_futbolistico, 'goles': j.goles},
+                page_current=1, page_size=2,
+                sort_by=[{'column_id': 'goles', 'direction': 'desc'}],
+                filter_query='{goles} >= 2 && {nombre} contains "Paged"'
+            )
+            
+            assert page_count == 3
+            assert [r['goles'] for r in rows] == [4, 3]
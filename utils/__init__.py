@@ -18,34 +18,45 @@ except ImportError as e:
     print(f"Warning: No se pudo importar header_utils: {e}")
     create_page_header = None
 
-# Importaciones de scraping con manejo de errores
-try:
-    from .scraping import (
-        FederacionScraper,
-        FFCVScraper,
-        ScrapingManager,
-        scraping_manager
-    )
-except ImportError as e:
-    print(f"Warning: No se pudo importar scraping: {e}")
-    # Crear clases dummy para evitar errores
-    class FederacionScraper:
-        pass
-    
-    class FFCVScraper:
-        pass
-    
-    class ScrapingManager:
-        def __init__(self):
-            self.scraping_enabled = False
+# Las clases de scraping se importan al pedirlas (from utils import scraping_manager):
+# requests y bs4 tardan en cargarse y solo se usan al importar calendarios
+_SCRAPING_NAMES = ('FederacionScraper', 'FFCVScraper', 'ScrapingManager', 'scraping_manager')
+
+def _load_scraping():
+    try:
+        from . import scraping
+        return {name: getattr(scraping, name) for name in _SCRAPING_NAMES}
+    except ImportError as e:
+        print(f"Warning: No se pudo importar scraping: {e}")
+        # Crear clases dummy para evitar errores
+        class FederacionScraper:
+            pass
         
-        def configure_ffcv_scraper(self, url):
+        class FFCVScraper:
             pass
         
-        def perform_ffcv_scraping(self):
-            return {'success': False, 'error': 'Scraping no disponible'}
-    
-    scraping_manager = ScrapingManager()
+        class ScrapingManager:
+            def __init__(self):
+                self.scraping_enabled = False
+            
+            def configure_ffcv_scraper(self, url):
+                pass
+            
+            def perform_ffcv_scraping(self):
+                return {'success': False, 'error': 'Scraping no disponible'}
+        
+        return {
+            'FederacionScraper': FederacionScraper,
+            'FFCVScraper': FFCVScraper,
+            'ScrapingManager': ScrapingManager,
+            'scraping_manager': ScrapingManager()
+        }
+
+def __getattr__(name):
+    if name in _SCRAPING_NAMES:
+        globals().update(_load_scraping())
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Exportar todo lo disponible
 __all__ = [
@@ -68,7 +79,7 @@ def check_dependencies():
     if create_page_header is None:
         missing.append('create_page_header')
         
-    if FederacionScraper is None:
+    if __getattr__('FederacionScraper') is None:
         missing.append('FederacionScraper')
     
     return missing
@@ -79,9 +90,8 @@ def debug_utils():
     print("=== DEBUG UTILS ===")
     print(f"SessionManager: {'✅' if SessionManager else '❌'}")
     print(f"create_page_header: {'✅' if create_page_header else '❌'}")
-    print(f"FederacionScraper: {'✅' if FederacionScraper else '❌'}")
-    print(f"FFCVScraper: {'✅' if FFCVScraper else '❌'}")
-    print(f"ScrapingManager: {'✅' if ScrapingManager else '❌'}")
+    for name in _SCRAPING_NAMES[:3]:
+        print(f"{name}: {'✅' if __getattr__(name) else '❌'}")
     
     missing = check_dependencies()
     if missing:
@@ -0,0 +1,368 @@
+"""
+Importación masiva desde CSV
+
+El CSV se lee por bloques con pandas (todas las columnas como texto) y cada
+bloque se valida de una vez con operaciones sobre columnas: tipos, campos
+obligatorios, DNI, email y teléfono (los mismos patrones que los validadores
+de utils/helpers.py) y referencias a jugadores y entrenamientos. Las
+referencias se resuelven con diccionarios cargados con una consulta al
+empezar, sin una SELECT por fila.
+
+Las filas válidas de cada bloque se insertan en bloque y se confirman; las
+demás se escriben en el fichero de rechazos con su número de fila y el
+motivo, así una fila incorrecta no detiene la importación.
+
+Cada bloque es su propia transacción: si la importación se interrumpe (un
+error de base de datos, un CSV mal formado a mitad de fichero) los bloques
+anteriores quedan importados, así que una importación puede quedar parcial.
+El ranking de puntuaciones se recalcula igualmente con lo importado.
+
+Entidades: jugadores, pesos, multas, puntuaciones y asistencias. Las
+entidades que pertenecen a un jugador lo identifican con jugador_id o con
+dni_jugador.
+"""
+
+import os
+import time
+from typing import Dict, Optional
+from sqlalchemy import func, insert, select
+from database.db_manager import (
+    SessionLocal,
+    engine as default_engine,
+    rebuild_ranking_puntuaciones,
+    Jugador,
+    PesoJugador,
+    Multa,
+    Puntuacion,
+    Entrenamiento,
+    AsistenciaEntrenamiento
+)
+from utils.helpers import EMAIL_PATTERN, PHONE_PATTERNS, DNI_LETTERS
+
+VALORES_VERDADEROS = {'1', 'true', 'si', 'sí', 'yes', 'x', 's'}
+VALORES_FALSOS = {'0', 'false', 'no', 'n'}
+
+# columnas: nombre en el CSV -> tipo; requeridas: no pueden estar vacías;
+# jugador: la fila pertenece a un jugador (jugador_id o dni_jugador)
+IMPORT_ENTITIES = {
+    'jugadores': {
+        'modelo': Jugador,
+        'columnas': {
+            'nombre_futbolistico': 'texto', 'nombre': 'texto', 'apellidos': 'texto',
+            'email': 'email', 'dni': 'dni', 'telefono': 'telefono', 'direccion': 'texto',
+            'dorsal': 'entero', 'posicion': 'texto', 'pierna_dominante': 'texto',
+            'altura': 'decimal', 'activo': 'booleano'
+        },
+        'requeridas': ['nombre_futbolistico', 'nombre', 'apellidos'],
+        'jugador': False,
+    },
+    'pesos': {
+        'modelo': PesoJugador,
+        'columnas': {'fecha': 'fecha', 'peso': 'decimal'},
+        'requeridas': ['fecha', 'peso'],
+        'jugador': True,
+    },
+    'multas': {
+        'modelo': Multa,
+        'columnas': {'fecha': 'fecha', 'razon_multa': 'texto', 'multa': 'decimal', 'pagado': 'decimal'},
+        'requeridas': ['fecha', 'razon_multa', 'multa'],
+        'jugador': True,
+    },
+    'puntuaciones': {
+        'modelo': Puntuacion,
+        'columnas': {'fecha': 'fecha', 'puntos': 'entero', 'concepto': 'texto', 'observaciones': 'texto'},
+        'requeridas': ['fecha', 'puntos'],
+        'jugador': True,
+    },
+    'asistencias': {
+        'modelo': AsistenciaEntrenamiento,
+        'columnas': {
+            'numero_entrenamiento': 'entero', 'fecha_entrenamiento': 'fecha', 'entrena': 'booleano',
+            'razon_ausencia': 'texto', 'observaciones': 'texto'
+        },
+        'requeridas': ['numero_entrenamiento'],
+        'jugador': True,
+    },
+}
+
+
+# Validación por columnas (equivalente a validate_email/validate_phone/validate_dni)
+
+def valid_email_series(serie):
+    return serie.str.match(EMAIL_PATTERN).fillna(False).astype(bool)
+
+
+def valid_phone_series(serie):
+    limpio = serie.str.replace(r'[^\d+]', '', regex=True)
+    validos = limpio.str.match(PHONE_PATTERNS[0])
+    for patron in PHONE_PATTERNS[1:]:
+        validos |= limpio.str.match(patron)
+    return validos.fillna(False).astype(bool) & (serie != '')
+
+
+def valid_dni_series(serie):
+    import numpy as np
+
+    formato = serie.str.fullmatch(r'\d{8}[A-Za-z]').fillna(False).astype(bool)
+    validos = formato.copy()
+    if formato.any():
+        numeros = serie[formato].str[:8].astype(np.int64) % 23
+        esperadas = np.array(list(DNI_LETTERS))[numeros.to_numpy()]
+        validos[formato] = serie[formato].str[8].str.upper().to_numpy() == esperadas
+    return validos
+
+
+def _a_objetos(serie):
+    """Valores Python (int, float, bool) con None en lugar de NaN/NA, como espera el driver"""
+    return serie.astype(object).where(serie.notna(), None)
+
+
+def _convertir(serie, tipo):
+    """
+    Convierte una columna de texto a su tipo
+
+    Returns:
+        tuple: (Series de valores Python con None en los vacíos, máscara de valores no válidos)
+    """
+    import pandas as pd
+
+    vacio = serie == ''
+    if tipo in ('entero', 'decimal'):
+        numeros = pd.to_numeric(serie.str.replace(',', '.', regex=False), errors='coerce')
+        invalidos = numeros.isna() & ~vacio
+        if tipo == 'entero':
+            invalidos |= numeros.notna() & (numeros != numeros.round())
+            numeros = numeros.where(~invalidos).round().astype('Int64')
+        valores = _a_objetos(numeros.where(~invalidos))
+    elif tipo == 'fecha':
+        fechas = pd.to_datetime(serie, format='%Y-%m-%d', errors='coerce')
+        fechas = fechas.fillna(pd.to_datetime(serie, format='%d/%m/%Y', errors='coerce'))
+        invalidos = fechas.isna() & ~vacio
+        valores = fechas.dt.date.astype(object).where(fechas.notna(), None)
+    elif tipo == 'booleano':
+        minusculas = serie.str.lower()
+        verdadero, falso = minusculas.isin(VALORES_VERDADEROS), minusculas.isin(VALORES_FALSOS)
+        invalidos = ~(verdadero | falso | vacio)
+        valores = verdadero.astype(object).where(verdadero | falso, None)
+    else:
+        if tipo == 'email':
+            invalidos = ~vacio & ~valid_email_series(serie)
+        elif tipo == 'telefono':
+            invalidos = ~vacio & ~valid_phone_series(serie)
+        elif tipo == 'dni':
+            serie = serie.str.upper()
+            invalidos = ~vacio & ~valid_dni_series(serie)
+        else:
+            invalidos = pd.Series(False, index=serie.index)
+        valores = serie.astype(object).where(~vacio, None)
+    return valores, invalidos
+
+
+class BulkImporter:
+    """Importa un CSV de una entidad por bloques, con rechazos por fila"""
+
+    def __init__(self, entidad: str, engine=None, chunk_size: int = 5000):
+        if entidad not in IMPORT_ENTITIES:
+            raise ValueError(f"Entidad desconocida: {entidad} (disponibles: {', '.join(IMPORT_ENTITIES)})")
+        self.entidad = entidad
+        self.config = IMPORT_ENTITIES[entidad]
+        self.chunk_size = chunk_size
+        self.session = SessionLocal(bind=engine or default_engine)
+        self.entrenamientos_nuevos = []
+
+    def _cargar_referencias(self):
+        """Una consulta por tabla referenciada para todo el fichero"""
+        self.dnis = dict(self.session.execute(select(Jugador.dni, Jugador.id).where(Jugador.dni.isnot(None))).all())
+        self.jugador_ids = set(self.session.scalars(select(Jugador.id)))
+        if self.entidad == 'asistencias':
+            self.entrenamientos = dict(self.session.execute(
+                select(Entrenamiento.numero_entrenamiento, Entrenamiento.id)).all())
+            self.siguiente_entrenamiento = (self.session.scalar(select(func.max(Entrenamiento.id))) or 0) + 1
+
+    def _validar_cabecera(self, columnas):
+        faltan = [c for c in self.config['requeridas'] if c not in columnas]
+        if self.config['jugador'] and 'jugador_id' not in columnas and 'dni_jugador' not in columnas:
+            faltan.append('jugador_id o dni_jugador')
+        if faltan:
+            raise ValueError(f"Faltan columnas en el CSV: {', '.join(faltan)}")
+
+        conocidas = set(self.config['columnas']) | {'jugador_id', 'dni_jugador'}
+        ignoradas = [c for c in columnas if c not in conocidas]
+        if ignoradas:
+            print(f"⚠️  Columnas ignoradas: {', '.join(ignoradas)}")
+
+    def _procesar_bloque(self, bloque):
+        """
+        Valida un bloque y devuelve las filas a insertar y los motivos de rechazo
+
+        Returns:
+            tuple: (dict columna -> lista de valores de las filas válidas, Series de motivos)
+        """
+        import pandas as pd
+
+        for columna in list(self.config['columnas']) + ['jugador_id', 'dni_jugador']:
+            if columna not in bloque:
+                bloque[columna] = ''
+        bloque = bloque.apply(lambda s: s.str.strip())
+        motivos = pd.Series('', index=bloque.index)
+
+        def rechazar(mascara, motivo):
+            motivos[mascara] += motivo + '; '
+
+        valores = {}
+        for columna, tipo in self.config['columnas'].items():
+            valores[columna], invalidos = _convertir(bloque[columna], tipo)
+            rechazar(invalidos, f"{columna}: valor no válido")
+        for columna in self.config['requeridas']:
+            rechazar(bloque[columna] == '', f"falta {columna}")
+
+        if self.config['jugador']:
+            valores['jugador_id'] = self._resolver_jugador(bloque, rechazar)
+
+        preparar = getattr(self, f"_preparar_{self.entidad}")
+        filas = preparar(bloque, valores, rechazar)
+
+        validas = motivos == ''
+        datos = {columna: lista[validas].tolist() for columna, lista in filas.items()}
+        return datos, motivos.str.rstrip('; ')
+
+    def _resolver_jugador(self, bloque, rechazar):
+        import pandas as pd
+
+        por_id, invalidos = _convertir(bloque['jugador_id'], 'entero')
+        # dni_jugador tiene prioridad sobre jugador_id
+        por_dni = bloque['dni_jugador'].str.upper().map(self.dnis)
+        ids = pd.to_numeric(por_dni.fillna(por_id), errors='coerce').astype('Int64')
+        rechazar(~ids.isin(self.jugador_ids) & ~invalidos, "jugador no encontrado")
+        rechazar(invalidos, "jugador_id no válido")
+        return _a_objetos(ids)
+
+    def _preparar_jugadores(self, bloque, valores, rechazar):
+        dni = valores['dni']
+        con_dni = dni.notna()
+        rechazar(con_dni & dni.isin(set(self.dnis)), "DNI ya registrado")
+        rechazar(con_dni & dni.duplicated(keep='first'), "DNI repetido en el fichero")
+        valores['activo'] = valores['activo'].where(valores['activo'].notna(), True)
+        return valores
+
+    def _preparar_pesos(self, bloque, valores, rechazar):
+        peso = valores['peso'].astype(float)
+        rechazar((peso <= 0) | (peso >= 250), "peso fuera de rango")
+        return valores
+
+    def _preparar_multas(self, bloque, valores, rechazar):
+        importe = valores['multa'].astype(float)
+        pagado = valores['pagado'].astype(float).fillna(0.0)
+        rechazar(importe <= 0, "multa debe ser positiva")
+        rechazar((pagado < 0) | (pagado > importe), "pagado fuera de rango")
+        valores['pagado'] = _a_objetos(pagado)
+        valores['debe'] = _a_objetos(importe - pagado)
+        valores['completamente_pagada'] = _a_objetos(pagado >= importe)
+        return valores
+
+    def _preparar_puntuaciones(self, bloque, valores, rechazar):
+        return valores
+
+    def _preparar_asistencias(self, bloque, valores, rechazar):
+        import pandas as pd
+
+        numeros = valores.pop('numero_entrenamiento')
+        fechas = valores.pop('fecha_entrenamiento')
+
+        # Los entrenamientos que no existen se crean si la fila trae su fecha
+        nuevos = numeros.notna() & ~numeros.isin(self.entrenamientos.keys()) & fechas.notna()
+        for numero, fecha in zip(numeros[nuevos], fechas[nuevos]):
+            if numero not in self.entrenamientos:
+                self.entrenamientos[numero] = self.siguiente_entrenamiento
+                self.entrenamientos_nuevos.append({'id': self.siguiente_entrenamiento,
+                                                   'numero_entrenamiento': numero, 'fecha': fecha})
+                self.siguiente_entrenamiento += 1
+
+        ids = pd.to_numeric(numeros.map(self.entrenamientos), errors='coerce').astype('Int64')
+        rechazar(ids.isna() & numeros.notna(), "entrenamiento no encontrado (añade fecha_entrenamiento)")
+        valores['entrenamiento_id'] = _a_objetos(ids)
+        valores['entrena'] = valores['entrena'].where(valores['entrena'].notna(), True)
+        return valores
+
+    def run(self, csv_file: str, rejects_file: Optional[str] = None) -> Dict:
+        """
+        Importa el fichero completo
+
+        Args:
+            csv_file (str): CSV con cabecera (UTF-8)
+            rejects_file (str, optional): CSV de rechazos (por defecto <csv>_rechazos.csv)
+
+        Returns:
+            dict: importados, rechazados, fichero de rechazos y duración
+
+        Raises:
+            Exception: El error que interrumpe la importación; los bloques
+                confirmados antes del error no se deshacen
+        """
+        import pandas as pd
+
+        rejects_file = rejects_file or f"{os.path.splitext(csv_file)[0]}_rechazos.csv"
+        if os.path.exists(rejects_file):
+            os.remove(rejects_file)
+
+        inicio = time.perf_counter()
+        importados = rechazados = 0
+        modelo = self.config['modelo']
+
+        try:
+            self._cargar_referencias()
+            lector = pd.read_csv(csv_file, dtype=str, keep_default_na=False, chunksize=self.chunk_size,
+                                 encoding='utf-8-sig')
+            for numero_bloque, bloque in enumerate(lector):
+                if numero_bloque == 0:
+                    self._validar_cabecera(list(bloque.columns))
+
+                datos, motivos = self._procesar_bloque(bloque.copy())
+                filas = [dict(zip(datos, valores)) for valores in zip(*datos.values())]
+
+                if self.entrenamientos_nuevos:
+                    self.session.execute(insert(Entrenamiento.__table__), self.entrenamientos_nuevos)
+                    self.entrenamientos_nuevos = []
+                if filas:
+                    self.session.execute(insert(modelo.__table__), filas)
+                self.session.commit()
+                importados += len(filas)
+
+                if self.entidad == 'jugadores':
+                    self.dnis.update({dni: None for dni in datos['dni'] if dni})
+
+                malas = motivos != ''
+                if malas.any():
+                    rechazo = bloque[malas].copy()
+                    # Número de línea en el CSV (la 1 es la cabecera)
+                    rechazo.insert(0, 'fila', rechazo.index + 2)
+                    rechazo['motivo'] = motivos[malas]
+                    rechazo.to_csv(rejects_file, mode='a', index=False, header=rechazados == 0, encoding='utf-8')
+                    rechazados += int(malas.sum())
+        except Exception:
+            self.session.rollback()
+            if importados:
+                print(f"⚠️  Importación interrumpida: las {importados} filas de los bloques anteriores "
+                      f"ya están guardadas")
+            raise
+        finally:
+            try:
+                if self.entidad == 'puntuaciones' and importados:
+                    # Las inserciones en bloque no pasan por los eventos que mantienen el
+                    # ranking; se recalcula aunque la importación se haya interrumpido
+                    rebuild_ranking_puntuaciones(self.session)
+            finally:
+                self.session.close()
+
+        return {
+            'entidad': self.entidad,
+            'importados': importados,
+            'rechazados': rechazados,
+            'rechazos': rejects_file if rechazados else None,
+            'segundos': time.perf_counter() - inicio,
+        }
+
+
+def import_csv(entidad: str, csv_file: str, rejects_file: str = None, engine=None, chunk_size: int = 5000) -> Dict:
+    """Importa un CSV de la entidad indicada (ver IMPORT_ENTITIES)"""
+    return BulkImporter(entidad, engine=engine, chunk_size=chunk_size).run(csv_file, rejects_file)
@@ -0,0 +1,375 @@
+"""
+Exportación en streaming a CSV y Excel
+
+Cada entidad exportable es una consulta Core sobre su tabla (con el nombre
+del jugador cuando la tabla tiene jugador_id) que se lee con yield_per y se
+escribe lote a lote, así que la memoria depende del tamaño del lote y no del
+número de filas. El Excel se escribe con el modo constant_memory de
+xlsxwriter y el ancho de las columnas se calcula con una muestra acotada de
+las primeras filas.
+
+Las páginas no generan el fichero en el callback: el botón Exportar encola
+un trabajo en job_runner, la página consulta su progreso y, al terminar,
+muestra un enlace firmado a /exportaciones/<token>. Esa ruta de Flask sirve
+el fichero desde disco por bloques, así que ni la generación ni la descarga
+ocupan un worker durante toda la exportación ni cargan el fichero entero en
+memoria (dcc.send_file lo codificaba completo en base64 en la respuesta).
+"""
+
+import os
+import csv
+import time
+import shutil
+import zipfile
+import tempfile
+from datetime import datetime, date
+from itertools import chain, islice
+from typing import Dict, Iterator, List, Optional
+import dash_bootstrap_components as dbc
+from dash import html, dcc, Input, Output, State, callback
+from dash.exceptions import PreventUpdate
+from flask import abort, send_file
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import select
+from database.db_manager import engine as default_engine, EstadisticaJugador, Jugador, RankingPuntuacion, Usuario
+from database.backup import BACKUP_MODELS
+from config.settings import APP_CONFIG, COLORS
+from auth.security import secret_key, session_user
+from utils.jobs import job_runner
+
+# Columnas que nunca salen de la base de datos
+EXPORT_EXCLUDED_COLUMNS = {
+    Usuario.__tablename__: {'password_hash'}
+}
+
+EXPORT_ENTITIES = {
+    modelo.__tablename__: modelo.__table__
+    for modelo in BACKUP_MODELS + [RankingPuntuacion, EstadisticaJugador]
+}
+
+# Tablas que descarga el botón Exportar de cada página
+PAGE_EXPORTS = {
+    'dashboard': [entidad for entidad in EXPORT_ENTITIES if entidad != Usuario.__tablename__],
+    'jugadores': ['jugadores', 'estadisticas_jugadores', 'peso_jugadores', 'lesiones'],
+    'calendario': ['calendario'],
+    'partidos': ['partidos', 'eventos_partido', 'convocatorias_partido'],
+    'entrenamientos': ['entrenamientos', 'asistencia_entrenamientos'],
+    'objetivos': ['objetivos_individuales'],
+    'puntuacion': ['puntuaciones', 'ranking_puntuaciones'],
+    'multas': ['multas', 'pagos_multas']
+}
+
+# Filas que se miran para calcular el ancho de las columnas en Excel
+WIDTH_SAMPLE_ROWS = 200
+MAX_COLUMN_WIDTH = 50
+
+DATE_FORMAT = 'dd/mm/yyyy'
+DATETIME_FORMAT = 'dd/mm/yyyy hh:mm'
+
+
+def export_query(entidad: str):
+    """Consulta de exportación de una entidad, ordenada por clave primaria"""
+    if entidad not in EXPORT_ENTITIES:
+        raise ValueError(f"Entidad no exportable: {entidad}. Opciones: {', '.join(EXPORT_ENTITIES)}")
+
+    tabla = EXPORT_ENTITIES[entidad]
+    excluidas = EXPORT_EXCLUDED_COLUMNS.get(entidad, set())
+    columnas = [c for c in tabla.columns if c.name not in excluidas]
+    consulta = select(*columnas)
+
+    if 'jugador_id' in tabla.c:
+        jugadores = Jugador.__table__
+        consulta = (
+            consulta.add_columns(jugadores.c.nombre_futbolistico.label('jugador'))
+            .select_from(tabla.outerjoin(jugadores, tabla.c.jugador_id == jugadores.c.id))
+        )
+
+    return consulta.order_by(*tabla.primary_key.columns)
+
+
+def iter_export_rows(entidad: str, engine=None, chunk_size: int = 1000) -> Iterator[List]:
+    """
+    Recorre una entidad por lotes
+
+    El primer lote es la lista de nombres de columna (una sola fila); después
+    vienen las filas de datos en lotes de chunk_size.
+    """
+    with (engine or default_engine).connect() as conn:
+        resultado = conn.execution_options(yield_per=chunk_size).execute(export_query(entidad))
+        yield [list(resultado.keys())]
+        for lote in resultado.partitions():
+            yield lote
+
+
+def _valor_csv(valor):
+    if isinstance(valor, datetime):
+        return valor.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return valor
+
+
+def write_csv(entidad: str, output_file: str, engine=None, chunk_size: int = 1000) -> int:
+    """
+    Escribe una entidad en un CSV
+
+    Returns:
+        int: Filas de datos escritas
+    """
+    filas = 0
+    with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        lotes = iter_export_rows(entidad, engine, chunk_size)
+        writer.writerows(next(lotes))
+        for lote in lotes:
+            writer.writerows([_valor_csv(v) for v in fila] for fila in lote)
+            filas += len(lote)
+    return filas
+
+
+def _ancho(valor) -> int:
+    if valor is None:
+        return 0
+    if isinstance(valor, datetime):
+        return 16
+    if isinstance(valor, date):
+        return 10
+    return len(str(valor))
+
+
+def column_widths(cabecera: List[str], muestra: List) -> List[int]:
+    """Ancho de cada columna según la cabecera y una muestra de filas"""
+    anchos = [len(str(nombre)) for nombre in cabecera]
+    for fila in muestra:
+        for i, valor in enumerate(fila):
+            anchos[i] = max(anchos[i], _ancho(valor))
+    return [min(ancho + 2, MAX_COLUMN_WIDTH) for ancho in anchos]
+
+
+def _filas(lotes):
+    for lote in lotes:
+        yield from lote
+
+
+def write_xlsx(entidades: List[str], output_file: str, engine=None, chunk_size: int = 1000) -> Dict[str, int]:
+    """
+    Escribe una o varias entidades en un Excel, una hoja por entidad
+
+    Con constant_memory xlsxwriter vuelca cada fila a disco en cuanto se
+    pasa a la siguiente, por eso las filas se escriben en orden y la muestra
+    para el ancho se toma antes de empezar.
+
+    Returns:
+        dict: Filas de datos escritas por entidad
+    """
+    # xlsxwriter solo se carga al exportar a Excel
+    import xlsxwriter
+
+    conteos = {}
+    workbook = xlsxwriter.Workbook(output_file, {
+        'constant_memory': True,
+        'default_date_format': DATE_FORMAT,
+        'remove_timezone': True
+    })
+    try:
+        header_format = workbook.add_format({
+            'bold': True,
+            'text_wrap': True,
+            'valign': 'top',
+            'fg_color': COLORS['primary'],
+            'font_color': 'white',
+            'border': 1
+        })
+        datetime_format = workbook.add_format({'num_format': DATETIME_FORMAT})
+
+        for entidad in entidades:
+            # Los nombres de hoja de Excel tienen como máximo 31 caracteres
+            worksheet = workbook.add_worksheet(entidad[:31])
+            lotes = iter_export_rows(entidad, engine, chunk_size)
+            cabecera = next(lotes)[0]
+            filas = _filas(lotes)
+            muestra = list(islice(filas, WIDTH_SAMPLE_ROWS))
+
+            for i, ancho in enumerate(column_widths(cabecera, muestra)):
+                worksheet.set_column(i, i, ancho)
+            worksheet.write_row(0, 0, cabecera, header_format)
+
+            n = 0
+            for n, fila in enumerate(chain(muestra, filas), start=1):
+                for col, valor in enumerate(fila):
+                    if isinstance(valor, datetime):
+                        worksheet.write_datetime(n, col, valor, datetime_format)
+                    else:
+                        worksheet.write(n, col, valor)
+            conteos[entidad] = n
+    finally:
+        workbook.close()
+
+    return conteos
+
+
+def xlsx_available() -> bool:
+    try:
+        import xlsxwriter  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def export_file(entidades: List[str], directorio: str, nombre: str, engine=None,
+                chunk_size: int = 1000) -> str:
+    """
+    Exporta las entidades al formato más adecuado
+
+    Excel si xlsxwriter está instalado; si no, un CSV para una sola entidad
+    o un zip con un CSV por entidad.
+
+    Returns:
+        str: Ruta del fichero generado
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    base = os.path.join(directorio, f"{nombre}_{timestamp}")
+
+    if xlsx_available():
+        ruta = f"{base}.xlsx"
+        write_xlsx(entidades, ruta, engine, chunk_size)
+        return ruta
+
+    if len(entidades) == 1:
+        ruta = f"{base}.csv"
+        write_csv(entidades[0], ruta, engine, chunk_size)
+        return ruta
+
+    ruta = f"{base}.zip"
+    with zipfile.ZipFile(ruta, 'w', compression=zipfile.ZIP_DEFLATED) as zf:
+        for entidad in entidades:
+            csv_file = os.path.join(directorio, f"{entidad}.csv")
+            write_csv(entidad, csv_file, engine, chunk_size)
+            zf.write(csv_file, f"{entidad}.csv")
+            os.remove(csv_file)
+    return ruta
+
+
+def export_dir() -> str:
+    """Directorio compartido por los workers donde se dejan las exportaciones terminadas"""
+    directorio = APP_CONFIG.get('export_dir') or os.path.join(tempfile.gettempdir(), 'ud_atzeneta_exports')
+    os.makedirs(directorio, exist_ok=True)
+    return directorio
+
+
+def clean_exports(max_age: float = None) -> int:
+    """Borra las exportaciones más antiguas que export_ttl (sus enlaces ya han caducado)"""
+    max_age = APP_CONFIG['export_ttl'] if max_age is None else max_age
+    limite = time.time() - max_age
+    borradas = 0
+    with os.scandir(export_dir()) as entradas:
+        for entrada in entradas:
+            if entrada.is_dir() and entrada.stat().st_mtime < limite:
+                shutil.rmtree(entrada.path, ignore_errors=True)
+                borradas += 1
+    return borradas
+
+
+def run_export_job(set_progress, entidades: List[str], nombre: str, engine=None) -> Dict:
+    """
+    Trabajo de job_runner que genera la exportación de una página
+
+    Returns:
+        dict: ruta del fichero generado (dentro de export_dir) y su nombre
+    """
+    t0 = time.perf_counter()
+    clean_exports()
+    set_progress(5, f"Exportando {', '.join(entidades)}")
+    directorio = tempfile.mkdtemp(prefix=f"{nombre}_", dir=export_dir())
+    ruta = export_file(entidades, directorio, nombre, engine)
+    print(f"📤 Exportación {nombre} ({', '.join(entidades)}) en {time.perf_counter() - t0:.2f}s")
+    return {'ruta': ruta, 'fichero': os.path.basename(ruta)}
+
+
+def _download_serializer() -> URLSafeTimedSerializer:
+    return URLSafeTimedSerializer(secret_key(), salt='ud-atzeneta-exportacion')
+
+
+def export_download_url(job_id: str) -> str:
+    """Enlace firmado a la descarga de una exportación; caduca a los export_ttl segundos"""
+    return f"/exportaciones/{_download_serializer().dumps(job_id)}"
+
+
+def init_export_downloads(server):
+    """Registra la ruta que sirve las exportaciones terminadas desde disco"""
+
+    @server.route('/exportaciones/<token>')
+    def descargar_exportacion(token):
+        try:
+            job_id = _download_serializer().loads(token, max_age=APP_CONFIG['export_ttl'])
+        except BadSignature:
+            abort(403)
+
+        job = job_runner.get_job(job_id)
+        if not job or job['tipo'] != 'exportacion' or job['estado'] != 'completado':
+            abort(404)
+        ruta = os.path.realpath(job['resultado']['ruta'])
+        if os.path.commonpath([ruta, os.path.realpath(export_dir())]) != os.path.realpath(export_dir()) \
+                or not os.path.isfile(ruta):
+            abort(404)
+        # send_file entrega el fichero por bloques (wsgi.file_wrapper), sin leerlo entero
+        return send_file(ruta, as_attachment=True, download_name=job['resultado']['fichero'])
+
+
+def export_components(pagina: str):
+    """Componentes de la exportación de una página: trabajo, sondeo y estado con el enlace"""
+    return html.Div([
+        dcc.Store(id=f"{pagina}-export-job"),
+        dcc.Interval(id=f"{pagina}-export-interval", interval=1000, disabled=True),
+        html.Div(id=f"{pagina}-export-status")
+    ])
+
+
+def register_export_callbacks(pagina: str, boton: str):
+    """
+    Registra los callbacks del botón Exportar de una página
+
+    Args:
+        pagina (str): Clave de PAGE_EXPORTS (y prefijo de export_components)
+        boton (str): id del botón que lanza la exportación
+    """
+
+    @callback(
+        [Output(f"{pagina}-export-job", "data"),
+         Output(f"{pagina}-export-interval", "disabled"),
+         Output(f"{pagina}-export-status", "children")],
+        Input(boton, "n_clicks"),
+        State("session-store", "data"),
+        prevent_initial_call=True
+    )
+    def start_export(n_clicks, session_data):
+        """Encola la exportación de la página"""
+        if not session_user(session_data):
+            raise PreventUpdate
+        job_id = job_runner.submit('exportacion', run_export_job, PAGE_EXPORTS[pagina], pagina)
+        return job_id, False, dbc.Alert("⏳ Preparando exportación...", color="info", className="mt-2")
+
+    @callback(
+        [Output(f"{pagina}-export-status", "children", allow_duplicate=True),
+         Output(f"{pagina}-export-interval", "disabled", allow_duplicate=True)],
+        Input(f"{pagina}-export-interval", "n_intervals"),
+        [State(f"{pagina}-export-job", "data"),
+         State("session-store", "data")],
+        prevent_initial_call=True
+    )
+    def poll_export(n_intervals, job_id, session_data):
+        """Muestra el progreso y, al terminar, el enlace de descarga"""
+        if not session_user(session_data):
+            raise PreventUpdate
+        job = job_runner.get_job(job_id)
+        if job is None:
+            return None, True
+        if job['activo']:
+            return dbc.Alert(f"⏳ {job['progreso']}% - {job['mensaje']}", color="info", className="mt-2"), False
+        if job['estado'] == 'error':
+            return dbc.Alert(f"❌ Error en la exportación: {job['error']}", color="danger",
+                             dismissable=True, className="mt-2"), True
+        return dbc.Alert([
+            "✅ Exportación lista: ",
+            html.A(job['resultado']['fichero'], href=export_download_url(job_id), className="alert-link")
+        ], color="success", dismissable=True, className="mt-2"), True
@@ -0,0 +1,109 @@
+"""
+Parser rápido de las páginas de calendario de la FFCV
+
+Solo se construye el árbol de la tabla table.calendario_table (SoupStrainer)
+con lxml cuando está instalado, y cada fila se recorre una única vez: cada
+celda se busca una vez y de ella salen todos sus datos, en lugar de un
+find_all por dato como hacen los _extract_*_ffcv de FFCVScraper.
+"""
+
+import re
+from typing import Dict, Iterator, List, Optional
+from bs4 import BeautifulSoup, SoupStrainer
+from config.settings import SCRAPING_CONFIG
+
+# Mientras se parsea, el atributo class se compara como texto completo
+CALENDARIO_STRAINER = SoupStrainer('table', class_='table calendario_table')
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def lxml_available() -> bool:
+    try:
+        import lxml  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def get_parser_backend(backend: Optional[str] = None) -> str:
+    """
+    Backend de BeautifulSoup a usar
+
+    Args:
+        backend (str, optional): 'lxml', 'html.parser' o 'auto'
+            (por defecto SCRAPING_CONFIG['parser'])
+    """
+    backend = backend or SCRAPING_CONFIG.get('parser', 'auto')
+    if backend == 'auto':
+        return 'lxml' if lxml_available() else 'html.parser'
+    return backend
+
+
+def _text(elemento) -> str:
+    return elemento.get_text().strip()
+
+
+def _goles(spans, posicion) -> Optional[int]:
+    if len(spans) >= 2:
+        goles = _text(spans[posicion])
+        if goles.isdigit():
+            return int(goles)
+    return None
+
+
+def iter_calendar_rows(content, backend: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Recorre los partidos de una página de calendario FFCV
+
+    Yields:
+        dict: jornada, fecha (texto DD-MM-YYYY), hora, equipo_local,
+        equipo_visitante, goles_equipo_local, goles_equipo_visitante y campo
+    """
+    soup = BeautifulSoup(content, get_parser_backend(backend), parse_only=CALENDARIO_STRAINER)
+    tabla = soup.find('table', class_='table calendario_table')
+    if not tabla:
+        print("No se encontró la tabla de partidos")
+        return
+
+    tbody = tabla.find('tbody')
+    if not tbody:
+        return
+
+    jornada_actual = None
+    for fila in tbody.find_all('tr'):
+        try:
+            columnas = fila.find_all('td')
+
+            if 'info_jornada' in fila.get('class', []):
+                jornada_actual = _text(columnas[0]).replace('JORNADA ', '')
+                continue
+
+            if len(columnas) < 6:
+                continue
+
+            enlaces = columnas[2].find_all('a')
+            spans = columnas[3].find_all('span')
+            divs = columnas[4].find_all('div')
+            fecha_div = next((div for div in divs if 'negrita' in div.get('class', [])), None)
+            campo = _WHITESPACE.sub(' ', _text(columnas[5])).strip()
+
+            yield {
+                'jornada': jornada_actual,
+                'fecha': _text(fecha_div) if fecha_div else None,
+                'hora': _text(divs[1]) if len(divs) >= 2 else None,
+                'equipo_local': _text(enlaces[0]) if len(enlaces) >= 1 else None,
+                'equipo_visitante': _text(enlaces[1]) if len(enlaces) >= 2 else None,
+                'goles_equipo_local': _goles(spans, 0),
+                'goles_equipo_visitante': _goles(spans, 1),
+                'campo': campo or None
+            }
+
+        except Exception as e:
+            print(f"Error procesando fila: {e}")
+            continue
+
+
+def parse_calendar_rows(content, backend: Optional[str] = None) -> List[Dict]:
+    """Lista con todas las filas de partido de iter_calendar_rows"""
+    return list(iter_calendar_rows(content, backend))
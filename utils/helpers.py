@@ -1,4 +1,3 @@
-import pandas as pd
 import io
 import base64
 from datetime import datetime, date, timedelta
@@ -7,7 +6,6 @@ import re
 import json
 from decimal import Decimal
 import plotly.graph_objs as go
-import plotly.express as px
 from config.settings import COLORS
 
 def format_date(date_obj: Union[date, datetime, str], format_str: str = "%d/%m/%Y") -> str:
@@ -82,13 +80,22 @@ def sanitize_filename(filename: str) -> str:
     
     return filename
 
+# Patrones compartidos con la validación por lotes de utils/bulk_import.py
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+PHONE_PATTERNS = [
+    r'^\+34[6-9]\d{8}$',  # +34 seguido de móvil
+    r'^[6-9]\d{8}$',      # Móvil directo
+    r'^\+349\d{8}$',      # +34 seguido de fijo
+    r'^9\d{8}$'           # Fijo directo
+]
+DNI_LETTERS = "TRWAGMYFPDXBNJZSQVHLCKE"
+
 def validate_email(email: str) -> bool:
     """Valida formato de email"""
     if not email:
         return False
     
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return bool(re.match(pattern, email))
+    return bool(re.match(EMAIL_PATTERN, email))
 
 def validate_phone(phone: str) -> bool:
     """Valida formato de teléfono español"""
@@ -99,14 +106,7 @@ def validate_phone(phone: str) -> bool:
     phone = re.sub(r'[^\d+]', '', phone)
     
     # Patrones válidos para España
-    patterns = [
-        r'^\+34[6-9]\d{8}$',  # +34 seguido de móvil
-        r'^[6-9]\d{8}$',      # Móvil directo
-        r'^\+349\d{8}$',      # +34 seguido de fijo
-        r'^9\d{8}$'           # Fijo directo
-    ]
-    
-    return any(re.match(pattern, phone) for pattern in patterns)
+    return any(re.match(pattern, phone) for pattern in PHONE_PATTERNS)
 
 def validate_dni(dni: str) -> bool:
     """Valida DNI español"""
@@ -121,13 +121,15 @@ def validate_dni(dni: str) -> bool:
         return False
     
     # Tabla de letras para validación
-    letters = "TRWAGMYFPDXBNJZSQVHLCKE"
-    expected_letter = letters[int(number) % 23]
+    expected_letter = DNI_LETTERS[int(number) % 23]
     
     return letter == expected_letter
 
 def export_to_excel(data: List[Dict], filename: str, sheet_name: str = "Datos") -> bytes:
     """Exporta datos a Excel"""
+    # pandas solo se carga al exportar (tarda en importarse y alarga el arranque)
+    import pandas as pd
+    
     df = pd.DataFrame(data)
     
     # Crear buffer en memoria
@@ -154,10 +156,11 @@ def export_to_excel(data: List[Dict], filename: str, sheet_name: str = "Datos")
         for col_num, value in enumerate(df.columns.values):
             worksheet.write(0, col_num, value, header_format)
         
-        # Ajustar ancho de columnas
+        # Ajustar ancho de columnas con una muestra acotada de filas
+        muestra = df.head(200)
         for i, col in enumerate(df.columns):
             max_length = max(
-                df[col].astype(str).str.len().max(),
+                muestra[col].astype(str).str.len().max() if len(muestra) else 0,
                 len(str(col))
             )
             worksheet.set_column(i, i, min(max_length + 2, 50))
@@ -165,95 +168,6 @@ def export_to_excel(data: List[Dict], filename: str, sheet_name: str = "Datos")
     output.seek(0)
     return output.getvalue()
 
-def create_backup_data(db_manager) -> Dict[str, Any]:
-    """Crea un backup de todos los datos"""
-    backup_data = {
-        'timestamp': datetime.now().isoformat(),
-        'version': '1.0',
-        'data': {}
-    }
-    
-    try:
-        # Exportar jugadores
-        jugadores = db_manager.get_jugadores(activos_solo=False)
-        backup_data['data']['jugadores'] = [
-            {
-                'id': j.id,
-                'nombre_futbolistico': j.nombre_futbolistico,
-                'nombre': j.nombre,
-                'apellidos': j.apellidos,
-                'email': j.email,
-                'dni': j.dni,
-                'telefono': j.telefono,
-                'direccion': j.direccion,
-                'dorsal': j.dorsal,
-                'posicion': j.posicion,
-                'pierna_dominante': j.pierna_dominante,
-                'goles': j.goles,
-                'asistencias': j.asistencias,
-                'tarjetas_amarillas': j.tarjetas_amarillas,
-                'tarjetas_rojas': j.tarjetas_rojas,
-                'minutos_jugados': j.minutos_jugados,
-                'partidos_titular': j.partidos_titular,
-                'partidos_suplente': j.partidos_suplente,
-                'convocatorias': j.convocatorias,
-                'altura': j.altura,
-                'activo': j.activo,
-                'fecha_registro': j.fecha_registro.isoformat() if j.fecha_registro else None
-            } for j in jugadores
-        ]
-        
-        # Exportar calendario
-        calendario = db_manager.get_calendario()
-        backup_data['data']['calendario'] = [
-            {
-                'id': c.id,
-                'fecha': c.fecha.isoformat() if c.fecha else None,
-                'hora': c.hora,
-                'competicion': c.competicion,
-                'jornada': c.jornada,
-                'equipo_local': c.equipo_local,
-                'goles_equipo_local': c.goles_equipo_local,
-                'goles_equipo_visitante': c.goles_equipo_visitante,
-                'equipo_visitante': c.equipo_visitante,
-                'arbitro': c.arbitro,
-                'asistentes': c.asistentes,
-                'campo': c.campo,
-                'scrapeado': c.scrapeado
-            } for c in calendario
-        ]
-        
-        # Exportar entrenamientos
-        entrenamientos = db_manager.get_entrenamientos()
-        backup_data['data']['entrenamientos'] = [
-            {
-                'id': e.id,
-                'numero_entrenamiento': e.numero_entrenamiento,
-                'fecha': e.fecha.isoformat() if e.fecha else None,
-                'observaciones': e.observaciones
-            } for e in entrenamientos
-        ]
-        
-        # Exportar multas
-        multas = db_manager.get_multas()
-        backup_data['data']['multas'] = [
-            {
-                'id': m.id,
-                'jugador_id': m.jugador_id,
-                'fecha': m.fecha.isoformat() if m.fecha else None,
-                'razon_multa': m.razon_multa,
-                'multa': float(m.multa),
-                'pagado': float(m.pagado),
-                'debe': float(m.debe),
-                'completamente_pagada': m.completamente_pagada
-            } for m in multas
-        ]
-        
-    except Exception as e:
-        backup_data['error'] = str(e)
-    
-    return backup_data
-
 def process_uploaded_image(contents: str, filename: str) -> Optional[str]:
     """Procesa imagen subida y retorna path relativo"""
     try:
@@ -329,6 +243,7 @@ def create_attendance_chart(asistencia_data: List[Dict]) -> go.Figure:
         return go.Figure()
     
     # Procesar datos de asistencia
+    import pandas as pd
     df = pd.DataFrame(asistencia_data)
     
     if 'fecha' not in df.columns or 'asistentes' not in df.columns:
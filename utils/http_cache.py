@@ -0,0 +1,139 @@
+"""
+Caché en disco de respuestas HTTP con peticiones condicionales
+
+Guarda por URL el cuerpo de la última respuesta, sus cabeceras ETag y
+Last-Modified y un hash del contenido. Las siguientes descargas envían
+If-None-Match/If-Modified-Since: un 304, o un 200 con el mismo hash, se
+marcan como "sin cambios" para que el llamante pueda saltarse el parseo.
+Las respuestas que sí han cambiado no se guardan al descargarlas: el
+llamante las guarda con save() cuando ya las ha procesado, para que un
+fallo al parsear o al escribir no deje la página marcada como importada.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional
+
+
+class CachedResponse(NamedTuple):
+    content: bytes
+    changed: bool
+    status_code: int
+    content_hash: Optional[str] = None
+    headers: Optional[Dict] = None
+
+
+class ConditionalGetCache:
+    """Caché de respuestas en un directorio (un fichero de cuerpo y otro de metadatos por URL)"""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + '.json', base + '.body'
+
+    def load(self, url: str) -> Optional[Dict]:
+        """Metadatos guardados de la URL o None"""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if os.path.exists(body_path) else None
+
+    def load_content(self, url: str) -> Optional[bytes]:
+        _, body_path = self._paths(url)
+        try:
+            with open(body_path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store(self, url: str, content: bytes, content_hash: str, headers) -> None:
+        """Guarda cuerpo y metadatos con escrituras atómicas"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        meta_path, body_path = self._paths(url)
+        entry = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'hash': content_hash,
+            'fecha': datetime.utcnow().isoformat()
+        }
+        self._write_atomic(body_path, content)
+        self._write_atomic(meta_path, json.dumps(entry).encode('utf-8'))
+
+    def save(self, url: str, response: CachedResponse) -> None:
+        """Guarda una respuesta devuelta por get() (los 304 no traen nada nuevo)"""
+        if response.content_hash is not None:
+            self.store(url, response.content, response.content_hash, response.headers or {})
+
+    def _write_atomic(self, path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def clear(self) -> None:
+        """Elimina todas las respuestas guardadas"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(('.json', '.body')):
+                os.unlink(os.path.join(self.cache_dir, name))
+
+    def get(self, session, url: str, timeout: float = 30, force: bool = False) -> CachedResponse:
+        """
+        GET condicional a través de una requests.Session
+
+        Las respuestas sin cambios se guardan al momento para refrescar
+        ETag y Last-Modified; las que han cambiado se guardan con save().
+
+        Args:
+            session: Sesión con la que hacer la petición
+            url (str): URL a descargar
+            timeout (float): Timeout de la petición
+            force (bool): Ignorar la caché y tratar la respuesta como cambiada
+
+        Raises:
+            requests.RequestException: Errores de conexión o de estado HTTP
+        """
+        entry = None if force else self.load(url)
+
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        response = session.get(url, headers=headers, timeout=timeout)
+
+        if response.status_code == 304 and entry:
+            content = self.load_content(url)
+            if content is not None:
+                return CachedResponse(content, False, 304)
+            # El cuerpo ha desaparecido: se descarga de nuevo sin condiciones
+            return self.get(session, url, timeout, force=True)
+
+        response.raise_for_status()
+
+        content = response.content
+        content_hash = hashlib.sha256(content).hexdigest()
+        changed = force or entry is None or entry.get('hash') != content_hash
+        validators = {name: response.headers[name] for name in ('ETag', 'Last-Modified')
+                      if response.headers.get(name)}
+        cached = CachedResponse(content, changed, response.status_code, content_hash, validators)
+        if not changed:
+            self.save(url, cached)
+        return cached
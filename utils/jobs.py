@@ -0,0 +1,168 @@
+"""
+Trabajos en segundo plano para UD Atzeneta
+
+Las tareas largas (importaciones de la FFCV) se ejecutan en un pool de hilos
+del propio proceso para no bloquear al worker que atiende el callback. El
+estado de cada trabajo se guarda en la tabla trabajos, así que cualquier
+worker de gunicorn puede responder a la consulta de progreso de la interfaz.
+Si el worker muere con un trabajo activo, el trabajo se marca como error al
+superar APP_CONFIG['job_timeout'] para que la interfaz deje de consultarlo.
+"""
+
+import json
+import uuid
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+from sqlalchemy import func
+from config.settings import APP_CONFIG
+from database.db_manager import DatabaseManager, Trabajo
+
+ESTADOS_ACTIVOS = ('pendiente', 'en_curso')
+
+
+class JobRunner:
+    """Cola de trabajos en un pool de hilos con el estado persistido en la base de datos"""
+
+    def __init__(self, max_workers: int = None, timeout: float = None):
+        self.max_workers = max_workers or APP_CONFIG.get('background_workers', 2)
+        self.timeout = timeout or APP_CONFIG.get('job_timeout', 1800)
+        self._executor = None
+        self._futures = {}
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # Se crea al primer uso para no arrancar hilos al importar el módulo
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='trabajo')
+        return self._executor
+
+    def submit(self, tipo: str, func: Callable, *args, **kwargs) -> str:
+        """
+        Encola un trabajo
+
+        Args:
+            tipo (str): Tipo de trabajo (p. ej. 'importacion_ffcv')
+            func: Función func(set_progress, *args, **kwargs) que devuelve
+                un resultado serializable a JSON. set_progress(progreso, mensaje)
+                actualiza el porcentaje (0-100) visible en la interfaz.
+
+        Returns:
+            str: Identificador del trabajo
+        """
+        job_id = str(uuid.uuid4())
+        with DatabaseManager() as db:
+            db.db.add(Trabajo(id=job_id, tipo=tipo, estado='pendiente', progreso=0, mensaje='En cola'))
+            db.db.commit()
+
+        future = self.executor.submit(self._run, job_id, func, args, kwargs)
+        self._futures[job_id] = future
+        future.add_done_callback(lambda f: self._futures.pop(job_id, None))
+        return job_id
+
+    def _run(self, job_id: str, func: Callable, args, kwargs):
+        self._update(job_id, estado='en_curso', fecha_inicio=datetime.utcnow(), mensaje='Iniciando')
+
+        def set_progress(progreso: int, mensaje: str = None):
+            values = {'progreso': max(0, min(100, int(progreso)))}
+            if mensaje is not None:
+                values['mensaje'] = mensaje[:200]
+            self._update(job_id, **values)
+
+        try:
+            resultado = func(set_progress, *args, **kwargs)
+            self._update(
+                job_id,
+                estado='completado',
+                progreso=100,
+                mensaje='Completado',
+                resultado=json.dumps(resultado, default=str),
+                fecha_fin=datetime.utcnow()
+            )
+            return resultado
+        except Exception as e:
+            print(f"Error en trabajo {job_id}: {e}")
+            traceback.print_exc()
+            self._update(
+                job_id,
+                estado='error',
+                mensaje='Error',
+                error=str(e),
+                fecha_fin=datetime.utcnow()
+            )
+
+    def _update(self, job_id: str, **values):
+        with DatabaseManager() as db:
+            db.db.query(Trabajo).filter(Trabajo.id == job_id).update(values)
+            db.db.commit()
+
+    def expire_stale_jobs(self, job_id: str = None) -> int:
+        """
+        Marca como error los trabajos activos que empezaron hace más de self.timeout
+
+        Un trabajo así pertenecía a un worker que murió o se quedó bloqueado:
+        sin esto seguiría 'en_curso' para siempre y la interfaz no dejaría
+        de consultar su progreso.
+
+        Args:
+            job_id (str, optional): Revisar solo este trabajo
+
+        Returns:
+            int: Trabajos marcados como error
+        """
+        limite = datetime.utcnow() - timedelta(seconds=self.timeout)
+        with DatabaseManager() as db:
+            query = db.db.query(Trabajo).filter(
+                Trabajo.estado.in_(ESTADOS_ACTIVOS),
+                func.coalesce(Trabajo.fecha_inicio, Trabajo.fecha_creacion) < limite
+            )
+            if job_id:
+                query = query.filter(Trabajo.id == job_id)
+            caducados = query.update({
+                'estado': 'error',
+                'mensaje': 'Interrumpido',
+                'error': f"El trabajo no terminó en {int(self.timeout)} segundos",
+                'fecha_fin': datetime.utcnow()
+            }, synchronize_session=False)
+            db.db.commit()
+
+        if caducados:
+            print(f"⚠️ {caducados} trabajos en segundo plano marcados como interrumpidos")
+        return caducados
+
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """Estado del trabajo como diccionario (None si no existe)"""
+        if not job_id:
+            return None
+
+        self.expire_stale_jobs(job_id)
+        with DatabaseManager() as db:
+            trabajo = db.db.query(Trabajo).filter(Trabajo.id == job_id).first()
+            if not trabajo:
+                return None
+
+            return {
+                'id': trabajo.id,
+                'tipo': trabajo.tipo,
+                'estado': trabajo.estado,
+                'activo': trabajo.estado in ESTADOS_ACTIVOS,
+                'progreso': trabajo.progreso,
+                'mensaje': trabajo.mensaje,
+                'resultado': json.loads(trabajo.resultado) if trabajo.resultado else None,
+                'error': trabajo.error,
+                'fecha_creacion': trabajo.fecha_creacion,
+                'fecha_inicio': trabajo.fecha_inicio,
+                'fecha_fin': trabajo.fecha_fin
+            }
+
+    def wait(self, job_id: str, timeout: float = None) -> Optional[Dict]:
+        """Espera a que termine un trabajo de este proceso y devuelve su estado"""
+        future = self._futures.get(job_id)
+        if future is not None:
+            future.exception(timeout=timeout)
+        return self.get_job(job_id)
+
+
+# Instancia global del ejecutor de trabajos
+job_runner = JobRunner()
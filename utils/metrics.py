@@ -0,0 +1,174 @@
+"""
+Instrumentación de los callbacks de Dash
+
+Cada callback llega al servidor como una petición a _dash-update-component.
+Los hooks de Flask miden cada una: duración, sentencias SQL ejecutadas
+(evento before_cursor_execute del engine), la sentencia más repetida (para
+detectar N+1) y el tamaño de la petición y de la respuesta. Los registros se
+guardan en un buffer circular por worker y, si se configura
+METRICS_CONFIG['log_file'], también en un fichero JSON lines común a todos los
+workers. /_metrics devuelve el resumen y los últimos registros; monitor_app.py
+los muestra en vivo.
+"""
+
+import os
+import hmac
+import json
+import time
+import threading
+from collections import Counter, deque
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from flask import g, has_request_context, jsonify, request
+from sqlalchemy import event
+from config.settings import METRICS_CONFIG
+
+DASH_UPDATE_PATH = '_dash-update-component'
+
+
+class CallbackMetrics:
+    """Buffer circular de registros de callbacks con su resumen agregado"""
+
+    def __init__(self, max_records: int = None, log_file: str = None):
+        self.records = deque(maxlen=max_records or METRICS_CONFIG['max_records'])
+        self.log_file = log_file
+        self._lock = threading.Lock()
+
+    def record(self, registro: Dict):
+        with self._lock:
+            self.records.append(registro)
+            if self.log_file:
+                with open(self.log_file, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+    def recent(self, limit: int = 50) -> List[Dict]:
+        with self._lock:
+            return list(self.records)[-limit:]
+
+    def summary(self) -> List[Dict]:
+        with self._lock:
+            return summarize(self.records)
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p * (len(ordenados) - 1))))]
+
+
+def summarize(registros: Iterable[Dict]) -> List[Dict]:
+    """
+    Agrega los registros por callback
+
+    Returns:
+        list: Un diccionario por callback ordenado por p95 descendente
+    """
+    por_callback = {}
+    for registro in registros:
+        por_callback.setdefault(registro['callback'], []).append(registro)
+
+    resumen = []
+    for callback, lista in por_callback.items():
+        duraciones = [r['duration_ms'] for r in lista]
+        peor = max(lista, key=lambda r: r['max_repeat'])
+        resumen.append({
+            'callback': callback,
+            'count': len(lista),
+            'avg_ms': sum(duraciones) / len(lista),
+            'p95_ms': _percentil(duraciones, 0.95),
+            'max_ms': max(duraciones),
+            'avg_queries': sum(r['queries'] for r in lista) / len(lista),
+            'max_queries': max(r['queries'] for r in lista),
+            'max_repeat': peor['max_repeat'],
+            'repeated_sql': peor.get('repeated_sql'),
+            'n_plus_one': any(r.get('n_plus_one') for r in lista),
+            'avg_response_bytes': sum(r['response_bytes'] for r in lista) / len(lista),
+            'errors': sum(1 for r in lista if r['status'] >= 400),
+        })
+    return sorted(resumen, key=lambda r: r['p95_ms'], reverse=True)
+
+
+def _callback_name(body: Optional[Dict]) -> str:
+    if not body:
+        return 'desconocido'
+    # Los callbacks con varias salidas llegan como '..salida1...salida2..'
+    return body.get('output', 'desconocido').strip('.').replace('...', ' | ')
+
+
+def init_metrics(server, engine, metrics: CallbackMetrics = None, config: Dict = None) -> Optional[CallbackMetrics]:
+    """
+    Instrumenta los callbacks del servidor de Dash y registra /_metrics
+
+    Args:
+        server: Servidor Flask (app.server)
+        engine: Engine de SQLAlchemy cuyas sentencias se cuentan
+        metrics (CallbackMetrics, optional): Destino de los registros
+        config (dict, optional): Configuración (por defecto METRICS_CONFIG)
+
+    Returns:
+        CallbackMetrics: El destino usado, o None si las métricas están desactivadas
+    """
+    config = config or METRICS_CONFIG
+    if not config.get('enabled', True):
+        return None
+
+    metrics = metrics or CallbackMetrics(config.get('max_records'), config.get('log_file'))
+    umbral = config.get('n_plus_one_threshold', 5)
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _contar_sentencia(conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and 'metrics_sentencias' in g:
+            g.metrics_sentencias[statement] += 1
+
+    @server.before_request
+    def _iniciar_medida():
+        if request.path.endswith(DASH_UPDATE_PATH):
+            g.metrics_sentencias = Counter()
+            g.metrics_inicio = time.perf_counter()
+
+    @server.after_request
+    def _registrar_medida(response):
+        if 'metrics_inicio' not in g:
+            return response
+
+        duracion = (time.perf_counter() - g.metrics_inicio) * 1000
+        sentencias = g.metrics_sentencias
+        repetida, repeticiones = sentencias.most_common(1)[0] if sentencias else (None, 0)
+        body = request.get_json(silent=True)
+
+        metrics.record({
+            'ts': datetime.now().isoformat(timespec='seconds'),
+            'pid': os.getpid(),
+            'callback': _callback_name(body),
+            'triggered': (body or {}).get('changedPropIds', []),
+            'status': response.status_code,
+            'duration_ms': round(duracion, 2),
+            'queries': sum(sentencias.values()),
+            'max_repeat': repeticiones,
+            'repeated_sql': ' '.join(repetida.split())[:200] if repeticiones > 1 else None,
+            'n_plus_one': repeticiones >= umbral,
+            'request_bytes': request.content_length or 0,
+            'response_bytes': response.calculate_content_length() or 0,
+        })
+        return response
+
+    @server.route('/_metrics')
+    def metrics_endpoint():
+        # Sin METRICS_TOKEN el endpoint no se abre: expone nombres de callbacks y SQL
+        token = config.get('token')
+        if not token:
+            return jsonify({'error': 'Define METRICS_TOKEN para consultar las métricas'}), 403
+        if not hmac.compare_digest(request.args.get('token', ''), token):
+            return jsonify({'error': 'No autorizado'}), 403
+
+        limit = request.args.get('limit', default=50, type=int)
+        return jsonify({
+            'pid': os.getpid(),
+            'summary': metrics.summary(),
+            'records': metrics.recent(limit)
+        })
+
+    return metrics
@@ -0,0 +1,165 @@
+"""
+Sincronización automática del calendario y los resultados con la FFCV
+
+Cada worker de la aplicación arranca un hilo que comprueba periódicamente
+si toca sincronizar. La sincronización es más frecuente en las ventanas de
+partido (según Calendario.fecha/hora) y casi nula fuera de ellas. Un bloqueo
+en la tabla tareas_programadas garantiza que solo un worker scrapea en cada
+turno, y la hora de la última ejecución compartida evita que los demás
+repitan el trabajo al despertar. Solo cuenta como ejecución un scraping
+correcto: tras un fallo se reintenta pasados sync_retry_interval segundos.
+"""
+
+import os
+import socket
+import threading
+import traceback
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+from config.settings import SCRAPING_CONFIG
+from database.db_manager import DatabaseManager, Calendario
+
+LOCK_NAME = 'sincronizacion_ffcv'
+
+# Ventana de todo el día para partidos sin hora conocida
+HORA_INICIO_SIN_HORA = '09:00'
+HORA_FIN_SIN_HORA = '23:00'
+
+
+def parse_hora(hora: Optional[str]):
+    """Convierte 'HH:MM' en time (None si no es una hora válida)"""
+    try:
+        return datetime.strptime((hora or '').strip(), '%H:%M').time()
+    except ValueError:
+        return None
+
+
+def get_ventanas_partido(db, ahora: datetime) -> List[tuple]:
+    """Ventanas (inicio, fin) de los partidos de ayer, hoy y mañana"""
+    antes = timedelta(minutes=SCRAPING_CONFIG['sync_ventana_antes'])
+    despues = timedelta(minutes=SCRAPING_CONFIG['sync_ventana_despues'])
+
+    partidos = db.db.query(Calendario.fecha, Calendario.hora).filter(
+        Calendario.fecha >= ahora.date() - timedelta(days=1),
+        Calendario.fecha <= ahora.date() + timedelta(days=1)
+    ).all()
+
+    ventanas = []
+    for fecha, hora in partidos:
+        inicio = parse_hora(hora)
+        if inicio:
+            saque = datetime.combine(fecha, inicio)
+            ventanas.append((saque - antes, saque + despues))
+        else:
+            ventanas.append((
+                datetime.combine(fecha, parse_hora(HORA_INICIO_SIN_HORA)),
+                datetime.combine(fecha, parse_hora(HORA_FIN_SIN_HORA))
+            ))
+    return ventanas
+
+
+def intervalo_sincronizacion(db, ahora: datetime = None) -> int:
+    """Segundos entre sincronizaciones en este momento (corto en ventana de partido)"""
+    ahora = ahora or datetime.now()
+    for inicio, fin in get_ventanas_partido(db, ahora):
+        if inicio <= ahora <= fin:
+            return SCRAPING_CONFIG['sync_interval_partido']
+    return SCRAPING_CONFIG['sync_interval_normal']
+
+
+class SyncScheduler:
+    """Hilo de sincronización periódica coordinado entre workers mediante la base de datos"""
+
+    def __init__(self, urls: List[str] = None, lock_name: str = LOCK_NAME,
+                 scrape: Callable[[List[str]], Dict] = None):
+        self.urls = urls if urls is not None else SCRAPING_CONFIG['sync_urls']
+        self.lock_name = lock_name
+        self.scrape = scrape or self._scrape_ffcv
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{id(self)}"
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _scrape_ffcv(self, urls: List[str]) -> Dict:
+        from utils.scraping import run_ffcv_import_job
+        return run_ffcv_import_job(lambda progreso, mensaje=None: None, urls)
+
+    def is_due(self, db, ahora: datetime = None) -> bool:
+        """Indica si ha pasado el intervalo actual desde la última sincronización de cualquier worker"""
+        ahora = ahora or datetime.now()
+        tarea = db.get_tarea_programada(self.lock_name)
+        if tarea is None or tarea.ultima_ejecucion is None:
+            return True
+        # ultima_ejecucion se guarda en UTC
+        transcurrido = (datetime.utcnow() - tarea.ultima_ejecucion).total_seconds()
+        return transcurrido >= intervalo_sincronizacion(db, ahora)
+
+    def run_once(self, ahora: datetime = None) -> Optional[Dict]:
+        """
+        Sincroniza si toca y si este worker consigue el bloqueo
+
+        Returns:
+            dict: Resultado del scraping, o None si no se ha ejecutado
+        """
+        if not self.urls:
+            return None
+
+        with DatabaseManager() as db:
+            if not self.is_due(db, ahora):
+                return None
+            # El bloqueo caduca solo si el worker muere a mitad de sincronización
+            ttl = SCRAPING_CONFIG['timeout'] * SCRAPING_CONFIG['retry_attempts'] * max(1, len(self.urls)) + 60
+            if not db.acquire_lock(self.lock_name, self.worker_id, ttl):
+                return None
+            # Otro worker puede haber terminado entre la comprobación y el bloqueo
+            db.db.expire_all()
+            if not self.is_due(db, ahora):
+                db.release_lock(self.lock_name, self.worker_id, ejecutada=False)
+                return None
+
+        ejecutada = False
+        try:
+            resultado = self.scrape(self.urls)
+            # Un scraping fallido no cuenta como sincronización: se reintenta antes del intervalo
+            ejecutada = bool(resultado.get('success'))
+            if not ejecutada:
+                print(f"⚠️ Sincronización FFCV fallida: {resultado.get('error', 'sin detalle')}")
+            elif not resultado.get('unchanged'):
+                print(f"🔄 Sincronización FFCV: {resultado['created']} nuevos, "
+                      f"{resultado['updated']} actualizados")
+            return resultado
+        except Exception as e:
+            print(f"Error en la sincronización automática: {e}")
+            return None
+        finally:
+            reintentar_en = None if ejecutada else SCRAPING_CONFIG['sync_retry_interval']
+            with DatabaseManager() as db:
+                db.release_lock(self.lock_name, self.worker_id, ejecutada=ejecutada,
+                                reintentar_en=reintentar_en)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                # Un fallo de la base de datos (bloqueo, conexión) no debe parar el hilo
+                print(f"Error en la sincronización automática: {e}")
+                traceback.print_exc()
+            espera = min(SCRAPING_CONFIG['sync_check_interval'], SCRAPING_CONFIG['sync_interval_partido'])
+            self._stop.wait(espera)
+
+    def start(self) -> bool:
+        """Arranca el hilo si hay URLs configuradas"""
+        if not self.urls or (self._thread and self._thread.is_alive()):
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='sincronizacion-ffcv', daemon=True)
+        self._thread.start()
+        print(f"🔄 Sincronización automática FFCV activa para {len(self.urls)} calendarios")
+        return True
+
+    def stop(self):
+        self._stop.set()
+
+
+# Instancia global del programador de sincronización
+sync_scheduler = SyncScheduler()
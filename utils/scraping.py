@@ -5,8 +5,33 @@ import requests
 from bs4 import BeautifulSoup
 import re
 import time
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from datetime import datetime, date
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple, Union
+from urllib.parse import urlparse
+from config.settings import SCRAPING_CONFIG
+from utils.http_cache import ConditionalGetCache, CachedResponse
+from utils.ffcv_parser import iter_calendar_rows
+
+class HostThrottle:
+    """Respeta un intervalo mínimo entre peticiones a un mismo host (seguro entre hilos)"""
+    
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._next_slot = {}
+    
+    def wait(self, url: str):
+        """Reserva el siguiente turno del host de la URL y espera hasta él"""
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.delay
+        if slot > now:
+            time.sleep(slot - now)
 
 class FederacionScraper:
     """Scraper base para federaciones - Clase base requerida"""
@@ -18,6 +43,11 @@ class FederacionScraper:
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        self.cache = ConditionalGetCache(SCRAPING_CONFIG['cache_dir'])
+    
+    def conditional_get(self, url: str, force: bool = False) -> CachedResponse:
+        """GET condicional con la sesión del scraper y la caché en disco"""
+        return self.cache.get(self.session, url, timeout=SCRAPING_CONFIG['timeout'], force=force)
     
     def get_calendar_page(self, url: str) -> Optional[BeautifulSoup]:
         """Método base para obtener páginas"""
@@ -110,16 +140,48 @@ class FFCVScraper(FederacionScraper):
             print(f"Error parseando calendario FFCV: {e}")
             return matches
     
+    def parse_ffcv_html(self, content, competicion: str = 'Liga', backend: str = None) -> List[Dict]:
+        """
+        Parsea el HTML del calendario con el parser rápido de utils.ffcv_parser
+        
+        Devuelve los mismos diccionarios que parse_ffcv_calendar sin construir
+        el árbol completo de la página.
+        """
+        matches = []
+        for row in iter_calendar_rows(content, backend):
+            if not row['equipo_local'] or not row['equipo_visitante']:
+                continue
+            
+            try:
+                fecha = datetime.strptime(row['fecha'], '%d-%m-%Y').date() if row['fecha'] else None
+            except ValueError:
+                fecha = None
+            
+            matches.append({
+                'fecha': fecha,
+                'jornada': row['jornada'],
+                'competicion': competicion,
+                'equipo_local': row['equipo_local'],
+                'goles_equipo_local': row['goles_equipo_local'],
+                'equipo_visitante': row['equipo_visitante'],
+                'goles_equipo_visitante': row['goles_equipo_visitante'],
+                'hora': row['hora'],
+                'arbitro': None,  # No disponible en esta tabla
+                'campo': row['campo'],
+                'scrapeado': True
+            })
+        return matches
+    
     def scrape_ffcv_calendar(self, url: str) -> List[Dict]:
         """Realiza el scraping completo del calendario FFCV"""
         matches = []
         
         try:
-            soup = self.get_calendar_page(url)
-            if not soup:
+            response = self.fetch_calendar_content(url, force=True)
+            if not response:
                 return matches
             
-            matches = self.parse_ffcv_calendar(soup)
+            matches = self.parse_ffcv_html(response.content)
             print(f"Scrapeados {len(matches)} partidos de FFCV")
             return matches
             
@@ -220,44 +282,166 @@ class FFCVScraper(FederacionScraper):
         except:
             return None
     
-    def update_database(self, matches: List[Dict]) -> Tuple[int, int]:
-        """Actualiza la base de datos con los partidos de FFCV"""
-        created = 0
-        updated = 0
+    def fetch_calendar_content(self, url: str, throttle: Optional[HostThrottle] = None,
+                               force: bool = False) -> Optional[CachedResponse]:
+        """
+        Descarga una página del calendario con reintentos y GET condicional
+        
+        Los errores de conexión, los 5xx y los 429 se reintentan hasta
+        SCRAPING_CONFIG['retry_attempts'] veces con espera exponencial.
+        
+        Returns:
+            CachedResponse: contenido y si ha cambiado desde la última descarga,
+            o None si no se pudo descargar
+        """
+        attempts = max(1, SCRAPING_CONFIG['retry_attempts'])
+        
+        for attempt in range(attempts):
+            if throttle:
+                throttle.wait(url)
+            try:
+                return self.conditional_get(url, force=force)
+            except requests.RequestException as e:
+                print(f"Error al obtener {url} (intento {attempt + 1}/{attempts}): {e}")
+                status = e.response.status_code if e.response is not None else None
+                if status is not None and status < 500 and status != 429:
+                    break
+                if attempt + 1 < attempts:
+                    time.sleep(SCRAPING_CONFIG['retry_backoff'] * 2 ** attempt)
+        
+        return None
+    
+    def scrape_ffcv_calendars(self, sources: List[Union[str, Dict]], max_workers: int = None,
+                              parse_workers: int = None, force: bool = False,
+                              progress: Callable[[int, int], None] = None) -> Dict[str, any]:
+        """
+        Scraping concurrente de varios calendarios FFCV
+        
+        Las descargas se hacen en paralelo con un máximo de max_workers
+        peticiones simultáneas y el intervalo de SCRAPING_CONFIG entre
+        peticiones al mismo host. Cada página se parsea en cuanto termina su
+        descarga, en un pool de procesos si parse_workers > 1; las páginas sin
+        cambios desde la última descarga (304 o mismo hash) no se parsean.
+        Las páginas nuevas no se guardan en la caché: sus respuestas vuelven
+        en 'responses' para guardarlas con save_responses() tras escribirlas.
+        El pool usa el arranque 'spawn': se crea desde hilos en segundo plano
+        dentro de los workers de gunicorn y un fork ahí no es seguro.
+        
+        Args:
+            sources (list): URLs o diccionarios {'url': ..., 'competicion': ...}
+            max_workers (int, optional): Descargas simultáneas
+            parse_workers (int, optional): Procesos de parseo (1 = en este proceso)
+            force (bool): Descargar y parsear aunque las páginas no hayan cambiado
+            progress (callable, optional): progress(terminadas, total) al acabar cada página
+        
+        Returns:
+            dict: {'matches': partidos de todas las páginas, 'pages': resultado por URL,
+                   'responses': [(url, CachedResponse)] de las páginas parseadas con partidos}
+        """
+        sources = [s if isinstance(s, dict) else {'url': s} for s in sources if s]
+        if not sources:
+            return {'matches': [], 'pages': [], 'responses': []}
+        
+        max_workers = max_workers or SCRAPING_CONFIG['max_concurrent_requests']
+        parse_workers = parse_workers or SCRAPING_CONFIG['parse_workers']
+        throttle = HostThrottle(SCRAPING_CONFIG['delay_between_requests'])
+        
+        pages = [{'url': s['url'], 'competicion': s.get('competicion', 'Liga'),
+                  'success': False, 'unchanged': False, 'matches': 0, 'error': None} for s in sources]
+        results = [[] for _ in sources]
+        responses = [None for _ in sources]
+        
+        parse_pool = None
+        if parse_workers > 1 and len(sources) > 1:
+            try:
+                parse_pool = ProcessPoolExecutor(max_workers=min(parse_workers, len(sources)),
+                                                 mp_context=multiprocessing.get_context('spawn'))
+            except (OSError, NotImplementedError) as e:
+                print(f"Pool de parseo no disponible, se parsea en el proceso actual: {e}")
+        
+        terminadas = 0
+        
+        def page_done():
+            nonlocal terminadas
+            terminadas += 1
+            if progress:
+                progress(terminadas, len(pages))
         
         try:
-            # Importar aquí para evitar errores circulares
-            from database.db_manager import DatabaseManager, Calendario
-            
-            with DatabaseManager() as db:
-                for match in matches:
-                    # Buscar si el partido ya existe
-                    existing = db.db.query(Calendario).filter(
-                        Calendario.fecha == match['fecha'],
-                        Calendario.equipo_local == match['equipo_local'],
-                        Calendario.equipo_visitante == match['equipo_visitante'],
-                        Calendario.competicion == match['competicion']
-                    ).first()
-                    
-                    if existing:
-                        # Actualizar partido existente
-                        for key, value in match.items():
-                            if hasattr(existing, key) and value is not None:
-                                setattr(existing, key, value)
-                        existing.fecha_actualizacion = datetime.utcnow()
-                        updated += 1
+            parse_futures = {}
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(sources))) as fetch_pool:
+                fetch_futures = {
+                    fetch_pool.submit(self.fetch_calendar_content, page['url'], throttle, force): i
+                    for i, page in enumerate(pages)
+                }
+                for future in as_completed(fetch_futures):
+                    i = fetch_futures[future]
+                    response = future.result()
+                    content = response.content if response else None
+                    if response is None:
+                        pages[i]['error'] = 'No se pudo descargar la página'
+                    elif not response.changed:
+                        pages[i]['success'] = pages[i]['unchanged'] = True
+                    elif parse_pool:
+                        responses[i] = response
+                        parse_futures[parse_pool.submit(parse_ffcv_content, content, pages[i]['competicion'])] = i
+                        continue
                     else:
-                        # Crear nuevo partido
-                        new_match = Calendario(**match)
-                        db.db.add(new_match)
-                        created += 1
-                
-                db.db.commit()
-                
-        except Exception as e:
-            print(f"Error actualizando base de datos: {e}")
+                        responses[i] = response
+                        try:
+                            results[i] = parse_ffcv_content(content, pages[i]['competicion'])
+                            pages[i]['success'] = True
+                        except Exception as e:
+                            pages[i]['error'] = f"Error parseando la página: {e}"
+                    page_done()
             
-        return created, updated
+            for future in as_completed(parse_futures):
+                i = parse_futures[future]
+                try:
+                    results[i] = future.result()
+                    pages[i]['success'] = True
+                except Exception as e:
+                    pages[i]['error'] = f"Error parseando la página: {e}"
+                page_done()
+        finally:
+            if parse_pool:
+                parse_pool.shutdown()
+        
+        for page, matches in zip(pages, results):
+            page['matches'] = len(matches)
+        
+        matches = [match for page_matches in results for match in page_matches]
+        sin_cambios = sum(1 for page in pages if page['unchanged'])
+        print(f"Scrapeados {len(matches)} partidos de {len(sources)} calendarios FFCV ({sin_cambios} sin cambios)")
+        # Una página que no da partidos (o no se pudo parsear) se vuelve a parsear la próxima vez
+        guardables = [(page['url'], response) for page, response in zip(pages, responses)
+                      if response is not None and page['success'] and page['matches']]
+        return {'matches': matches, 'pages': pages, 'responses': guardables}
+    
+    def save_responses(self, responses: List[Tuple[str, CachedResponse]]) -> None:
+        """Guarda en la caché las páginas ya importadas para no volver a parsearlas"""
+        for url, response in responses:
+            try:
+                self.cache.save(url, response)
+            except OSError as e:
+                print(f"No se pudo guardar {url} en la caché: {e}")
+    
+    def update_database(self, matches: List[Dict]) -> Tuple[int, int]:
+        """
+        Actualiza la base de datos con los partidos de FFCV en bloque
+        
+        Raises:
+            Exception: Si falla la escritura (la caché no se toca y se reintenta en la próxima importación)
+        """
+        # Importar aquí para evitar errores circulares
+        from database.db_manager import DatabaseManager
+        
+        with DatabaseManager() as db:
+            return db.upsert_calendario(matches)
+
+def parse_ffcv_content(content: bytes, competicion: str = 'Liga') -> List[Dict]:
+    """Parsea el HTML de un calendario FFCV (función de módulo para el pool de procesos)"""
+    return FFCVScraper().parse_ffcv_html(content, competicion)
 
 class ScrapingManager:
     """Gestor principal de scraping"""
@@ -267,18 +451,43 @@ class ScrapingManager:
         self.last_scraping = None
         self.scraping_enabled = False
         self.ffcv_url = None
+        self.ffcv_urls = []
     
     def configure_ffcv_scraper(self, url: str):
         """Configura el scraper específico de FFCV"""
         self.ffcv_url = url
+        self.ffcv_urls = [url]
         self.scraping_enabled = True
     
-    def perform_ffcv_scraping(self) -> Dict[str, any]:
-        """Realiza el scraping específico de FFCV"""
-        if not self.ffcv_url:
+    def configure_ffcv_urls(self, urls: List[Union[str, Dict]]):
+        """Configura varios calendarios FFCV (equipos A, B, juveniles, liga y copa)"""
+        self.ffcv_urls = [url for url in urls if url]
+        self.ffcv_url = None
+        if self.ffcv_urls:
+            first = self.ffcv_urls[0]
+            self.ffcv_url = first['url'] if isinstance(first, dict) else first
+        self.scraping_enabled = bool(self.ffcv_urls)
+    
+    def perform_ffcv_multi_scraping(self, force: bool = False,
+                                    progress: Callable[[int, str], None] = None,
+                                    urls: List[Union[str, Dict]] = None) -> Dict[str, any]:
+        """
+        Scraping concurrente de todos los calendarios configurados con una única escritura
+        
+        Si ninguna página ha cambiado desde la última importación no se parsea
+        ni se escribe nada y el resultado lleva 'unchanged': True.
+        
+        Args:
+            force (bool): Ignorar la caché de páginas
+            progress (callable, optional): progress(porcentaje, mensaje) durante el proceso
+            urls (list, optional): Calendarios a importar (por defecto self.ffcv_urls)
+        """
+        progress = progress or (lambda porcentaje, mensaje: None)
+        urls = urls or self.ffcv_urls
+        if not urls:
             return {
                 'success': False,
-                'error': 'URL de FFCV no configurada',
+                'error': 'URLs de FFCV no configuradas',
                 'created': 0,
                 'updated': 0
             }
@@ -286,26 +495,52 @@ class ScrapingManager:
         try:
             start_time = time.time()
             
-            matches = self.ffcv_scraper.scrape_ffcv_calendar(self.ffcv_url)
+            progress(5, f"Descargando {len(urls)} calendarios")
+            scraped = self.ffcv_scraper.scrape_ffcv_calendars(
+                urls,
+                force=force,
+                progress=lambda hechas, total: progress(5 + 80 * hechas // total, f"Calendarios procesados: {hechas}/{total}")
+            )
+            matches = scraped['matches']
+            pages = scraped['pages']
+            
+            if not matches and pages and all(page['unchanged'] for page in pages):
+                elapsed_time = time.time() - start_time
+                self.last_scraping = datetime.now()
+                return {
+                    'success': True,
+                    'unchanged': True,
+                    'created': 0,
+                    'updated': 0,
+                    'total_matches': 0,
+                    'pages': pages,
+                    'elapsed_time': elapsed_time,
+                    'timestamp': self.last_scraping.isoformat()
+                }
             
             if not matches:
                 return {
                     'success': False,
                     'error': 'No se encontraron partidos en FFCV',
                     'created': 0,
-                    'updated': 0
+                    'updated': 0,
+                    'pages': scraped['pages']
                 }
             
+            progress(90, f"Guardando {len(matches)} partidos")
             created, updated = self.ffcv_scraper.update_database(matches)
+            self.ffcv_scraper.save_responses(scraped['responses'])
             
             elapsed_time = time.time() - start_time
             self.last_scraping = datetime.now()
             
             return {
                 'success': True,
+                'unchanged': False,
                 'created': created,
                 'updated': updated,
                 'total_matches': len(matches),
+                'pages': pages,
                 'elapsed_time': elapsed_time,
                 'timestamp': self.last_scraping.isoformat()
             }
@@ -317,6 +552,32 @@ class ScrapingManager:
                 'created': 0,
                 'updated': 0
             }
+    
+    def perform_ffcv_scraping(self, force: bool = False) -> Dict[str, any]:
+        """Realiza el scraping específico de FFCV"""
+        if not self.ffcv_url:
+            return {
+                'success': False,
+                'error': 'URL de FFCV no configurada',
+                'created': 0,
+                'updated': 0
+            }
+        
+        return self.perform_ffcv_multi_scraping(force=force, urls=[self.ffcv_url])
 
 # Instancia global del gestor de scraping
-scraping_manager = ScrapingManager()
\ No newline at end of file
+scraping_manager = ScrapingManager()
+
+def run_ffcv_import_job(set_progress, urls: List[Union[str, Dict]], force: bool = False) -> Dict[str, any]:
+    """
+    Trabajo en segundo plano de importación FFCV (ver utils.jobs.JobRunner)
+    
+    Usa su propio ScrapingManager para que dos importaciones simultáneas no
+    compartan la lista de URLs del gestor global.
+    """
+    manager = ScrapingManager()
+    manager.configure_ffcv_urls(urls)
+    result = manager.perform_ffcv_multi_scraping(force=force, progress=set_progress)
+    if result['success']:
+        scraping_manager.last_scraping = manager.last_scraping
+    return result
\ No newline at end of file
@@ -1,39 +1,42 @@
 import uuid
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, Optional, Any, List
-from config.settings import APP_CONFIG
+from config.settings import APP_CONFIG, SESSION_CONFIG
+from utils.session_store import create_session_backend
 
 class SessionManager:
-    """Gestor de sesiones para la aplicación"""
+    """Gestor de sesiones para la aplicación (el almacén se elige en SESSION_CONFIG)"""
     _instance = None
     
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(SessionManager, cls).__new__(cls)
-            cls._instance.sessions = {}
             cls._instance.session_timeout = APP_CONFIG.get('session_timeout', 3600)  # 1 hora por defecto
+            cls._instance.configure(SESSION_CONFIG)
         return cls._instance
     
-    @classmethod
-    def get_session(cls):
-        """Obtiene la sesión actual (método de clase para facilitar el acceso)"""
-        if cls._instance is None:
-            return {}
-        # Devolver la primera sesión activa (para simplificar)
-        for session in cls._instance.sessions.values():
-            if session.get('is_active', False) and cls._instance._is_session_valid(session):
-                return session
-        return {}
+    def configure(self, config: Dict[str, Any]):
+        """Cambia el almacén de sesiones"""
+        self.config = {**SESSION_CONFIG, **config}
+        self.backend = create_session_backend(self.config)
+    
+    def _caducidad(self, segundos: int = None):
+        """Instante de caducidad (epoch para el almacén) y su datetime UTC para la sesión"""
+        expira = time.time() + (self.session_timeout if segundos is None else segundos)
+        return expira, datetime.utcfromtimestamp(expira)
     
-    def __init__(self):
-        # Inicialización real solo ocurre una vez debido a __new__
-        if not hasattr(self, 'sessions'):
-            self.sessions = {}
-            self.session_timeout = APP_CONFIG.get('session_timeout', 3600)
+    def _guardar(self, session_id: str, session: Dict[str, Any], segundos: int = None):
+        """Renueva la caducidad y la última actividad y guarda la sesión en el almacén"""
+        expira, session['expires_at'] = self._caducidad(segundos)
+        session['last_activity'] = datetime.utcnow()
+        self.backend.put(session_id, session, expira)
     
     def create_session(self, user_id: str, username: str, additional_data: Dict = None) -> str:
         """Crea una nueva sesión para un usuario"""
+        # Limpiar sesiones expiradas (solo recorre las caducadas)
+        self._cleanup_expired_sessions()
+        
         session_id = str(uuid.uuid4())
         
         session_data = {
@@ -41,8 +44,6 @@ class SessionManager:
             'user_id': user_id,
             'username': username,
             'created_at': datetime.utcnow(),
-            'last_activity': datetime.utcnow(),
-            'expires_at': datetime.utcnow() + timedelta(seconds=self.session_timeout),
             'is_active': True,
             'ip_address': None,  # Se puede añadir en el futuro
             'user_agent': None   # Se puede añadir en el futuro
@@ -52,29 +53,19 @@ class SessionManager:
         if additional_data:
             session_data.update(additional_data)
         
-        self.sessions[session_id] = session_data
-        
-        # Limpiar sesiones expiradas
-        self._cleanup_expired_sessions()
-        
+        self._guardar(session_id, session_data)
         return session_id
     
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
-        """Obtiene los datos de una sesión"""
-        if not session_id or session_id not in self.sessions:
+        """Obtiene los datos de una sesión y renueva su caducidad"""
+        if not session_id:
             return None
         
-        session = self.sessions[session_id]
-        
-        # Verificar si la sesión ha expirado
-        if not self._is_session_valid(session):
-            self.destroy_session(session_id)
+        session = self.backend.get(session_id, time.time())
+        if session is None or not session.get('is_active', False):
             return None
         
-        # Actualizar última actividad
-        session['last_activity'] = datetime.utcnow()
-        session['expires_at'] = datetime.utcnow() + timedelta(seconds=self.session_timeout)
-        
+        self._guardar(session_id, session)
         return session
     
     def update_session(self, session_id: str, data: Dict[str, Any]) -> bool:
@@ -89,23 +80,26 @@ class SessionManager:
             if key not in protected_fields:
                 session[key] = value
         
-        session['last_activity'] = datetime.utcnow()
+        self._guardar(session_id, session)
         return True
     
     def destroy_session(self, session_id: str) -> bool:
         """Destruye una sesión"""
-        if session_id in self.sessions:
-            del self.sessions[session_id]
-            return True
-        return False
-    
-    def is_session_valid(self, session_id: str) -> bool:
-        """Verifica si una sesión es válida"""
-        if not session_id or session_id not in self.sessions:
+        if not session_id:
             return False
+        return self.backend.delete(session_id)
+    
+    def peek_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Datos de una sesión válida sin renovar su caducidad (una sola búsqueda por id)"""
+        if not session_id:
+            return None
         
-        session = self.sessions[session_id]
-        return self._is_session_valid(session)
+        session = self.backend.get(session_id, time.time())
+        return session if session is not None and self._is_session_valid(session) else None
+    
+    def is_session_valid(self, session_id: str) -> bool:
+        """Verifica si una sesión es válida (una sola búsqueda por id, sin modificarla)"""
+        return self.peek_session(session_id) is not None
     
     def _is_session_valid(self, session: Dict[str, Any]) -> bool:
         """Verifica internamente si una sesión es válida"""
@@ -120,86 +114,50 @@ class SessionManager:
     
     def extend_session(self, session_id: str, extension_time: int = None) -> bool:
         """Extiende el tiempo de vida de una sesión"""
-        session = self.get_session(session_id)
+        session = self.backend.get(session_id, time.time()) if session_id else None
         if not session:
             return False
         
-        if extension_time is None:
-            extension_time = self.session_timeout
-        
-        session['expires_at'] = datetime.utcnow() + timedelta(seconds=extension_time)
-        session['last_activity'] = datetime.utcnow()
+        self._guardar(session_id, session, extension_time)
         return True
     
     def get_active_sessions(self) -> Dict[str, Dict[str, Any]]:
         """Obtiene todas las sesiones activas"""
-        active_sessions = {}
-        
-        for session_id, session in self.sessions.items():
-            if self._is_session_valid(session):
-                active_sessions[session_id] = session
-        
-        return active_sessions
+        return {
+            session_id: session
+            for session_id, session in self.backend.active(time.time()).items()
+            if self._is_session_valid(session)
+        }
     
     def get_user_sessions(self, user_id: str) -> List[Dict[str, Any]]:
-        """Obtiene todas las sesiones activas de un usuario"""
-        user_sessions = []
-        
-        for session_id, session in self.sessions.items():
-            if (session.get('user_id') == user_id and 
-                self._is_session_valid(session)):
-                user_sessions.append(session)
-        
-        return user_sessions
+        """Obtiene todas las sesiones activas de un usuario (índice por usuario)"""
+        return [s for s in self.backend.user_sessions(user_id, time.time()) if self._is_session_valid(s)]
     
     def destroy_user_sessions(self, user_id: str) -> int:
         """Destruye todas las sesiones de un usuario"""
-        sessions_to_destroy = []
-        
-        for session_id, session in self.sessions.items():
-            if session.get('user_id') == user_id:
-                sessions_to_destroy.append(session_id)
-        
-        for session_id in sessions_to_destroy:
-            self.destroy_session(session_id)
-        
-        return len(sessions_to_destroy)
+        return self.backend.delete_user(user_id)
     
-    def _cleanup_expired_sessions(self):
+    def _cleanup_expired_sessions(self) -> int:
         """Limpia las sesiones expiradas"""
-        expired_sessions = []
-        
-        for session_id, session in self.sessions.items():
-            if not self._is_session_valid(session):
-                expired_sessions.append(session_id)
-        
-        for session_id in expired_sessions:
-            del self.sessions[session_id]
+        return self.backend.cleanup(time.time())
     
     def get_session_stats(self) -> Dict[str, Any]:
         """Obtiene estadísticas de las sesiones"""
         self._cleanup_expired_sessions()
         
-        active_sessions = len(self.sessions)
-        unique_users = len(set(session.get('user_id') for session in self.sessions.values()))
+        sessions = self.get_active_sessions()
+        ahora = datetime.utcnow()
         
         # Calcular tiempo promedio de sesión activa
-        total_duration = 0
-        session_count = 0
-        
-        for session in self.sessions.values():
-            if self._is_session_valid(session):
-                duration = (datetime.utcnow() - session['created_at']).total_seconds()
-                total_duration += duration
-                session_count += 1
-        
-        avg_duration = total_duration / session_count if session_count > 0 else 0
+        total_duration = sum((ahora - s['created_at']).total_seconds() for s in sessions.values())
+        avg_duration = total_duration / len(sessions) if sessions else 0
         
         return {
-            'active_sessions': active_sessions,
-            'unique_users': unique_users,
+            'active_sessions': len(sessions),
+            'unique_users': self.backend.count_users(time.time()),
             'average_session_duration': avg_duration,
-            'session_timeout': self.session_timeout
+            'session_timeout': self.session_timeout,
+            'backend': self.config.get('backend', 'memory')
         }
 
 class DashSessionManager:
@@ -0,0 +1,246 @@
+# Almacenes de sesiones para SessionManager
+#
+# Cada backend guarda las sesiones por id (búsqueda O(1)), con un índice
+# secundario por usuario y la caducidad indexada: limpiar cuesta O(caducadas)
+# y no recorre todas las sesiones.
+#
+# Con el backend 'memory' las sesiones son de cada proceso. Con 'sqlite' o
+# 'redis' se comparten entre los workers de gunicorn: una sesión creada o
+# cerrada en un worker se ve igual en todos.
+
+import time
+import heapq
+import pickle
+import sqlite3
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+class MemorySessionBackend:
+    """Diccionario del proceso con un montículo de caducidades y un índice por usuario"""
+
+    def __init__(self):
+        self._sessions = {}                  # id -> (sesión, expira)
+        self._por_usuario = defaultdict(set)  # user_id -> ids
+        # (expira, id); al extender una sesión su entrada anterior queda obsoleta y se descarta al salir
+        self._caducidades = []
+        self._lock = threading.RLock()
+
+    def get(self, session_id: str, ahora: float) -> Optional[Dict]:
+        entrada = self._sessions.get(session_id)
+        if entrada is None or entrada[1] <= ahora:
+            return None
+        return entrada[0]
+
+    def put(self, session_id: str, session: Dict, expira: float):
+        with self._lock:
+            anterior = self._sessions.get(session_id)
+            if anterior is not None and anterior[0].get('user_id') != session.get('user_id'):
+                self._quitar_de_usuario(anterior[0].get('user_id'), session_id)
+            self._sessions[session_id] = (session, expira)
+            self._por_usuario[session.get('user_id')].add(session_id)
+            heapq.heappush(self._caducidades, (expira, session_id))
+
+            # Las extensiones acumulan entradas obsoletas: se rehace el montículo de vez en cuando
+            if len(self._caducidades) > 2 * len(self._sessions) + 64:
+                self._caducidades = [(e, sid) for sid, (_, e) in self._sessions.items()]
+                heapq.heapify(self._caducidades)
+
+    def _quitar_de_usuario(self, user_id, session_id):
+        ids = self._por_usuario.get(user_id)
+        if ids is not None:
+            ids.discard(session_id)
+            if not ids:
+                del self._por_usuario[user_id]
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            entrada = self._sessions.pop(session_id, None)
+            if entrada is None:
+                return False
+            self._quitar_de_usuario(entrada[0].get('user_id'), session_id)
+            return True
+
+    def cleanup(self, ahora: float) -> int:
+        borradas = 0
+        with self._lock:
+            while self._caducidades and self._caducidades[0][0] <= ahora:
+                expira, session_id = heapq.heappop(self._caducidades)
+                entrada = self._sessions.get(session_id)
+                # Solo cuenta si es la caducidad vigente de la sesión
+                if entrada is not None and entrada[1] == expira:
+                    self.delete(session_id)
+                    borradas += 1
+        return borradas
+
+    def user_sessions(self, user_id: str, ahora: float) -> List[Dict]:
+        with self._lock:
+            ids = list(self._por_usuario.get(user_id, ()))
+        return [s for s in (self.get(sid, ahora) for sid in ids) if s is not None]
+
+    def delete_user(self, user_id: str) -> int:
+        with self._lock:
+            ids = list(self._por_usuario.get(user_id, ()))
+            for session_id in ids:
+                self.delete(session_id)
+            return len(ids)
+
+    def active(self, ahora: float) -> Dict[str, Dict]:
+        with self._lock:
+            return {sid: s for sid, (s, expira) in self._sessions.items() if expira > ahora}
+
+    def count_users(self, ahora: float) -> int:
+        with self._lock:
+            return len(self._por_usuario)
+
+    def clear(self):
+        with self._lock:
+            self._sessions.clear()
+            self._por_usuario.clear()
+            self._caducidades.clear()
+
+class SQLiteSessionBackend:
+    """Sesiones compartidas entre procesos en un fichero SQLite, con índices por caducidad y usuario"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute("CREATE TABLE IF NOT EXISTS sesiones ("
+                     "id TEXT PRIMARY KEY, usuario TEXT, expira REAL NOT NULL, datos BLOB NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_sesiones_expira ON sesiones (expira)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_sesiones_usuario ON sesiones (usuario)")
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, session_id: str, ahora: float) -> Optional[Dict]:
+        row = self._connect().execute(
+            "SELECT datos FROM sesiones WHERE id = ? AND expira > ?", (session_id, ahora)
+        ).fetchone()
+        return pickle.loads(row[0]) if row else None
+
+    def put(self, session_id: str, session: Dict, expira: float):
+        self._connect().execute(
+            "INSERT OR REPLACE INTO sesiones VALUES (?, ?, ?, ?)",
+            (session_id, session.get('user_id'), expira, pickle.dumps(session))
+        )
+
+    def delete(self, session_id: str) -> bool:
+        return self._connect().execute("DELETE FROM sesiones WHERE id = ?", (session_id,)).rowcount > 0
+
+    def cleanup(self, ahora: float) -> int:
+        return self._connect().execute("DELETE FROM sesiones WHERE expira <= ?", (ahora,)).rowcount
+
+    def user_sessions(self, user_id: str, ahora: float) -> List[Dict]:
+        rows = self._connect().execute(
+            "SELECT datos FROM sesiones WHERE usuario = ? AND expira > ?", (user_id, ahora)
+        ).fetchall()
+        return [pickle.loads(row[0]) for row in rows]
+
+    def delete_user(self, user_id: str) -> int:
+        return self._connect().execute("DELETE FROM sesiones WHERE usuario = ?", (user_id,)).rowcount
+
+    def active(self, ahora: float) -> Dict[str, Dict]:
+        rows = self._connect().execute("SELECT id, datos FROM sesiones WHERE expira > ?", (ahora,)).fetchall()
+        return {row[0]: pickle.loads(row[1]) for row in rows}
+
+    def count_users(self, ahora: float) -> int:
+        return self._connect().execute(
+            "SELECT COUNT(DISTINCT usuario) FROM sesiones WHERE expira > ?", (ahora,)
+        ).fetchone()[0]
+
+    def clear(self):
+        self._connect().execute("DELETE FROM sesiones")
+
+class RedisSessionBackend:
+    """Sesiones compartidas en Redis: TTL nativo por sesión, un set por usuario y un zset de caducidades"""
+
+    def __init__(self, url, prefix='ud_atzeneta:sesion:'):
+        import redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self.caducidades = f"{prefix}caducidades"
+
+    def _clave(self, session_id):
+        return f"{self.prefix}s:{session_id}"
+
+    def _usuario(self, user_id):
+        return f"{self.prefix}u:{user_id}"
+
+    def get(self, session_id: str, ahora: float) -> Optional[Dict]:
+        valor = self.client.get(self._clave(session_id))
+        return pickle.loads(valor) if valor is not None else None
+
+    def put(self, session_id: str, session: Dict, expira: float):
+        user_id = session.get('user_id')
+        pipe = self.client.pipeline()
+        pipe.set(self._clave(session_id), pickle.dumps(session), px=max(1, int((expira - time.time()) * 1000)))
+        pipe.sadd(self._usuario(user_id), session_id)
+        pipe.zadd(self.caducidades, {f"{session_id}|{user_id}": expira})
+        pipe.execute()
+
+    def delete(self, session_id: str) -> bool:
+        session = self.get(session_id, 0)
+        borrada = bool(self.client.delete(self._clave(session_id)))
+        if session is not None:
+            self.client.srem(self._usuario(session.get('user_id')), session_id)
+        return borrada
+
+    def cleanup(self, ahora: float) -> int:
+        # Redis ya borra las sesiones caducadas; aquí solo se limpian los índices por usuario
+        miembros = self.client.zrangebyscore(self.caducidades, '-inf', ahora)
+        if not miembros:
+            return 0
+        pipe = self.client.pipeline()
+        for miembro in miembros:
+            session_id, _, user_id = miembro.decode('utf-8').partition('|')
+            pipe.srem(self._usuario(user_id), session_id)
+        pipe.zremrangebyscore(self.caducidades, '-inf', ahora)
+        pipe.execute()
+        return len(miembros)
+
+    def user_sessions(self, user_id: str, ahora: float) -> List[Dict]:
+        ids = [sid.decode('utf-8') for sid in self.client.smembers(self._usuario(user_id))]
+        return [s for s in (self.get(sid, ahora) for sid in ids) if s is not None]
+
+    def delete_user(self, user_id: str) -> int:
+        ids = [sid.decode('utf-8') for sid in self.client.smembers(self._usuario(user_id))]
+        if ids:
+            self.client.delete(*[self._clave(sid) for sid in ids])
+        self.client.delete(self._usuario(user_id))
+        return len(ids)
+
+    def active(self, ahora: float) -> Dict[str, Dict]:
+        sesiones = {}
+        for clave in self.client.scan_iter(f"{self.prefix}s:*"):
+            valor = self.client.get(clave)
+            if valor is not None:
+                sesiones[clave.decode('utf-8')[len(self.prefix) + 2:]] = pickle.loads(valor)
+        return sesiones
+
+    def count_users(self, ahora: float) -> int:
+        return sum(1 for _ in self.client.scan_iter(f"{self.prefix}u:*"))
+
+    def clear(self):
+        for clave in self.client.scan_iter(f"{self.prefix}*"):
+            self.client.delete(clave)
+
+def create_session_backend(config):
+    """Crea el backend configurado (memoria si el compartido no está disponible)"""
+    backend = config.get('backend', 'memory')
+
+    try:
+        if backend == 'sqlite':
+            return SQLiteSessionBackend(config.get('url') or 'ud_atzeneta_sessions.db')
+        if backend == 'redis':
+            return RedisSessionBackend(config.get('url') or 'redis://localhost:6379/0')
+    except Exception as e:
+        print(f"Almacén de sesiones '{backend}' no disponible, se usa el de memoria: {e}")
+
+    return MemorySessionBackend()
@@ -0,0 +1,98 @@
+"""
+Perfil del arranque de la aplicación
+
+app.py anota la duración de cada fase de inicialización con startup_phase().
+profile_startup() arranca un intérprete nuevo con -X importtime para medir
+las importaciones (agrupadas por paquete) y recoge esas fases junto con lo
+que tarda en precargarse cada página. Se usa desde setup.py --profile-startup.
+"""
+
+import os
+import sys
+import json
+import time
+import subprocess
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+# Fase -> segundos, en el orden en que se ejecutan
+STARTUP_TIMINGS: Dict[str, float] = {}
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_SCRIPT = """
+import io, json, time, contextlib
+inicio = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    import app
+    app.page_registry.wait_warm_up()
+from utils.startup_profile import STARTUP_TIMINGS
+print(json.dumps({
+    'total': time.perf_counter() - inicio,
+    'fases': STARTUP_TIMINGS,
+    'paginas': app.page_registry.load_times
+}))
+"""
+
+
+@contextmanager
+def startup_phase(nombre: str):
+    """Mide una fase del arranque y la guarda en STARTUP_TIMINGS"""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS[nombre] = time.perf_counter() - inicio
+
+
+def parse_importtime(salida: str) -> Dict[str, float]:
+    """Suma el tiempo propio (segundos) de cada paquete de primer nivel en la salida de -X importtime"""
+    paquetes = {}
+    for linea in salida.splitlines():
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        propio, _, modulo = linea[len('import time:'):].split('|')
+        paquete = modulo.strip().split('.')[0]
+        paquetes[paquete] = paquetes.get(paquete, 0) + int(propio) / 1e6
+    return paquetes
+
+
+def profile_startup(env: Dict[str, str] = None) -> Dict:
+    """
+    Arranca la aplicación en un proceso nuevo y devuelve el perfil
+
+    Returns:
+        dict: total (s), importaciones {paquete: s}, fases {fase: s}
+        y paginas {ruta: s}
+    """
+    resultado = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _SCRIPT],
+        cwd=ROOT, env={**os.environ, **(env or {})}, capture_output=True, text=True
+    )
+    if resultado.returncode != 0:
+        raise RuntimeError(resultado.stderr.strip().splitlines()[-1] if resultado.stderr else 'Error al arrancar')
+
+    perfil = json.loads(resultado.stdout.strip().splitlines()[-1])
+    perfil['importaciones'] = parse_importtime(resultado.stderr)
+    return perfil
+
+
+def _top(tiempos: Dict[str, float], limite: int) -> List[Tuple[str, float]]:
+    return sorted(tiempos.items(), key=lambda item: item[1], reverse=True)[:limite]
+
+
+def print_startup_profile(perfil: Dict, limite: int = 15):
+    """Muestra el perfil de arranque por consola"""
+    print(f"\n⏱️  Arranque completo: {perfil['total'] * 1000:.0f} ms")
+
+    print(f"\n📦 Importaciones por paquete (tiempo propio, {limite} mayores):")
+    for paquete, segundos in _top(perfil['importaciones'], limite):
+        print(f"   {paquete:35} {segundos * 1000:8.1f} ms")
+
+    print("\n🗄️  Fases de inicialización:")
+    for fase, segundos in perfil['fases'].items():
+        print(f"   {fase:35} {segundos * 1000:8.1f} ms")
+
+    print("\n📄 Páginas (importación en la precarga):")
+    for ruta, segundos in _top(perfil['paginas'], limite):
+        print(f"   {ruta:35} {segundos * 1000:8.1f} ms")
@@ -0,0 +1,236 @@
+"""
+Paginación, filtrado y ordenación en servidor para las DataTables
+
+Las tablas creadas con create_paged_table usan page_action/sort_action/
+filter_action="custom": el navegador solo recibe la página visible y la
+consulta de filtro de la tabla se traduce a filtros de SQLAlchemy.
+"""
+
+import math
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from dash import dash_table
+from sqlalchemy import String, cast
+from config.settings import COLORS
+from utils.helpers import parse_date
+
+DEFAULT_PAGE_SIZE = 15
+
+# Operadores de la sintaxis filter_query de Dash y su equivalente
+FILTER_OPERATORS = [
+    ['ge ', '>='],
+    ['le ', '<='],
+    ['lt ', '<'],
+    ['gt ', '>'],
+    ['ne ', '!='],
+    ['eq ', '='],
+    ['contains '],
+    ['datestartswith '],
+]
+
+
+def split_filter_part(filter_part: str) -> Tuple[Optional[str], Optional[str], Any]:
+    """
+    Divide una parte del filter_query en (columna, operador, valor)
+
+    El operador es el que va justo después del '}' de {columna}: buscarlo en
+    toda la cadena confundiría un valor como "jorge" con el operador 'ge'.
+    """
+    filter_part = filter_part.strip()
+    cierre = filter_part.find('}')
+    if not filter_part.startswith('{') or cierre == -1:
+        return None, None, None
+
+    name = filter_part[1:cierre]
+    rest = filter_part[cierre + 1:].lstrip()
+    for operator_type in FILTER_OPERATORS:
+        for operator in operator_type:
+            if rest.startswith(operator):
+                value_part = rest[len(operator):].strip()
+                v0 = value_part[0] if value_part else ''
+                if v0 and v0 == value_part[-1] and v0 in ("'", '"', '`'):
+                    value = value_part[1:-1].replace('\\' + v0, v0)
+                else:
+                    # El valor se deja como texto: solo se convierte a número si la columna lo es
+                    value = value_part
+
+                # El primer operador de cada grupo es el nombre canónico
+                return name, operator_type[0].strip(), value
+
+    return None, None, None
+
+
+def parse_filter_query(filter_query: Optional[str]) -> List[Tuple[str, str, Any]]:
+    """Convierte un filter_query completo en una lista de condiciones"""
+    if not filter_query:
+        return []
+
+    conditions = []
+    for filter_part in filter_query.split(' && '):
+        name, operator, value = split_filter_part(filter_part)
+        if name is not None:
+            conditions.append((name, operator, value))
+    return conditions
+
+
+def _is_custom_condition(column) -> bool:
+    """Las funciones (operador, valor) -> condición no son columnas ordenables"""
+    return callable(column) and not hasattr(column, 'type')
+
+
+def _python_type(column):
+    try:
+        return column.type.python_type
+    except (AttributeError, NotImplementedError):
+        return None
+
+
+def _is_date_column(column) -> bool:
+    return _python_type(column) in (date, datetime)
+
+
+def _numeric_value(column, value):
+    """Convierte el valor al tipo de una columna numérica; None si no es un número"""
+    python_type = _python_type(column)
+    try:
+        numero = float(value)
+    except (TypeError, ValueError):
+        return None
+    if python_type is int:
+        return int(numero) if numero.is_integer() else numero
+    return numero
+
+
+def build_condition(column, operator: str, value: Any):
+    """Construye la condición SQLAlchemy para una columna"""
+    if operator == 'contains':
+        return cast(column, String).ilike(f"%{value}%")
+
+    if operator == 'datestartswith':
+        parsed = parse_date(str(value))
+        if parsed and _is_date_column(column):
+            return column == parsed
+        return cast(column, String).like(f"{value}%")
+
+    if _is_date_column(column) and isinstance(value, str):
+        parsed = parse_date(value)
+        if parsed is None:
+            return cast(column, String).ilike(f"%{value}%")
+        value = parsed
+    elif _python_type(column) in (int, float, Decimal):
+        numero = _numeric_value(column, value)
+        if numero is None:
+            return cast(column, String).ilike(f"%{value}%")
+        value = numero
+
+    if operator == 'eq':
+        return column == value
+    if operator == 'ne':
+        return column != value
+    if operator == 'lt':
+        return column < value
+    if operator == 'le':
+        return column <= value
+    if operator == 'gt':
+        return column > value
+    if operator == 'ge':
+        return column >= value
+    return None
+
+
+def apply_filter_query(query, columns: Dict[str, Any], filter_query: Optional[str]):
+    """
+    Aplica el filter_query de una DataTable a una consulta
+
+    Args:
+        query: Consulta SQLAlchemy
+        columns (dict): id de columna de la tabla -> columna SQLAlchemy o
+            función (operador, valor) -> condición. Las columnas sin
+            correspondencia se ignoran.
+        filter_query (str): Valor de la propiedad filter_query de la tabla
+    """
+    for name, operator, value in parse_filter_query(filter_query):
+        column = columns.get(name)
+        if column is None:
+            continue
+
+        if _is_custom_condition(column):
+            condition = column(operator, value)
+        else:
+            condition = build_condition(column, operator, value)
+
+        if condition is not None:
+            query = query.filter(condition)
+    return query
+
+
+def apply_sort_by(query, columns: Dict[str, Any], sort_by: Optional[List[Dict]], default_order=None):
+    """Aplica el sort_by de una DataTable a una consulta"""
+    order_clauses = []
+    for sort in sort_by or []:
+        column = columns.get(sort.get('column_id'))
+        if column is None or _is_custom_condition(column):
+            continue
+        order_clauses.append(column.desc() if sort.get('direction') == 'desc' else column.asc())
+
+    if order_clauses:
+        return query.order_by(*order_clauses)
+    if default_order is not None:
+        return query.order_by(*default_order)
+    return query
+
+
+def paginate_query(query, columns: Dict[str, Any], row_formatter: Callable,
+                   page_current: Optional[int] = 0, page_size: Optional[int] = DEFAULT_PAGE_SIZE,
+                   sort_by: Optional[List[Dict]] = None, filter_query: Optional[str] = None,
+                   default_order=None) -> Tuple[List[Dict], int]:
+    """
+    Filtra, ordena y pagina una consulta en la base de datos
+
+    Returns:
+        tuple: (filas de la página formateadas, número total de páginas)
+    """
+    page_current = page_current or 0
+    page_size = page_size or DEFAULT_PAGE_SIZE
+
+    query = apply_filter_query(query, columns, filter_query)
+    total = query.order_by(None).count()
+    query = apply_sort_by(query, columns, sort_by, default_order)
+
+    rows = query.offset(page_current * page_size).limit(page_size).all()
+    page_count = max(1, math.ceil(total / page_size))
+    return [row_formatter(row) for row in rows], page_count
+
+
+def create_paged_table(table_id: str, columns: List[Dict], page_size: int = DEFAULT_PAGE_SIZE,
+                       **kwargs) -> dash_table.DataTable:
+    """Crea una DataTable con paginación, filtrado y ordenación en servidor"""
+    style_cell = {
+        'textAlign': 'left',
+        'padding': '12px',
+        'fontFamily': 'Arial'
+    }
+    style_cell.update(kwargs.pop('style_cell', {}))
+
+    return dash_table.DataTable(
+        id=table_id,
+        data=[],
+        columns=columns,
+        style_cell=style_cell,
+        style_header={
+            'backgroundColor': COLORS['primary'],
+            'color': 'white',
+            'fontWeight': 'bold'
+        },
+        page_current=0,
+        page_size=page_size,
+        page_count=1,
+        page_action="custom",
+        sort_action="custom",
+        sort_mode="single",
+        sort_by=[],
+        filter_action="custom",
+        filter_query="",
+        **kwargs
+    )